@@ -0,0 +1,119 @@
+"""
+Compare the padded alignment in detection.detect_faces, rotating the whole bordered image
+for each face, against the roi alignment rotating only the region around each face.
+
+    python benchmarks/align_throughput.py --faces 1 5 20 --detector placed
+"""
+
+# built-in dependencies
+import argparse
+import time
+from typing import List
+
+# 3rd party dependencies
+import cv2
+import numpy as np
+
+# project dependencies
+from deepface.modules import detection, modeling
+from deepface.models.Detector import Detector, FacialAreaRegion
+
+FRAME_SIZE = (1080, 1920)
+
+
+# pylint: disable=too-few-public-methods
+class PlacedFacesDetector(Detector):
+    """
+    Detector returning the faces placed into the frame, so only alignment is measured
+    """
+
+    facial_areas: List[FacialAreaRegion] = []
+
+    def detect_faces(self, img: np.ndarray) -> List[FacialAreaRegion]:
+        # faces are placed into the frame without borders
+        dx = (img.shape[1] - FRAME_SIZE[1]) // 2
+        dy = (img.shape[0] - FRAME_SIZE[0]) // 2
+        return [
+            FacialAreaRegion(
+                x=facial_area.x + dx,
+                y=facial_area.y + dy,
+                w=facial_area.w,
+                h=facial_area.h,
+                left_eye=(facial_area.left_eye[0] + dx, facial_area.left_eye[1] + dy),
+                right_eye=(facial_area.right_eye[0] + dx, facial_area.right_eye[1] + dy),
+            )
+            for facial_area in self.facial_areas
+        ]
+
+
+def create_frame(face: np.ndarray, faces: int, rng: np.random.Generator) -> np.ndarray:
+    frame = np.full((*FRAME_SIZE, 3), 127, dtype=np.uint8)
+    size = 160
+    columns = FRAME_SIZE[1] // size
+    facial_areas = []
+    for i in range(faces):
+        x = (i % columns) * size + 10
+        y = (i // columns) * size + 10
+        angle = rng.uniform(-20, 20)
+        rotation = cv2.getRotationMatrix2D((size / 2 - 10, size / 2 - 10), angle, 1.0)
+        frame[y : y + size - 20, x : x + size - 20] = cv2.warpAffine(
+            face, rotation, (size - 20, size - 20), borderMode=cv2.BORDER_REPLICATE
+        )
+        # eyes of a rotated face
+        radians = np.radians(angle)
+        offset = 25 * np.array([np.cos(radians), -np.sin(radians)])
+        center = np.array([x + size / 2 - 10, y + size / 2 - 30])
+        facial_areas.append(
+            FacialAreaRegion(
+                x=x,
+                y=y,
+                w=size - 20,
+                h=size - 20,
+                left_eye=tuple(int(value) for value in center + offset),
+                right_eye=tuple(int(value) for value in center - offset),
+            )
+        )
+    PlacedFacesDetector.facial_areas = facial_areas
+    return frame
+
+
+def measure(func, repeat: int) -> float:
+    func()
+    tic = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - tic) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--detector", type=str, default="placed")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    modeling.models["face_detector"]["placed"] = PlacedFacesDetector
+    face = cv2.resize(cv2.imread("tests/dataset/img1.jpg"), (140, 140))
+    rng = np.random.default_rng(seed=0)
+
+    print("| faces | padded (ms) | roi (ms) | speedup |")
+    print("| --- | --- | --- | --- |")
+    for faces in args.faces:
+        frame = create_frame(face, faces, rng)
+        durations = {
+            align_mode: measure(
+                lambda frame=frame, align_mode=align_mode: detection.detect_faces(
+                    detector_backend=args.detector, img=frame, align_mode=align_mode
+                ),
+                repeat=args.repeat,
+            )
+            for align_mode in ["padded", "roi"]
+        }
+        print(
+            f"| {faces} | {1000 * durations['padded']:.1f} | {1000 * durations['roi']:.2f} "
+            f"| {durations['padded'] / durations['roi']:.0f}x |"
+        )
+
+
+if __name__ == "__main__":
+    main()
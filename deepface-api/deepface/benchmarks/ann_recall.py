@@ -0,0 +1,88 @@
+"""
+Compare recall and latency of the ivf index with the exact search of find_batched
+on a synthetic gallery of clustered embeddings, where each identity has a few samples.
+
+    python benchmarks/ann_recall.py --identities 20000 --samples 5 --probes 1 4 16 64
+"""
+
+# built-in dependencies
+import argparse
+import time
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.modules import verification
+from deepface.modules.search import EmbeddingMatrix, IVFIndex
+
+
+def create_gallery(
+    identities: int, samples: int, dims: int, latent_dims: int, noise: float, rng
+):
+    # face embeddings lie on a lower dimensional manifold than their length
+    projection = rng.normal(size=(latent_dims, dims)) / np.sqrt(latent_dims)
+    centers = rng.normal(size=(identities, latent_dims)) @ projection
+    gallery = np.repeat(centers, samples, axis=0) + noise * rng.normal(
+        size=(identities * samples, dims)
+    )
+    return centers, gallery.astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--identities", type=int, default=20000)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--dims", type=int, default=128)
+    parser.add_argument("--latent-dims", type=int, default=32)
+    parser.add_argument("--noise", type=float, default=0.3)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--metric", type=str, default="cosine")
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    centers, gallery = create_gallery(
+        args.identities, args.samples, args.dims, args.latent_dims, args.noise, rng
+    )
+    query_ids = rng.choice(args.identities, size=args.queries, replace=False)
+    queries = centers[query_ids] + args.noise * rng.normal(size=(args.queries, args.dims))
+
+    # reference results with the distance calculation of find_batched
+    tic = time.perf_counter()
+    distances = verification.find_distance(gallery, queries, args.metric)  # (M, N)
+    exact = np.argsort(distances, axis=1, kind="stable")[:, : args.top_k]
+    exact_duration = (time.perf_counter() - tic) / args.queries
+
+    embedding_matrix = EmbeddingMatrix(embeddings=gallery)
+    tic = time.perf_counter()
+    index = IVFIndex.build(embedding_matrix)
+    build_duration = time.perf_counter() - tic
+
+    print(
+        f"{len(gallery)} embeddings, {index.centroids.shape[0]} lists, "
+        f"index built in {build_duration:.2f}s"
+    )
+    print(f"| probes | recall@{args.top_k} | latency (ms) | speedup |")
+    print("| --- | --- | --- | --- |")
+    print(f"| exact | 1.000 | {1000 * exact_duration:.2f} | 1x |")
+
+    for probes in args.probes:
+        hits = 0
+        tic = time.perf_counter()
+        for query, expected in zip(queries, exact):
+            indices, _ = index.search(
+                query, args.metric, threshold=np.inf, top_k=args.top_k, probes=probes
+            )
+            hits += len(set(indices.tolist()) & set(expected.tolist()))
+        duration = (time.perf_counter() - tic) / args.queries
+        recall = hits / exact.size
+        print(
+            f"| {probes} | {recall:.3f} | {1000 * duration:.2f} "
+            f"| {exact_duration / duration:.0f}x |"
+        )
+
+
+if __name__ == "__main__":
+    main()
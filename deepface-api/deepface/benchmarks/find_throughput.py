@@ -0,0 +1,105 @@
+"""
+Compare the throughput of the legacy row by row search in recognition.find
+against the vectorized embedding matrix search on a synthetic datastore.
+
+    python benchmarks/find_throughput.py --dims 128 --sizes 1000 10000 100000
+"""
+
+# built-in dependencies
+import argparse
+import time
+
+# 3rd party dependencies
+import numpy as np
+import pandas as pd
+
+# project dependencies
+from deepface.modules import verification
+from deepface.modules.search import EmbeddingMatrix
+
+
+def legacy_search(df: pd.DataFrame, target: list, distance_metric: str, threshold: float):
+    distances = []
+    for _, instance in df.iterrows():
+        source_representation = instance["embedding"]
+        distances.append(
+            verification.find_distance(source_representation, target, distance_metric)
+        )
+    result_df = df.copy()
+    result_df["distance"] = distances
+    result_df = result_df.drop(columns=["embedding"])
+    result_df = result_df[result_df["distance"] <= threshold]
+    return result_df.sort_values(by=["distance"], ascending=True).reset_index(drop=True)
+
+
+def matrix_search(
+    representations: list,
+    embedding_matrix: EmbeddingMatrix,
+    target: list,
+    distance_metric: str,
+    threshold: float,
+):
+    indices, distances = embedding_matrix.search(target, distance_metric, threshold)
+    result_df = pd.DataFrame(
+        [{"identity": representations[index]["identity"]} for index in indices],
+        columns=["identity"],
+    )
+    result_df["distance"] = distances
+    return result_df
+
+
+def measure(func, repeat: int) -> float:
+    tic = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - tic) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dims", type=int, default=128)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--metric", type=str, default="cosine")
+    parser.add_argument("--legacy-limit", type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    threshold = verification.find_threshold("Facenet", args.metric)
+
+    print("| identities | legacy (ms) | matrix (ms) | speedup | matrix queries/s |")
+    print("| --- | --- | --- | --- | --- |")
+    for size in args.sizes:
+        representations = [
+            {"identity": f"img{i}.jpg", "embedding": rng.normal(size=args.dims).tolist()}
+            for i in range(size)
+        ]
+        target = rng.normal(size=args.dims).tolist()
+
+        embedding_matrix = EmbeddingMatrix.from_list(
+            [item["embedding"] for item in representations]
+        )
+        matrix_duration = measure(
+            lambda: matrix_search(
+                representations, embedding_matrix, target, args.metric, threshold
+            ),
+            repeat=20,
+        )
+
+        legacy = "-"
+        speedup = "-"
+        if size <= args.legacy_limit:
+            df = pd.DataFrame(representations)
+            legacy_duration = measure(
+                lambda: legacy_search(df, target, args.metric, threshold), repeat=1
+            )
+            legacy = f"{1000 * legacy_duration:.1f}"
+            speedup = f"{legacy_duration / matrix_duration:.0f}x"
+
+        print(
+            f"| {size} | {legacy} | {1000 * matrix_duration:.2f} | {speedup} "
+            f"| {1 / matrix_duration:.0f} |"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Measure the cold start of deepface modules in fresh interpreters with python -X importtime,
+reporting the import time, peak memory, whether tensorflow is imported and the slowest
+packages imported on the way.
+
+    python benchmarks/import_time.py --modules deepface.api.src.app deepface.DeepFace
+"""
+
+# built-in dependencies
+import os
+import sys
+import argparse
+import subprocess
+import statistics
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# child interpreter reports its peak memory in KB and loaded frameworks after the import
+SCRIPT = (
+    "import resource, sys; import {module}; "
+    "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "
+    "'tensorflow' in sys.modules, 'torch' in sys.modules)"
+)
+
+
+def import_module(module: str) -> Tuple[float, int, bool, bool, Dict[str, float]]:
+    """
+    Import a module in a fresh interpreter
+    Returns:
+        duration (float): cumulative import time in ms
+        memory (int): peak resident memory in KB
+        tf_imported (bool): tensorflow is imported
+        torch_imported (bool): torch is imported
+        packages (dict): import time in ms spent in the modules of each top level package
+    """
+    env = {**os.environ, "PYTHONPATH": ROOT, "TF_CPP_MIN_LOG_LEVEL": "3"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT.format(module=module)],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    memory, tf_imported, torch_imported = result.stdout.split()[-3:]
+
+    duration = 0.0
+    packages: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:") :].split("|")
+        package = name.strip().split(".", maxsplit=1)[0]
+        packages[package] = packages.get(package, 0) + int(self_time) / 1000
+        # nested imports are indented, top level ones have a single space
+        if not name.startswith("  "):
+            duration += int(cumulative) / 1000
+
+    return (
+        duration,
+        int(memory),
+        tf_imported == "True",
+        torch_imported == "True",
+        packages,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        default=["deepface.api.src.app", "deepface.DeepFace", "deepface.modules.modeling"],
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    print("module                    | import ms | peak MB | tensorflow | torch")
+    slowest: List[str] = []
+    for module in args.modules:
+        runs = [import_module(module) for _ in range(args.repeat)]
+        duration = statistics.median(run[0] for run in runs)
+        memory = statistics.median(run[1] for run in runs) / 1024
+        _, _, tf_imported, torch_imported, packages = runs[-1]
+        print(
+            f"{module:<25} | {duration:>9.0f} | {memory:>7.0f} |"
+            f" {str(tf_imported):<10} | {torch_imported}"
+        )
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        slowest.append(
+            f"{module}: "
+            + ", ".join(f"{package} {ms:.0f} ms" for package, ms in heaviest[: args.top])
+        )
+
+    print("\nslowest top level imports")
+    print("\n".join(slowest))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compare the latency of keras models called eagerly, through their graph compiled inference
+functions and through their graphs compiled with XLA, in fresh interpreters. Weights are
+downloaded first if they are not available.
+
+    python benchmarks/inference_latency.py --models facial_recognition/DeepID --batch-sizes 1 8
+"""
+
+# built-in dependencies
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODELS = [
+    "facial_recognition/VGG-Face",
+    "facial_recognition/Facenet",
+    "facial_recognition/OpenFace",
+    "facial_recognition/DeepID",
+    "facial_recognition/ArcFace",
+    "facial_recognition/GhostFaceNet",
+    "facial_attribute/Emotion",
+    "facial_attribute/Age",
+]
+
+# keras models are built layer by layer, since compiled artifacts are restored as graphs already
+MODES = {
+    "eager": {"DEEPFACE_GRAPH_INFERENCE": "0"},
+    "graph": {"DEEPFACE_GRAPH_INFERENCE": "1", "DEEPFACE_JIT_COMPILE": "0"},
+    "xla": {"DEEPFACE_GRAPH_INFERENCE": "1", "DEEPFACE_JIT_COMPILE": "1"},
+}
+
+# inputs are the ones modeling.warm_up feeds, and the first calls are not measured
+SCRIPT = """
+import json, time, statistics
+import numpy as np
+from deepface import DeepFace
+from deepface.modules import modeling
+task, model_name = "{model}".split("/")
+model = modeling.build_model(task=task, model_name=model_name)
+if task == "facial_recognition":
+    width, height = model.input_shape
+    func, shape = model.forward_batch, (height, width, 3)
+else:
+    func, shape = model.predict_batch, (224, 224, 3)
+imgs = np.random.default_rng(seed=0).random(({batch_size}, *shape), dtype=np.float32)
+for _ in range(3):
+    func(imgs)
+durations = []
+for _ in range({repeat}):
+    tic = time.perf_counter()
+    func(imgs)
+    durations.append(time.perf_counter() - tic)
+print(json.dumps({{"latency": 1000 * statistics.median(durations)}}))
+"""
+
+
+def measure_latency(model: str, mode: str, batch_size: int, repeat: int) -> Dict[str, float]:
+    """
+    Measure the median latency of a model call in a fresh interpreter
+    Returns:
+        result (dict): latency in ms
+    """
+    env = {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "TF_CPP_MIN_LOG_LEVEL": "3",
+        "DEEPFACE_COMPILED_MODELS": "0",
+        **MODES[mode],
+    }
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            SCRIPT.format(model=model, batch_size=batch_size, repeat=repeat),
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", default=MODELS)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8])
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    print("model                            | batch | eager ms | graph ms |   xla ms")
+    for model in args.models:
+        for batch_size in args.batch_sizes:
+            latencies = {
+                mode: measure_latency(model, mode, batch_size, args.repeat)["latency"]
+                for mode in MODES
+            }
+            print(
+                f"{model:<32} | {batch_size:>5} | {latencies['eager']:>8.1f} |"
+                f" {latencies['graph']:>8.1f} | {latencies['xla']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
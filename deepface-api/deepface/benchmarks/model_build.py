@@ -0,0 +1,115 @@
+"""
+Compare the build time of keras models in fresh interpreters, when they are built layer by
+layer and their h5 weights are loaded, when they are built and compiled for the first time,
+and when they are loaded from their compiled artifacts in ~/.deepface/weights/compiled.
+Weights are downloaded first if they are not available.
+
+    python benchmarks/model_build.py --models facial_recognition/Facenet512 facial_attribute/Age
+"""
+
+# built-in dependencies
+import os
+import sys
+import glob
+import json
+import shutil
+import argparse
+import statistics
+import subprocess
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODELS = [
+    "facial_recognition/VGG-Face",
+    "facial_recognition/Facenet",
+    "facial_recognition/Facenet512",
+    "facial_recognition/OpenFace",
+    "facial_recognition/DeepID",
+    "facial_recognition/ArcFace",
+    "facial_recognition/GhostFaceNet",
+    "facial_attribute/Emotion",
+    "facial_attribute/Age",
+    "facial_attribute/Gender",
+    "facial_attribute/Race",
+    "facial_attribute/Age-Gender-Race",
+]
+
+# tensorflow and the model module are imported before, so just the build is measured
+SCRIPT = """
+import json, time
+from deepface import DeepFace
+from deepface.modules import modeling
+import tensorflow
+task, model_name = "{model}".split("/")
+modeling.find_model_class(task=task, model_name=model_name)
+tic = time.perf_counter()
+stats = modeling.warm_up(["{model}"])["{model}"]
+total = time.perf_counter() - tic
+print(json.dumps({{"build": stats["load_time"], "first_inference": total - stats["load_time"]}}))
+"""
+
+
+def build_model(model: str, compiled: bool, repeat: int = 1) -> Dict[str, float]:
+    """
+    Build a model and run its first inference in fresh interpreters
+    Returns:
+        durations (dict): median seconds spent in build and first_inference
+    """
+    runs = [build_model_once(model, compiled) for _ in range(repeat)]
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def build_model_once(model: str, compiled: bool) -> Dict[str, float]:
+    env = {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "TF_CPP_MIN_LOG_LEVEL": "3",
+        "DEEPFACE_COMPILED_MODELS": "1" if compiled else "0",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(model=model)],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def remove_compiled_artifacts(model: str) -> None:
+    folder = os.path.join(
+        os.getenv("DEEPFACE_HOME", default=os.path.expanduser("~")), ".deepface/weights/compiled"
+    )
+    model_name = model.split("/")[1]
+    for path in glob.glob(os.path.join(folder, f"{model_name}-" + "?" * 16)):
+        shutil.rmtree(path, ignore_errors=True)
+    if os.path.isfile(os.path.join(folder, f"{model_name}.json")):
+        os.remove(os.path.join(folder, f"{model_name}.json"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", default=MODELS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        "model                            | h5 build s | compiling build s | compiled build s"
+        " | h5 first inference s | compiled first inference s"
+    )
+    for model in args.models:
+        remove_compiled_artifacts(model)
+        h5 = build_model(model, compiled=False, repeat=args.repeat)
+        # artifact is compiled in the first build
+        compiling = build_model(model, compiled=True)
+        compiled = build_model(model, compiled=True, repeat=args.repeat)
+        print(
+            f"{model:<32} | {h5['build']:>10.2f} | {compiling['build']:>17.2f} |"
+            f" {compiled['build']:>16.2f} | {h5['first_inference']:>20.2f} |"
+            f" {compiled['first_inference']:>26.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
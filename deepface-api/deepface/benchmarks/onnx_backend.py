@@ -0,0 +1,181 @@
+"""
+Compare facial recognition models run by tensorflow with their onnx exports in fp32, and
+quantized into int8 dynamically and statically, in fresh interpreters. Verification decisions
+of the pairs in tests/dataset/master.csv are compared with the ones of tensorflow, and the
+latency of single faces and the memory of the model are reported. Static quantization is
+calibrated on tests/dataset. Weights are downloaded first if they are not available.
+
+    python benchmarks/onnx_backend.py --models Facenet512 ArcFace
+"""
+
+# built-in dependencies
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from typing import Any, Dict, List
+
+# 3rd party dependencies
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET = os.path.join(ROOT, "tests", "dataset")
+
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from deepface.commons import onnx_utils
+from deepface.modules import detection, verification
+
+BACKENDS = {
+    "tensorflow": None,
+    "onnx fp32": "fp32",
+    "onnx dynamic": "dynamic",
+    "onnx static": "static",
+}
+
+# the client module is imported before, so the memory of tensorflow itself is not counted
+SCRIPT = """
+import json, time, resource, statistics
+import numpy as np
+from deepface import DeepFace
+from deepface.modules import modeling, representation
+modeling.find_model_class(task="facial_recognition", model_name="{model_name}")
+memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+model = modeling.build_model(task="facial_recognition", model_name="{model_name}")
+with np.load("{faces_file}") as data:
+    faces = [data[key] for key in sorted(data.files, key=int)]
+embeddings = representation.find_embeddings(
+    faces=faces, model_name="{model_name}", color_face="bgr"
+)
+width, height = model.input_shape
+img = np.random.default_rng(seed=0).random((1, height, width, 3), dtype=np.float32)
+for _ in range(3):
+    model.forward_batch(img)
+durations = []
+for _ in range({repeat}):
+    tic = time.perf_counter()
+    model.forward_batch(img)
+    durations.append(time.perf_counter() - tic)
+np.save("{embeddings_file}", np.array(embeddings, dtype=np.float64))
+print(json.dumps({{
+    "latency": 1000 * statistics.median(durations),
+    "memory": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memory) / 1024,
+}}))
+"""
+
+
+def extract_faces(img_names: List[str]) -> List[np.ndarray]:
+    """
+    Extract the face of each image as represent does with opencv detector
+    Returns:
+        faces (list): bgr face of each image
+    """
+    faces = []
+    for img_name in img_names:
+        img_objs = detection.extract_faces(
+            img_path=os.path.join(DATASET, img_name),
+            detector_backend="opencv",
+            enforce_detection=False,
+            color_face="bgr",
+            normalize_face=False,
+        )
+        faces.append(img_objs[0]["face"])
+    return faces
+
+
+def run_backend(
+    model_name: str, quantization: Any, faces_file: str, work_dir: str, repeat: int
+) -> Dict[str, Any]:
+    """
+    Find the embeddings of the faces with a backend in a fresh interpreter. The model is
+        built once before, so its export and quantization are not measured.
+    Returns:
+        result (dict): embeddings, latency in ms and memory of the model in MB
+    """
+    embeddings_file = os.path.join(work_dir, "embeddings.npy")
+    env = {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "TF_CPP_MIN_LOG_LEVEL": "3",
+        "DEEPFACE_ONNX_MODELS": "" if quantization is None else f"{model_name}:{quantization}",
+        "DEEPFACE_ONNX_CALIBRATION_DIR": DATASET,
+    }
+    script = SCRIPT.format(
+        model_name=model_name,
+        faces_file=faces_file,
+        embeddings_file=embeddings_file,
+        repeat=repeat,
+    )
+    for _ in range(2):
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+    return {
+        **json.loads(result.stdout.splitlines()[-1]),
+        "embeddings": np.load(embeddings_file),
+    }
+
+
+def find_distances(
+    embeddings: np.ndarray, pairs: pd.DataFrame, index: Dict[str, int]
+) -> np.ndarray:
+    """
+    Find the cosine distance of each pair
+    """
+    return np.array(
+        [
+            verification.find_cosine_distance(
+                embeddings[index[file_x]], embeddings[index[file_y]]
+            )
+            for file_x, file_y in zip(pairs["file_x"], pairs["file_y"])
+        ]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", default=onnx_utils.ONNX_MODELS)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    pairs = pd.read_csv(os.path.join(DATASET, "master.csv"))
+    labels = (pairs["Decision"] == "Yes").to_numpy()
+    img_names = sorted(set(pairs["file_x"]) | set(pairs["file_y"]))
+    index = {img_name: i for i, img_name in enumerate(img_names)}
+
+    print(
+        "model          | backend      | agreement | accuracy | max distance delta"
+        " | latency ms | memory MB"
+    )
+    with tempfile.TemporaryDirectory() as work_dir:
+        faces_file = os.path.join(work_dir, "faces.npz")
+        np.savez(faces_file, **{str(i): face for i, face in enumerate(extract_faces(img_names))})
+
+        for model_name in args.models:
+            threshold = verification.find_threshold(model_name, "cosine")
+            reference = None
+            for backend, quantization in BACKENDS.items():
+                result = run_backend(model_name, quantization, faces_file, work_dir, args.repeat)
+                distances = find_distances(result["embeddings"], pairs, index)
+                decisions = distances <= threshold
+                if reference is None:
+                    reference = (distances, decisions)
+                print(
+                    f"{model_name:<14} | {backend:<12} |"
+                    f" {100 * np.mean(decisions == reference[1]):>8.1f}% |"
+                    f" {100 * np.mean(decisions == labels):>7.1f}% |"
+                    f" {np.max(np.abs(distances - reference[0])):>18.4f} |"
+                    f" {result['latency']:>10.1f} | {result['memory']:>9.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
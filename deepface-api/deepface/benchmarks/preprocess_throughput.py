@@ -0,0 +1,79 @@
+"""
+Compare the legacy preprocessing from detected faces to model inputs, scaling each face into
+float64, flipping its channels twice, resizing, padding and normalizing it with many copies,
+against the fused preprocessing.prepare_faces writing uint8 faces into a reused float32 batch.
+
+    python benchmarks/preprocess_throughput.py --faces 1 8 32 --normalization base VGGFace
+"""
+
+# built-in dependencies
+import argparse
+import time
+from typing import Callable, List, Tuple
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.modules import preprocessing
+
+# input sizes of VGG-Face, Facenet and ArcFace
+TARGET_SIZES = [(224, 224), (160, 160), (112, 112)]
+
+
+def legacy(faces: List[np.ndarray], target_size: Tuple[int, int], normalization: str):
+    imgs = []
+    for face in faces:
+        # extract_faces returns rgb faces in [0, 1], and represent reverts them into bgr
+        img = (face[:, :, ::-1] / 255)[:, :, ::-1]
+        img = preprocessing.resize_image(img=img, target_size=target_size)
+        imgs.append(preprocessing.normalize_input(img=img, normalization=normalization))
+    return np.concatenate(imgs, axis=0)
+
+
+def fused(faces: List[np.ndarray], target_size: Tuple[int, int], normalization: str):
+    return preprocessing.prepare_faces(
+        faces=faces, target_size=target_size, normalization=normalization, color_face="bgr"
+    )
+
+
+def measure(func: Callable[..., np.ndarray], repeat: int, *args) -> float:
+    func(*args)
+    tic = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return 1000 * (time.perf_counter() - tic) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--normalization", nargs="+", default=["base", "VGGFace", "Facenet"])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    print("target   | normalization | faces | legacy ms | fused ms | speedup | max abs diff")
+    for target_size in TARGET_SIZES:
+        for normalization in args.normalization:
+            for count in args.faces:
+                # detected faces in various sizes
+                faces = [
+                    rng.integers(0, 256, size=(size, size * 4 // 5, 3), dtype=np.uint8)
+                    for size in rng.integers(80, 400, size=count)
+                ]
+                expected = legacy(faces, target_size, normalization)
+                diff = float(np.abs(fused(faces, target_size, normalization) - expected).max())
+
+                inputs = (faces, target_size, normalization)
+                legacy_ms = measure(legacy, args.repeat, *inputs)
+                fused_ms = measure(fused, args.repeat, *inputs)
+                print(
+                    f"{target_size[0]}x{target_size[1]:<4} | {normalization:<13} | {count:>5} |"
+                    f" {legacy_ms:>9.2f} | {fused_ms:>8.2f} | {legacy_ms / fused_ms:>6.1f}x |"
+                    f" {diff:.1e}"
+                )
+
+
+if __name__ == "__main__":
+    main()
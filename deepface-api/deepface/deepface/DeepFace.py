@@ -12,7 +12,6 @@ os.environ["TF_USE_LEGACY_KERAS"] = "1"
 # 3rd party dependencies
 import numpy as np
 import pandas as pd
-import tensorflow as tf
 
 # package dependencies
 from deepface.commons import package_utils, folder_utils
@@ -26,6 +25,7 @@ from deepface.modules import (
     detection,
     streaming,
     preprocessing,
+    gallery,
 )
 from deepface import __version__
 
@@ -39,9 +39,10 @@ package_utils.validate_for_keras3()
 
 warnings.filterwarnings("ignore")
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+# tensorflow is imported when a keras model is built, its logger is configured before that
 tf_version = package_utils.get_tf_major_version()
 if tf_version == 2:
-    tf.get_logger().setLevel(logging.ERROR)
+    logging.getLogger("tensorflow").setLevel(logging.ERROR)
 # -----------------------------------
 
 # create required folders if necessary to store model weights
@@ -55,7 +56,8 @@ def build_model(model_name: str, task: str = "facial_recognition") -> Any:
         model_name (str): model identifier
             - VGG-Face, Facenet, Facenet512, OpenFace, DeepFace, DeepID, Dlib,
                 ArcFace, SFace, GhostFaceNet for face recognition
-            - Age, Gender, Emotion, Race for facial attributes
+            - Age, Gender, Emotion, Race for facial attributes, or Age-Gender-Race
+                for age, gender and race in a single model sharing their backbone
             - opencv, mtcnn, ssd, dlib, retinaface, mediapipe, yolov8, yunet,
                 fastmtcnn or centerface for face detectors
             - Fasnet for spoofing
@@ -67,9 +69,24 @@ def build_model(model_name: str, task: str = "facial_recognition") -> Any:
     return modeling.build_model(task=task, model_name=model_name)
 
 
+def warm_up(model_names: Optional[Union[str, List[str]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Preload models and run a dummy inference on each of them, so the first request does not
+        pay for model construction and weight loading. Warmed up models are never evicted
+        from memory even if DEEPFACE_MODEL_MEMORY_BUDGET environment variable is set.
+    Args:
+        model_names (str or list): task/model_name items such as face_detector/retinaface or
+            facial_recognition/Facenet512, a comma separated string of them is accepted too
+            (default is None for DEEPFACE_WARMUP_MODELS environment variable)
+    Returns:
+        stats (dict): load time, estimated memory and usage of each warmed up model
+    """
+    return modeling.warm_up(model_names=model_names)
+
+
 def verify(
     img1_path: Union[str, np.ndarray, List[float]],
-    img2_path: Union[str, np.ndarray, List[float]],
+    img2_path: Union[str, np.ndarray, List[float], None],
     model_name: str = "VGG-Face",
     detector_backend: str = "opencv",
     distance_metric: str = "cosine",
@@ -80,6 +97,7 @@ def verify(
     silent: bool = False,
     threshold: Optional[float] = None,
     anti_spoofing: bool = False,
+    gallery_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Verify if an image pair represents the same person or different persons.
@@ -90,7 +108,8 @@ def verify(
 
         img2_path (str or np.ndarray or List[float]): Path to the second image.
             Accepts exact image path as a string, numpy array (BGR), base64 encoded images
-            or pre-calculated embeddings.
+            or pre-calculated embeddings. It can be None if gallery_id is set and the identity
+            is already enrolled.
 
         model_name (str): Model for face recognition. Options: VGG-Face, Facenet, Facenet512,
             OpenFace, DeepFace, DeepID, Dlib, ArcFace, SFace and GhostFaceNet (default is VGG-Face).
@@ -122,6 +141,10 @@ def verify(
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        gallery_id (str): Identifier of the second image's identity in the embedding gallery.
+            If set, embeddings of the second image are calculated once per its content
+            and served from the gallery afterwards (default is None).
+
     Returns:
         result (dict): A dictionary containing verification results with following keys.
 
@@ -160,6 +183,70 @@ def verify(
         silent=silent,
         threshold=threshold,
         anti_spoofing=anti_spoofing,
+        gallery_id=gallery_id,
+    )
+
+
+def enroll(
+    gallery_id: str,
+    img_path: Union[str, np.ndarray],
+    model_name: str = "VGG-Face",
+    detector_backend: str = "opencv",
+    enforce_detection: bool = True,
+    align: bool = True,
+    expand_percentage: int = 0,
+    normalization: str = "base",
+    anti_spoofing: bool = False,
+) -> Dict[str, Any]:
+    """
+    Enroll the reference image of an identity into the embedding gallery to verify
+        it later with gallery_id instead of re-calculating the embeddings of the same image.
+    Args:
+        gallery_id (str): Unique identifier of the enrolled identity (e.g. user id).
+
+        img_path (str or np.ndarray): The exact path to the image, a numpy array in BGR format,
+            or a base64 encoded image.
+
+        model_name (str): Model for face recognition. Options: VGG-Face, Facenet, Facenet512,
+            OpenFace, DeepFace, DeepID, Dlib, ArcFace, SFace and GhostFaceNet (default is VGG-Face).
+
+        detector_backend (string): face detector backend. Options: 'opencv', 'retinaface',
+            'mtcnn', 'ssd', 'dlib', 'mediapipe', 'yolov8', 'centerface' or 'skip'
+            (default is opencv).
+
+        enforce_detection (boolean): If no face is detected in an image, raise an exception.
+            Set to False to avoid the exception for low-resolution images (default is True).
+
+        align (bool): Flag to enable face alignment (default is True).
+
+        expand_percentage (int): expand detected facial area with a percentage (default is 0).
+
+        normalization (string): Normalize the input image before feeding it to the model.
+            Options: base, raw, Facenet, Facenet2018, VGGFace, VGGFace2, ArcFace (default is base)
+
+        anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
+
+    Returns:
+        enrollment (dict): A dictionary with following keys
+
+        - 'gallery_id' (str): identifier of the enrolled identity
+
+        - 'hash' (str): content hash of the enrolled image
+
+        - 'embeddings' (List[List[float]]): embeddings of each face in the enrolled image
+
+        - 'facial_areas' (List[dict]): facial areas of each face in the enrolled image
+    """
+    return gallery.enroll(
+        gallery_id=gallery_id,
+        img_path=img_path,
+        model_name=model_name,
+        detector_backend=detector_backend,
+        enforce_detection=enforce_detection,
+        align=align,
+        expand_percentage=expand_percentage,
+        normalization=normalization,
+        anti_spoofing=anti_spoofing,
     )
 
 
@@ -172,6 +259,7 @@ def analyze(
     expand_percentage: int = 0,
     silent: bool = False,
     anti_spoofing: bool = False,
+    batch_size: int = 32,
 ) -> List[Dict[str, Any]]:
     """
     Analyze facial attributes such as age, gender, emotion, and race in the provided image.
@@ -202,6 +290,9 @@ def analyze(
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        batch_size (int): Maximum number of faces fed to a model in a single call. All faces
+            in the image are analyzed together instead of one by one (default is 32).
+
     Returns:
         results (List[Dict[str, Any]]): A list of dictionaries, where each dictionary represents
            the analysis results for a detected face. Each dictionary in the list contains the
@@ -259,6 +350,7 @@ def analyze(
         expand_percentage=expand_percentage,
         silent=silent,
         anti_spoofing=anti_spoofing,
+        batch_size=batch_size,
     )
 
 
@@ -277,6 +369,11 @@ def find(
     refresh_database: bool = True,
     anti_spoofing: bool = False,
     batched: bool = False,
+    top_k: Optional[int] = None,
+    search_method: str = "exact",
+    ann_probes: int = 8,
+    batch_size: int = 32,
+    workers: Optional[int] = None,
 ) -> Union[List[pd.DataFrame], List[List[Dict[str, Any]]]]:
     """
     Identify individuals in a database
@@ -316,12 +413,35 @@ def find(
         silent (boolean): Suppress or allow some log messages for a quieter analysis process
             (default is False).
 
-        refresh_database (boolean): Synchronizes the images representation (pkl) file with the
+        refresh_database (boolean): Synchronizes the images representation datastore with the
             directory/db files, if set to false, it will ignore any file changes inside the db_path
-            (default is True).
+            (default is True). Only the directories changed since the previous call are
+            re-scanned. Set DEEPFACE_WATCH_DATABASE=1 to track the changes with inotify on linux,
+            which also catches the images overwritten in place.
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        batched (boolean): Return a list of dicts instead of a list of dataframes
+            (default is False).
+
+        top_k (int): Return only the closest k identities for each detected face
+            (default is None for all identities closer than the threshold).
+
+        search_method (str): exact or ivf. ivf searches an approximate nearest neighbour index
+            persisted next to the datastore. Datastores smaller than DEEPFACE_ANN_MIN_SIZE
+            environment variable (default 10000) are always searched exactly (default is exact).
+
+        ann_probes (int): number of index lists searched with ivf. Higher values increase
+            recall and latency (default is 8).
+
+        batch_size (int): Maximum number of faces fed to the model in a single call while
+            representing new images in db_path and faces in img_path (default is 32).
+
+        workers (int): Number of threads decoding new images in db_path while faces of
+            the previous ones are being detected and represented. Completed images are saved
+            into the datastore periodically, so an interrupted indexing resumes from the last
+            checkpoint (default is None for up to 4 threads).
+
     Returns:
         results (List[pd.DataFrame] or List[List[Dict[str, Any]]]):
             A list of pandas dataframes (if `batched=False`) or
@@ -365,6 +485,11 @@ def find(
         refresh_database=refresh_database,
         anti_spoofing=anti_spoofing,
         batched=batched,
+        top_k=top_k,
+        search_method=search_method,
+        ann_probes=ann_probes,
+        batch_size=batch_size,
+        workers=workers,
     )
 
 
@@ -378,6 +503,7 @@ def represent(
     normalization: str = "base",
     anti_spoofing: bool = False,
     max_faces: Optional[int] = None,
+    batch_size: int = 32,
 ) -> List[Dict[str, Any]]:
     """
     Represent facial images as multi-dimensional vector embeddings.
@@ -411,6 +537,9 @@ def represent(
 
         max_faces (int): Set a limit on the number of faces to be processed (default is None).
 
+        batch_size (int): Maximum number of faces fed to the model in a single call. Faces of
+            group photos are embedded together instead of one by one (default is 32).
+
     Returns:
         results (List[Dict[str, Any]]): A list of dictionaries, each containing the
             following fields:
@@ -437,6 +566,7 @@ def represent(
         normalization=normalization,
         anti_spoofing=anti_spoofing,
         max_faces=max_faces,
+        batch_size=batch_size,
     )
 
 
@@ -450,6 +580,8 @@ def stream(
     time_threshold: int = 5,
     frame_threshold: int = 5,
     anti_spoofing: bool = False,
+    pipelined: bool = True,
+    detection_interval: int = 10,
 ) -> None:
     """
     Run real time face recognition and facial attribute analysis
@@ -478,6 +610,15 @@ def stream(
         frame_threshold (int): The frame threshold for face recognition (default is 5).
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
+
+        pipelined (boolean): Capture frames, detect faces and render the video in separate
+            threads. Only the latest frame is kept, so the video stays smooth while faces are
+            detected as fast as the cpu allows. Set to False to process every frame one by one
+            (default is True).
+
+        detection_interval (int): Faces are followed with optical flow between detections in
+            pipelined mode. Detector runs every detection_interval frames, or as soon as a face
+            is lost. Faces are analyzed once when they appear (default is 10).
     Returns:
         None
     """
@@ -495,6 +636,8 @@ def stream(
         time_threshold=time_threshold,
         frame_threshold=frame_threshold,
         anti_spoofing=anti_spoofing,
+        pipelined=pipelined,
+        detection_interval=detection_interval,
     )
 
 
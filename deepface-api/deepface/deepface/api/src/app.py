@@ -4,6 +4,7 @@ from flask_cors import CORS
 
 # project dependencies
 from deepface import DeepFace
+from deepface.modules import modeling, caching
 from deepface.api.src.modules.core.routes import blueprint
 from deepface.commons.logger import Logger
 
@@ -14,5 +15,11 @@ def create_app():
     app = Flask(__name__)
     CORS(app)
     app.register_blueprint(blueprint)
+    # concurrent requests share forward passes of the models
+    modeling.enable_batching()
+    # re-submitted images are served without model work
+    caching.enable_cache()
+    # preload models in DEEPFACE_WARMUP_MODELS not to slow down the first requests
+    modeling.warm_up()
     logger.info(f"Welcome to DeepFace API v{DeepFace.__version__}!")
     return app
@@ -1,12 +1,14 @@
 # built-in dependencies
-from typing import Union
+import os
+from typing import Any, Dict, Optional, Union
 
 # 3rd party dependencies
-from flask import Blueprint, request
+from flask import Blueprint, request, g
 import numpy as np
 
 # project dependencies
 from deepface import DeepFace
+from deepface.modules import modeling, caching
 from deepface.api.src.modules.core import service
 from deepface.commons import image_utils
 from deepface.commons.logger import Logger
@@ -17,22 +19,97 @@ blueprint = Blueprint("routes", __name__)
 
 # pylint: disable=no-else-return, broad-except
 
+# content types of requests having an image itself as their body
+RAW_IMAGE_TYPES = {"image/jpeg", "image/png", "application/octet-stream"}
+
+# keys of the facial area coordinates to be scaled back for reduced images
+COORDINATE_KEYS = {"x", "y", "w", "h"}
+LANDMARK_KEYS = {"left_eye", "right_eye", "nose", "mouth_left", "mouth_right"}
+
+# arguments in form data and query string are strings, so these are parsed into their types
+BOOLEAN_ARGS = {"enforce_detection", "align", "anti_spoofing"}
+INTEGER_ARGS = {"max_faces", "max_image_size"}
+TRUE_VALUES = {"true", "1", "yes"}
+FALSE_VALUES = {"false", "0", "no"}
+
 
 @blueprint.route("/")
 def home():
     return f"<h1>Welcome to DeepFace API v{DeepFace.__version__}!</h1>"
 
 
-def extract_image_from_request(img_key: str) -> Union[str, np.ndarray]:
+@blueprint.route("/stats")
+def stats():
+    # load times, memory usage and batch fill of the models, and hits of the result cache
+    return {**modeling.get_stats(), "result_cache": caching.get_stats()}
+
+
+def get_input_args() -> Dict[str, Any]:
+    """
+    Find the arguments of the request from json, form data or query string.
+        Requests having an image as their body send other arguments in query string.
+
+    Returns:
+        input_args (dict): arguments of the request, boolean and integer ones are parsed
+            if they are sent as strings
+    """
+    if request.is_json:
+        input_args = request.get_json() or {}
+    elif request.form:
+        input_args = request.form.to_dict()
+    else:
+        input_args = request.args.to_dict()
+    return parse_input_args(input_args)
+
+
+def parse_input_args(input_args: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Extracts an image from the request either from json or a multipart/form-data file.
+    Parse boolean and integer arguments sent as strings, e.g. anti_spoofing=true
+        in query string. Otherwise, a non-empty string such as "false" would be truthy.
+
+    Args:
+        input_args (dict): arguments of the request
+
+    Returns:
+        input_args (dict): the same arguments with parsed values
+    """
+    for key, value in input_args.items():
+        if not isinstance(value, str):
+            continue
+        if key in BOOLEAN_ARGS:
+            if value.strip().lower() in TRUE_VALUES:
+                input_args[key] = True
+            elif value.strip().lower() in FALSE_VALUES:
+                input_args[key] = False
+            else:
+                raise ValueError(f"{key} must be true or false, but it is {value}")
+        elif key in INTEGER_ARGS:
+            if value.strip() == "":
+                input_args[key] = None
+                continue
+            try:
+                input_args[key] = int(value)
+            except ValueError as err:
+                raise ValueError(f"{key} must be an integer, but it is {value}") from err
+    return input_args
+
+
+def extract_image_from_request(
+    img_key: str, max_image_size: Optional[int] = None
+) -> Union[str, np.ndarray]:
+    """
+    Extracts an image from the request either from json, a multipart/form-data file
+        or the request body itself.
 
     Args:
         img_key (str): The key used to retrieve the image data
             from the request (e.g., 'img1').
+        max_image_size (int): longer side of the image that is enough for the detector.
+            Larger jpeg images are decoded at 1/2, 1/4 or 1/8 resolution, and the facial
+            areas found in them are scaled back with scale_facial_areas (default is None).
 
     Returns:
-        img (str or np.ndarray): Given image detail (base64 encoded string, image path or url)
+        img (str or np.ndarray): Given image detail (image path or url)
             or the decoded image as a numpy array.
     """
 
@@ -48,12 +125,21 @@ def extract_image_from_request(img_key: str) -> Union[str, np.ndarray]:
         if file.filename == "":
             raise ValueError(f"No file uploaded for '{img_key}'")
 
-        img = image_utils.load_image_from_file_storage(file)
+        if not max_image_size:
+            return image_utils.load_image_from_file_storage(file)
 
-        return img
-    # Check if the request is coming as base64, file path or url from json or form data
-    elif request.is_json or request.form:
-        input_args = request.get_json() or request.form.to_dict()
+        return __load_image(file.read(), img_key, max_image_size)
+    # Check if the request body is the image itself, it is the first image of the request
+    elif request.mimetype in RAW_IMAGE_TYPES and img_key in {"img", "img1"}:
+        data = request.get_data(cache=True)
+
+        if not data:
+            raise ValueError(f"Request body is empty for '{img_key}'")
+
+        return __load_image(data, img_key, max_image_size)
+    # Check if the request is coming as base64, file path or url from json, form or query string
+    elif request.is_json or request.form or request.mimetype in RAW_IMAGE_TYPES:
+        input_args = get_input_args()
 
         if input_args is None:
             raise ValueError("empty input set passed")
@@ -64,18 +150,82 @@ def extract_image_from_request(img_key: str) -> Union[str, np.ndarray]:
         if not img:
             raise ValueError(f"'{img_key}' not found in either json or form data request")
 
+        # base64 encoded images are decoded once here instead of checking their format first
+        if isinstance(img, str) and img.startswith("data:image/"):
+            return __load_image(image_utils.decode_base64(img), img_key, max_image_size)
+
         return img
 
     # If neither JSON nor file input is present
     raise ValueError(f"'{img_key}' not found in request in either json or form data")
 
 
+def find_max_image_size(input_args: Dict[str, Any]) -> Optional[int]:
+    """
+    Find the longer side of the images that is enough for the detector
+        from max_image_size argument or DEEPFACE_API_MAX_IMAGE_SIZE environment variable
+
+    Args:
+        input_args (dict): arguments of the request
+
+    Returns:
+        max_image_size (int): None if images are decoded at full resolution
+    """
+    max_image_size = input_args.get("max_image_size", os.getenv("DEEPFACE_API_MAX_IMAGE_SIZE"))
+    if max_image_size in (None, ""):
+        return None
+    max_image_size = int(max_image_size)
+    if max_image_size <= 0:
+        raise ValueError(f"max_image_size must be a positive integer, but it is {max_image_size}")
+    return max_image_size
+
+
+def scale_facial_areas(obj: Any, img_key: str) -> Any:
+    """
+    Scale the facial areas found in a reduced image back to the original image.
+        Input is not modified because it can be shared, e.g. facial areas of the gallery.
+
+    Args:
+        obj (Any): response having facial areas in any of its nested dicts and lists
+        img_key (str): key of the image the facial areas are found in
+
+    Returns:
+        obj (Any): a copy of the response with scaled facial areas
+    """
+    scale = g.get("image_reductions", {}).get(img_key, 1)
+    if scale == 1:
+        return obj
+
+    if isinstance(obj, list):
+        return [scale_facial_areas(item, img_key) for item in obj]
+    elif isinstance(obj, dict):
+        if COORDINATE_KEYS.issubset(obj.keys()):
+            scaled = dict(obj)
+            for key in COORDINATE_KEYS:
+                if obj[key] is not None:
+                    scaled[key] = obj[key] * scale
+            for key in LANDMARK_KEYS.intersection(obj.keys()):
+                if obj[key] is not None:
+                    scaled[key] = [value * scale for value in obj[key]]
+            return scaled
+        return {key: scale_facial_areas(value, img_key) for key, value in obj.items()}
+    return obj
+
+
+def __load_image(data: bytes, img_key: str, max_image_size: Optional[int]) -> np.ndarray:
+    reduction = image_utils.find_reduction(data, max_image_size)
+    img = image_utils.load_image_from_bytes(data, reduction)
+    if "image_reductions" not in g:
+        g.image_reductions = {}
+    g.image_reductions[img_key] = reduction
+    return img
+
+
 @blueprint.route("/represent", methods=["POST"])
 def represent():
-    input_args = request.get_json() or request.form.to_dict()
-
     try:
-        img = extract_image_from_request("img")
+        input_args = get_input_args()
+        img = extract_image_from_request("img", find_max_image_size(input_args))
     except Exception as err:
         return {"exception": str(err)}, 400
 
@@ -88,6 +238,7 @@ def represent():
         anti_spoofing=input_args.get("anti_spoofing", False),
         max_faces=input_args.get("max_faces"),
     )
+    obj = scale_facial_areas(obj, "img")
 
     logger.debug(obj)
 
@@ -96,17 +247,28 @@ def represent():
 
 @blueprint.route("/verify", methods=["POST"])
 def verify():
-    input_args = request.get_json() or request.form.to_dict()
-
     try:
-        img1 = extract_image_from_request("img1")
+        input_args = get_input_args()
+        max_image_size = find_max_image_size(input_args)
+        img1 = extract_image_from_request("img1", max_image_size)
     except Exception as err:
         return {"exception": str(err)}, 400
 
-    try:
-        img2 = extract_image_from_request("img2")
-    except Exception as err:
-        return {"exception": str(err)}, 400
+    gallery_id = input_args.get("gallery_id")
+
+    # img2 is optional if its identity is already enrolled into the gallery
+    img2 = None
+    if gallery_id is not None and isinstance(input_args.get("img2"), str) and input_args["img2"]:
+        # enrolled image is hashed as it is sent, it is decoded only if its content changes
+        img2 = input_args["img2"]
+    elif gallery_id is None or request.files.get("img2") or input_args.get("img2"):
+        try:
+            # enrolled images are decoded at full resolution because their facial areas are stored
+            img2 = extract_image_from_request(
+                "img2", max_image_size if gallery_id is None else None
+            )
+        except Exception as err:
+            return {"exception": str(err)}, 400
 
     verification = service.verify(
         img1_path=img1,
@@ -117,22 +279,59 @@ def verify():
         align=input_args.get("align", True),
         enforce_detection=input_args.get("enforce_detection", True),
         anti_spoofing=input_args.get("anti_spoofing", False),
+        gallery_id=gallery_id,
     )
+    if isinstance(verification, dict):
+        verification["facial_areas"] = {
+            "img1": scale_facial_areas(verification["facial_areas"]["img1"], "img1"),
+            "img2": scale_facial_areas(verification["facial_areas"]["img2"], "img2"),
+        }
 
     logger.debug(verification)
 
     return verification
 
 
-@blueprint.route("/analyze", methods=["POST"])
-def analyze():
-    input_args = request.get_json() or request.form.to_dict()
+@blueprint.route("/enroll", methods=["POST"])
+def enroll():
+    try:
+        input_args = get_input_args()
+    except Exception as err:
+        return {"exception": str(err)}, 400
+
+    gallery_id = input_args.get("gallery_id")
+    if not gallery_id:
+        return {"exception": "'gallery_id' not found in either json or form data request"}, 400
 
+    # enrolled images are decoded at full resolution because their facial areas are stored
     try:
         img = extract_image_from_request("img")
     except Exception as err:
         return {"exception": str(err)}, 400
 
+    enrollment = service.enroll(
+        gallery_id=gallery_id,
+        img_path=img,
+        model_name=input_args.get("model_name", "VGG-Face"),
+        detector_backend=input_args.get("detector_backend", "opencv"),
+        enforce_detection=input_args.get("enforce_detection", True),
+        align=input_args.get("align", True),
+        anti_spoofing=input_args.get("anti_spoofing", False),
+    )
+
+    logger.debug(enrollment)
+
+    return enrollment
+
+
+@blueprint.route("/analyze", methods=["POST"])
+def analyze():
+    try:
+        input_args = get_input_args()
+        img = extract_image_from_request("img", find_max_image_size(input_args))
+    except Exception as err:
+        return {"exception": str(err)}, 400
+
     actions = input_args.get("actions", ["age", "gender", "emotion", "race"])
     # actions is the only argument instance of list or tuple
     # if request is form data, input args can either be text or file
@@ -156,6 +355,7 @@ def analyze():
         align=input_args.get("align", True),
         anti_spoofing=input_args.get("anti_spoofing", False),
     )
+    demographies = scale_facial_areas(demographies, "img")
 
     logger.debug(demographies)
 
@@ -46,13 +46,14 @@ def represent(
 
 def verify(
     img1_path: Union[str, np.ndarray],
-    img2_path: Union[str, np.ndarray],
+    img2_path: Optional[Union[str, np.ndarray]],
     model_name: str,
     detector_backend: str,
     distance_metric: str,
     enforce_detection: bool,
     align: bool,
     anti_spoofing: bool,
+    gallery_id: Optional[str] = None,
 ):
     try:
         obj = DeepFace.verify(
@@ -64,6 +65,7 @@ def verify(
             align=align,
             enforce_detection=enforce_detection,
             anti_spoofing=anti_spoofing,
+            gallery_id=gallery_id,
         )
         return obj
     except Exception as err:
@@ -73,6 +75,37 @@ def verify(
         return {"error": f"Exception while verifying: {str(err)} - {tb_str}"}, 400
 
 
+def enroll(
+    gallery_id: str,
+    img_path: Union[str, np.ndarray],
+    model_name: str,
+    detector_backend: str,
+    enforce_detection: bool,
+    align: bool,
+    anti_spoofing: bool,
+):
+    try:
+        enrollment = DeepFace.enroll(
+            gallery_id=gallery_id,
+            img_path=img_path,
+            model_name=model_name,
+            detector_backend=detector_backend,
+            enforce_detection=enforce_detection,
+            align=align,
+            anti_spoofing=anti_spoofing,
+        )
+        return {
+            "gallery_id": enrollment["gallery_id"],
+            "hash": enrollment["hash"],
+            "facial_areas": enrollment["facial_areas"],
+        }
+    except Exception as err:
+        tb_str = traceback.format_exc()
+        logger.error(str(err))
+        logger.error(tb_str)
+        return {"error": f"Exception while enrolling: {str(err)} - {tb_str}"}, 400
+
+
 def analyze(
     img_path: Union[str, np.ndarray],
     actions: list,
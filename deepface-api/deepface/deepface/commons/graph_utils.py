@@ -0,0 +1,195 @@
+# built-in dependencies
+import os
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.commons import onnx_utils, package_utils, weight_utils
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# pylint: disable=too-many-instance-attributes
+
+Outputs = Union[np.ndarray, List[np.ndarray]]
+
+# batches are split into these sizes, so a graph is traced for each of them at most once
+BATCH_BUCKETS = (32, 16, 8, 4, 2, 1)
+
+
+class GraphFunction:
+    """
+    Graph compiled inference function of a keras model. Calling a keras model eagerly
+        dispatches each of its layers from python, while its graph runs all of them in a
+        single call. Batches are split into power of two buckets having fixed input
+        signatures, so each bucket is traced once and XLA compiles each of them once.
+        The model is called eagerly if its graph cannot be compiled. Onnx models are called
+        directly, since their runtimes optimize their graphs.
+    """
+
+    def __init__(self, model: Any, name: str, jit_compile: Optional[bool] = None):
+        """
+        Args:
+            model (keras.models.Model, CompiledModel or OnnxModel): model to run
+            name (str): model identifier in logs
+            jit_compile (bool): compile the graphs with XLA (default is None for
+                DEEPFACE_JIT_COMPILE environment variable or False)
+        """
+        if jit_compile is None:
+            jit_compile = os.getenv("DEEPFACE_JIT_COMPILE", "0") == "1"
+
+        self.model = model
+        self.name = name
+        self.jit_compile = jit_compile
+        # DEEPFACE_GRAPH_INFERENCE=0 calls models eagerly as before
+        self.eager = os.getenv("DEEPFACE_GRAPH_INFERENCE", "1") == "0"
+        self.functions: Dict[int, Any] = {}
+        self.lock = threading.Lock()
+
+        if isinstance(model, onnx_utils.OnnxModel):
+            self.func = model
+            self.eager = True
+            input_shape = model.input_shape
+            dtype = model.dtype
+        elif isinstance(model, weight_utils.CompiledModel):
+            # serving function of a compiled model is called in the graph of each bucket
+            self.func = model.module.serve
+            input_shape = model.input_shape
+            dtype = model.dtype
+        else:
+            self.func = lambda inputs: model(inputs, training=False)
+            input_shape = model.inputs[0].shape
+            dtype = model.inputs[0].dtype
+        self.input_shape = [None if dim is None else int(dim) for dim in input_shape]
+        self.dtype = np.dtype(getattr(dtype, "name", dtype))
+
+    def __call__(self, inputs: np.ndarray) -> Outputs:
+        """
+        Run the model on a batch
+        Args:
+            inputs (np.ndarray): (N, ...) batch of model inputs
+        Returns:
+            outputs (np.ndarray or list): (N, ...) outputs, or a list of them
+                for multi-output models
+        """
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        # keras models expand the missing channel axis of inputs, e.g. grayscale images
+        if inputs.ndim == len(self.input_shape) - 1:
+            inputs = inputs[..., np.newaxis]
+
+        # empty batches and inputs not matching the model are left to the model itself
+        if self.eager or len(inputs) == 0 or not self.__match(inputs):
+            return self.__call_eager(inputs)
+
+        results = []
+        offset = 0
+        for size in find_buckets(len(inputs)):
+            outputs = self.__call_bucket(inputs[offset : offset + size])
+            # graph could not be compiled, so the whole batch is run eagerly
+            if outputs is None:
+                return self.__call_eager(inputs)
+            results.append(outputs)
+            offset += size
+
+        if len(results) == 1:
+            return results[0]
+        if isinstance(results[0], list):
+            return [np.concatenate(outputs) for outputs in zip(*results)]
+        return np.concatenate(results)
+
+    def warm_up(self) -> None:
+        """
+        Trace the graph of single inputs and run it once, so the first request does not
+            pay for its tracing and optimization
+        """
+        if self.eager or any(dim is None for dim in self.input_shape[1:]):
+            return
+        self(np.zeros((1, *self.input_shape[1:]), dtype=self.dtype))
+
+    def __call_bucket(self, inputs: np.ndarray) -> Optional[Outputs]:
+        """
+        Run the graph of a bucket, tracing it in its first call. Returns None and switches
+            to eager calls if the graph cannot be compiled.
+        """
+        size = len(inputs)
+        function = self.functions.get(size)
+        if function is not None:
+            return to_numpy(function(inputs))
+
+        with self.lock:
+            if self.eager:
+                return None
+            function = self.functions.get(size)
+            if function is not None:
+                return to_numpy(function(inputs))
+
+            try:
+                import tensorflow as tf
+
+                signature = tf.TensorSpec(
+                    shape=[size, *self.input_shape[1:]], dtype=tf.as_dtype(self.dtype)
+                )
+                function = tf.function(
+                    self.func, jit_compile=self.jit_compile
+                ).get_concrete_function(signature)
+                # xla compiles the graph in its first call
+                outputs = to_numpy(function(inputs))
+            except Exception as err:  # pylint: disable=broad-except
+                logger.warn(
+                    f"Graph of {self.name} cannot be compiled, it is called eagerly - {err}"
+                )
+                self.eager = True
+                return None
+
+            self.functions[size] = function
+            logger.debug(f"Graph of {self.name} is traced for batches of {size}")
+            return outputs
+
+    def __call_eager(self, inputs: np.ndarray) -> Outputs:
+        return to_numpy(self.func(inputs))
+
+    def __match(self, inputs: np.ndarray) -> bool:
+        return inputs.ndim == len(self.input_shape) and all(
+            dim is None or dim == size for dim, size in zip(self.input_shape[1:], inputs.shape[1:])
+        )
+
+
+def is_supported(model: Any) -> bool:
+    """
+    Check a model can be run by a graph function
+    Args:
+        model: model of a client
+    Returns:
+        supported (bool): model is a keras model, a compiled artifact or an onnx model
+    """
+    return package_utils.is_keras_model(model) or isinstance(
+        model, (weight_utils.CompiledModel, onnx_utils.OnnxModel)
+    )
+
+
+def find_buckets(batch_size: int) -> List[int]:
+    """
+    Split a batch into bucket sizes, largest ones first
+    Args:
+        batch_size (int): number of inputs
+    Returns:
+        sizes (list): bucket sizes summing up to batch_size
+    """
+    sizes = []
+    for bucket in BATCH_BUCKETS:
+        while batch_size >= bucket:
+            sizes.append(bucket)
+            batch_size -= bucket
+    return sizes
+
+
+def to_numpy(outputs: Any) -> Outputs:
+    """
+    Convert the output tensors of a model to numpy arrays
+    """
+    if isinstance(outputs, (list, tuple)):
+        return [np.asarray(output) for output in outputs]
+    return np.asarray(outputs)
@@ -1,7 +1,6 @@
 # built-in dependencies
 import os
-import io
-from typing import List, Union, Tuple
+from typing import List, Union, Tuple, Optional
 import hashlib
 import base64
 from pathlib import Path
@@ -10,9 +9,31 @@ from pathlib import Path
 import requests
 import numpy as np
 import cv2
-from PIL import Image
 from werkzeug.datastructures import FileStorage
 
+# file extensions of the images in a facial database
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+# leading bytes of image formats, only jpeg and png images are loaded
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "jpeg",
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"GIF87a": "gif",
+    b"GIF89a": "gif",
+    b"BM": "bmp",
+}
+
+# opencv flags decoding an image at 1/n resolution
+REDUCED_DECODING_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# jpeg start of frame markers having image size, others are huffman and arithmetic tables
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
 
 def list_images(path: str) -> List[str]:
     """
@@ -26,28 +47,119 @@ def list_images(path: str) -> List[str]:
     for r, _, f in os.walk(path):
         for file in f:
             exact_path = os.path.join(r, file)
+            if is_image(exact_path):
+                images.append(exact_path)
+    return images
+
+
+def is_image(file_path: str) -> bool:
+    """
+    Check a file is a jpeg or png image with its extension and its header
+    Args:
+        file_path (str): exact file path
+    Returns:
+        is_image (bool)
+    """
+    ext_lower = os.path.splitext(file_path)[-1].lower()
+
+    if ext_lower not in IMAGE_EXTENSIONS:
+        return False
 
-            ext_lower = os.path.splitext(exact_path)[-1].lower()
+    with open(file_path, "rb") as file:
+        return find_image_format(file.read(16)) in {"jpeg", "png"}
 
-            if ext_lower not in {".jpg", ".jpeg", ".png"}:
+
+def find_image_format(data: bytes) -> str:
+    """
+    Find the format of an encoded image from its leading bytes
+    Args:
+        data (bytes): encoded image, its first 16 bytes are enough
+    Returns:
+        format (str): jpeg, png, gif, bmp, webp or unknown
+    """
+    for signature, image_format in IMAGE_SIGNATURES.items():
+        if data.startswith(signature):
+            return image_format
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return "unknown"
+
+
+def find_image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Find the size of an encoded jpeg or png image from its headers without decoding it
+    Args:
+        data (bytes): encoded image
+    Returns:
+        size (tuple): height and width of the image, or None if headers are not found
+    """
+    image_format = find_image_format(data)
+
+    if image_format == "png":
+        # first chunk is IHDR having width and height
+        if len(data) < 24:
+            return None
+        return int.from_bytes(data[20:24], "big"), int.from_bytes(data[16:20], "big")
+
+    if image_format == "jpeg":
+        offset = 2
+        while offset + 9 <= len(data):
+            if data[offset] != 0xFF:
+                return None
+            marker = data[offset + 1]
+            # fill bytes and markers without segments
+            if marker == 0xFF:
+                offset += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                offset += 2
                 continue
+            if marker in JPEG_SOF_MARKERS:
+                height = int.from_bytes(data[offset + 5 : offset + 7], "big")
+                width = int.from_bytes(data[offset + 7 : offset + 9], "big")
+                return height, width
+            offset += 2 + int.from_bytes(data[offset + 2 : offset + 4], "big")
 
-            with Image.open(exact_path) as img:  # lazy
-                if img.format.lower() in {"jpeg", "png"}:
-                    images.append(exact_path)
-    return images
+    return None
+
+
+def find_reduction(data: bytes, max_size: Optional[int] = None) -> int:
+    """
+    Find how much an encoded image can be reduced while decoding it
+    Args:
+        data (bytes): encoded image
+        max_size (int): longer side of the image that is enough, image is not reduced
+            below it. None means image is not reduced (default is None)
+    Returns:
+        reduction (int): 1, 2, 4 or 8 to decode the image at 1/reduction resolution
+    """
+    if not max_size:
+        return 1
 
+    size = find_image_size(data)
+    if size is None:
+        return 1
 
-def find_image_hash(file_path: str) -> str:
+    longer_side = max(size)
+    for reduction in (8, 4, 2):
+        if longer_side // reduction >= max_size:
+            return reduction
+    return 1
+
+
+def find_image_hash(file_path: str, file_stats: Optional[os.stat_result] = None) -> str:
     """
     Find the hash of given image file with its properties
         finding the hash of image content is costly operation
     Args:
         file_path (str): exact image path
+        file_stats (os.stat_result): already known stats of the file not to stat it again
+            (default is None)
     Returns:
         hash (str): digest with sha1 algorithm
     """
-    file_stats = os.stat(file_path)
+    if file_stats is None:
+        file_stats = os.stat(file_path)
 
     # some properties
     file_size = file_stats.st_size
@@ -61,6 +173,34 @@ def find_image_hash(file_path: str) -> str:
     return hasher.hexdigest()
 
 
+def find_content_hash(img: Union[str, np.ndarray]) -> str:
+    """
+    Find the hash of a given image with its content
+        files are hashed with their bytes, other strings (base64 or url) as they are
+        and numpy arrays with their shape and pixels.
+    Args:
+        img (str or np.ndarray): exact image path, base64 encoded image, url or numpy array
+    Returns:
+        hash (str): digest with sha1 algorithm
+    """
+    hasher = hashlib.sha1()
+
+    if isinstance(img, np.ndarray):
+        hasher.update(str(img.shape).encode("utf-8"))
+        hasher.update(np.ascontiguousarray(img).tobytes())
+    elif isinstance(img, str):
+        if not img.startswith("data:image/") and os.path.isfile(img):
+            with open(img, "rb") as f:
+                while chunk := f.read(8192):
+                    hasher.update(chunk)
+        else:
+            hasher.update(img.encode("utf-8"))
+    else:
+        raise ValueError(f"img must be numpy array or str but it is {type(img)}")
+
+    return hasher.hexdigest()
+
+
 def load_image(img: Union[str, np.ndarray]) -> Tuple[np.ndarray, str]:
     """
     Load image from path, url, base64 or numpy array.
@@ -113,25 +253,48 @@ def load_image_from_base64(uri: str) -> np.ndarray:
         numpy array: the loaded image.
     """
 
+    return load_image_from_bytes(decode_base64(uri))
+
+
+def decode_base64(uri: str) -> bytes:
+    """
+    Decode the image bytes of a base64 string.
+    Args:
+        uri: a base64 string.
+    Returns:
+        data (bytes): encoded image
+    """
     encoded_data_parts = uri.split(",")
 
     if len(encoded_data_parts) < 2:
         raise ValueError("format error in base64 encoded string")
 
-    encoded_data = encoded_data_parts[1]
-    decoded_bytes = base64.b64decode(encoded_data)
+    return base64.b64decode(encoded_data_parts[1])
+
+
+def load_image_from_bytes(data: bytes, reduction: int = 1) -> np.ndarray:
+    """
+    Load an encoded jpeg or png image in a single decoding
+    Args:
+        data (bytes): encoded image
+        reduction (int): 1, 2, 4 or 8 to decode the image at 1/reduction resolution.
+            Reduced jpeg images are decoded faster (default is 1)
+    Returns:
+        img (np.ndarray): the loaded image in BGR format
+    """
+    if reduction not in REDUCED_DECODING_FLAGS:
+        raise ValueError(f"reduction must be 1, 2, 4 or 8, but it is {reduction}")
 
     # similar to find functionality, we are just considering these extensions
-    # content type is safer option than file extension
-    with Image.open(io.BytesIO(decoded_bytes)) as img:
-        file_type = img.format.lower()
-        if file_type not in {"jpeg", "png"}:
-            raise ValueError(f"Input image can be jpg or png, but it is {file_type}")
+    # content is safer option than file extension
+    file_type = find_image_format(data)
+    if file_type not in {"jpeg", "png"}:
+        raise ValueError(f"Input image can be jpg or png, but it is {file_type}")
 
-    nparr = np.frombuffer(decoded_bytes, np.uint8)
-    img_bgr = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    # img_rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
-    return img_bgr
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), REDUCED_DECODING_FLAGS[reduction])
+    if img is None:
+        raise ValueError("Failed to decode image")
+    return img
 
 
 def load_image_from_file_storage(file: FileStorage) -> np.ndarray:
@@ -142,11 +305,7 @@ def load_image_from_file_storage(file: FileStorage) -> np.ndarray:
     Returns:
         img (np.ndarray): The decoded image as a numpy array (OpenCV format).
     """
-    file_bytes = np.frombuffer(file.read(), np.uint8)
-    image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
-    if image is None:
-        raise ValueError("Failed to decode image")
-    return image
+    return load_image_from_bytes(file.read())
 
 
 def load_image_from_web(url: str) -> np.ndarray:
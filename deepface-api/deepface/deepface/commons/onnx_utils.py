@@ -0,0 +1,310 @@
+# built-in dependencies
+import os
+import threading
+import importlib.util
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# pylint: disable=too-many-instance-attributes
+
+# keras facial recognition models can be exported to onnx
+ONNX_MODELS = [
+    "VGG-Face",
+    "Facenet",
+    "Facenet512",
+    "OpenFace",
+    "DeepFace",
+    "DeepID",
+    "ArcFace",
+    "GhostFaceNet",
+]
+
+# fp32 keeps the exported model as it is, dynamic quantizes the weights of dense layers into
+# int8, and static quantizes the weights and activations of all layers into int8 with the
+# ranges calibrated on the images in DEEPFACE_ONNX_CALIBRATION_DIR
+QUANTIZATIONS = ["fp32", "dynamic", "static"]
+
+RUNTIMES = ["onnxruntime", "opencv"]
+
+OPSET = 17
+
+# faces in calibration images are used up to this number
+CALIBRATION_LIMIT = 100
+
+
+def find_onnx_models() -> Dict[str, str]:
+    """
+    Find the models to run in onnx and their quantizations from DEEPFACE_ONNX_MODELS
+        environment variable, a comma separated list of model names each followed by an
+        optional quantization such as Facenet512:static,ArcFace:dynamic,DeepID
+    Returns:
+        models (dict): model name to its quantization, fp32 if it is not given
+    """
+    models = {}
+    for item in os.getenv("DEEPFACE_ONNX_MODELS", "").split(","):
+        if not item.strip():
+            continue
+        model_name, _, quantization = item.strip().partition(":")
+        quantization = quantization or "fp32"
+        if model_name not in ONNX_MODELS:
+            raise ValueError(
+                f"{model_name} cannot be run in onnx, supported models are {ONNX_MODELS}"
+            )
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(
+                f"unimplemented quantization - {quantization}, options are {QUANTIZATIONS}"
+            )
+        if quantization == "static" and os.getenv("DEEPFACE_ONNX_CALIBRATION_DIR") is None:
+            raise ValueError(
+                f"Static quantization of {model_name} is calibrated on the images in"
+                " DEEPFACE_ONNX_CALIBRATION_DIR environment variable, but it is not set"
+            )
+        if quantization != "fp32" and find_runtime() == "opencv":
+            raise ValueError(
+                f"Quantized {model_name} can be run with onnxruntime only, but opencv is used"
+            )
+        models[model_name] = quantization
+    return models
+
+
+def find_runtime() -> str:
+    """
+    Find the runtime of onnx models from DEEPFACE_ONNX_RUNTIME environment variable,
+        onnxruntime if it is installed or opencv otherwise
+    Returns:
+        runtime (str): onnxruntime or opencv
+    """
+    runtime = os.getenv("DEEPFACE_ONNX_RUNTIME")
+    if runtime is None:
+        runtime = "onnxruntime" if importlib.util.find_spec("onnxruntime") else "opencv"
+    if runtime not in RUNTIMES:
+        raise ValueError(f"unimplemented onnx runtime - {runtime}, options are {RUNTIMES}")
+    return runtime
+
+
+# pylint: disable=too-few-public-methods
+class OnnxModel:
+    """
+    Keras model exported to onnx and run by onnxruntime or opencv dnn on cpu. It is called
+        in the same way with the keras model.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        input_shape: List[Optional[int]],
+        dtype: str,
+        runtime: Optional[str] = None,
+    ):
+        self.path = path
+        self.name = name
+        self.input_shape = tuple(input_shape)
+        self.dtype = dtype
+        self.runtime = runtime or find_runtime()
+
+        if self.runtime == "onnxruntime":
+            try:
+                import onnxruntime as ort
+            except ModuleNotFoundError as e:
+                raise ImportError(
+                    "onnxruntime is an optional dependency, ensure the library is installed."
+                    "Please install using 'pip install onnxruntime' "
+                ) from e
+            self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+            self.input_name = self.session.get_inputs()[0].name
+        else:
+            import cv2
+
+            self.net = cv2.dnn.readNetFromONNX(path)
+            self.output_names = self.net.getUnconnectedOutLayersNames()
+            # input and forward calls of a net must not interleave
+            self.lock = threading.Lock()
+
+    # pylint: disable=unused-argument
+    def __call__(
+        self, inputs: np.ndarray, training: bool = False
+    ) -> Union[np.ndarray, List[np.ndarray]]:
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        # keras models expand the missing channel axis of inputs, e.g. grayscale images
+        if inputs.ndim == len(self.input_shape) - 1:
+            inputs = inputs[..., np.newaxis]
+
+        if self.runtime == "onnxruntime":
+            outputs = self.session.run(None, {self.input_name: inputs})
+        else:
+            with self.lock:
+                self.net.setInput(inputs)
+                outputs = self.net.forward(self.output_names)
+
+        return outputs[0] if len(outputs) == 1 else list(outputs)
+
+
+def export_onnx_model(model: Any, path: str, quantization: str = "fp32") -> None:
+    """
+    Export a keras model to onnx, and quantize it into int8 if requested
+    Args:
+        model (keras.models.Model): model to export
+        path (str): path of the onnx file
+        quantization (str): fp32, dynamic or static (default is fp32)
+    """
+    try:
+        from tf2onnx import tf_loader
+        from tf2onnx.convert import _convert_common, tensor_names_from_structed
+    except ModuleNotFoundError as e:
+        raise ImportError(
+            "tf2onnx is an optional dependency, ensure the library is installed."
+            "Please install using 'pip install tf2onnx' "
+        ) from e
+    import tensorflow as tf
+
+    input_spec = tf.TensorSpec(
+        shape=[None, *model.inputs[0].shape[1:]],
+        dtype=tf.as_dtype(model.inputs[0].dtype),
+        name="input",
+    )
+    exported_path = path if quantization == "fp32" else f"{path}.fp32"
+
+    # keras 3 models cannot be converted with from_keras of tf2onnx, so the inference
+    # function of the model is converted as from_function of tf2onnx does
+    function = tf.function(lambda inputs: model(inputs, training=False))
+    concrete_function = function.get_concrete_function(input_spec)
+    input_names = [
+        tensor.name for tensor in concrete_function.inputs if tensor.dtype != tf.dtypes.resource
+    ]
+    output_names = [
+        tensor.name for tensor in concrete_function.outputs if tensor.dtype != tf.dtypes.resource
+    ]
+    with tf.device("/cpu:0"):
+        frozen_graph = tf_loader.from_function(concrete_function, input_names, output_names)
+        # onnxruntime optimizes the graph while loading it, while the optimizers of tf2onnx
+        # copy the whole graph with its weights in each pass and run out of memory. from_function
+        # of tf2onnx does not accept optimizers, so its common conversion is called directly.
+        _convert_common(
+            frozen_graph,
+            name=model.name,
+            continue_on_error=True,
+            opset=OPSET,
+            input_names=input_names,
+            output_names=output_names,
+            tensors_to_rename=tensor_names_from_structed(
+                concrete_function, input_names, output_names
+            ),
+            output_path=exported_path,
+            optimizers={},
+        )
+    if quantization == "fp32":
+        return
+
+    try:
+        __quantize_onnx_model(
+            source=exported_path,
+            target=path,
+            quantization=quantization,
+            input_shape=[int(dim) for dim in input_spec.shape[1:]],
+        )
+    finally:
+        for temp_file in [exported_path, f"{path}.preprocessed"]:
+            if os.path.isfile(temp_file):
+                os.remove(temp_file)
+
+
+def __quantize_onnx_model(
+    source: str, target: str, quantization: str, input_shape: List[int]
+) -> None:
+    """
+    Quantize an onnx model into int8. Convolutions are quantized in static quantization
+        only, because integer convolutions of dynamic quantization are slower than float
+        ones on cpu.
+    """
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantFormat,
+        QuantType,
+        quantize_dynamic,
+        quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    preprocessed = f"{target}.preprocessed"
+    quant_pre_process(source, preprocessed, skip_symbolic_shape=True)
+
+    if quantization == "dynamic":
+        quantize_dynamic(
+            preprocessed,
+            target,
+            op_types_to_quantize=["MatMul", "Gemm"],
+            weight_type=QuantType.QInt8,
+        )
+        return
+
+    calibration_dir = os.environ["DEEPFACE_ONNX_CALIBRATION_DIR"]
+    imgs = find_calibration_inputs(
+        calibration_dir=calibration_dir, target_size=(input_shape[0], input_shape[1])
+    )
+
+    # pylint: disable=abstract-method
+    class CalibrationReader(CalibrationDataReader):
+        def __init__(self):
+            self.imgs = iter(imgs)
+
+        def __len__(self) -> int:
+            return len(imgs)
+
+        def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+            img = next(self.imgs, None)
+            return None if img is None else {"input": img[np.newaxis]}
+
+    quantize_static(
+        preprocessed,
+        target,
+        CalibrationReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+    )
+    logger.info(f"Quantization is calibrated on {len(imgs)} faces in {calibration_dir}")
+
+
+def find_calibration_inputs(calibration_dir: str, target_size: Tuple[int, int]) -> np.ndarray:
+    """
+    Find the model inputs of the faces in calibration images, detected with opencv and
+        preprocessed as represent does with base normalization
+    Args:
+        calibration_dir (str): folder of the calibration images
+        target_size (tuple): height and width of the model input
+    Returns:
+        imgs (np.ndarray): (N, height, width, 3) batch of faces
+    """
+    # import modules here to avoid circular import issue
+    from deepface.commons import image_utils
+    from deepface.modules import detection, preprocessing
+
+    faces = []
+    for img_path in image_utils.list_images(calibration_dir):
+        img_objs = detection.extract_faces(
+            img_path=img_path,
+            detector_backend="opencv",
+            enforce_detection=False,
+            color_face="bgr",
+            normalize_face=False,
+        )
+        faces += [img_obj["face"] for img_obj in img_objs]
+        if len(faces) >= CALIBRATION_LIMIT:
+            break
+
+    if not faces:
+        raise ValueError(f"No image is found in {calibration_dir} to calibrate quantization")
+
+    # copied, because prepare_faces returns a buffer reused in its next call
+    return preprocessing.prepare_faces(
+        faces=faces[:CALIBRATION_LIMIT], target_size=target_size, color_face="bgr"
+    ).copy()
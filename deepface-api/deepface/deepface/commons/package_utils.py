@@ -1,14 +1,50 @@
 # built-in dependencies
+import sys
 import hashlib
-
-# 3rd party dependencies
-import tensorflow as tf
+import importlib.util
+import importlib.metadata
+from functools import lru_cache
+from typing import Any
 
 # package dependencies
 from deepface.commons.logger import Logger
 
 logger = Logger()
 
+# distributions shipping the tensorflow package
+TF_DISTRIBUTIONS = [
+    "tensorflow",
+    "tensorflow-cpu",
+    "tensorflow-gpu",
+    "tensorflow-macos",
+    "tensorflow-intel",
+    "tf-nightly",
+]
+
+
+@lru_cache(maxsize=None)
+def get_tf_version() -> str:
+    """
+    Find tensorflow's version from its installed distribution without importing it,
+        because importing tensorflow takes seconds and it is just needed for keras models
+    Returns
+        version (str)
+    """
+    tf = sys.modules.get("tensorflow")
+    if tf is not None and hasattr(tf, "__version__"):
+        return tf.__version__
+
+    for distribution in TF_DISTRIBUTIONS:
+        try:
+            return importlib.metadata.version(distribution)
+        except importlib.metadata.PackageNotFoundError:
+            continue
+
+    # not installed with pip, so import it
+    import tensorflow as tf  # pylint: disable=redefined-outer-name
+
+    return tf.__version__
+
 
 def get_tf_major_version() -> int:
     """
@@ -16,7 +52,7 @@ def get_tf_major_version() -> int:
     Returns
         major_version (int)
     """
-    return int(tf.__version__.split(".", maxsplit=1)[0])
+    return int(get_tf_version().split(".", maxsplit=1)[0])
 
 
 def get_tf_minor_version() -> int:
@@ -25,7 +61,27 @@ def get_tf_minor_version() -> int:
     Returns
         minor_version (int)
     """
-    return int(tf.__version__.split(".", maxsplit=-1)[1])
+    return int(get_tf_version().split(".", maxsplit=-1)[1])
+
+
+def is_keras_model(obj: Any) -> bool:
+    """
+    Check an object is a keras model. Tensorflow is not imported for this if it is not
+        imported yet, because no keras model can exist then.
+    Args:
+        obj (Any): object to check
+    Returns:
+        result (bool)
+    """
+    if "tensorflow" not in sys.modules and "keras" not in sys.modules:
+        return False
+
+    if get_tf_major_version() == 1:
+        from keras.models import Model
+    else:
+        from tensorflow.keras.models import Model
+
+    return isinstance(obj, Model)
 
 
 def validate_for_keras3():
@@ -36,17 +92,16 @@ def validate_for_keras3():
     if tf_major == 1 or (tf_major == 2 and tf_minor < 16):
         return
 
-    try:
-        import tf_keras
-
-        logger.debug(f"tf_keras is already available - {tf_keras.__version__}")
-    except ImportError as err:
+    # importing tf_keras imports tensorflow, so it is just looked up
+    if importlib.util.find_spec("tf_keras") is None:
         # you may consider to install that package here
         raise ValueError(
-            f"You have tensorflow {tf.__version__} and this requires "
+            f"You have tensorflow {get_tf_version()} and this requires "
             "tf-keras package. Please run `pip install tf-keras` "
             "or downgrade your tensorflow."
-        ) from err
+        )
+
+    logger.debug("tf_keras is already available")
 
 
 def find_file_hash(file_path: str, hash_algorithm: str = "sha256") -> str:
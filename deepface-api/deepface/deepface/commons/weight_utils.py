@@ -1,21 +1,24 @@
 # built-in dependencies
 import os
-from typing import Optional
+import json
+import shutil
+import inspect
+import hashlib
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
 import zipfile
 import bz2
 
 # 3rd party dependencies
-import gdown
+import numpy as np
 
 # project dependencies
-from deepface.commons import folder_utils, package_utils
+from deepface import __version__
+from deepface.commons import folder_utils, onnx_utils, package_utils
 from deepface.commons.logger import Logger
 
-
-tf_version = package_utils.get_tf_major_version()
-if tf_version == 1:
-    from keras.models import Sequential
-else:
+# tensorflow is imported by the keras models themselves when they are built
+if TYPE_CHECKING:
     from tensorflow.keras.models import Sequential
 
 logger = Logger()
@@ -24,6 +27,12 @@ logger = Logger()
 
 ALLOWED_COMPRESS_TYPES = ["zip", "bz2"]
 
+# keras models are saved into this folder in weights as graphs holding their weights
+COMPILED_MODELS_FOLDER = "compiled"
+
+# weight files loaded by each thread while it is building a model to be compiled
+loaded_weights = threading.local()
+
 
 def download_weights_if_necessary(
     file_name: str, source_url: str, compress_type: Optional[str] = None
@@ -48,6 +57,9 @@ def download_weights_if_necessary(
     if compress_type is not None and compress_type not in ALLOWED_COMPRESS_TYPES:
         raise ValueError(f"unimplemented compress type - {compress_type}")
 
+    # gdown takes half a second to import, so it is imported when something is downloaded
+    import gdown
+
     try:
         logger.info(f"🔗 {file_name} will be downloaded from {source_url} to {target_file}...")
 
@@ -77,7 +89,7 @@ def download_weights_if_necessary(
     return target_file
 
 
-def load_model_weights(model: Sequential, weight_file: str) -> Sequential:
+def load_model_weights(model: "Sequential", weight_file: str) -> "Sequential":
     """
     Load pre-trained weights for a given model
     Args:
@@ -97,9 +109,365 @@ def load_model_weights(model: Sequential, weight_file: str) -> Sequential:
             "If the issue persists, consider downloading the file directly from the source "
             "and copying it to the target folder."
         ) from err
+
+    if getattr(loaded_weights, "files", None) is not None:
+        loaded_weights.files.append(weight_file)
+
     return model
 
 
+def read_layer_weights(weight_file: str) -> Iterator[List[np.ndarray]]:
+    """
+    Read the weights of a keras h5 weight file layer by layer without building its model,
+        e.g. to load just the head of a model whose backbone is already built
+    Args:
+        weight_file (str): exact path of pre-trained weights
+    Returns:
+        weights (Iterator[List[np.ndarray]]): weights of each layer having weights in the
+            order of the layers of the model
+    """
+    # h5py is a dependency of tensorflow, it is imported when a weight file is read
+    import h5py
+
+    try:
+        with h5py.File(weight_file, "r") as f:
+            # whole models saved by keras keep their weights in a group
+            group = f["model_weights"] if "model_weights" in f else f
+            for layer_name in group.attrs["layer_names"]:
+                layer_group = group[__decode(layer_name)]
+                weight_names = layer_group.attrs["weight_names"]
+                if len(weight_names) == 0:
+                    continue
+                yield [np.asarray(layer_group[__decode(name)]) for name in weight_names]
+    except (OSError, KeyError) as err:
+        raise ValueError(
+            f"An exception occurred while reading the pre-trained weights from {weight_file}."
+            "This might have happened due to an interruption during the download."
+            "You may want to delete it and allow DeepFace to download it again during the next run."
+        ) from err
+
+    if getattr(loaded_weights, "files", None) is not None:
+        loaded_weights.files.append(weight_file)
+
+
+def __decode(name: Any) -> str:
+    return name.decode("utf8") if isinstance(name, bytes) else name
+
+
+class CompiledModel:
+    """
+    Keras model restored from its compiled artifact. It is called in the same way with the
+        keras model, but its graph and weights are loaded without building its layers.
+    """
+
+    def __init__(self, module: Any, name: str, input_shape: List[Optional[int]], dtype: str):
+        self.module = module
+        self.name = name
+        self.input_shape = tuple(input_shape)
+        self.dtype = dtype
+        self.weights = list(module.weights)
+
+    # pylint: disable=unused-argument
+    def __call__(self, inputs: np.ndarray, training: bool = False) -> Any:
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        # keras models expand the missing channel axis of inputs, e.g. grayscale images
+        if inputs.ndim == len(self.input_shape) - 1:
+            inputs = inputs[..., np.newaxis]
+        return self.module.serve(inputs)
+
+    def count_params(self) -> int:
+        return sum(int(np.prod(weight.shape)) for weight in self.weights)
+
+
+def load_compiled_model(model_name: str, loader: Callable[[], Any]) -> Any:
+    """
+    Load a keras model from its compiled artifact in ~/.deepface/weights/compiled, or build it
+        with its loader and compile it for the next time. Building a keras model layer by layer
+        in python takes seconds, while its compiled graph and weights are loaded directly.
+        Artifacts are keyed by the hashes of the weight files the loader loads and of the source
+        files building the model, the tensorflow version and the deepface version, so they are
+        built again if any of them changes.
+        Set DEEPFACE_COMPILED_MODELS environment variable to 0 to disable this. Models in
+        DEEPFACE_ONNX_MODELS environment variable are exported to onnx instead, and they are
+        run by onnxruntime or opencv.
+    Args:
+        model_name (str): model identifier such as VGG-Face
+        loader (callable): function building the keras model and loading its weights
+    Returns:
+        model (keras.models.Model, CompiledModel or OnnxModel)
+    """
+    quantization = onnx_utils.find_onnx_models().get(model_name)
+    if quantization is None and os.getenv("DEEPFACE_COMPILED_MODELS", "1") == "0":
+        return loader()
+
+    # onnx exports of a model are indexed separately for each quantization
+    variant = None if quantization is None else f"onnx-{quantization}"
+    folder = os.path.join(
+        folder_utils.get_deepface_home(), ".deepface/weights", COMPILED_MODELS_FOLDER
+    )
+    index_file = os.path.join(
+        folder, "-".join(filter(None, [__find_safe_name(model_name), variant])) + ".json"
+    )
+
+    artifact = __find_compiled_artifact(index_file)
+    if artifact is not None:
+        artifact_path, index = artifact
+        try:
+            model = __load_compiled_artifact(artifact_path=artifact_path, index=index)
+            logger.debug(f"{model_name} is loaded from its compiled artifact {artifact_path}")
+            return model
+        except Exception as err:  # pylint: disable=broad-except
+            logger.warn(f"Compiled artifact of {model_name} cannot be loaded, rebuilding it - {err}")
+
+    loaded_weights.files = []
+    try:
+        model = loader()
+        weight_files = loaded_weights.files
+    finally:
+        loaded_weights.files = None
+
+    if not weight_files or not package_utils.is_keras_model(model):
+        return model
+
+    try:
+        artifact_path, index = __save_compiled_artifact(
+            model=model,
+            model_name=model_name,
+            index_file=index_file,
+            source_files=weight_files + __find_source_files(loader),
+            variant=variant,
+        )
+        # onnx models are run from their first build
+        if variant is not None:
+            return __load_compiled_artifact(artifact_path=artifact_path, index=index)
+    except Exception as err:  # pylint: disable=broad-except
+        # models requested in DEEPFACE_ONNX_MODELS are not run in tensorflow silently
+        if variant is not None:
+            raise ValueError(
+                f"{model_name} cannot be exported to onnx with {quantization} quantization"
+                f" - {err}"
+            ) from err
+        logger.warn(f"{model_name} cannot be compiled, it will be built again next time - {err}")
+
+    return model
+
+
+def __find_source_files(loader: Callable[[], Any]) -> List[str]:
+    """
+    Find the source files building a model, so its artifact is built again if its
+        architecture changes without a version bump
+    Args:
+        loader (callable): function building the keras model and loading its weights
+    Returns:
+        source_files (list): module of the loader and the deepface model modules it uses
+            directly or through other model modules
+    """
+    modules = []
+    pending = [inspect.getmodule(loader)]
+    # e.g. backbones of attribute models are built in facial recognition modules
+    namespaces = [getattr(loader, "__globals__", {})]
+    while pending or namespaces:
+        if namespaces:
+            for value in namespaces.pop().values():
+                module = value if inspect.ismodule(value) else inspect.getmodule(value)
+                if module is not None and module.__name__.startswith("deepface.models"):
+                    pending.append(module)
+            continue
+        module = pending.pop()
+        if module is None or module in modules:
+            continue
+        modules.append(module)
+        if module.__name__.startswith("deepface.models"):
+            namespaces.append(vars(module))
+
+    source_files = set()
+    for module in modules:
+        try:
+            source_files.add(inspect.getsourcefile(module))
+        except TypeError:
+            # built-in modules have no source files
+            continue
+    return sorted(source_file for source_file in source_files if source_file is not None)
+
+
+def __find_compiled_artifact(index_file: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Find the compiled artifact of a model if it was compiled from the same weight files with
+        the same tensorflow and deepface versions
+    Args:
+        index_file (str): index of the model's artifact
+    Returns:
+        artifact (tuple): path of the artifact and its index, or None
+    """
+    index = __read_index(index_file)
+    if index.get("framework") != __find_framework() or index.get("deepface") != __version__:
+        return None
+
+    modified = False
+    for source in index["sources"]:
+        if not os.path.isfile(source["file"]):
+            return None
+        stat = os.stat(source["file"])
+        if stat.st_size == source["size"] and stat.st_mtime_ns == source["mtime"]:
+            continue
+        # touched or replaced weight files are hashed again
+        if package_utils.find_file_hash(source["file"]) != source["sha256"]:
+            return None
+        source["size"], source["mtime"] = stat.st_size, stat.st_mtime_ns
+        modified = True
+
+    artifact_path = os.path.join(os.path.dirname(index_file), index["artifact"])
+    if not os.path.exists(artifact_path):
+        return None
+
+    if modified:
+        __write_index(index_file, index)
+
+    return artifact_path, index
+
+
+def __load_compiled_artifact(artifact_path: str, index: Dict[str, Any]) -> Any:
+    """
+    Load a saved model or an onnx model from its compiled artifact
+    """
+    if index.get("variant") is not None:
+        return onnx_utils.OnnxModel(
+            path=artifact_path,
+            name=index["model_name"],
+            input_shape=index["input_shape"],
+            dtype=index["dtype"],
+        )
+
+    import tensorflow as tf
+
+    return CompiledModel(
+        module=tf.saved_model.load(artifact_path),
+        name=index["model_name"],
+        input_shape=index["input_shape"],
+        dtype=index["dtype"],
+    )
+
+
+def __save_compiled_artifact(
+    model: Any,
+    model_name: str,
+    index_file: str,
+    source_files: List[str],
+    variant: Optional[str] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Save a keras model as a graph holding its weights, or export it to onnx for onnx variants,
+        and index it with its weight and source files
+    Returns:
+        artifact (tuple): path of the artifact and its index
+    """
+    import tensorflow as tf
+
+    sources = []
+    for source_file in source_files:
+        stat = os.stat(source_file)
+        sources.append(
+            {
+                "file": source_file,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "sha256": package_utils.find_file_hash(source_file),
+            }
+        )
+    key = hashlib.sha256(
+        "\n".join(
+            [__version__, __find_framework()]
+            + [source["sha256"] for source in sources]
+            + ([variant] if variant is not None else [])
+        ).encode("utf-8")
+    ).hexdigest()
+    artifact = "-".join(filter(None, [__find_safe_name(model_name), variant, key[:16]]))
+    if variant is not None:
+        artifact += ".onnx"
+    folder = os.path.dirname(index_file)
+    artifact_path = os.path.join(folder, artifact)
+    os.makedirs(folder, exist_ok=True)
+
+    # batch dimension of the input stays unknown
+    input_spec = tf.TensorSpec(
+        shape=tf.TensorShape(model.inputs[0].shape), dtype=tf.as_dtype(model.inputs[0].dtype)
+    )
+    # saved into a temporary path first not to leave a partial artifact if it is interrupted
+    temp_path = f"{artifact_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if variant is None:
+        module = tf.Module()
+        module.weights = model.weights
+        module.serve = tf.function(
+            lambda inputs: model(inputs, training=False), input_signature=[input_spec]
+        )
+        tf.saved_model.save(module, temp_path)
+    else:
+        try:
+            onnx_utils.export_onnx_model(
+                model=model, path=temp_path, quantization=variant.split("-", maxsplit=1)[1]
+            )
+        except Exception:
+            __remove_artifact(temp_path)
+            raise
+    try:
+        os.rename(temp_path, artifact_path)
+    except OSError:
+        # another process has already saved the same artifact
+        __remove_artifact(temp_path)
+
+    previous = __read_index(index_file).get("artifact")
+    index = {
+        "model_name": model_name,
+        "artifact": artifact,
+        "variant": variant,
+        "framework": __find_framework(),
+        "deepface": __version__,
+        "input_shape": input_spec.shape.as_list(),
+        "dtype": input_spec.dtype.name,
+        "sources": sources,
+    }
+    __write_index(index_file, index)
+    # artifacts of former weights or versions are not used anymore
+    if previous is not None and previous != artifact:
+        __remove_artifact(os.path.join(folder, previous))
+
+    logger.info(f"{model_name} is compiled into {artifact_path}")
+    return artifact_path, index
+
+
+def __remove_artifact(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.isfile(path):
+        os.remove(path)
+
+
+def __read_index(index_file: str) -> Dict[str, Any]:
+    """
+    Read the index of a compiled artifact, empty if it does not exist or it is broken
+    """
+    try:
+        with open(index_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def __write_index(index_file: str, index: Dict[str, Any]) -> None:
+    temp_file = f"{index_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(temp_file, index_file)
+
+
+def __find_framework() -> str:
+    return f"tensorflow-{package_utils.get_tf_version()}"
+
+
+def __find_safe_name(model_name: str) -> str:
+    return "".join(char if char.isalnum() or char in "-_" else "_" for char in model_name)
+
+
 def download_all_models_in_one_shot() -> None:
     """
     Download all model weights in one shot
@@ -1,12 +1,10 @@
-from typing import Union
-from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Optional, Union
+from abc import ABC
 import numpy as np
-from deepface.commons import package_utils
+from deepface.commons import graph_utils
 
-tf_version = package_utils.get_tf_major_version()
-if tf_version == 1:
-    from keras.models import Model
-else:
+# tensorflow is imported by the keras models themselves when they are built
+if TYPE_CHECKING:
     from tensorflow.keras.models import Model
 
 # Notice that all facial attribute analysis models must be inherited from this class
@@ -14,9 +12,49 @@ else:
 
 # pylint: disable=too-few-public-methods
 class Demography(ABC):
-    model: Model
+    model: "Model"
     model_name: str
+    # graph compiled inference function of the keras model, built on its first call
+    graph_function: Optional[graph_utils.GraphFunction] = None
 
-    @abstractmethod
-    def predict(self, img: np.ndarray) -> Union[np.ndarray, np.float64]:
-        pass
+    def predict(self, img: np.ndarray) -> Union[np.ndarray, np.float64, Any]:
+        return self.predict_batch(img)[0]
+
+    def predict_batch(self, imgs: np.ndarray) -> Union[np.ndarray, Any]:
+        """
+        Find predictions of a batch of pre-processed faces with a single model call
+        Args:
+            imgs (np.ndarray): (N, 224, 224, 3) batch of faces in BGR
+        Returns:
+            predictions (np.ndarray): (N, C) probabilities or (N,) values
+        """
+        if type(self).predict is Demography.predict:
+            graph_function = self.find_graph_function()
+            if graph_function is not None:
+                # model.predict causes memory issue when it is called in a for loop
+                # return self.model.predict(img, verbose=0)
+                return graph_function(imgs)
+
+            raise ValueError(
+                "You must overwrite predict_batch method if it is not a keras model,"
+                f"but {self.model_name} not overwritten!"
+            )
+
+        # clients overwriting just predict method are called one by one
+        return np.array([self.predict(img[np.newaxis]) for img in imgs])
+
+    def find_graph_function(self) -> Optional[graph_utils.GraphFunction]:
+        """
+        Find the graph compiled inference function of the model, building it in the
+            first call
+        Returns:
+            graph_function (GraphFunction): None if the model is not a keras or onnx model
+        """
+        if not graph_utils.is_supported(self.model):
+            return None
+        graph_function = self.graph_function
+        # graph of a replaced model is built again
+        if graph_function is None or graph_function.model is not self.model:
+            graph_function = graph_utils.GraphFunction(model=self.model, name=self.model_name)
+            self.graph_function = graph_function
+        return graph_function
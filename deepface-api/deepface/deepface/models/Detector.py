@@ -1,4 +1,4 @@
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 import numpy as np
@@ -27,6 +27,19 @@ class Detector(ABC):
         """
         pass
 
+    def detect_faces_array(self, img: np.ndarray) -> "DetectedFaces":
+        """
+        Detect faces as arrays. Detectors finding faces in arrays should overwrite this
+            not to create an object for each face, others are converted from detect_faces.
+
+        Args:
+            img (np.ndarray): pre-loaded image as numpy array
+
+        Returns:
+            results (DetectedFaces): boxes, scores and landmarks of detected faces
+        """
+        return DetectedFaces.from_regions(self.detect_faces(img))
+
 
 @dataclass
 class FacialAreaRegion:
@@ -72,3 +85,197 @@ class DetectedFace:
     img: np.ndarray
     facial_area: FacialAreaRegion
     confidence: float
+
+
+# landmarks of DetectedFaces in order, with respect to the person instead of observer
+LANDMARKS = ("left_eye", "right_eye", "nose", "mouth_left", "mouth_right")
+
+
+@dataclass
+class DetectedFaces:
+    """
+    Detected faces of an image as arrays. Post-processing steps run on all faces at once,
+        and faces are converted into FacialAreaRegion objects only when they are returned.
+
+    Args:
+        boxes (np.ndarray): (N, 4) x, y, w and h of facial areas
+        scores (np.ndarray): (N,) confidence scores, nan if the detector has no score
+        landmarks (np.ndarray): (N, 5, 2) x and y of the landmarks in LANDMARKS order,
+            nan if the detector does not find a landmark
+    """
+
+    boxes: np.ndarray
+    scores: np.ndarray
+    landmarks: np.ndarray
+
+    def __post_init__(self):
+        self.boxes = np.asarray(self.boxes, dtype=np.float64).reshape(-1, 4)
+        self.scores = np.asarray(self.scores, dtype=np.float64).reshape(-1)
+        self.landmarks = np.asarray(self.landmarks, dtype=np.float64).reshape(
+            -1, len(LANDMARKS), 2
+        )
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    @classmethod
+    def empty(cls) -> "DetectedFaces":
+        return cls(
+            boxes=np.empty((0, 4)),
+            scores=np.empty((0,)),
+            landmarks=np.empty((0, len(LANDMARKS), 2)),
+        )
+
+    @classmethod
+    def from_regions(cls, regions: List[FacialAreaRegion]) -> "DetectedFaces":
+        """
+        Convert facial areas found one by one into arrays
+        """
+        if len(regions) == 0:
+            return cls.empty()
+        return cls(
+            boxes=[(region.x, region.y, region.w, region.h) for region in regions],
+            scores=[
+                np.nan if region.confidence is None else region.confidence for region in regions
+            ],
+            landmarks=[
+                [
+                    (np.nan, np.nan) if point is None else point
+                    for point in (getattr(region, landmark) for landmark in LANDMARKS)
+                ]
+                for region in regions
+            ],
+        )
+
+    def to_regions(self) -> List[FacialAreaRegion]:
+        """
+        Convert faces into FacialAreaRegion objects having int coordinates
+        """
+        boxes = self.boxes.astype(int).tolist()
+        scores = [None if np.isnan(score) else score for score in self.scores.tolist()]
+        found = (~np.isnan(self.landmarks).any(axis=2)).tolist()
+        landmarks = [
+            [tuple(point) if point_found else None for point, point_found in zip(*face)]
+            for face in zip(np.nan_to_num(self.landmarks).astype(int).tolist(), found)
+        ]
+
+        return [
+            FacialAreaRegion(
+                x=x,
+                y=y,
+                w=w,
+                h=h,
+                confidence=score,
+                left_eye=left_eye,
+                right_eye=right_eye,
+                nose=nose,
+                mouth_left=mouth_left,
+                mouth_right=mouth_right,
+            )
+            for (x, y, w, h), score, (left_eye, right_eye, nose, mouth_left, mouth_right) in zip(
+                boxes, scores, landmarks
+            )
+        ]
+
+    def select(self, indices: Union[np.ndarray, List[int]]) -> "DetectedFaces":
+        """
+        Keep the faces of given indices or boolean mask
+        """
+        return DetectedFaces(
+            boxes=self.boxes[indices],
+            scores=self.scores[indices],
+            landmarks=self.landmarks[indices],
+        )
+
+    def filter(self, min_confidence: float) -> "DetectedFaces":
+        """
+        Keep the faces having at least the given confidence, or having no confidence score
+        """
+        return self.select(~(self.scores < min_confidence))
+
+    def suppress(self, iou_threshold: float) -> "DetectedFaces":
+        """
+        Keep the most confident one of the faces overlapping more than the threshold
+        """
+        return self.select(non_max_suppression(self.boxes, self.scores, iou_threshold))
+
+    def largest(self, max_faces: int) -> "DetectedFaces":
+        """
+        Keep the largest faces in descending order of their areas
+        """
+        if max_faces >= len(self):
+            return self
+        areas = self.boxes[:, 2] * self.boxes[:, 3]
+        return self.select(np.argsort(-areas, kind="stable")[:max_faces])
+
+    def expand(self, expand_percentage: int, size: Tuple[int, int]) -> "DetectedFaces":
+        """
+        Expand facial areas by a percentage, staying in the image
+        Args:
+            expand_percentage (int): percentage to expand facial areas
+            size (tuple): height and width of the image
+        """
+        if expand_percentage <= 0:
+            return self
+        x, y, w, h = self.boxes.T
+        expanded_w = w + np.trunc(w * expand_percentage / 100)
+        expanded_h = h + np.trunc(h * expand_percentage / 100)
+        x = np.maximum(0, x - np.trunc((expanded_w - w) / 2))
+        y = np.maximum(0, y - np.trunc((expanded_h - h) / 2))
+        w = np.minimum(size[1] - x, expanded_w)
+        h = np.minimum(size[0] - y, expanded_h)
+        return DetectedFaces(
+            boxes=np.stack([x, y, w, h], axis=1), scores=self.scores, landmarks=self.landmarks
+        )
+
+    def shift(self, dx: int, dy: int) -> "DetectedFaces":
+        """
+        Move facial areas and landmarks, e.g. from a bordered image into the image itself
+        """
+        offset = np.array([dx, dy], dtype=np.float64)
+        boxes = self.boxes.copy()
+        boxes[:, :2] += offset
+        return DetectedFaces(boxes=boxes, scores=self.scores, landmarks=self.landmarks + offset)
+
+    def find_angles(self) -> np.ndarray:
+        """
+        Find the rotations in degrees aligning the eyes of faces horizontally
+        Returns:
+            angles (np.ndarray): (N,) angles, 0 for faces without eyes
+        """
+        left_eyes, right_eyes = self.landmarks[:, 0], self.landmarks[:, 1]
+        differences = left_eyes - right_eyes
+        angles = np.degrees(np.arctan2(differences[:, 1], differences[:, 0]))
+        return np.nan_to_num(angles, nan=0.0)
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    Find the boxes not overlapping with a more confident box more than the threshold
+    Args:
+        boxes (np.ndarray): (N, 4) x, y, w and h of boxes
+        scores (np.ndarray): (N,) confidence scores
+        iou_threshold (float): boxes overlapping at least this intersection over union
+            with a more confident one are suppressed
+    Returns:
+        keep (np.ndarray): indices of the kept boxes in descending order of their scores
+    """
+    x1, y1 = boxes[:, 0], boxes[:, 1]
+    x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+    areas = boxes[:, 2] * boxes[:, 3]
+    order = np.argsort(scores)[::-1]
+
+    keep = []
+    while len(order) > 0:
+        i = order[0]
+        keep.append(i)
+
+        # overlaps of the best remaining box with the others
+        others = order[1:]
+        w = np.maximum(0, np.minimum(x2[i], x2[others]) - np.maximum(x1[i], x1[others]))
+        h = np.maximum(0, np.minimum(y2[i], y2[others]) - np.maximum(y1[i], y1[others]))
+        inter = w * h
+        ious = inter / np.maximum(areas[i] + areas[others] - inter, 1e-9)
+        order = others[ious < iou_threshold]
+
+    return np.array(keep, dtype=int)
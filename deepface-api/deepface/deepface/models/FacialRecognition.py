@@ -1,29 +1,61 @@
 from abc import ABC
-from typing import Any, Union, List, Tuple
+from typing import TYPE_CHECKING, Any, Optional, Union, List, Tuple
 import numpy as np
-from deepface.commons import package_utils
+from deepface.commons import graph_utils
 
-tf_version = package_utils.get_tf_major_version()
-if tf_version == 2:
+# tensorflow is imported by the keras models themselves when they are built
+if TYPE_CHECKING:
     from tensorflow.keras.models import Model
-else:
-    from keras.models import Model
 
 # Notice that all facial recognition models must be inherited from this class
 
 # pylint: disable=too-few-public-methods
 class FacialRecognition(ABC):
-    model: Union[Model, Any]
+    model: Union["Model", Any]
     model_name: str
     input_shape: Tuple[int, int]
     output_shape: int
+    # graph compiled inference function of the keras model, built on its first call
+    graph_function: Optional[graph_utils.GraphFunction] = None
 
     def forward(self, img: np.ndarray) -> List[float]:
-        if not isinstance(self.model, Model):
+        return self.forward_batch(img)[0].tolist()
+
+    def forward_batch(self, imgs: np.ndarray) -> np.ndarray:
+        """
+        Find embeddings of a batch of pre-processed faces with a single model call
+        Args:
+            imgs (np.ndarray): (N, H, W, 3) batch of faces
+        Returns:
+            embeddings (np.ndarray): (N, D) embeddings
+        """
+        graph_function = self.find_graph_function()
+        if graph_function is not None:
+            # model.predict causes memory issue when it is called in a for loop
+            # embedding = model.predict(img, verbose=0)[0].tolist()
+            return graph_function(imgs)
+
+        if type(self).forward is FacialRecognition.forward:
             raise ValueError(
-                "You must overwrite forward method if it is not a keras model,"
+                "You must overwrite forward_batch method if it is not a keras model,"
                 f"but {self.model_name} not overwritten!"
             )
-        # model.predict causes memory issue when it is called in a for loop
-        # embedding = model.predict(img, verbose=0)[0].tolist()
-        return self.model(img, training=False).numpy()[0].tolist()
+
+        # clients overwriting just forward method are called one by one
+        return np.array([self.forward(img[np.newaxis]) for img in imgs])
+
+    def find_graph_function(self) -> Optional[graph_utils.GraphFunction]:
+        """
+        Find the graph compiled inference function of the model, building it in the
+            first call
+        Returns:
+            graph_function (GraphFunction): None if the model is not a keras or onnx model
+        """
+        if not graph_utils.is_supported(self.model):
+            return None
+        graph_function = self.graph_function
+        # graph of a replaced model is built again
+        if graph_function is None or graph_function.model is not self.model:
+            graph_function = graph_utils.GraphFunction(model=self.model, name=self.model_name)
+            self.graph_function = graph_function
+        return graph_function
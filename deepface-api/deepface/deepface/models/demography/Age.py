@@ -34,13 +34,13 @@ class ApparentAgeClient(Demography):
     """
 
     def __init__(self):
-        self.model = load_model()
+        self.model = weight_utils.load_compiled_model(model_name="Age", loader=load_model)
         self.model_name = "Age"
 
-    def predict(self, img: np.ndarray) -> np.float64:
+    def predict_batch(self, imgs: np.ndarray) -> np.ndarray:
         # model.predict causes memory issue when it is called in a for loop
-        # age_predictions = self.model.predict(img, verbose=0)[0, :]
-        age_predictions = self.model(img, training=False).numpy()[0, :]
+        # age_predictions = self.model.predict(imgs, verbose=0)
+        age_predictions = self.find_graph_function()(imgs)
         return find_apparent_age(age_predictions)
 
 
@@ -83,10 +83,10 @@ def find_apparent_age(age_predictions: np.ndarray) -> np.float64:
     """
     Find apparent age prediction from a given probas of ages
     Args:
-        age_predictions (?)
+        age_predictions (np.ndarray): (101,) probas of an image or (N, 101) of a batch
     Returns:
-        apparent_age (float)
+        apparent_age (float or np.ndarray): apparent age, or (N,) apparent ages of a batch
     """
     output_indexes = np.arange(0, 101)
-    apparent_age = np.sum(age_predictions * output_indexes)
+    apparent_age = np.sum(age_predictions * output_indexes, axis=-1)
     return apparent_age
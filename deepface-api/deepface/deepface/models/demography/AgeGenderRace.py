@@ -0,0 +1,175 @@
+# built-in dependencies
+from typing import Dict, List, Optional, Union
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.models.demography import Age, Gender, Race
+from deepface.commons import package_utils, weight_utils
+from deepface.models.Demography import Demography
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# ----------------------------------------
+# dependency configurations
+
+tf_version = package_utils.get_tf_major_version()
+
+if tf_version == 1:
+    from keras.models import Model
+    from keras.layers import InputLayer
+else:
+    from tensorflow.keras.models import Model
+    from tensorflow.keras.layers import InputLayer
+
+# ----------------------------------------
+
+# weight files of the models whose heads are built on the backbone of the age model
+HEAD_WEIGHTS = {
+    "Gender": ("gender_model_weights.h5", Gender.WEIGHTS_URL),
+    "Race": ("race_model_single_batch.h5", Race.WEIGHTS_URL),
+}
+
+# pylint: disable=too-few-public-methods
+class AgeGenderRaceClient(Demography):
+    """
+    Age, gender and race models in a single multi-head model. They are fine-tuned from
+        VGG-Face, so the backbone of the age model is built once and just the prediction
+        layers of gender and race models are read from their weight files. All heads are
+        found in one forward pass.
+    """
+
+    def __init__(self):
+        self.model_names = ["Age", "Gender", "Race"]
+        self.model = weight_utils.load_compiled_model(
+            model_name="Age-Gender-Race", loader=load_model
+        )
+        self.model_name = "Age-Gender-Race"
+
+    def predict(self, img: np.ndarray) -> Dict[str, Union[np.ndarray, np.float64]]:
+        """
+        Find age, gender and race predictions of an image in one forward pass
+        Args:
+            img (np.ndarray): (1, 224, 224, 3) pre-loaded image in BGR
+        Returns:
+            predictions (dict): apparent age for Age, probabilities for Gender and Race
+        """
+        predictions = self.predict_batch(img)
+        return {model_name: prediction[0] for model_name, prediction in predictions.items()}
+
+    def predict_batch(self, imgs: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Find age, gender and race predictions of a batch of faces in one forward pass
+        Args:
+            imgs (np.ndarray): (N, 224, 224, 3) batch of faces in BGR
+        Returns:
+            predictions (dict): (N,) apparent ages for Age, (N, C) probabilities for
+                Gender and Race
+        """
+        # model.predict causes memory issue when it is called in a for loop
+        outputs = self.find_graph_function()(imgs)
+        predictions = dict(zip(self.model_names, outputs))
+        predictions["Age"] = Age.find_apparent_age(predictions["Age"])
+        return predictions
+
+
+def load_model() -> Model:
+    """
+    Construct the age model, and the heads of gender and race models on its backbone
+    Returns:
+        model (Model)
+    """
+    weight_files = {
+        model_name: weight_utils.download_weights_if_necessary(
+            file_name=file_name, source_url=url
+        )
+        for model_name, (file_name, url) in HEAD_WEIGHTS.items()
+    }
+    return build_shared_model(model=Age.load_model(), weight_files=weight_files)
+
+
+def build_shared_model(model: Model, weight_files: Dict[str, str]) -> Model:
+    """
+    Build a multi-head model on the backbone of a model. Head of a model starts from its
+        last layer having weights, and the backbone is the part before it. Heads of other
+        models fine-tuned from the same backbone are built in the same structure, and their
+        weights are read from their weight files without building their backbones.
+        Predictions of another model are exactly the same with its own ones if its backbone
+        weights are not changed while it is fine-tuned. Otherwise, they are approximated
+        with the shared backbone, and a warning tells how many backbone layers differ.
+    Args:
+        model (Model): model whose backbone is shared, e.g. age model
+        weight_files (dict): model name to the h5 weight file of the other models
+    Returns:
+        model (Model): model returning the output of the given model, and then the outputs
+            of the other models in the same order with weight_files
+    """
+    layers = [layer for layer in model.layers if not isinstance(layer, InputLayer)]
+    weighted_indices = [index for index, layer in enumerate(layers) if layer.weights]
+    if len(weighted_indices) < 2:
+        raise ValueError("Model must have a backbone and a head having weights to be shared")
+
+    head_index = weighted_indices[-1]
+    backbone_layers = [layers[index] for index in weighted_indices[:-1]]
+    backbone_output = layers[head_index].input
+
+    outputs = [model.output]
+    for model_name, weight_file in weight_files.items():
+        shared_layers = 0
+        head_weights = None
+        for index, weights in enumerate(weight_utils.read_layer_weights(weight_file)):
+            if (
+                index == shared_layers < len(backbone_layers)
+                and __is_same_weights(backbone_layers[index].get_weights(), weights)
+            ):
+                shared_layers += 1
+            head_weights = weights
+
+        if shared_layers == len(backbone_layers):
+            logger.debug(f"All {shared_layers} backbone layers of {model_name} are shared")
+        else:
+            logger.warn(
+                f"{len(backbone_layers) - shared_layers} of {len(backbone_layers)} backbone"
+                f" layers of {model_name} are different from the shared backbone."
+                f" {model_name} predictions are approximated with the shared backbone."
+            )
+
+        y = backbone_output
+        for layer in layers[head_index:]:
+            y = __copy_layer(
+                layer=layer,
+                name=f"{model_name.lower()}_{layer.name}",
+                x=y,
+                weights=head_weights if layer is layers[head_index] else None,
+            )
+        outputs.append(y)
+
+    return Model(inputs=model.inputs, outputs=outputs)
+
+
+def __copy_layer(layer, name: str, x, weights: Optional[List[np.ndarray]]):
+    """
+    Copy a layer in another name since names must be unique in a model. Its number of
+        outputs is found from the given weights, since heads predict different classes.
+    Returns:
+        output of the copied layer for the given input
+    """
+    config = {**layer.get_config(), "name": name}
+    if weights is not None:
+        for key in ("filters", "units"):
+            if key in config:
+                config[key] = weights[-1].shape[0]
+    copied_layer = type(layer).from_config(config)
+    y = copied_layer(x)
+    if weights is not None:
+        copied_layer.set_weights(weights)
+    return y
+
+
+def __is_same_weights(weights: List[np.ndarray], other_weights: List[np.ndarray]) -> bool:
+    return len(weights) == len(other_weights) and all(
+        weight.shape == other_weight.shape and np.array_equal(weight, other_weight)
+        for weight, other_weight in zip(weights, other_weights)
+    )
@@ -40,17 +40,17 @@ class EmotionClient(Demography):
     """
 
     def __init__(self):
-        self.model = load_model()
+        self.model = weight_utils.load_compiled_model(model_name="Emotion", loader=load_model)
         self.model_name = "Emotion"
 
-    def predict(self, img: np.ndarray) -> np.ndarray:
-        img_gray = cv2.cvtColor(img[0], cv2.COLOR_BGR2GRAY)
-        img_gray = cv2.resize(img_gray, (48, 48))
-        img_gray = np.expand_dims(img_gray, axis=0)
+    def predict_batch(self, imgs: np.ndarray) -> np.ndarray:
+        imgs_gray = np.stack(
+            [cv2.resize(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), (48, 48)) for img in imgs]
+        )
 
         # model.predict causes memory issue when it is called in a for loop
-        # emotion_predictions = self.model.predict(img_gray, verbose=0)[0, :]
-        emotion_predictions = self.model(img_gray, training=False).numpy()[0, :]
+        # emotion_predictions = self.model.predict(imgs_gray, verbose=0)
+        emotion_predictions = self.find_graph_function()(imgs_gray)
 
         return emotion_predictions
 
@@ -1,6 +1,3 @@
-# 3rd party dependencies
-import numpy as np
-
 # project dependencies
 from deepface.models.facial_recognition import VGGFace
 from deepface.commons import package_utils, weight_utils
@@ -34,14 +31,9 @@ class RaceClient(Demography):
     """
 
     def __init__(self):
-        self.model = load_model()
+        self.model = weight_utils.load_compiled_model(model_name="Race", loader=load_model)
         self.model_name = "Race"
 
-    def predict(self, img: np.ndarray) -> np.ndarray:
-        # model.predict causes memory issue when it is called in a for loop
-        # return self.model.predict(img, verbose=0)[0, :]
-        return self.model(img, training=False).numpy()[0, :]
-
 
 def load_model(
     url=WEIGHTS_URL,
@@ -1,6 +1,8 @@
 # built-in dependencies
 import os
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import Any, List, Tuple
 
 # 3rd party dependencies
 import numpy as np
@@ -8,7 +10,13 @@ import cv2
 
 # project dependencies
 from deepface.commons import weight_utils
-from deepface.models.Detector import Detector, FacialAreaRegion
+from deepface.models.Detector import (
+    Detector,
+    DetectedFaces,
+    FacialAreaRegion,
+    LANDMARKS,
+    non_max_suppression,
+)
 from deepface.commons.logger import Logger
 
 logger = Logger()
@@ -17,12 +25,13 @@ logger = Logger()
 
 WEIGHTS_URL = "https://github.com/Star-Clouds/CenterFace/raw/master/models/onnx/centerface.onnx"
 
+# number of input sizes having their own network in memory
+MAX_INPUT_SIZES = 8
+
 
 class CenterFaceClient(Detector):
     def __init__(self):
-        # BUG: model must be flushed for each call
-        # self.model = self.build_model()
-        pass
+        self.model = self.build_model()
 
     def build_model(self):
         """
@@ -44,165 +53,128 @@ class CenterFaceClient(Detector):
         Returns:
             results (List[FacialAreaRegion]): A list of FacialAreaRegion objects
         """
-        resp = []
+        return self.detect_faces_array(img).to_regions()
+
+    def detect_faces_array(self, img: np.ndarray) -> DetectedFaces:
+        """
+        Detect faces with CenterFace as arrays
+
+        Args:
+            img (np.ndarray): pre-loaded image as numpy array
 
+        Returns:
+            results (DetectedFaces): boxes, scores and landmarks of detected faces
+        """
         threshold = float(os.getenv("CENTERFACE_THRESHOLD", "0.80"))
 
-        # BUG: model causes problematic results from 2nd call if it is not flushed
-        # detections, landmarks = self.model.forward(
-        #     img, img.shape[0], img.shape[1], threshold=threshold
-        # )
-        detections, landmarks = self.build_model().forward(
+        detections, landmarks = self.model.forward(
             img, img.shape[0], img.shape[1], threshold=threshold
         )
 
-        for i, detection in enumerate(detections):
-            boxes, confidence = detection[:4], detection[4]
-
-            x = boxes[0]
-            y = boxes[1]
-            w = boxes[2] - x
-            h = boxes[3] - y
-
-            landmark = landmarks[i]
-
-            right_eye = (int(landmark[0]), int(landmark[1]))
-            left_eye = (int(landmark[2]), int(landmark[3]))
-            # nose = (int(landmark[4]), int(landmark [5]))
-            # mouth_right = (int(landmark[6]), int(landmark [7]))
-            # mouth_left = (int(landmark[8]), int(landmark [9]))
-
-            facial_area = FacialAreaRegion(
-                x=int(x),
-                y=int(y),
-                w=int(w),
-                h=int(h),
-                left_eye=left_eye,
-                right_eye=right_eye,
-                confidence=min(max(0, float(confidence)), 1.0),
-            )
-            resp.append(facial_area)
+        # detections are x1, y1, x2, y2 and score
+        boxes = np.trunc(
+            np.concatenate(
+                [detections[:, :2], detections[:, 2:4] - detections[:, :2]], axis=1
+            ).astype(np.float64)
+        )
 
-        return resp
+        # landmarks are right eye, left eye, nose, right and left corners of mouth
+        points = np.full((len(detections), len(LANDMARKS), 2), np.nan)
+        points[:, LANDMARKS.index("left_eye")] = np.trunc(landmarks[:, 2:4])
+        points[:, LANDMARKS.index("right_eye")] = np.trunc(landmarks[:, 0:2])
+
+        return DetectedFaces(
+            boxes=boxes, scores=np.clip(detections[:, 4], 0, 1), landmarks=points
+        )
 
 
 class CenterFace:
     """
     This class is heavily inspired from
         github.com/Star-Clouds/CenterFace/blob/master/prj-python/centerface.py
+    OpenCV network keeps the shapes of its first input, so it returns problematic results
+        for inputs in other sizes. A network is loaded once for each input size instead.
     """
 
     def __init__(self, weight_path: str):
-        self.net = cv2.dnn.readNetFromONNX(weight_path)
-        self.img_h_new, self.img_w_new, self.scale_h, self.scale_w = 0, 0, 0, 0
+        self.weight_path = weight_path
+        # input size to its network in least recently used order
+        self.nets: "OrderedDict[Tuple[int, int], Any]" = OrderedDict()
+        self.lock = threading.Lock()
 
     def forward(self, img, height, width, threshold=0.5):
-        self.img_h_new, self.img_w_new, self.scale_h, self.scale_w = self.transform(height, width)
-        return self.inference_opencv(img, threshold)
-
-    def inference_opencv(self, img, threshold):
+        img_h_new, img_w_new, scale_h, scale_w = self.transform(height, width)
         blob = cv2.dnn.blobFromImage(
             img,
             scalefactor=1.0,
-            size=(self.img_w_new, self.img_h_new),
+            size=(img_w_new, img_h_new),
             mean=(0, 0, 0),
             swapRB=True,
             crop=False,
         )
-        self.net.setInput(blob)
-        heatmap, scale, offset, lms = self.net.forward(["537", "538", "539", "540"])
-        return self.postprocess(heatmap, lms, offset, scale, threshold)
 
-    def transform(self, h, w):
-        img_h_new, img_w_new = int(np.ceil(h / 32) * 32), int(np.ceil(w / 32) * 32)
-        scale_h, scale_w = img_h_new / h, img_w_new / w
-        return img_h_new, img_w_new, scale_h, scale_w
+        # networks are not thread-safe
+        with self.lock:
+            net = self.__find_net((img_h_new, img_w_new))
+            net.setInput(blob)
+            heatmap, scale, offset, lms = net.forward(["537", "538", "539", "540"])
 
-    def postprocess(self, heatmap, lms, offset, scale, threshold):
         dets, lms = self.decode(
-            heatmap, scale, offset, lms, (self.img_h_new, self.img_w_new), threshold=threshold
+            heatmap, scale, offset, lms, (img_h_new, img_w_new), threshold=threshold
         )
-        if len(dets) > 0:
-            dets[:, 0:4:2], dets[:, 1:4:2] = (
-                dets[:, 0:4:2] / self.scale_w,
-                dets[:, 1:4:2] / self.scale_h,
-            )
-            lms[:, 0:10:2], lms[:, 1:10:2] = (
-                lms[:, 0:10:2] / self.scale_w,
-                lms[:, 1:10:2] / self.scale_h,
-            )
-        else:
-            dets = np.empty(shape=[0, 5], dtype=np.float32)
-            lms = np.empty(shape=[0, 10], dtype=np.float32)
+        dets[:, 0:4:2] /= scale_w
+        dets[:, 1:4:2] /= scale_h
+        lms[:, 0:10:2] /= scale_w
+        lms[:, 1:10:2] /= scale_h
         return dets, lms
 
+    def __find_net(self, size: Tuple[int, int]) -> Any:
+        """
+        Find the network of an input size, load it if it is not in memory. Lock must be held.
+        """
+        net = self.nets.get(size)
+        if net is None:
+            net = cv2.dnn.readNetFromONNX(self.weight_path)
+            self.nets[size] = net
+            if len(self.nets) > MAX_INPUT_SIZES:
+                self.nets.popitem(last=False)
+            logger.debug(f"CenterFace network is loaded for {size[1]}x{size[0]} inputs")
+        self.nets.move_to_end(size)
+        return net
+
+    def transform(self, h, w):
+        img_h_new, img_w_new = int(np.ceil(h / 32) * 32), int(np.ceil(w / 32) * 32)
+        scale_h, scale_w = img_h_new / h, img_w_new / w
+        return img_h_new, img_w_new, scale_h, scale_w
+
     def decode(self, heatmap, scale, offset, landmark, size, threshold=0.1):
         heatmap = np.squeeze(heatmap)
-        scale0, scale1 = scale[0, 0, :, :], scale[0, 1, :, :]
-        offset0, offset1 = offset[0, 0, :, :], offset[0, 1, :, :]
         c0, c1 = np.where(heatmap > threshold)
-        boxes, lms = [], []
-        if len(c0) > 0:
-            # pylint:disable=consider-using-enumerate
-            for i in range(len(c0)):
-                s0, s1 = np.exp(scale0[c0[i], c1[i]]) * 4, np.exp(scale1[c0[i], c1[i]]) * 4
-                o0, o1 = offset0[c0[i], c1[i]], offset1[c0[i], c1[i]]
-                s = heatmap[c0[i], c1[i]]
-                x1, y1 = max(0, (c1[i] + o1 + 0.5) * 4 - s1 / 2), max(
-                    0, (c0[i] + o0 + 0.5) * 4 - s0 / 2
-                )
-                x1, y1 = min(x1, size[1]), min(y1, size[0])
-                boxes.append([x1, y1, min(x1 + s1, size[1]), min(y1 + s0, size[0]), s])
-                lm = []
-                for j in range(5):
-                    lm.append(landmark[0, j * 2 + 1, c0[i], c1[i]] * s1 + x1)
-                    lm.append(landmark[0, j * 2, c0[i], c1[i]] * s0 + y1)
-                lms.append(lm)
-            boxes = np.asarray(boxes, dtype=np.float32)
-            keep = self.nms(boxes[:, :4], boxes[:, 4], 0.3)
-            boxes = boxes[keep, :]
-            lms = np.asarray(lms, dtype=np.float32)
-            lms = lms[keep, :]
-        return boxes, lms
+        if len(c0) == 0:
+            return np.empty(shape=[0, 5], dtype=np.float32), np.empty(
+                shape=[0, 10], dtype=np.float32
+            )
+
+        s0, s1 = np.exp(scale[0, 0, c0, c1]) * 4, np.exp(scale[0, 1, c0, c1]) * 4
+        o0, o1 = offset[0, 0, c0, c1], offset[0, 1, c0, c1]
+        x1 = np.clip((c1 + o1 + 0.5) * 4 - s1 / 2, 0, size[1])
+        y1 = np.clip((c0 + o0 + 0.5) * 4 - s0 / 2, 0, size[0])
+        boxes = np.stack(
+            [x1, y1, np.minimum(x1 + s1, size[1]), np.minimum(y1 + s0, size[0]), heatmap[c0, c1]],
+            axis=1,
+        ).astype(np.float32)
+
+        # landmarks are in y, x order for each of 5 points
+        lms = np.empty(shape=[len(c0), 10], dtype=np.float32)
+        lms[:, 0::2] = landmark[0, 1::2][:, c0, c1].T * s1[:, None] + x1[:, None]
+        lms[:, 1::2] = landmark[0, 0::2][:, c0, c1].T * s0[:, None] + y1[:, None]
+
+        keep = self.nms(boxes[:, :4], boxes[:, 4], 0.3)
+        return boxes[keep, :], lms[keep, :]
 
     def nms(self, boxes, scores, nms_thresh):
-        x1 = boxes[:, 0]
-        y1 = boxes[:, 1]
-        x2 = boxes[:, 2]
-        y2 = boxes[:, 3]
-        areas = (x2 - x1 + 1) * (y2 - y1 + 1)
-        order = np.argsort(scores)[::-1]
-        num_detections = boxes.shape[0]
-        suppressed = np.zeros((num_detections,), dtype=bool)
-
-        keep = []
-        for _i in range(num_detections):
-            i = order[_i]
-            if suppressed[i]:
-                continue
-            keep.append(i)
-
-            ix1 = x1[i]
-            iy1 = y1[i]
-            ix2 = x2[i]
-            iy2 = y2[i]
-            iarea = areas[i]
-
-            for _j in range(_i + 1, num_detections):
-                j = order[_j]
-                if suppressed[j]:
-                    continue
-
-                xx1 = max(ix1, x1[j])
-                yy1 = max(iy1, y1[j])
-                xx2 = min(ix2, x2[j])
-                yy2 = min(iy2, y2[j])
-                w = max(0, xx2 - xx1 + 1)
-                h = max(0, yy2 - yy1 + 1)
-
-                inter = w * h
-                ovr = inter / (iarea + areas[j] - inter)
-                if ovr >= nms_thresh:
-                    suppressed[j] = True
-
-        return keep
+        # boxes include their right and bottom pixels
+        widths = boxes[:, 2:4] - boxes[:, 0:2] + 1
+        return non_max_suppression(
+            np.concatenate([boxes[:, 0:2], widths], axis=1), scores, nms_thresh
+        )
@@ -6,7 +6,7 @@ import numpy as np
 from retinaface import RetinaFace as rf
 
 # project dependencies
-from deepface.models.Detector import Detector, FacialAreaRegion
+from deepface.models.Detector import Detector, DetectedFaces, FacialAreaRegion, LANDMARKS
 
 # pylint: disable=too-few-public-methods
 class RetinaFaceClient(Detector):
@@ -23,54 +23,45 @@ class RetinaFaceClient(Detector):
         Returns:
             results (List[FacialAreaRegion]): A list of FacialAreaRegion objects
         """
-        resp = []
+        return self.detect_faces_array(img).to_regions()
 
-        obj = rf.detect_faces(img, model=self.model, threshold=0.9)
-
-        if not isinstance(obj, dict):
-            return resp
-
-        for face_idx in obj.keys():
-            identity = obj[face_idx]
-            detection = identity["facial_area"]
-
-            y = detection[1]
-            h = detection[3] - y
-            x = detection[0]
-            w = detection[2] - x
-
-            # retinaface sets left and right eyes with respect to the person
-            left_eye = identity["landmarks"]["left_eye"]
-            right_eye = identity["landmarks"]["right_eye"]
-            nose = identity["landmarks"].get("nose")
-            mouth_right = identity["landmarks"].get("mouth_right")
-            mouth_left = identity["landmarks"].get("mouth_left")
+    def detect_faces_array(self, img: np.ndarray) -> DetectedFaces:
+        """
+        Detect faces with retinaface as arrays
 
-            # eyes are list of float, need to cast them tuple of int
-            left_eye = tuple(int(i) for i in left_eye)
-            right_eye = tuple(int(i) for i in right_eye)
-            if nose is not None:
-                nose = tuple(int(i) for i in nose)
-            if mouth_right is not None:
-                mouth_right = tuple(int(i) for i in mouth_right)
-            if mouth_left is not None:
-                mouth_left = tuple(int(i) for i in mouth_left)
+        Args:
+            img (np.ndarray): pre-loaded image as numpy array
 
-            confidence = identity["score"]
+        Returns:
+            results (DetectedFaces): boxes, scores and landmarks of detected faces
+        """
+        obj = rf.detect_faces(img, model=self.model, threshold=0.9)
 
-            facial_area = FacialAreaRegion(
-                x=x,
-                y=y,
-                w=w,
-                h=h,
-                left_eye=left_eye,
-                right_eye=right_eye,
-                confidence=confidence,
-                nose=nose,
-                mouth_left=mouth_left,
-                mouth_right=mouth_right,
+        if not isinstance(obj, dict) or len(obj) == 0:
+            return DetectedFaces.empty()
+
+        identities = list(obj.values())
+
+        # x1, y1, x2 and y2 of facial areas
+        corners = np.array([identity["facial_area"] for identity in identities], dtype=np.float64)
+        boxes = np.concatenate([corners[:, :2], corners[:, 2:] - corners[:, :2]], axis=1)
+
+        # retinaface sets left and right eyes with respect to the person
+        landmarks = np.trunc(
+            np.array(
+                [
+                    [
+                        identity["landmarks"].get(landmark, (np.nan, np.nan))
+                        for landmark in LANDMARKS
+                    ]
+                    for identity in identities
+                ],
+                dtype=np.float64,
             )
+        )
 
-            resp.append(facial_area)
-
-        return resp
+        return DetectedFaces(
+            boxes=boxes,
+            scores=[identity["score"] for identity in identities],
+            landmarks=landmarks,
+        )
@@ -6,7 +6,7 @@ from typing import Any, List
 import numpy as np
 
 # project dependencies
-from deepface.models.Detector import Detector, FacialAreaRegion
+from deepface.models.Detector import Detector, DetectedFaces, FacialAreaRegion, LANDMARKS
 from deepface.commons import weight_utils
 from deepface.commons.logger import Logger
 
@@ -56,8 +56,18 @@ class YoloClient(Detector):
         Returns:
             results (List[FacialAreaRegion]): A list of FacialAreaRegion objects
         """
-        resp = []
+        return self.detect_faces_array(img).to_regions()
 
+    def detect_faces_array(self, img: np.ndarray) -> DetectedFaces:
+        """
+        Detect faces with yolo as arrays
+
+        Args:
+            img (np.ndarray): pre-loaded image as numpy array
+
+        Returns:
+            results (DetectedFaces): boxes, scores and landmarks of detected faces
+        """
         # Detect faces
         results = self.model.predict(
             img,
@@ -66,35 +76,21 @@ class YoloClient(Detector):
             conf=float(os.getenv("YOLO_MIN_DETECTION_CONFIDENCE", "0.25")),
         )[0]
 
-        # For each face, extract the bounding box, the landmarks and confidence
-        for result in results:
-
-            if result.boxes is None or result.keypoints is None:
-                continue
-
-            # Extract the bounding box and the confidence
-            x, y, w, h = result.boxes.xywh.tolist()[0]
-            confidence = result.boxes.conf.tolist()[0]
-
-            # right_eye_conf = result.keypoints.conf[0][0]
-            # left_eye_conf = result.keypoints.conf[0][1]
-            right_eye = result.keypoints.xy[0][0].tolist()
-            left_eye = result.keypoints.xy[0][1].tolist()
-
-            # eyes are list of float, need to cast them tuple of int
-            left_eye = tuple(int(i) for i in left_eye)
-            right_eye = tuple(int(i) for i in right_eye)
-
-            x, y, w, h = int(x - w / 2), int(y - h / 2), int(w), int(h)
-            facial_area = FacialAreaRegion(
-                x=x,
-                y=y,
-                w=w,
-                h=h,
-                left_eye=left_eye,
-                right_eye=right_eye,
-                confidence=confidence,
-            )
-            resp.append(facial_area)
-
-        return resp
+        if results.boxes is None or results.keypoints is None or len(results.boxes) == 0:
+            return DetectedFaces.empty()
+
+        # center x, center y, w and h of the bounding boxes
+        xywh = results.boxes.xywh.cpu().numpy().astype(np.float64)
+        boxes = np.trunc(
+            np.concatenate([xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, 2:]], axis=1)
+        )
+
+        # keypoints are right eye, left eye, nose, right and left corners of mouth
+        keypoints = results.keypoints.xy.cpu().numpy()
+        landmarks = np.full((len(boxes), len(LANDMARKS), 2), np.nan)
+        landmarks[:, LANDMARKS.index("left_eye")] = np.trunc(keypoints[:, 1])
+        landmarks[:, LANDMARKS.index("right_eye")] = np.trunc(keypoints[:, 0])
+
+        return DetectedFaces(
+            boxes=boxes, scores=results.boxes.conf.cpu().numpy(), landmarks=landmarks
+        )
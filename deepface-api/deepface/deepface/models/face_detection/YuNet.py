@@ -8,7 +8,7 @@ import numpy as np
 
 # project dependencies
 from deepface.commons import weight_utils
-from deepface.models.Detector import Detector, FacialAreaRegion
+from deepface.models.Detector import Detector, DetectedFaces, FacialAreaRegion, LANDMARKS
 from deepface.commons.logger import Logger
 
 logger = Logger()
@@ -67,11 +67,21 @@ class YuNetClient(Detector):
         Returns:
             results (List[FacialAreaRegion]): A list of FacialAreaRegion objects
         """
+        return self.detect_faces_array(img).to_regions()
+
+    def detect_faces_array(self, img: np.ndarray) -> DetectedFaces:
+        """
+        Detect faces with yunet as arrays
+
+        Args:
+            img (np.ndarray): pre-loaded image as numpy array
+
+        Returns:
+            results (DetectedFaces): boxes, scores and landmarks of detected faces
+        """
         # FaceDetector.detect_faces does not support score_threshold parameter.
         # We can set it via environment variable.
         score_threshold = float(os.environ.get("yunet_score_threshold", "0.9"))
-        resp = []
-        faces = []
         height, width = img.shape[0], img.shape[1]
         # resize image if it is too large (Yunet fails to detect faces on large input sometimes)
         # I picked 640 as a threshold because it is the default value of max_size in Yunet.
@@ -86,45 +96,31 @@ class YuNetClient(Detector):
         self.model.setScoreThreshold(score_threshold)
         _, faces = self.model.detect(img)
         if faces is None:
-            return resp
-        for face in faces:
-            # pylint: disable=W0105
-            """
-            The detection output faces is a two-dimension array of type CV_32F,
-            whose rows are the detected face instances, columns are the location
-            of a face and 5 facial landmarks.
-            The format of each row is as follows:
-            x1, y1, w, h, x_re, y_re, x_le, y_le, x_nt, y_nt,
-            x_rcm, y_rcm, x_lcm, y_lcm,
-            where x1, y1, w, h are the top-left coordinates, width and height of
-            the face bounding box,
-            {x, y}_{re, le, nt, rcm, lcm} stands for the coordinates of right eye,
-            left eye, nose tip, the right corner and left corner of the mouth respectively.
-            """
-            (x, y, w, h, x_le, y_le, x_re, y_re) = list(map(int, face[:8]))
-
-            # YuNet returns negative coordinates if it thinks part of the detected face
-            # is outside the frame.
-            x = max(x, 0)
-            y = max(y, 0)
-            if resized:
-                x, y, w, h = int(x / r), int(y / r), int(w / r), int(h / r)
-                x_re, y_re, x_le, y_le = (
-                    int(x_re / r),
-                    int(y_re / r),
-                    int(x_le / r),
-                    int(y_le / r),
-                )
-            confidence = float(face[-1])
-
-            facial_area = FacialAreaRegion(
-                x=x,
-                y=y,
-                w=w,
-                h=h,
-                confidence=confidence,
-                left_eye=(x_re, y_re),
-                right_eye=(x_le, y_le),
-            )
-            resp.append(facial_area)
-        return resp
+            return DetectedFaces.empty()
+
+        # pylint: disable=W0105
+        """
+        The detection output faces is a two-dimension array of type CV_32F,
+        whose rows are the detected face instances, columns are the location
+        of a face and 5 facial landmarks.
+        The format of each row is as follows:
+        x1, y1, w, h, x_re, y_re, x_le, y_le, x_nt, y_nt,
+        x_rcm, y_rcm, x_lcm, y_lcm,
+        where x1, y1, w, h are the top-left coordinates, width and height of
+        the face bounding box,
+        {x, y}_{re, le, nt, rcm, lcm} stands for the coordinates of right eye,
+        left eye, nose tip, the right corner and left corner of the mouth respectively.
+        """
+        values = np.trunc(faces[:, :8].astype(np.float64))
+
+        # YuNet returns negative coordinates if it thinks part of the detected face
+        # is outside the frame.
+        values[:, :2] = np.maximum(values[:, :2], 0)
+        if resized:
+            values = np.trunc(values / r)
+
+        landmarks = np.full((len(values), len(LANDMARKS), 2), np.nan)
+        landmarks[:, LANDMARKS.index("left_eye")] = values[:, 6:8]
+        landmarks[:, LANDMARKS.index("right_eye")] = values[:, 4:6]
+
+        return DetectedFaces(boxes=values[:, :4], scores=faces[:, -1], landmarks=landmarks)
@@ -51,7 +51,7 @@ class ArcFaceClient(FacialRecognition):
     """
 
     def __init__(self):
-        self.model = load_model()
+        self.model = weight_utils.load_compiled_model(model_name="ArcFace", loader=load_model)
         self.model_name = "ArcFace"
         self.input_shape = (112, 112)
         self.output_shape = 512
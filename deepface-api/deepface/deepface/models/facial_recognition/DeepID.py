@@ -43,7 +43,7 @@ class DeepIdClient(FacialRecognition):
     """
 
     def __init__(self):
-        self.model = load_model()
+        self.model = weight_utils.load_compiled_model(model_name="DeepID", loader=load_model)
         self.model_name = "DeepId"
         self.input_shape = (47, 55)
         self.output_shape = 160
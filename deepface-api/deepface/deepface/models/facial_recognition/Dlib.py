@@ -1,6 +1,3 @@
-# built-in dependencies
-from typing import List
-
 # 3rd party dependencies
 import numpy as np
 
@@ -26,35 +23,32 @@ class DlibClient(FacialRecognition):
         self.input_shape = (150, 150)
         self.output_shape = 128
 
-    def forward(self, img: np.ndarray) -> List[float]:
+    def forward_batch(self, imgs: np.ndarray) -> np.ndarray:
         """
         Find embeddings with Dlib model.
             This model necessitates the override of the forward method
             because it is not a keras model.
         Args:
-            img (np.ndarray): pre-loaded image in BGR
+            imgs (np.ndarray): (N, H, W, 3) batch of pre-loaded images in BGR
         Returns
-            embeddings (list): multi-dimensional vector
+            embeddings (np.ndarray): (N, D) multi-dimensional vectors
         """
         # return self.model.predict(img)[0].tolist()
 
-        # extract_faces returns 4 dimensional images
-        if len(img.shape) == 4:
-            img = img[0]
+        # a single image may come without batch dimension
+        if len(imgs.shape) == 3:
+            imgs = imgs[np.newaxis]
 
         # bgr to rgb
-        img = img[:, :, ::-1]  # bgr to rgb
+        imgs = imgs[:, :, :, ::-1]  # bgr to rgb
 
         # img is in scale of [0, 1] but expected [0, 255]
-        if img.max() <= 1:
-            img = img * 255
-
-        img = img.astype(np.uint8)
+        scales = np.where(imgs.reshape(imgs.shape[0], -1).max(axis=1) <= 1, 255, 1)
+        imgs = (imgs * scales[:, None, None, None]).astype(np.uint8)
 
-        img_representation = self.model.model.compute_face_descriptor(img)
-        img_representation = np.array(img_representation)
-        img_representation = np.expand_dims(img_representation, axis=0)
-        return img_representation[0].tolist()
+        # dlib accepts a list of images to run them in a single batch
+        img_representations = self.model.model.compute_face_descriptor(list(imgs))
+        return np.array([np.array(representation) for representation in img_representations])
 
 
 class DlibResNet:
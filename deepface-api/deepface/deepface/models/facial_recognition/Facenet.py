@@ -56,7 +56,9 @@ class FaceNet128dClient(FacialRecognition):
     """
 
     def __init__(self):
-        self.model = load_facenet128d_model()
+        self.model = weight_utils.load_compiled_model(
+            model_name="Facenet", loader=load_facenet128d_model
+        )
         self.model_name = "FaceNet-128d"
         self.input_shape = (160, 160)
         self.output_shape = 128
@@ -68,7 +70,9 @@ class FaceNet512dClient(FacialRecognition):
     """
 
     def __init__(self):
-        self.model = load_facenet512d_model()
+        self.model = weight_utils.load_compiled_model(
+            model_name="Facenet512", loader=load_facenet512d_model
+        )
         self.model_name = "FaceNet-512d"
         self.input_shape = (160, 160)
         self.output_shape = 512
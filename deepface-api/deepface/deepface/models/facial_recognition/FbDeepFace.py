@@ -47,7 +47,7 @@ class DeepFaceClient(FacialRecognition):
                 f" after tf 2.12 but you have {tf_major}.{tf_minor}. You need to downgrade your tf."
             )
 
-        self.model = load_model()
+        self.model = weight_utils.load_compiled_model(model_name="DeepFace", loader=load_model)
         self.model_name = "DeepFace"
         self.input_shape = (152, 152)
         self.output_shape = 4096
@@ -64,7 +64,9 @@ class GhostFaceNetClient(FacialRecognition):
         self.model_name = "GhostFaceNet"
         self.input_shape = (112, 112)
         self.output_shape = 512
-        self.model = load_model()
+        self.model = weight_utils.load_compiled_model(
+            model_name="GhostFaceNet", loader=load_model
+        )
 
 
 def load_model():
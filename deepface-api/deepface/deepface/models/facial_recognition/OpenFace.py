@@ -35,7 +35,7 @@ class OpenFaceClient(FacialRecognition):
     """
 
     def __init__(self):
-        self.model = load_model()
+        self.model = weight_utils.load_compiled_model(model_name="OpenFace", loader=load_model)
         self.model_name = "OpenFace"
         self.input_shape = (96, 96)
         self.output_shape = 128
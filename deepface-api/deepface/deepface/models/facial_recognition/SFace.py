@@ -1,5 +1,5 @@
 # built-in dependencies
-from typing import Any, List
+from typing import Any
 
 # 3rd party dependencies
 import numpy as np
@@ -27,24 +27,25 @@ class SFaceClient(FacialRecognition):
         self.input_shape = (112, 112)
         self.output_shape = 128
 
-    def forward(self, img: np.ndarray) -> List[float]:
+    def forward_batch(self, imgs: np.ndarray) -> np.ndarray:
         """
         Find embeddings with SFace model
             This model necessitates the override of the forward method
             because it is not a keras model.
         Args:
-            img (np.ndarray): pre-loaded image in BGR
+            imgs (np.ndarray): (N, H, W, 3) batch of pre-loaded images in BGR
         Returns
-            embeddings (list): multi-dimensional vector
+            embeddings (np.ndarray): (N, D) multi-dimensional vectors
         """
         # return self.model.predict(img)[0].tolist()
 
-        # revert the image to original format and preprocess using the model
-        input_blob = (img[0] * 255).astype(np.uint8)
+        # revert the images to original format and preprocess using the model
+        input_blobs = (imgs * 255).astype(np.uint8)
 
-        embeddings = self.model.model.feature(input_blob)
+        # opencv FaceRecognizerSF gets a single aligned face in each call
+        embeddings = [self.model.model.feature(input_blob)[0] for input_blob in input_blobs]
 
-        return embeddings[0].tolist()
+        return np.array(embeddings)
 
 
 def load_model(
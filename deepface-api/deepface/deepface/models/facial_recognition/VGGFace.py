@@ -1,6 +1,3 @@
-# built-in dependencies
-from typing import List
-
 # 3rd party dependencies
 import numpy as np
 
@@ -49,30 +46,29 @@ class VggFaceClient(FacialRecognition):
     """
 
     def __init__(self):
-        self.model = load_model()
+        self.model = weight_utils.load_compiled_model(model_name="VGG-Face", loader=load_model)
         self.model_name = "VGG-Face"
         self.input_shape = (224, 224)
         self.output_shape = 4096
 
-    def forward(self, img: np.ndarray) -> List[float]:
+    def forward_batch(self, imgs: np.ndarray) -> np.ndarray:
         """
         Generates embeddings using the VGG-Face model.
             This method incorporates an additional normalization layer,
             necessitating the override of the forward method.
 
         Args:
-            img (np.ndarray): pre-loaded image in BGR
+            imgs (np.ndarray): (N, H, W, 3) batch of pre-loaded images in BGR
         Returns
-            embeddings (list): multi-dimensional vector
+            embeddings (np.ndarray): (N, D) multi-dimensional vectors
         """
         # model.predict causes memory issue when it is called in a for loop
         # embedding = model.predict(img, verbose=0)[0].tolist()
 
         # having normalization layer in descriptor troubles for some gpu users (e.g. issue 957, 966)
         # instead we are now calculating it with traditional way not with keras backend
-        embedding = self.model(img, training=False).numpy()[0].tolist()
-        embedding = verification.l2_normalize(embedding)
-        return embedding.tolist()
+        embeddings = self.find_graph_function()(imgs)
+        return verification.l2_normalize(embeddings, axis=1)
 
 
 def base_model() -> Sequential:
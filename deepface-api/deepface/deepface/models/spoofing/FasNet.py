@@ -1,5 +1,7 @@
 # built-in dependencies
-from typing import Union
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Union
 
 # 3rd party dependencies
 import cv2
@@ -35,6 +37,11 @@ class Fasnet:
         device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
         self.device = device
 
+        # number of threads used by torch in an operation, all cores by default
+        num_threads = os.getenv("DEEPFACE_TORCH_THREADS")
+        if num_threads is not None:
+            torch.set_num_threads(int(num_threads))
+
         # download pre-trained models if not installed yet
         first_model_weight_file = weight_utils.download_weights_if_necessary(
             file_name="2.7_80x80_MiniFASNetV2.pth",
@@ -94,6 +101,11 @@ class Fasnet:
         self.first_model = first_model
         self.second_model = second_model
 
+        # models may run at the same time in different threads, torch releases the gil
+        self.executor = None
+        if os.getenv("DEEPFACE_SPOOFING_CONCURRENCY", "0") == "1":
+            self.executor = ThreadPoolExecutor(max_workers=2)
+
     def analyze(self, img: np.ndarray, facial_area: Union[list, tuple]):
         """
         Analyze a given image spoofed or not
@@ -103,85 +115,68 @@ class Fasnet:
         Returns:
             result (tuple): a result tuple consisting of is_real and score
         """
-        import torch
-        import torch.nn.functional as F
+        return self.analyze_batch(img=img, facial_areas=[facial_area])[0]
 
-        x, y, w, h = facial_area
-        first_img = crop(img, (x, y, w, h), 2.7, 80, 80)
-        second_img = crop(img, (x, y, w, h), 4, 80, 80)
+    def analyze_batch(
+        self, img: np.ndarray, facial_areas: List[Union[list, tuple]]
+    ) -> List[Tuple[bool, float]]:
+        """
+        Analyze all faces of a given image spoofed or not. Faces are cropped in both scales
+            and each model runs once for all faces.
+        Args:
+            img (np.ndarray): pre loaded image
+            facial_areas (list): facial rectangle area coordinates with x, y, w, h respectively
+        Returns:
+            results (list): a result tuple consisting of is_real and score for each face
+        """
+        if len(facial_areas) == 0:
+            return []
 
-        test_transform = Compose(
-            [
-                ToTensor(),
-            ]
+        first_imgs = self.__to_tensor(
+            [crop(img, tuple(facial_area), 2.7, 80, 80) for facial_area in facial_areas]
+        )
+        second_imgs = self.__to_tensor(
+            [crop(img, tuple(facial_area), 4, 80, 80) for facial_area in facial_areas]
         )
 
-        first_img = test_transform(first_img)
-        first_img = first_img.unsqueeze(0).to(self.device)
+        if self.executor is None:
+            first_result = self.__predict(self.first_model, first_imgs)
+            second_result = self.__predict(self.second_model, second_imgs)
+        else:
+            first_future = self.executor.submit(self.__predict, self.first_model, first_imgs)
+            second_result = self.__predict(self.second_model, second_imgs)
+            first_result = first_future.result()
 
-        second_img = test_transform(second_img)
-        second_img = second_img.unsqueeze(0).to(self.device)
+        prediction = first_result + second_result
+        labels = np.argmax(prediction, axis=1)
+        scores = prediction[np.arange(len(labels)), labels] / 2
 
-        with torch.no_grad():
-            first_result = self.first_model.forward(first_img)
-            first_result = F.softmax(first_result).cpu().numpy()
+        return [(bool(label == 1), float(score)) for label, score in zip(labels, scores)]
 
-            second_result = self.second_model.forward(second_img)
-            second_result = F.softmax(second_result).cpu().numpy()
+    def __to_tensor(self, imgs: List[np.ndarray]):
+        """
+        Stack images into a float tensor in (N, C, H, W) shape on the device
+        """
+        import torch
 
-        prediction = np.zeros((1, 3))
-        prediction += first_result
-        prediction += second_result
+        batch = np.stack(imgs).transpose((0, 3, 1, 2))
+        return torch.from_numpy(np.ascontiguousarray(batch)).float().to(self.device)
 
-        label = np.argmax(prediction)
-        is_real = True if label == 1 else False  # pylint: disable=simplifiable-if-expression
-        score = prediction[0][label] / 2
+    @staticmethod
+    def __predict(model, imgs) -> np.ndarray:
+        """
+        Find class probabilities of a batch with a model
+        """
+        import torch
+        import torch.nn.functional as F
 
-        return is_real, score
+        with torch.inference_mode():
+            return F.softmax(model.forward(imgs), dim=1).cpu().numpy()
 
 
 # subsdiary classes and functions
 
 
-def to_tensor(pic):
-    """Convert a ``numpy.ndarray`` to tensor.
-
-    See ``ToTensor`` for more details.
-
-    Args:
-        pic (PIL Image or numpy.ndarray): Image to be converted to tensor.
-
-    Returns:
-        Tensor: Converted image.
-    """
-    import torch
-
-    # handle numpy array
-    # IR image channel=1: modify by lzc --> 20190730
-    if pic.ndim == 2:
-        pic = pic.reshape((pic.shape[0], pic.shape[1], 1))
-
-    img = torch.from_numpy(pic.transpose((2, 0, 1)))
-    # backward compatibility
-    # return img.float().div(255)  modify by zkx
-    return img.float()
-
-
-class Compose:
-    def __init__(self, transforms):
-        self.transforms = transforms
-
-    def __call__(self, img):
-        for t in self.transforms:
-            img = t(img)
-        return img
-
-
-class ToTensor:
-    def __call__(self, pic):
-        return to_tensor(pic)
-
-
 def _get_new_box(src_w, src_h, bbox, scale):
     x = bbox[0]
     y = bbox[1]
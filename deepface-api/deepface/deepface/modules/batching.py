@@ -0,0 +1,153 @@
+# built-in dependencies
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Tuple, Union
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# pylint: disable=too-many-instance-attributes
+
+Predictions = Union[np.ndarray, Dict[str, np.ndarray]]
+
+# seconds a worker waits for new calls before it exits
+IDLE_TIMEOUT = 1.0
+
+
+class MicroBatcher:
+    """
+    Collects the calls of a batch function coming from concurrent threads for a short time,
+        runs the function once for all of their inputs, and returns each caller its own part
+        of the outputs. So, concurrent requests share a single forward pass of a model.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[np.ndarray], Predictions],
+        name: str,
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+    ):
+        """
+        Args:
+            func (callable): function finding (N, ...) outputs or a dict of them
+                for (N, ...) inputs
+            name (str): name of the batched function in logs
+            max_batch_size (int): maximum number of inputs in a batch. A call having more
+                inputs is run alone (default is 32)
+            max_wait (float): seconds to wait for other calls after the first one
+                (default is 0.005)
+        """
+        if not isinstance(max_batch_size, int) or max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive integer")
+        if max_wait < 0:
+            raise ValueError("max_wait must be a non-negative number")
+
+        self.func = func
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self.pending: Deque[Tuple[np.ndarray, Future, float]] = deque()
+        self.condition = threading.Condition()
+        self.worker = None
+        # calls were coming at the same time recently
+        self.concurrent = True
+
+        self.requests = 0
+        self.batches = 0
+        self.items = 0
+
+    def __call__(self, imgs: np.ndarray) -> Predictions:
+        future: Future = Future()
+        with self.condition:
+            self.pending.append((imgs, future, time.perf_counter()))
+            # worker exits when it is idle, and it is started again on demand
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.__run, daemon=True)
+                self.worker.start()
+            self.condition.notify()
+        return future.result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Find how many calls are merged into batches
+        Returns:
+            stats (dict):
+                - requests (int): number of calls
+                - batches (int): number of function runs
+                - mean_batch_size (float): mean number of inputs in a batch
+                - mean_fill (float): mean batch size over max batch size
+        """
+        with self.condition:
+            mean_batch_size = self.items / self.batches if self.batches > 0 else 0.0
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "mean_batch_size": mean_batch_size,
+                "mean_fill": mean_batch_size / self.max_batch_size,
+            }
+
+    def __run(self) -> None:
+        while True:
+            with self.condition:
+                if not self.pending:
+                    self.condition.wait(timeout=IDLE_TIMEOUT)
+                    if not self.pending:
+                        self.worker = None
+                        return
+
+                # wait for other calls until the batch is full or the first call waits enough,
+                # a single caller does not wait if the previous call was not concurrent either
+                deadline = self.pending[0][2] + self.max_wait
+                while self.concurrent and self.__count_pending() < self.max_batch_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(timeout=remaining)
+
+                calls = [self.pending.popleft()]
+                size = len(calls[0][0])
+                while self.pending and size + len(self.pending[0][0]) <= self.max_batch_size:
+                    size += len(self.pending[0][0])
+                    calls.append(self.pending.popleft())
+
+                self.concurrent = len(calls) > 1 or len(self.pending) > 0
+                self.requests += len(calls)
+                self.batches += 1
+                self.items += size
+
+            self.__process(calls)
+
+    def __count_pending(self) -> int:
+        return sum(len(imgs) for imgs, _, _ in self.pending)
+
+    def __process(self, calls: List[Tuple[np.ndarray, Future, float]]) -> None:
+        try:
+            if len(calls) == 1:
+                predictions = self.func(calls[0][0])
+            else:
+                predictions = self.func(np.concatenate([imgs for imgs, _, _ in calls], axis=0))
+        except Exception as err:  # pylint: disable=broad-except
+            for _, future, _ in calls:
+                future.set_exception(err)
+            return
+
+        if len(calls) > 1:
+            logger.debug(f"{len(calls)} calls of {self.name} are run in a single batch")
+
+        offset = 0
+        for imgs, future, _ in calls:
+            part = slice(offset, offset + len(imgs))
+            if isinstance(predictions, dict):
+                future.set_result({key: value[part] for key, value in predictions.items()})
+            else:
+                future.set_result(predictions[part])
+            offset += len(imgs)
@@ -0,0 +1,238 @@
+# built-in dependencies
+import os
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface import __version__
+from deepface.commons import image_utils
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# cache key to pickled result in least recently used order
+cached_results: "OrderedDict[str, bytes]" = OrderedDict()
+cache_lock = threading.Lock()
+
+# memory_budget in bytes and path of the persisted results, empty if cache is disabled
+cache_config: Dict[str, Any] = {}
+
+cache_stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "memory": 0}
+
+
+def enable_cache(memory_budget: Optional[float] = None, path: Optional[str] = None) -> None:
+    """
+    Cache the results of represent, verify and analyze with the content hash of their images
+        and their parameters. So, re-submitted images are served without any model work.
+    Args:
+        memory_budget (float): megabytes of results kept in memory, least recently used ones
+            are evicted beyond it. 0 disables the cache (default is None for
+            DEEPFACE_RESULT_CACHE_MEMORY environment variable or 64)
+        path (str): folder to persist the results into, they are read back after a restart.
+            Empty string keeps results in memory only (default is None for
+            DEEPFACE_RESULT_CACHE_PATH environment variable or memory only)
+    """
+    if memory_budget is None:
+        memory_budget = float(os.getenv("DEEPFACE_RESULT_CACHE_MEMORY", "64"))
+    if path is None:
+        path = os.getenv("DEEPFACE_RESULT_CACHE_PATH", "")
+    if memory_budget < 0:
+        raise ValueError(f"memory_budget must be a non-negative number, but it is {memory_budget}")
+
+    if memory_budget == 0:
+        disable_cache()
+        return
+
+    if path:
+        os.makedirs(path, exist_ok=True)
+
+    with cache_lock:
+        cache_config["memory_budget"] = int(memory_budget * 1024 * 1024)
+        cache_config["path"] = path or None
+        __evict()
+
+    logger.info(
+        f"Results are cached in {memory_budget:g} MB of memory"
+        + (f" and persisted into {path}" if path else "")
+    )
+
+
+def disable_cache() -> None:
+    """
+    Stop caching results and drop the ones in memory, persisted results are kept
+    """
+    with cache_lock:
+        cache_config.clear()
+        cached_results.clear()
+        cache_stats["memory"] = 0
+
+
+def clear_cache() -> None:
+    """
+    Drop the cached results in memory and on disk
+    """
+    with cache_lock:
+        cached_results.clear()
+        cache_stats["memory"] = 0
+        path = cache_config.get("path")
+        if path is not None:
+            for file_name in os.listdir(path):
+                if file_name.endswith(".pkl"):
+                    os.remove(os.path.join(path, file_name))
+
+
+def get_stats() -> Dict[str, Any]:
+    """
+    Find how many results are served from the cache
+    Returns:
+        stats (dict):
+            - enabled (bool): results are cached
+            - entries (int): number of results in memory
+            - memory (int): size of the results in memory in bytes
+            - memory_budget (int): maximum size of the results in memory in bytes
+            - hits (int): number of results served from memory
+            - disk_hits (int): number of results read back from disk
+            - misses (int): number of results computed
+            - evictions (int): number of results dropped from memory
+    """
+    with cache_lock:
+        return {
+            "enabled": bool(cache_config),
+            "entries": len(cached_results),
+            "memory_budget": cache_config.get("memory_budget", 0),
+            **cache_stats,
+        }
+
+
+def find_key(task: str, img: Union[str, np.ndarray], **params: Any) -> Optional[str]:
+    """
+    Find the cache key of a result with the content of its image and its parameters
+    Args:
+        task (str): function finding the result, e.g. represent
+        img (str or np.ndarray): exact image path, base64 encoded image or numpy array
+        params: parameters changing the result
+    Returns:
+        key (str): None if cache is disabled or image is a url whose content may change
+    """
+    if not cache_config:
+        return None
+    if isinstance(img, Path):
+        img = str(img)
+    if not isinstance(img, (str, np.ndarray)):
+        return None
+    if isinstance(img, str) and img.lower().startswith(("http://", "https://")):
+        return None
+
+    hasher = hashlib.sha1()
+    # results of different versions may differ
+    hasher.update(f"{__version__}-{task}-{image_utils.find_content_hash(img)}".encode("utf-8"))
+    for name, value in sorted(params.items()):
+        hasher.update(f"-{name}={value!r}".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def get(key: Optional[str]) -> Optional[Any]:
+    """
+    Find a cached result
+    Args:
+        key (str): key of the result from find_key
+    Returns:
+        result (Any): a new copy of the result, None if it is not cached
+    """
+    if key is None:
+        return None
+
+    with cache_lock:
+        data = cached_results.get(key)
+        if data is not None:
+            cached_results.move_to_end(key)
+            cache_stats["hits"] += 1
+            return pickle.loads(data)
+        path = cache_config.get("path")
+
+    data = __read(path, key) if path is not None else None
+
+    with cache_lock:
+        if data is None:
+            cache_stats["misses"] += 1
+            return None
+        cache_stats["disk_hits"] += 1
+        __store(key, data)
+
+    return pickle.loads(data)
+
+
+def put(key: Optional[str], result: Any) -> None:
+    """
+    Cache a result
+    Args:
+        key (str): key of the result from find_key, result is not cached if it is None
+        result (Any): picklable result
+    """
+    if key is None:
+        return
+
+    data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    with cache_lock:
+        if not cache_config:
+            return
+        __store(key, data)
+        path = cache_config.get("path")
+
+    if path is not None:
+        __write(path, key, data)
+
+
+def __store(key: str, data: bytes) -> None:
+    """
+    Keep a pickled result in memory. Cache lock must be held.
+    """
+    if not cache_config:
+        return
+    previous = cached_results.pop(key, None)
+    if previous is not None:
+        cache_stats["memory"] -= len(previous)
+    cached_results[key] = data
+    cache_stats["memory"] += len(data)
+    __evict()
+
+
+def __evict() -> None:
+    """
+    Drop the least recently used results beyond the memory budget. Cache lock must be held.
+    """
+    while cached_results and cache_stats["memory"] > cache_config["memory_budget"]:
+        _, data = cached_results.popitem(last=False)
+        cache_stats["memory"] -= len(data)
+        cache_stats["evictions"] += 1
+
+
+def __read(path: str, key: str) -> Optional[bytes]:
+    file_path = os.path.join(path, f"{key}.pkl")
+    try:
+        with open(file_path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as err:
+        logger.warn(f"cached result cannot be read from {file_path}: {err}")
+        return None
+
+
+def __write(path: str, key: str, data: bytes) -> None:
+    file_path = os.path.join(path, f"{key}.pkl")
+    # write into a temporary file first to not leave a broken result if interrupted
+    temp_path = f"{file_path}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, file_path)
+    except OSError as err:
+        logger.warn(f"result cannot be cached into {file_path}: {err}")
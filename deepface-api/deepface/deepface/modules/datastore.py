@@ -0,0 +1,411 @@
+# built-in dependencies
+import os
+import json
+import pickle
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.modules.search import EmbeddingMatrix, IVFIndex
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# pylint: disable=too-many-instance-attributes
+
+# metadata stored for each item in addition to its embedding
+METADATA_KEYS = ["identity", "hash", "target_x", "target_y", "target_w", "target_h"]
+
+# stores are kept in memory and synchronized with the tail of their metadata files
+cached_stores: Dict[str, "EmbeddingStore"] = {}
+
+
+def load(datastore_path: str) -> "EmbeddingStore":
+    """
+    Load the embedding store of a facial database in a singleton way
+    Args:
+        datastore_path (str): exact path of the datastore without extension
+    Returns:
+        store (EmbeddingStore)
+    """
+    store = cached_stores.get(datastore_path)
+    if store is None:
+        store = EmbeddingStore(datastore_path)
+        cached_stores[datastore_path] = store
+    else:
+        store.refresh()
+    return store
+
+
+class EmbeddingStore:
+    """
+    Append-only datastore of a facial database.
+        Embeddings are stored in a float32 matrix file which is memory-mapped instead of
+        deserialized, and their metadata (identity, hash, facial area) in a json lines sidecar.
+        New items are appended to the end of both files and removed items are marked with
+        tombstones, so that neither adding nor removing rewrites the whole datastore.
+    """
+
+    def __init__(self, datastore_path: str):
+        """
+        Args:
+            datastore_path (str): exact path of the datastore without extension
+        """
+        self.datastore_path = datastore_path
+        self.metadata_path = f"{datastore_path}.jsonl"
+        self.__reset()
+        self.refresh()
+
+    def __reset(self):
+        self.dims = 0
+        self.matrix_name: Optional[str] = None
+        # every added item with its row in the matrix file (None if it has no face)
+        self.items: List[Dict[str, Any]] = []
+        # indices of alive items for each identity
+        self.alive: Dict[str, List[int]] = {}
+        self.tombstones = 0
+        # rows in the matrix file referred by the items
+        self.rows = 0
+        self.metadata_offset = 0
+        self.metadata_inode: Optional[int] = None
+        self.embeddings = np.zeros((0, 0), dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)
+        # embedding matrix and metadata of its rows are built together once after each change
+        self.embedding_matrix: Optional[EmbeddingMatrix] = None
+        self.row_metadata: List[Optional[Dict[str, Any]]] = []
+        self.ivf_index: Optional[IVFIndex] = None
+
+    def __len__(self) -> int:
+        return sum(len(indices) for indices in self.alive.values())
+
+    @property
+    def version(self) -> Tuple[Optional[int], int]:
+        """
+        Returns:
+            version (tuple): changes whenever an item is added or removed
+        """
+        return (self.metadata_inode, self.metadata_offset)
+
+    @property
+    def matrix_path(self) -> Optional[str]:
+        if self.matrix_name is None:
+            return None
+        return os.path.join(os.path.dirname(self.datastore_path), self.matrix_name)
+
+    def refresh(self) -> None:
+        """
+        Synchronize the store with its files. Just the appended tail of the metadata file
+            is read if it is not compacted by another process in the meantime.
+        """
+        if not os.path.exists(self.metadata_path):
+            if self.metadata_inode is not None:
+                self.__reset()
+            return
+
+        file_stats = os.stat(self.metadata_path)
+        if file_stats.st_ino != self.metadata_inode or file_stats.st_size < self.metadata_offset:
+            self.__reset()
+            self.metadata_inode = file_stats.st_ino
+
+        if file_stats.st_size == self.metadata_offset:
+            return
+
+        with open(self.metadata_path, "rb") as f:
+            f.seek(self.metadata_offset)
+            tail = f.read()
+
+        # a partially written last line will be read in the next refresh
+        complete_size = tail.rfind(b"\n") + 1
+        for line in tail[:complete_size].splitlines():
+            if line.strip():
+                self.__apply(json.loads(line))
+        self.metadata_offset += complete_size
+
+        self.__map_embeddings()
+
+    def __apply(self, record: Dict[str, Any]) -> None:
+        operation = record["op"]
+        if operation == "init":
+            self.matrix_name = record["matrix"]
+        elif operation == "dims":
+            self.dims = record["dims"]
+        elif operation == "add":
+            self.alive.setdefault(record["identity"], []).append(len(self.items))
+            self.items.append(record)
+            if record["row"] is not None:
+                self.rows = max(self.rows, record["row"] + 1)
+        elif operation == "delete":
+            indices = self.alive.pop(record["identity"], [])
+            self.tombstones += len(indices)
+        else:
+            raise ValueError(f"unimplemented operation {operation} in {self.metadata_path}")
+
+    def __map_embeddings(self) -> None:
+        self.embedding_matrix = None
+
+        if self.dims == 0 or self.matrix_path is None or not os.path.exists(self.matrix_path):
+            return
+
+        # rows written without metadata (e.g. interrupted append) are ignored
+        rows = self.rows
+        if rows == 0:
+            return
+
+        self.embeddings = np.memmap(
+            self.matrix_path, dtype=np.float32, mode="r", shape=(rows, self.dims)
+        )
+
+        # norms of new rows are calculated once
+        known_rows = self.norms.shape[0]
+        if known_rows < rows:
+            self.norms = np.concatenate(
+                [self.norms, np.linalg.norm(self.embeddings[known_rows:], axis=1)]
+            )
+
+    def identities(self) -> Set[str]:
+        """
+        Returns:
+            identities (set): identities of the alive items
+        """
+        return set(self.alive.keys())
+
+    def hashes(self) -> Dict[str, str]:
+        """
+        Returns:
+            hashes (dict): hash of each alive identity
+        """
+        return {
+            identity: self.items[indices[0]]["hash"] for identity, indices in self.alive.items()
+        }
+
+    def append(self, representations: List[Dict[str, Any]]) -> None:
+        """
+        Append new items to the end of the store
+        Args:
+            representations (list): items with embedding and metadata keys
+        """
+        if len(representations) == 0:
+            return
+
+        self.refresh()
+
+        records = []
+        matrix_name = self.matrix_name
+        if matrix_name is None:
+            matrix_name = f"{os.path.basename(self.datastore_path)}.0.f32"
+            records.append({"op": "init", "matrix": matrix_name})
+        matrix_path = os.path.join(os.path.dirname(self.datastore_path), matrix_name)
+
+        embeddings = np.asarray(
+            [item["embedding"] for item in representations if item["embedding"] is not None],
+            dtype=np.float32,
+        )
+        if embeddings.shape[0] > 0:
+            if self.dims == 0:
+                records.append({"op": "dims", "dims": embeddings.shape[1]})
+            elif embeddings.shape[1] != self.dims:
+                raise ValueError(
+                    f"Embeddings must have {self.dims} dimensions but they have "
+                    f"{embeddings.shape[1]}. Model structure may change after "
+                    f"{self.datastore_path} created. Delete it and re-run."
+                )
+
+            # embeddings are written before their metadata not to refer a missing row,
+            # rows written without metadata (e.g. interrupted append) are overwritten
+            with open(matrix_path, "ab") as f:
+                f.truncate(self.rows * embeddings.shape[1] * 4)
+                embeddings.tofile(f)
+
+        row = self.rows
+        for item in representations:
+            record = {"op": "add", "row": None}
+            for key in METADATA_KEYS:
+                record[key] = item[key]
+            for key in ["target_x", "target_y", "target_w", "target_h"]:
+                record[key] = int(record[key])
+            if item["embedding"] is not None:
+                record["row"] = row
+                row += 1
+            records.append(record)
+
+        self.__write_records(records)
+        self.refresh()
+
+    def remove(self, identities: Set[str]) -> None:
+        """
+        Mark all items of some identities as removed
+        Args:
+            identities (set): identities to be removed
+        """
+        self.refresh()
+        records = [
+            {"op": "delete", "identity": identity}
+            for identity in identities
+            if identity in self.alive
+        ]
+        if len(records) == 0:
+            return
+        self.__write_records(records)
+        self.refresh()
+
+    def find_embedding_matrix(self) -> Tuple[EmbeddingMatrix, List[Dict[str, Any]]]:
+        """
+        Find the embedding matrix of the alive items. The memory-mapped matrix file is
+            used as it is, removed rows are just excluded from the search.
+        Returns:
+            embedding_matrix (EmbeddingMatrix): matrix of all rows in the matrix file.
+                Items without a face have no rows, so it has no rows at all if none of
+                the items has a face.
+            row_metadata (list): metadata of each row of the matrix.
+                It is None for removed rows. It is shared between calls, so it must not
+                be modified.
+        """
+        if self.embedding_matrix is None:
+            self.row_metadata = [None] * self.embeddings.shape[0]
+            for indices in self.alive.values():
+                for index in indices:
+                    item = self.items[index]
+                    if item["row"] is not None:
+                        self.row_metadata[item["row"]] = {key: item[key] for key in METADATA_KEYS}
+
+            valid = np.array([metadata is not None for metadata in self.row_metadata], dtype=bool)
+            self.embedding_matrix = EmbeddingMatrix(
+                embeddings=self.embeddings, valid=valid, norms=self.norms
+            )
+
+        return self.embedding_matrix, self.row_metadata
+
+    def find_ivf_index(self) -> IVFIndex:
+        """
+        Find the approximate nearest neighbour index of the store. It is persisted next to
+            the store, rows appended after it is built are assigned to its lists, and it is
+            re-trained once the store doubles or compacted.
+        Returns:
+            index (IVFIndex)
+        """
+        embedding_matrix, _ = self.find_embedding_matrix()
+        index_path = f"{self.datastore_path}.ivf.npz"
+
+        if self.ivf_index is None and os.path.exists(index_path):
+            with np.load(index_path) as index_file:
+                if str(index_file["matrix"]) == self.matrix_name and (
+                    index_file["centroids"].shape[1] == self.dims
+                ):
+                    self.ivf_index = IVFIndex(
+                        embedding_matrix=embedding_matrix,
+                        centroids=index_file["centroids"],
+                        assignments=index_file["assignments"],
+                        trained_rows=int(index_file["trained_rows"]),
+                    )
+
+        if (
+            self.ivf_index is None
+            or len(self.ivf_index) > len(embedding_matrix)
+            or len(embedding_matrix) > 2 * max(self.ivf_index.trained_rows, 1)
+        ):
+            self.ivf_index = IVFIndex.build(embedding_matrix)
+        elif not self.ivf_index.update(embedding_matrix):
+            return self.ivf_index
+
+        temp_path = f"{index_path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                matrix=np.array(self.matrix_name),
+                centroids=self.ivf_index.centroids,
+                assignments=self.ivf_index.assignments,
+                trained_rows=np.array(self.ivf_index.trained_rows),
+            )
+        os.replace(temp_path, index_path)
+        logger.debug(f"{index_path} is updated for {len(self.ivf_index)} rows")
+        return self.ivf_index
+
+    def find_representations(self) -> List[Dict[str, Any]]:
+        """
+        Find alive items in the legacy representations format. Embeddings are views of the
+            memory-mapped matrix file.
+        Returns:
+            representations (list): items with embedding and metadata keys
+        """
+        representations = []
+        for indices in self.alive.values():
+            for index in indices:
+                item = self.items[index]
+                representation = {key: item[key] for key in METADATA_KEYS}
+                row = item["row"]
+                representation["embedding"] = None if row is None else self.embeddings[row]
+                representations.append(representation)
+        return representations
+
+    def compact(self) -> None:
+        """
+        Rewrite the store with just its alive items if most of the rows are removed.
+            A new matrix file is written first and the metadata file is replaced atomically
+            to point it, so that the store is never left in an inconsistent state.
+        """
+        self.refresh()
+        if self.tombstones == 0 or self.tombstones < len(self):
+            return
+
+        representations = self.find_representations()
+        generation = int(self.matrix_name.split(".")[-2]) + 1 if self.matrix_name else 0
+        matrix_name = f"{os.path.basename(self.datastore_path)}.{generation}.f32"
+        matrix_path = os.path.join(os.path.dirname(self.datastore_path), matrix_name)
+
+        records = [{"op": "init", "matrix": matrix_name}]
+        if self.dims > 0:
+            records.append({"op": "dims", "dims": self.dims})
+
+        row = 0
+        with open(matrix_path, "wb") as f:
+            for representation in representations:
+                record = {"op": "add", "row": None}
+                record.update({key: representation[key] for key in METADATA_KEYS})
+                if representation["embedding"] is not None:
+                    np.asarray(representation["embedding"], dtype=np.float32).tofile(f)
+                    record["row"] = row
+                    row += 1
+                records.append(record)
+
+        old_matrix_path = self.matrix_path
+        temp_path = f"{self.metadata_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+        # release memory-mapped file before replacing it
+        self.__reset()
+        os.replace(temp_path, self.metadata_path)
+        if old_matrix_path is not None and os.path.exists(old_matrix_path):
+            os.remove(old_matrix_path)
+
+        self.refresh()
+        logger.debug(f"{self.datastore_path} compacted to {len(self)} items")
+
+    def migrate(self, pickle_path: str) -> None:
+        """
+        Import the items of a legacy pickle datastore into this store, and remove it.
+        Args:
+            pickle_path (str): exact path of the pickle datastore
+        """
+        with open(pickle_path, "rb") as f:
+            representations = pickle.load(f)
+
+        # check each item of representations list has required keys
+        for i, current_representation in enumerate(representations):
+            missing_keys = set(METADATA_KEYS + ["embedding"]) - set(current_representation.keys())
+            if len(missing_keys) > 0:
+                raise ValueError(
+                    f"{i}-th item does not have some required keys - {missing_keys}."
+                    f"Consider to delete {pickle_path}"
+                )
+
+        self.append(representations)
+        os.remove(pickle_path)
+        logger.info(f"{len(representations)} representations migrated from {pickle_path}")
+
+    def __write_records(self, records: List[Dict[str, Any]]) -> None:
+        with open(self.metadata_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
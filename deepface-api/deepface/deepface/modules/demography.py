@@ -6,8 +6,7 @@ import numpy as np
 from tqdm import tqdm
 
 # project dependencies
-from deepface.modules import modeling, detection, preprocessing
-from deepface.models.demography import Gender, Race, Emotion
+from deepface.modules import modeling, detection, preprocessing, caching
 
 
 def analyze(
@@ -19,6 +18,7 @@ def analyze(
     expand_percentage: int = 0,
     silent: bool = False,
     anti_spoofing: bool = False,
+    batch_size: int = 32,
 ) -> List[Dict[str, Any]]:
     """
     Analyze facial attributes such as age, gender, emotion, and race in the provided image.
@@ -50,6 +50,9 @@ def analyze(
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        batch_size (int): Maximum number of faces fed to a model in a single call. All faces
+            in the image are analyzed together instead of one by one (default is 32).
+
     Returns:
         results (List[Dict[str, Any]]): A list of dictionaries, where each dictionary represents
            the analysis results for a detected face.
@@ -100,113 +103,222 @@ def analyze(
                - 'white': Confidence score for White ethnicity.
     """
 
-    # if actions is passed as tuple with single item, interestingly it becomes str here
-    if isinstance(actions, str):
-        actions = (actions,)
+    actions = __validate_actions(actions=actions, batch_size=batch_size)
 
-    # check if actions is not an iterable or empty.
-    if not hasattr(actions, "__getitem__") or not actions:
-        raise ValueError("`actions` must be a list of strings.")
-
-    actions = list(actions)
+    # same image with same parameters is served from the cache if caching is enabled
+    cache_key = caching.find_key(
+        "analyze",
+        img_path,
+        actions=actions,
+        enforce_detection=enforce_detection,
+        detector_backend=detector_backend,
+        align=align,
+        expand_percentage=expand_percentage,
+        anti_spoofing=anti_spoofing,
+    )
+    cached_objs = caching.get(cache_key)
+    if cached_objs is not None:
+        return cached_objs
 
-    # For each action, check if it is valid
-    for action in actions:
-        if action not in ("emotion", "age", "gender", "race"):
-            raise ValueError(
-                f"Invalid action passed ({repr(action)})). "
-                "Valid actions are `emotion`, `age`, `gender`, `race`."
-            )
     # ---------------------------------
-    resp_objects = []
-
+    # faces are kept in uint8 bgr to preprocess them in a single pass
     img_objs = detection.extract_faces(
         img_path=img_path,
         detector_backend=detector_backend,
         enforce_detection=enforce_detection,
         grayscale=False,
+        color_face="bgr",
+        normalize_face=False,
         align=align,
         expand_percentage=expand_percentage,
         anti_spoofing=anti_spoofing,
     )
 
+    regions = []
+    confidences = []
+    img_contents = []
     for img_obj in img_objs:
         if anti_spoofing is True and img_obj.get("is_real", True) is False:
             raise ValueError("Spoof detected in the given image.")
 
         img_content = img_obj["face"]
-        img_region = img_obj["facial_area"]
-        img_confidence = img_obj["confidence"]
         if img_content.shape[0] == 0 or img_content.shape[1] == 0:
             continue
 
-        # rgb to bgr
-        img_content = img_content[:, :, ::-1]
-
-        # resize input image
-        img_content = preprocessing.resize_image(img=img_content, target_size=(224, 224))
-
-        obj = {}
-        # facial attribute analysis
-        pbar = tqdm(
-            range(0, len(actions)),
-            desc="Finding actions",
-            disable=silent if len(actions) > 1 else True,
-        )
-        for index in pbar:
-            action = actions[index]
-            pbar.set_description(f"Action: {action}")
-
-            if action == "emotion":
-                emotion_predictions = modeling.build_model(
-                    task="facial_attribute", model_name="Emotion"
-                ).predict(img_content)
-                sum_of_predictions = emotion_predictions.sum()
-
-                obj["emotion"] = {}
-                for i, emotion_label in enumerate(Emotion.labels):
-                    emotion_prediction = 100 * emotion_predictions[i] / sum_of_predictions
-                    obj["emotion"][emotion_label] = emotion_prediction
-
-                obj["dominant_emotion"] = Emotion.labels[np.argmax(emotion_predictions)]
-
-            elif action == "age":
-                apparent_age = modeling.build_model(
-                    task="facial_attribute", model_name="Age"
-                ).predict(img_content)
+        img_contents.append(img_content)
+        regions.append(img_obj["facial_area"])
+        confidences.append(img_obj["confidence"])
+
+    if len(img_contents) == 0:
+        caching.put(cache_key, [])
+        return []
+
+    resp_objects = __analyze_faces(
+        faces=img_contents, actions=actions, silent=silent, batch_size=batch_size
+    )
+    for obj, img_region, img_confidence in zip(resp_objects, regions, confidences):
+        # mention facial areas
+        obj["region"] = img_region
+        # include image confidence
+        obj["face_confidence"] = img_confidence
+
+    caching.put(cache_key, resp_objects)
+
+    return resp_objects
+
+
+def analyze_faces(
+    faces: List[np.ndarray],
+    actions: Union[tuple, list] = ("emotion", "age", "gender", "race"),
+    silent: bool = False,
+    batch_size: int = 32,
+) -> List[Dict[str, Any]]:
+    """
+    Analyze facial attributes of faces extracted before, e.g. the faces tracked in a
+        stream. All faces are analyzed together, so each action costs one model call per
+        batch instead of one call per face.
+
+    Args:
+        faces (List[np.ndarray]): facial images in BGR, as uint8 crops or as extract_faces
+            returns them with color_face="bgr" and normalize_face=False.
+
+        actions (tuple): Attributes to analyze. The default is ('age', 'gender', 'emotion', 'race').
+
+        silent (boolean): Suppress or allow some log messages for a quieter analysis process
+            (default is False).
+
+        batch_size (int): Maximum number of faces fed to a model in a single call (default is 32).
+
+    Returns:
+        results (List[Dict[str, Any]]): analysis results of each face in the same order, with
+            the keys of analyze results except region and face_confidence.
+    """
+    actions = __validate_actions(actions=actions, batch_size=batch_size)
+    if len(faces) == 0:
+        return []
+    return __analyze_faces(faces=faces, actions=actions, silent=silent, batch_size=batch_size)
+
+
+def __analyze_faces(
+    faces: List[np.ndarray], actions: List[str], silent: bool, batch_size: int
+) -> List[Dict[str, Any]]:
+    # age, gender and race share their backbone, so they are found in a single forward pass
+    shared_actions = [action for action in actions if action in ("age", "gender", "race")]
+    shared = len(shared_actions) > 1
+
+    # all faces are resized into a single batch, so each action costs one model call per batch
+    imgs = preprocessing.prepare_faces(faces=faces, target_size=(224, 224), color_face="bgr")
+    resp_objects: List[Dict[str, Any]] = [{} for _ in faces]
+
+    shared_predictions = (
+        __predict_batch(model_name="Age-Gender-Race", imgs=imgs, batch_size=batch_size)
+        if shared
+        else None
+    )
+
+    # model modules importing tensorflow are imported lazily, when they are needed
+    from deepface.models.demography import Gender, Race, Emotion
+
+    # facial attribute analysis
+    pbar = tqdm(
+        range(0, len(actions)),
+        desc="Finding actions",
+        disable=silent if len(actions) > 1 else True,
+    )
+    for index in pbar:
+        action = actions[index]
+        pbar.set_description(f"Action: {action}")
+
+        if action == "emotion":
+            emotion_predictions = __predict_batch(
+                model_name="Emotion", imgs=imgs, batch_size=batch_size
+            )
+            sum_of_predictions = emotion_predictions.sum(axis=1, keepdims=True)
+            emotion_predictions = 100 * emotion_predictions / sum_of_predictions
+
+            for obj, predictions in zip(resp_objects, emotion_predictions):
+                obj["emotion"] = dict(zip(Emotion.labels, predictions))
+                obj["dominant_emotion"] = Emotion.labels[np.argmax(predictions)]
+
+        elif action == "age":
+            apparent_ages = (
+                shared_predictions["Age"]
+                if shared_predictions is not None
+                else __predict_batch(model_name="Age", imgs=imgs, batch_size=batch_size)
+            )
+            for obj, apparent_age in zip(resp_objects, apparent_ages):
                 # int cast is for exception - object of type 'float32' is not JSON serializable
                 obj["age"] = int(apparent_age)
 
-            elif action == "gender":
-                gender_predictions = modeling.build_model(
-                    task="facial_attribute", model_name="Gender"
-                ).predict(img_content)
-                obj["gender"] = {}
-                for i, gender_label in enumerate(Gender.labels):
-                    gender_prediction = 100 * gender_predictions[i]
-                    obj["gender"][gender_label] = gender_prediction
+        elif action == "gender":
+            gender_predictions = (
+                shared_predictions["Gender"]
+                if shared_predictions is not None
+                else __predict_batch(model_name="Gender", imgs=imgs, batch_size=batch_size)
+            )
+            gender_predictions = 100 * gender_predictions
 
-                obj["dominant_gender"] = Gender.labels[np.argmax(gender_predictions)]
+            for obj, predictions in zip(resp_objects, gender_predictions):
+                obj["gender"] = dict(zip(Gender.labels, predictions))
+                obj["dominant_gender"] = Gender.labels[np.argmax(predictions)]
 
-            elif action == "race":
-                race_predictions = modeling.build_model(
-                    task="facial_attribute", model_name="Race"
-                ).predict(img_content)
-                sum_of_predictions = race_predictions.sum()
+        elif action == "race":
+            race_predictions = (
+                shared_predictions["Race"]
+                if shared_predictions is not None
+                else __predict_batch(model_name="Race", imgs=imgs, batch_size=batch_size)
+            )
+            sum_of_predictions = race_predictions.sum(axis=1, keepdims=True)
+            race_predictions = 100 * race_predictions / sum_of_predictions
 
-                obj["race"] = {}
-                for i, race_label in enumerate(Race.labels):
-                    race_prediction = 100 * race_predictions[i] / sum_of_predictions
-                    obj["race"][race_label] = race_prediction
+            for obj, predictions in zip(resp_objects, race_predictions):
+                obj["race"] = dict(zip(Race.labels, predictions))
+                obj["dominant_race"] = Race.labels[np.argmax(predictions)]
 
-                obj["dominant_race"] = Race.labels[np.argmax(race_predictions)]
+    return resp_objects
 
-            # -----------------------------
-            # mention facial areas
-            obj["region"] = img_region
-            # include image confidence
-            obj["face_confidence"] = img_confidence
 
-        resp_objects.append(obj)
+def __validate_actions(actions: Union[tuple, list, str], batch_size: int) -> List[str]:
+    # if actions is passed as tuple with single item, interestingly it becomes str here
+    if isinstance(actions, str):
+        actions = (actions,)
 
-    return resp_objects
+    # check if actions is not an iterable or empty.
+    if not hasattr(actions, "__getitem__") or not actions:
+        raise ValueError("`actions` must be a list of strings.")
+
+    actions = list(actions)
+
+    # For each action, check if it is valid
+    for action in actions:
+        if action not in ("emotion", "age", "gender", "race"):
+            raise ValueError(
+                f"Invalid action passed ({repr(action)})). "
+                "Valid actions are `emotion`, `age`, `gender`, `race`."
+            )
+    if not isinstance(batch_size, int) or batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
+    return actions
+
+
+def __predict_batch(
+    model_name: str, imgs: np.ndarray, batch_size: int
+) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Find predictions of a facial attribute model for a stack of faces in batches
+    Args:
+        model_name (str): Emotion, Age, Gender, Race or Age-Gender-Race
+        imgs (np.ndarray): (N, 224, 224, 3) pre-loaded faces in BGR
+        batch_size (int): maximum number of faces fed to the model in a single call
+    Returns:
+        predictions (np.ndarray or dict): predictions of all faces, or predictions of
+            each model for Age-Gender-Race
+    """
+    model = modeling.build_model(task="facial_attribute", model_name=model_name)
+    batches = [
+        model.predict_batch(imgs[offset : offset + batch_size])
+        for offset in range(0, len(imgs), batch_size)
+    ]
+    if isinstance(batches[0], dict):
+        return {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+    return np.concatenate(batches)
@@ -1,8 +1,8 @@
 # built-in dependencies
+import os
 from typing import Any, Dict, List, Tuple, Union, Optional
 
 # 3rd part dependencies
-from heapq import nlargest
 import numpy as np
 import cv2
 
@@ -171,14 +171,23 @@ def extract_faces(
             "confidence": round(float(current_region.confidence or 0), 2),
         }
 
-        if anti_spoofing is True:
-            antispoof_model = modeling.build_model(task="spoofing", model_name="Fasnet")
-            is_real, antispoof_score = antispoof_model.analyze(img=img, facial_area=(x, y, w, h))
+        resp_objs.append(resp_obj)
+
+    # all faces are analyzed in a single batch
+    if anti_spoofing is True and len(resp_objs) > 0:
+        antispoof_model = modeling.build_model(task="spoofing", model_name="Fasnet")
+        with modeling.find_inference_lock(task="spoofing", model_name="Fasnet"):
+            antispoof_results = antispoof_model.analyze_batch(
+                img=img,
+                facial_areas=[
+                    tuple(resp_obj["facial_area"][key] for key in ["x", "y", "w", "h"])
+                    for resp_obj in resp_objs
+                ],
+            )
+        for resp_obj, (is_real, antispoof_score) in zip(resp_objs, antispoof_results):
             resp_obj["is_real"] = is_real
             resp_obj["antispoof_score"] = antispoof_score
 
-        resp_objs.append(resp_obj)
-
     if len(resp_objs) == 0 and enforce_detection == True:
         raise ValueError(
             f"Exception while extracting faces from {img_name}."
@@ -194,6 +203,8 @@ def detect_faces(
     align: bool = True,
     expand_percentage: int = 0,
     max_faces: Optional[int] = None,
+    align_mode: Optional[str] = None,
+    min_confidence: float = 0,
 ) -> List[DetectedFace]:
     """
     Detect face(s) from a given image
@@ -206,6 +217,15 @@ def detect_faces(
 
         expand_percentage (int): expand detected facial area with a percentage (default is 0).
 
+        max_faces (int): keep only the given number of largest faces (default is None for all).
+
+        align_mode (str): roi runs the detector on the image itself and rotates only the
+            region around each face, padded adds black borders around the image and rotates
+            the whole bordered image for each face. Both give the same crop for the same
+            detection (default is None for DEEPFACE_ALIGN_MODE environment variable or roi).
+
+        min_confidence (float): discard faces detected with a lower confidence (default is 0).
+
     Returns:
         results (List[DetectedFace]): A list of DetectedFace objects
             where each object contains:
@@ -231,11 +251,16 @@ def detect_faces(
         )
         expand_percentage = 0
 
+    if align_mode is None:
+        align_mode = os.getenv("DEEPFACE_ALIGN_MODE", "roi")
+    if align_mode not in ("roi", "padded"):
+        raise ValueError(f"align_mode must be roi or padded, but it is {align_mode}")
+
     # If faces are close to the upper boundary, alignment move them outside
     # Add a black border around an image to avoid this.
     height_border = int(0.5 * height)
     width_border = int(0.5 * width)
-    if align is True:
+    if align is True and align_mode == "padded":
         img = cv2.copyMakeBorder(
             img,
             height_border,
@@ -246,100 +271,104 @@ def detect_faces(
             value=[0, 0, 0],  # Color of the border (black)
         )
 
-    # find facial areas of given image
-    facial_areas = face_detector.detect_faces(img)
+    # find facial areas of given image, detectors are not thread-safe
+    with modeling.find_inference_lock(task="face_detector", model_name=detector_backend):
+        faces = face_detector.detect_faces_array(img)
+
+    if min_confidence > 0:
+        faces = faces.filter(min_confidence)
+
+    if max_faces is not None:
+        faces = faces.largest(max_faces)
+
+    # facial areas are expanded and aligned in the bordered image, even if it is not allocated
+    if align is True and align_mode == "roi":
+        faces = faces.shift(width_border, height_border)
+    size = (height + 2 * height_border, width + 2 * width_border) if align else (height, width)
+    faces = faces.expand(expand_percentage, size)
+
+    boxes = faces.boxes.astype(int).tolist()
+    if align is False:
+        detected_faces = [img[y : y + h, x : x + w] for x, y, w, h in boxes]
+    elif align_mode == "roi":
+        detected_faces = [
+            align_face_locally(
+                img=img,
+                facial_area=box,
+                angle=angle,
+                width_border=width_border,
+                height_border=height_border,
+            )
+            for box, angle in zip(boxes, faces.find_angles().tolist())
+        ]
+    else:
+        detected_faces = []
+        for (x, y, w, h), facial_area in zip(boxes, faces.to_regions()):
+            # align original image, then find projection of detected face area after alignment
+            aligned_img, angle = align_img_wrt_eyes(
+                img=img, left_eye=facial_area.left_eye, right_eye=facial_area.right_eye
+            )
+            rotated_x1, rotated_y1, rotated_x2, rotated_y2 = project_facial_area(
+                facial_area=(x, y, x + w, y + h), angle=angle, size=(img.shape[0], img.shape[1])
+            )
+            detected_faces.append(
+                aligned_img[int(rotated_y1) : int(rotated_y2), int(rotated_x1) : int(rotated_x2)]
+            )
 
-    if max_faces is not None and max_faces < len(facial_areas):
-        facial_areas = nlargest(
-            max_faces, facial_areas, key=lambda facial_area: facial_area.w * facial_area.h
-        )
+    # restore facial areas and landmarks before border added
+    if align is True:
+        faces = faces.shift(-width_border, -height_border)
 
     return [
-        expand_and_align_face(
-            facial_area=facial_area,
-            img=img,
-            align=align,
-            expand_percentage=expand_percentage,
-            width_border=width_border,
-            height_border=height_border,
-        )
-        for facial_area in facial_areas
+        DetectedFace(img=detected_face, facial_area=facial_area, confidence=facial_area.confidence)
+        for detected_face, facial_area in zip(detected_faces, faces.to_regions())
     ]
 
 
-def expand_and_align_face(
-    facial_area: FacialAreaRegion,
+def align_face_locally(
     img: np.ndarray,
-    align: bool,
-    expand_percentage: int,
+    facial_area: Tuple[int, int, int, int],
+    angle: float,
     width_border: int,
     height_border: int,
-) -> DetectedFace:
-    x = facial_area.x
-    y = facial_area.y
-    w = facial_area.w
-    h = facial_area.h
-    left_eye = facial_area.left_eye
-    right_eye = facial_area.right_eye
-    confidence = facial_area.confidence
-    nose = facial_area.nose
-    mouth_left = facial_area.mouth_left
-    mouth_right = facial_area.mouth_right
-
-    if expand_percentage > 0:
-        # Expand the facial region height and width by the provided percentage
-        # ensuring that the expanded region stays within img.shape limits
-        expanded_w = w + int(w * expand_percentage / 100)
-        expanded_h = h + int(h * expand_percentage / 100)
-
-        x = max(0, x - int((expanded_w - w) / 2))
-        y = max(0, y - int((expanded_h - h) / 2))
-        w = min(img.shape[1] - x, expanded_w)
-        h = min(img.shape[0] - y, expanded_h)
-
-    # extract detected face unaligned
-    detected_face = img[int(y) : int(y + h), int(x) : int(x + w)]
-    # align original image, then find projection of detected face area after alignment
-    if align is True:  # and left_eye is not None and right_eye is not None:
-        aligned_img, angle = align_img_wrt_eyes(img=img, left_eye=left_eye, right_eye=right_eye)
-
-        rotated_x1, rotated_y1, rotated_x2, rotated_y2 = project_facial_area(
-            facial_area=(x, y, x + w, y + h), angle=angle, size=(img.shape[0], img.shape[1])
+) -> np.ndarray:
+    """
+    Align a face in an image without borders by rotating only its region. The rotation is
+        still around the center of the image with width_border and height_border black
+        borders, so the crop is the same with the one of the bordered image although
+        the bordered image is never allocated.
+    Args:
+        img (np.ndarray): pre-loaded image without borders
+        facial_area (tuple): x, y, w and h of the facial area in the bordered image
+        angle (float): rotation aligning the eyes horizontally in degrees
+        width_border (int): left and right border width of the bordered image
+        height_border (int): top and bottom border height of the bordered image
+    Returns:
+        detected_face (np.ndarray): aligned face
+    """
+    height, width = img.shape[:2]
+    bordered_size = (height + 2 * height_border, width + 2 * width_border)
+
+    x, y, w, h = facial_area
+    x1, y1, x2, y2 = (
+        int(value)
+        for value in project_facial_area(
+            facial_area=(x, y, x + w, y + h), angle=angle, size=bordered_size
         )
-        detected_face = aligned_img[
-            int(rotated_y1) : int(rotated_y2), int(rotated_x1) : int(rotated_x2)
-        ]
-
-        # restore x, y, le and re before border added
-        x = x - width_border
-        y = y - height_border
-        # w and h will not change
-        if left_eye is not None:
-            left_eye = (left_eye[0] - width_border, left_eye[1] - height_border)
-        if right_eye is not None:
-            right_eye = (right_eye[0] - width_border, right_eye[1] - height_border)
-        if nose is not None:
-            nose = (nose[0] - width_border, nose[1] - height_border)
-        if mouth_left is not None:
-            mouth_left = (mouth_left[0] - width_border, mouth_left[1] - height_border)
-        if mouth_right is not None:
-            mouth_right = (mouth_right[0] - width_border, mouth_right[1] - height_border)
-
-    return DetectedFace(
-        img=detected_face,
-        facial_area=FacialAreaRegion(
-            x=x,
-            y=y,
-            h=h,
-            w=w,
-            confidence=confidence,
-            left_eye=left_eye,
-            right_eye=right_eye,
-            nose=nose,
-            mouth_left=mouth_left,
-            mouth_right=mouth_right,
-        ),
-        confidence=confidence,
+    )
+    if x2 <= x1 or y2 <= y1:
+        return img[0:0, 0:0]
+
+    M = cv2.getRotationMatrix2D((bordered_size[1] // 2, bordered_size[0] // 2), angle, 1.0)
+    # map the image itself into the bordered one, and the projected area into the crop
+    M[:, 2] += M[:, :2] @ np.array([width_border, height_border]) - np.array([x1, y1])
+    return cv2.warpAffine(
+        img,
+        M,
+        (x2 - x1, y2 - y1),
+        flags=cv2.INTER_CUBIC,
+        borderMode=cv2.BORDER_CONSTANT,
+        borderValue=(0, 0, 0),
     )
 
 
@@ -365,7 +394,7 @@ def align_img_wrt_eyes(
     if img.shape[0] == 0 or img.shape[1] == 0:
         return img, 0
 
-    angle = float(np.degrees(np.arctan2(left_eye[1] - right_eye[1], left_eye[0] - right_eye[0])))
+    angle = __find_angle(left_eye=left_eye, right_eye=right_eye)
 
     (h, w) = img.shape[:2]
     center = (w // 2, h // 2)
@@ -377,6 +406,17 @@ def align_img_wrt_eyes(
     return img, angle
 
 
+def __find_angle(
+    left_eye: Optional[Union[list, tuple]], right_eye: Optional[Union[list, tuple]]
+) -> float:
+    """
+    Find the rotation in degrees aligning the eyes horizontally, 0 if an eye is missing
+    """
+    if left_eye is None or right_eye is None:
+        return 0
+    return float(np.degrees(np.arctan2(left_eye[1] - right_eye[1], left_eye[0] - right_eye[0])))
+
+
 def project_facial_area(
     facial_area: Tuple[int, int, int, int], angle: float, size: Tuple[int, int]
 ) -> Tuple[int, int, int, int]:
@@ -0,0 +1,273 @@
+# built-in dependencies
+import os
+import copy
+import pickle
+import threading
+from typing import Any, Dict, Optional, Union
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.commons import folder_utils, image_utils
+from deepface.modules import representation, detection
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# enrolled embeddings are cached in memory after the first read of each datastore
+cached_galleries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+gallery_lock = threading.Lock()
+
+
+def enroll(
+    gallery_id: str,
+    img_path: Union[str, np.ndarray],
+    model_name: str = "VGG-Face",
+    detector_backend: str = "opencv",
+    enforce_detection: bool = True,
+    align: bool = True,
+    expand_percentage: int = 0,
+    normalization: str = "base",
+    anti_spoofing: bool = False,
+) -> Dict[str, Any]:
+    """
+    Enroll the reference image of an identity into the embedding gallery.
+        Embeddings are calculated once per content hash and configuration. Re-enrolling
+        the same image is a cheap hash comparison without any model work.
+
+    Args:
+        gallery_id (str): unique identifier of the enrolled identity (e.g. user id)
+
+        img_path (str or np.ndarray): The exact path to the image, a numpy array in BGR format,
+            or a base64 encoded image. If the image contains multiple faces, all of them
+            will be enrolled.
+
+        model_name (str): Model for face recognition. Options: VGG-Face, Facenet, Facenet512,
+            OpenFace, DeepFace, DeepID, Dlib, ArcFace, SFace and GhostFaceNet (default is VGG-Face).
+
+        detector_backend (string): face detector backend. Options: 'opencv', 'retinaface',
+            'mtcnn', 'ssd', 'dlib', 'mediapipe', 'yolov8', 'centerface' or 'skip'
+            (default is opencv).
+
+        enforce_detection (boolean): If no face is detected in an image, raise an exception.
+            Set to False to avoid the exception for low-resolution images (default is True).
+
+        align (bool): Flag to enable face alignment (default is True).
+
+        expand_percentage (int): expand detected facial area with a percentage (default is 0).
+
+        normalization (string): Normalize the input image before feeding it to the model.
+            Options: base, raw, Facenet, Facenet2018, VGGFace, VGGFace2, ArcFace (default is base)
+
+        anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
+
+    Returns:
+        enrollment (dict): A dictionary with following keys
+
+        - 'gallery_id' (str): identifier of the enrolled identity
+
+        - 'hash' (str): content hash of the enrolled image
+
+        - 'embeddings' (List[List[float]]): embeddings of each face in the enrolled image
+
+        - 'facial_areas' (List[dict]): facial areas of each face in the enrolled image
+    """
+    if not gallery_id:
+        raise ValueError("gallery_id must be a non-empty string")
+
+    gallery_id = str(gallery_id)
+    content_hash = find_content_hash(img_path)
+    datastore_path = __find_datastore_path(
+        model_name=model_name,
+        detector_backend=detector_backend,
+        align=align,
+        expand_percentage=expand_percentage,
+        normalization=normalization,
+    )
+
+    with gallery_lock:
+        gallery = __load_gallery(datastore_path)
+        enrollment = gallery.get(gallery_id)
+
+    if enrollment is not None and enrollment["hash"] == content_hash:
+        logger.debug(f"{gallery_id} is already enrolled with the same content")
+        return copy.deepcopy(enrollment)
+
+    facial_areas = []
+
+    img_objs = detection.extract_faces(
+        img_path=img_path,
+        detector_backend=detector_backend,
+        grayscale=False,
+        color_face="bgr",
+        normalize_face=False,
+        enforce_detection=enforce_detection,
+        align=align,
+        expand_percentage=expand_percentage,
+        anti_spoofing=anti_spoofing,
+    )
+
+    for img_obj in img_objs:
+        if anti_spoofing is True and img_obj.get("is_real", True) is False:
+            raise ValueError("Spoof detected in given image.")
+        facial_areas.append(img_obj["facial_area"])
+
+    # extracted faces are embedded together instead of representing each of them
+    embeddings = representation.find_embeddings(
+        faces=[img_obj["face"] for img_obj in img_objs],
+        model_name=model_name,
+        normalization=normalization,
+        color_face="bgr",
+    )
+
+    enrollment = {
+        "gallery_id": gallery_id,
+        "hash": content_hash,
+        "embeddings": embeddings,
+        "facial_areas": facial_areas,
+    }
+
+    with gallery_lock:
+        gallery = __load_gallery(datastore_path)
+        gallery[gallery_id] = enrollment
+        __save_gallery(datastore_path, gallery)
+
+    logger.debug(f"{gallery_id} enrolled with {len(embeddings)} face(s) into {datastore_path}")
+
+    return copy.deepcopy(enrollment)
+
+
+def find_enrollment(
+    gallery_id: str,
+    model_name: str = "VGG-Face",
+    detector_backend: str = "opencv",
+    align: bool = True,
+    expand_percentage: int = 0,
+    normalization: str = "base",
+) -> Optional[Dict[str, Any]]:
+    """
+    Retrieve the enrollment of an identity for the given configuration
+    Args:
+        gallery_id (str): unique identifier of the enrolled identity
+        model_name (str): face recognition model name
+        detector_backend (str): face detector backend
+        align (bool): enable or disable alignment
+        expand_percentage (int): expand detected facial area with a percentage
+        normalization (str): normalization technique
+    Returns:
+        enrollment (dict): see `enroll` for its keys, a copy of the cached enrollment.
+            None if identity is not enrolled.
+    """
+    datastore_path = __find_datastore_path(
+        model_name=model_name,
+        detector_backend=detector_backend,
+        align=align,
+        expand_percentage=expand_percentage,
+        normalization=normalization,
+    )
+    with gallery_lock:
+        enrollment = __load_gallery(datastore_path).get(str(gallery_id))
+    # cached enrollment is shared by requests, so callers get their own copy
+    return None if enrollment is None else copy.deepcopy(enrollment)
+
+
+def remove(gallery_id: str) -> int:
+    """
+    Remove an identity from the galleries of all configurations
+    Args:
+        gallery_id (str): unique identifier of the enrolled identity
+    Returns:
+        removed (int): number of removed enrollments
+    """
+    gallery_id = str(gallery_id)
+    gallery_path = __find_gallery_folder()
+    removed = 0
+
+    with gallery_lock:
+        for file_name in os.listdir(gallery_path):
+            if not file_name.endswith(".pkl"):
+                continue
+            datastore_path = os.path.join(gallery_path, file_name)
+            gallery = __load_gallery(datastore_path)
+            if gallery.pop(gallery_id, None) is not None:
+                __save_gallery(datastore_path, gallery)
+                removed += 1
+
+    return removed
+
+
+def flush_cache() -> None:
+    """
+    Drop the galleries cached in memory. They will be re-read from disk in the next call.
+    """
+    with gallery_lock:
+        cached_galleries.clear()
+
+
+def find_content_hash(img: Union[str, np.ndarray]) -> str:
+    """
+    Find the hash of a given image with its content, see image_utils.find_content_hash
+    Args:
+        img (str or np.ndarray): exact image path, base64 encoded image, url or numpy array
+    Returns:
+        hash (str): digest with sha1 algorithm
+    """
+    return image_utils.find_content_hash(img)
+
+
+def __find_gallery_folder() -> str:
+    home = folder_utils.get_deepface_home()
+    gallery_path = os.path.join(home, ".deepface", "gallery")
+    os.makedirs(gallery_path, exist_ok=True)
+    return gallery_path
+
+
+def __find_datastore_path(
+    model_name: str,
+    detector_backend: str,
+    align: bool,
+    expand_percentage: int,
+    normalization: str,
+) -> str:
+    file_parts = [
+        "gallery",
+        "model",
+        model_name,
+        "detector",
+        detector_backend,
+        "aligned" if align else "unaligned",
+        "normalization",
+        normalization,
+        "expand",
+        str(expand_percentage),
+    ]
+
+    file_name = "_".join(file_parts) + ".pkl"
+    file_name = file_name.replace("-", "").lower()
+
+    return os.path.join(__find_gallery_folder(), file_name)
+
+
+def __load_gallery(datastore_path: str) -> Dict[str, Dict[str, Any]]:
+    # must be called while gallery_lock is acquired
+    gallery = cached_galleries.get(datastore_path)
+    if gallery is not None:
+        return gallery
+
+    gallery = {}
+    if os.path.exists(datastore_path):
+        with open(datastore_path, "rb") as f:
+            gallery = pickle.load(f)
+
+    cached_galleries[datastore_path] = gallery
+    return gallery
+
+
+def __save_gallery(datastore_path: str, gallery: Dict[str, Dict[str, Any]]) -> None:
+    # must be called while gallery_lock is acquired
+    # write into a temporary file first to not corrupt the gallery if interrupted
+    temp_path = f"{datastore_path}.tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump(gallery, f)
+    os.replace(temp_path, datastore_path)
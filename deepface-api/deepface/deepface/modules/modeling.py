@@ -1,100 +1,415 @@
 # built-in dependencies
-from typing import Any
+import os
+import gc
+import time
+import threading
+import importlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# 3rd party dependencies
+import numpy as np
 
 # project dependencies
-from deepface.models.facial_recognition import (
-    VGGFace,
-    OpenFace,
-    FbDeepFace,
-    DeepID,
-    ArcFace,
-    SFace,
-    Dlib,
-    Facenet,
-    GhostFaceNet,
-)
-from deepface.models.face_detection import (
-    FastMtCnn,
-    MediaPipe,
-    MtCnn,
-    OpenCv,
-    Dlib as DlibDetector,
-    RetinaFace,
-    Ssd,
-    Yolo,
-    YuNet,
-    CenterFace,
-)
-from deepface.models.demography import Age, Gender, Race, Emotion
-from deepface.models.spoofing import FasNet
+from deepface.modules.batching import MicroBatcher
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# model classes as module.ClassName paths, so a model module and its framework are imported
+# on its first build instead of importing all of them at startup
+models: Dict[str, Dict[str, Union[str, type]]] = {
+    "facial_recognition": {
+        "VGG-Face": "deepface.models.facial_recognition.VGGFace.VggFaceClient",
+        "OpenFace": "deepface.models.facial_recognition.OpenFace.OpenFaceClient",
+        "Facenet": "deepface.models.facial_recognition.Facenet.FaceNet128dClient",
+        "Facenet512": "deepface.models.facial_recognition.Facenet.FaceNet512dClient",
+        "DeepFace": "deepface.models.facial_recognition.FbDeepFace.DeepFaceClient",
+        "DeepID": "deepface.models.facial_recognition.DeepID.DeepIdClient",
+        "Dlib": "deepface.models.facial_recognition.Dlib.DlibClient",
+        "ArcFace": "deepface.models.facial_recognition.ArcFace.ArcFaceClient",
+        "SFace": "deepface.models.facial_recognition.SFace.SFaceClient",
+        "GhostFaceNet": "deepface.models.facial_recognition.GhostFaceNet.GhostFaceNetClient",
+    },
+    "spoofing": {
+        "Fasnet": "deepface.models.spoofing.FasNet.Fasnet",
+    },
+    "facial_attribute": {
+        "Emotion": "deepface.models.demography.Emotion.EmotionClient",
+        "Age": "deepface.models.demography.Age.ApparentAgeClient",
+        "Gender": "deepface.models.demography.Gender.GenderClient",
+        "Race": "deepface.models.demography.Race.RaceClient",
+        "Age-Gender-Race": "deepface.models.demography.AgeGenderRace.AgeGenderRaceClient",
+    },
+    "face_detector": {
+        "opencv": "deepface.models.face_detection.OpenCv.OpenCvClient",
+        "mtcnn": "deepface.models.face_detection.MtCnn.MtCnnClient",
+        "ssd": "deepface.models.face_detection.Ssd.SsdClient",
+        "dlib": "deepface.models.face_detection.Dlib.DlibClient",
+        "retinaface": "deepface.models.face_detection.RetinaFace.RetinaFaceClient",
+        "mediapipe": "deepface.models.face_detection.MediaPipe.MediaPipeClient",
+        "yolov8": "deepface.models.face_detection.Yolo.YoloClient",
+        "yunet": "deepface.models.face_detection.YuNet.YuNetClient",
+        "fastmtcnn": "deepface.models.face_detection.FastMtCnn.FastMtCnnClient",
+        "centerface": "deepface.models.face_detection.CenterFace.CenterFaceClient",
+    },
+}
+
+# built models in least recently used order
+cached_models: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+# load time, memory and usage of each model built so far
+model_stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+# models preloaded in warm-up are never evicted
+pinned_models = set()
+registry_lock = threading.Lock()
+model_locks: Dict[Tuple[str, str], threading.Lock] = {}
+# detectors and spoofing models keep the input of a call in their state, e.g. opencv networks
+# and cascades, so each of them runs one call at a time
+inference_locks: Dict[Tuple[str, str], threading.Lock] = {}
+# batch functions of the models merging concurrent calls, and their configuration
+batched_methods = {"facial_recognition": "forward_batch", "facial_attribute": "predict_batch"}
+batching_config: Dict[str, Any] = {}
 
 
 def build_model(task: str, model_name: str) -> Any:
     """
-    This function loads a pre-trained models as singletonish way
+    This function loads a pre-trained models as singletonish way. Each model is built once
+        even if it is requested by many threads at the same time. If the models exceed the
+        memory budget in DEEPFACE_MODEL_MEMORY_BUDGET environment variable in MB, least
+        recently used ones are evicted and they are built again on their next request.
     Parameters:
         task (str): facial_recognition, facial_attribute, face_detector, spoofing
         model_name (str): model identifier
             - VGG-Face, Facenet, Facenet512, OpenFace, DeepFace, DeepID, Dlib,
                 ArcFace, SFace, GhostFaceNet for face recognition
-            - Age, Gender, Emotion, Race for facial attributes
+            - Age, Gender, Emotion, Race for facial attributes, or Age-Gender-Race
+                for age, gender and race in a single model sharing their backbone
             - opencv, mtcnn, ssd, dlib, retinaface, mediapipe, yolov8, yunet,
                 fastmtcnn or centerface for face detectors
             - Fasnet for spoofing
     Returns:
             built model class
     """
+    if models.get(task) is None:
+        raise ValueError(f"unimplemented task - {task}")
+
+    if models[task].get(model_name) is None:
+        raise ValueError(f"Invalid model_name passed - {task}/{model_name}")
+
+    key = (task, model_name)
+    with registry_lock:
+        model = __use_cached_model(key)
+        if model is not None:
+            return model
+        model_lock = model_locks.setdefault(key, threading.Lock())
+
+    # only one thread builds a model, others wait for it instead of building it again
+    with model_lock:
+        with registry_lock:
+            model = __use_cached_model(key)
+            if model is not None:
+                return model
+
+        rss = __find_resident_memory()
+        tic = time.perf_counter()
+        model = find_model_class(task=task, model_name=model_name)()
+        __trace_graph(model)
+        duration = time.perf_counter() - tic
+        memory = __find_model_memory(model) or max(__find_resident_memory() - rss, 0)
+
+        with registry_lock:
+            if batching_config:
+                __enable_batching(task=task, model=model)
+            stats = model_stats.setdefault(key, {"loads": 0, "hits": 0, "evictions": 0})
+            stats["loads"] += 1
+            stats["load_time"] = duration
+            stats["memory"] = memory
+            stats["last_used"] = time.time()
+            cached_models[key] = model
+            __evict(keep=key)
 
-    # singleton design pattern
-    global cached_models
-
-    models = {
-        "facial_recognition": {
-            "VGG-Face": VGGFace.VggFaceClient,
-            "OpenFace": OpenFace.OpenFaceClient,
-            "Facenet": Facenet.FaceNet128dClient,
-            "Facenet512": Facenet.FaceNet512dClient,
-            "DeepFace": FbDeepFace.DeepFaceClient,
-            "DeepID": DeepID.DeepIdClient,
-            "Dlib": Dlib.DlibClient,
-            "ArcFace": ArcFace.ArcFaceClient,
-            "SFace": SFace.SFaceClient,
-            "GhostFaceNet": GhostFaceNet.GhostFaceNetClient,
-        },
-        "spoofing": {
-            "Fasnet": FasNet.Fasnet,
-        },
-        "facial_attribute": {
-            "Emotion": Emotion.EmotionClient,
-            "Age": Age.ApparentAgeClient,
-            "Gender": Gender.GenderClient,
-            "Race": Race.RaceClient,
-        },
-        "face_detector": {
-            "opencv": OpenCv.OpenCvClient,
-            "mtcnn": MtCnn.MtCnnClient,
-            "ssd": Ssd.SsdClient,
-            "dlib": DlibDetector.DlibClient,
-            "retinaface": RetinaFace.RetinaFaceClient,
-            "mediapipe": MediaPipe.MediaPipeClient,
-            "yolov8": Yolo.YoloClient,
-            "yunet": YuNet.YuNetClient,
-            "fastmtcnn": FastMtCnn.FastMtCnnClient,
-            "centerface": CenterFace.CenterFaceClient,
-        },
-    }
+    logger.debug(f"{task}/{model_name} is built in {duration:.2f} seconds")
+    return model
 
+
+def find_inference_lock(task: str, model_name: str) -> threading.Lock:
+    """
+    Find the lock serializing the calls of a model that is not thread-safe
+    Args:
+        task (str): face_detector or spoofing
+        model_name (str): model identifier
+    Returns:
+        lock (threading.Lock): lock shared by all callers of the model
+    """
+    with registry_lock:
+        return inference_locks.setdefault((task, model_name), threading.Lock())
+
+
+def find_model_class(task: str, model_name: str) -> type:
+    """
+    Find the class of a model, importing its module if it is not imported yet
+    Args:
+        task (str): facial_recognition, facial_attribute, face_detector, spoofing
+        model_name (str): model identifier
+    Returns:
+        model class (type)
+    """
     if models.get(task) is None:
         raise ValueError(f"unimplemented task - {task}")
 
-    if not "cached_models" in globals():
-        cached_models = {current_task: {} for current_task in models.keys()}
+    model_class = models[task].get(model_name)
+    if model_class is None:
+        raise ValueError(f"Invalid model_name passed - {task}/{model_name}")
+
+    # registered model classes are used as they are
+    if not isinstance(model_class, str):
+        return model_class
+
+    module_name, class_name = model_class.rsplit(".", maxsplit=1)
+    tic = time.perf_counter()
+    module = importlib.import_module(module_name)
+    logger.debug(f"{module_name} is imported in {time.perf_counter() - tic:.2f} seconds")
+    return getattr(module, class_name)
+
+
+def warm_up(model_names: Optional[Union[str, List[str]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Preload models and run a dummy inference on each of them, so the first request does not
+        pay for model construction, weight loading and graph tracing. Warmed up models are
+        never evicted.
+    Args:
+        model_names (str or list): task/model_name items such as face_detector/retinaface,
+            a comma separated string of them is accepted too (default is None for
+            DEEPFACE_WARMUP_MODELS environment variable)
+    Returns:
+        stats (dict): stats of the warmed up models
+    """
+    if model_names is None:
+        model_names = os.getenv("DEEPFACE_WARMUP_MODELS", "")
+    if isinstance(model_names, str):
+        model_names = [item.strip() for item in model_names.split(",") if item.strip()]
+
+    keys = []
+    for item in model_names:
+        if "/" not in item:
+            raise ValueError(
+                f"Warm-up models must be in task/model_name format, but {item} passed"
+            )
+        task, model_name = item.split("/", maxsplit=1)
+        keys.append((task, model_name))
 
-    if cached_models[task].get(model_name) is None:
-        model = models[task].get(model_name)
-        if model:
-            cached_models[task][model_name] = model()
-        else:
-            raise ValueError(f"Invalid model_name passed - {task}/{model_name}")
+    for task, model_name in keys:
+        with registry_lock:
+            pinned_models.add((task, model_name))
 
-    return cached_models[task][model_name]
+        tic = time.perf_counter()
+        model = build_model(task=task, model_name=model_name)
+        __run_dummy_inference(task=task, model_name=model_name, model=model)
+        logger.info(f"{task}/{model_name} is warmed up in {time.perf_counter() - tic:.2f} seconds")
+
+    names = {f"{task}/{model_name}" for task, model_name in keys}
+    return {name: stats for name, stats in get_stats().items() if name in names}
+
+
+def enable_batching(
+    max_batch_size: Optional[int] = None, max_wait: Optional[float] = None
+) -> None:
+    """
+    Merge the concurrent calls of facial recognition and facial attribute models into
+        batches. Each model collects the faces of calls coming from different threads for
+        a short time, runs a single forward pass for all of them and returns each caller
+        its own results.
+    Args:
+        max_batch_size (int): maximum number of faces in a forward pass (default is None for
+            DEEPFACE_MAX_BATCH_SIZE environment variable or 32)
+        max_wait (float): seconds to wait for other calls after the first one (default is
+            None for DEEPFACE_MAX_BATCH_WAIT_MS environment variable in milliseconds or 5 ms)
+    """
+    if max_batch_size is None:
+        max_batch_size = int(os.getenv("DEEPFACE_MAX_BATCH_SIZE", "32"))
+    if max_wait is None:
+        max_wait = float(os.getenv("DEEPFACE_MAX_BATCH_WAIT_MS", "5")) / 1000
+
+    with registry_lock:
+        __disable_batching()
+        batching_config["max_batch_size"] = max_batch_size
+        batching_config["max_wait"] = max_wait
+        for (task, _), model in cached_models.items():
+            __enable_batching(task=task, model=model)
+
+    logger.info(
+        f"Concurrent calls are batched up to {max_batch_size} faces in {1000 * max_wait:.0f} ms"
+    )
+
+
+def disable_batching() -> None:
+    """
+    Call models directly again after enable_batching
+    """
+    with registry_lock:
+        __disable_batching()
+
+
+def get_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Find the load time, memory and usage stats of the models built so far
+    Returns:
+        stats (dict): task/model_name to its stats
+            - resident (bool): model is in memory
+            - pinned (bool): model was warmed up and is never evicted
+            - load_time (float): seconds spent in its last construction, including the
+                import of its module and framework in the first one, and the tracing of
+                its inference graph for keras models
+            - memory (int): estimated size of the model in bytes
+            - loads (int): number of constructions, more than 1 if it was evicted
+            - hits (int): number of requests served from memory
+            - evictions (int): number of evictions
+            - last_used (float): unix timestamp of its last request
+            - batching (dict): requests, batches, mean_batch_size and mean_fill of
+                the merged calls if batching is enabled
+    """
+    with registry_lock:
+        results = {}
+        for (task, model_name), stats in model_stats.items():
+            result = {
+                "resident": (task, model_name) in cached_models,
+                "pinned": (task, model_name) in pinned_models,
+                **stats,
+            }
+            batcher = getattr(cached_models.get((task, model_name)), "batcher", None)
+            if batcher is not None:
+                result["batching"] = batcher.get_stats()
+            results[f"{task}/{model_name}"] = result
+        return results
+
+
+def __enable_batching(task: str, model: Any) -> None:
+    """
+    Replace the batch function of a model with a micro batcher. Registry lock must be held.
+    """
+    method_name = batched_methods.get(task)
+    if method_name is None or getattr(model, "batcher", None) is not None:
+        return
+    batcher = MicroBatcher(
+        func=getattr(model, method_name),
+        name=f"{task}/{getattr(model, 'model_name', type(model).__name__)}",
+        max_batch_size=batching_config["max_batch_size"],
+        max_wait=batching_config["max_wait"],
+    )
+    # instance attribute shadows the method of its class
+    setattr(model, method_name, batcher)
+    model.batcher = batcher
+
+
+def __disable_batching() -> None:
+    """
+    Restore the batch functions of the models. Registry lock must be held.
+    """
+    batching_config.clear()
+    for (task, _), model in cached_models.items():
+        if getattr(model, "batcher", None) is not None:
+            delattr(model, batched_methods[task])
+            model.batcher = None
+
+
+def __use_cached_model(key: Tuple[str, str]) -> Any:
+    """
+    Find a built model and mark it as recently used. Registry lock must be held.
+    """
+    model = cached_models.get(key)
+    if model is not None:
+        cached_models.move_to_end(key)
+        model_stats[key]["hits"] += 1
+        model_stats[key]["last_used"] = time.time()
+    return model
+
+
+def __evict(keep: Tuple[str, str]) -> None:
+    """
+    Evict least recently used models exceeding the memory budget. Registry lock must be held.
+    """
+    budget = os.getenv("DEEPFACE_MODEL_MEMORY_BUDGET")
+    if budget is None:
+        return
+    budget_bytes = float(budget) * 1024 * 1024
+
+    evicted = False
+    for key in list(cached_models.keys()):
+        if sum(model_stats[item]["memory"] for item in cached_models) <= budget_bytes:
+            break
+        if key == keep or key in pinned_models:
+            continue
+        del cached_models[key]
+        model_stats[key]["evictions"] += 1
+        evicted = True
+        logger.debug(f"{key[0]}/{key[1]} is evicted to stay in the memory budget")
+
+    if evicted:
+        gc.collect()
+
+
+def __find_model_memory(model: Any) -> int:
+    """
+    Estimate the memory of a model client from the parameters of its keras or torch models
+    """
+    total = 0
+    candidates = list(getattr(model, "__dict__", {}).values())
+    for candidate in candidates:
+        if isinstance(candidate, dict):
+            candidates.extend(candidate.values())
+        elif hasattr(candidate, "count_params") and hasattr(candidate, "weights"):
+            total += sum(
+                int(np.prod(weight.shape))
+                * np.dtype(getattr(weight.dtype, "name", weight.dtype)).itemsize
+                for weight in candidate.weights
+            )
+        elif callable(getattr(candidate, "parameters", None)):
+            try:
+                total += sum(
+                    parameter.numel() * parameter.element_size()
+                    for parameter in candidate.parameters()
+                )
+            except (TypeError, AttributeError):
+                continue
+    return total
+
+
+def __find_resident_memory() -> int:
+    """
+    Find the resident memory of this process in bytes, 0 if it is not available
+    """
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def __trace_graph(model: Any) -> None:
+    """
+    Trace the inference graph of a keras model for single inputs while it is built
+    """
+    find_graph_function = getattr(model, "find_graph_function", None)
+    graph_function = find_graph_function() if callable(find_graph_function) else None
+    if graph_function is not None:
+        graph_function.warm_up()
+
+
+def __run_dummy_inference(task: str, model_name: str, model: Any) -> None:
+    """
+    Feed a blank image to a model to initialize its lazily built graph and kernels
+    """
+    if task == "facial_recognition":
+        # input shapes of facial recognition models are in (width, height) order
+        width, height = model.input_shape
+        model.forward_batch(np.zeros((1, height, width, 3), dtype=np.float32))
+    elif task == "facial_attribute":
+        model.predict_batch(np.zeros((1, 224, 224, 3), dtype=np.float32))
+    elif task in ["face_detector", "spoofing"]:
+        with find_inference_lock(task=task, model_name=model_name):
+            if task == "face_detector":
+                model.detect_faces(np.zeros((224, 224, 3), dtype=np.uint8))
+            else:
+                model.analyze(
+                    img=np.zeros((224, 224, 3), dtype=np.uint8), facial_area=(0, 0, 224, 224)
+                )
@@ -1,19 +1,24 @@
 # built-in dependencies
-from typing import Tuple
+import threading
+from typing import List, Tuple
 
 # 3rd party
 import numpy as np
 import cv2
 
-# project dependencies
-from deepface.commons import package_utils
+# scale and per channel offset of the normalization techniques for pixels in [0, 255],
+# Facenet is standardized with the mean and std of each face instead
+NORMALIZATIONS = {
+    "base": (1 / 255, (0.0, 0.0, 0.0)),
+    "raw": (1.0, (0.0, 0.0, 0.0)),
+    "Facenet2018": (1 / 127.5, (-1.0, -1.0, -1.0)),
+    "VGGFace": (1.0, (-93.5940, -104.7624, -129.1863)),
+    "VGGFace2": (1.0, (-91.4953, -103.8827, -131.0912)),
+    "ArcFace": (1 / 128, (-127.5 / 128, -127.5 / 128, -127.5 / 128)),
+}
 
-
-tf_major_version = package_utils.get_tf_major_version()
-if tf_major_version == 1:
-    from keras.preprocessing import image
-elif tf_major_version == 2:
-    from tensorflow.keras.preprocessing import image
+# input buffers of each thread reused for the batches in the same size
+buffers = threading.local()
 
 
 def normalize_input(img: np.ndarray, normalization: str = "base") -> np.ndarray:
@@ -112,10 +117,98 @@ def resize_image(img: np.ndarray, target_size: Tuple[int, int]) -> np.ndarray:
         img = cv2.resize(img, target_size)
 
     # make it 4-dimensional how ML models expect
-    img = image.img_to_array(img)
+    img = np.asarray(img, dtype=np.float32)
     img = np.expand_dims(img, axis=0)
 
     if img.max() > 1:
         img = (img.astype(np.float32) / 255.0).astype(np.float32)
 
     return img
+
+
+def prepare_faces(
+    faces: List[np.ndarray],
+    target_size: Tuple[int, int],
+    normalization: str = "base",
+    color_face: str = "rgb",
+) -> np.ndarray:
+    """
+    Resize, pad and normalize faces into a float32 batch in a few passes. The result is the
+        same with resize_image and normalize_input for each face, but the faces are written
+        into a buffer reused by the next call of the same thread.
+    Args:
+        faces (list): facial images in uint8 with [0, 255] pixels, or in float with [0, 1]
+            pixels as extract_faces returns
+        target_size (tuple): height and width of the model input
+        normalization (str): normalization technique (default is base)
+        color_face (str): rgb or bgr color order of the faces, batch is in bgr (default is rgb)
+    Returns:
+        imgs (np.ndarray): (N, height, width, 3) batch in BGR. It is valid until the next call
+            of the same thread.
+    """
+    if normalization != "Facenet" and normalization not in NORMALIZATIONS:
+        raise ValueError(f"unimplemented normalization type - {normalization}")
+    if color_face not in {"rgb", "bgr"}:
+        raise ValueError(f"The color_face can be rgb or bgr, but it is {color_face}.")
+
+    imgs = __find_buffer(len(faces), target_size)
+    scale, offset = NORMALIZATIONS.get(normalization, (1.0, (0.0, 0.0, 0.0)))
+    # padded pixels are black before normalization
+    padded = __find_padded_input(target_size, offset)
+
+    for img, face in zip(imgs, faces):
+        # float faces in [0, 1] are scaled into [0, 255] with normalization at once
+        face_scale = scale
+        if face.dtype != np.uint8 and face.max() <= 1:
+            face_scale *= 255
+
+        factor = min(target_size[0] / face.shape[0], target_size[1] / face.shape[1])
+        dsize = (int(face.shape[1] * factor), int(face.shape[0] * factor))
+        # channels are reversed and normalized after resizing on fewer pixels
+        resized = cv2.resize(np.ascontiguousarray(face, dtype=np.float32), dsize)
+        if color_face == "rgb":
+            resized = cv2.cvtColor(resized, cv2.COLOR_RGB2BGR)
+        resized *= face_scale
+        if any(offset):
+            resized = cv2.add(resized, (*offset, 0))
+
+        # put the resized face in the middle of the padded input
+        top = (target_size[0] - resized.shape[0]) // 2
+        left = (target_size[1] - resized.shape[1]) // 2
+        np.copyto(img, padded)
+        img[top : top + resized.shape[0], left : left + resized.shape[1]] = resized
+
+        if normalization == "Facenet":
+            img -= img.mean()
+            img /= img.std()
+
+    return imgs
+
+
+def __find_buffer(size: int, target_size: Tuple[int, int]) -> np.ndarray:
+    """
+    Find the input buffer of this thread for a batch, allocate a larger one if necessary
+    """
+    if not hasattr(buffers, "arrays"):
+        buffers.arrays = {}
+    key = tuple(target_size)
+    array = buffers.arrays.get(key)
+    if array is None or len(array) < size:
+        array = np.empty((size, *key, 3), dtype=np.float32)
+        buffers.arrays[key] = array
+    return array[:size]
+
+
+def __find_padded_input(target_size: Tuple[int, int], offset: Tuple[float, ...]) -> np.ndarray:
+    """
+    Find the input of this thread having just normalized black pixels
+    """
+    if not hasattr(buffers, "padded_inputs"):
+        buffers.padded_inputs = {}
+    key = (*target_size, *offset)
+    padded = buffers.padded_inputs.get(key)
+    if padded is None:
+        padded = np.empty((*target_size, 3), dtype=np.float32)
+        padded[:] = offset
+        buffers.padded_inputs[key] = padded
+    return padded
@@ -1,7 +1,8 @@
 # built-in dependencies
 import os
-import pickle
-from typing import List, Union, Optional, Dict, Any, Set
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Union, Optional, Dict, Any, Set, Tuple, Callable, Deque
 import time
 
 # 3rd party dependencies
@@ -11,11 +12,21 @@ from tqdm import tqdm
 
 # project dependencies
 from deepface.commons import image_utils
-from deepface.modules import representation, detection, verification
+from deepface.modules import (
+    representation,
+    detection,
+    verification,
+    datastore,
+    synchronization,
+    modeling,
+)
 from deepface.commons.logger import Logger
 
 logger = Logger()
 
+# versions of the manifest and datastore of a facial database when they were last synchronized
+synchronized_versions: Dict[str, Tuple[int, Tuple[Optional[int], int]]] = {}
+
 
 def find(
     img_path: Union[str, np.ndarray],
@@ -32,6 +43,11 @@ def find(
     refresh_database: bool = True,
     anti_spoofing: bool = False,
     batched: bool = False,
+    top_k: Optional[int] = None,
+    search_method: str = "exact",
+    ann_probes: int = 8,
+    batch_size: int = 32,
+    workers: Optional[int] = None,
 ) -> Union[List[pd.DataFrame], List[List[Dict[str, Any]]]]:
     """
     Identify individuals in a database
@@ -70,12 +86,34 @@ def find(
 
         silent (boolean): Suppress or allow some log messages for a quieter analysis process.
 
-        refresh_database (boolean): Synchronizes the images representation (pkl) file with the
+        refresh_database (boolean): Synchronizes the images representation datastore with the
             directory/db files, if set to false, it will ignore any file changes inside the db_path
-            directory (default is True).
+            directory (default is True). Only the directories changed since the previous call are
+            re-scanned. Set DEEPFACE_WATCH_DATABASE=1 to track the changes with inotify on linux,
+            which also catches the images overwritten in place.
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        batched (boolean): Return a list of dicts instead of a list of dataframes
+            (default is False).
+
+        top_k (int): Return only the closest k identities for each detected face
+            (default is None for all identities closer than the threshold).
+
+        search_method (str): exact or ivf. ivf searches an approximate nearest neighbour index
+            persisted next to the datastore. Datastores smaller than DEEPFACE_ANN_MIN_SIZE
+            environment variable (default 10000) are always searched exactly (default is exact).
+
+        ann_probes (int): number of index lists searched with ivf. Higher values increase
+            recall and latency (default is 8).
+
+        batch_size (int): Maximum number of faces fed to the model in a single call while
+            representing new images in db_path and faces in img_path (default is 32).
+
+        workers (int): Number of threads decoding new images in db_path while faces of
+            the previous ones are being detected and represented. Completed images are saved
+            into the datastore periodically, so an interrupted indexing resumes from the last
+            checkpoint (default is None for up to 4 threads).
 
     Returns:
         results (List[pd.DataFrame] or List[List[Dict[str, Any]]]):
@@ -108,6 +146,9 @@ def find(
 
     tic = time.time()
 
+    if search_method not in {"exact", "ivf"}:
+        raise ValueError(f"unimplemented search method - {search_method}")
+
     if not os.path.isdir(db_path):
         raise ValueError(f"Passed path {db_path} does not exist!")
 
@@ -115,128 +156,22 @@ def find(
     if img is None:
         raise ValueError(f"Passed image path {img_path} does not exist!")
 
-    file_parts = [
-        "ds",
-        "model",
-        model_name,
-        "detector",
-        detector_backend,
-        "aligned" if align else "unaligned",
-        "normalization",
-        normalization,
-        "expand",
-        str(expand_percentage),
-    ]
-
-    file_name = "_".join(file_parts) + ".pkl"
-    file_name = file_name.replace("-", "").lower()
-
-    datastore_path = os.path.join(db_path, file_name)
-    representations = []
-
-    # required columns for representations
-    df_cols = [
-        "identity",
-        "hash",
-        "embedding",
-        "target_x",
-        "target_y",
-        "target_w",
-        "target_h",
-    ]
-
-    # Ensure the proper pickle file exists
-    if not os.path.exists(datastore_path):
-        with open(datastore_path, "wb") as f:
-            pickle.dump([], f)
-
-    # Load the representations from the pickle file
-    with open(datastore_path, "rb") as f:
-        representations = pickle.load(f)
-
-    # check each item of representations list has required keys
-    for i, current_representation in enumerate(representations):
-        missing_keys = set(df_cols) - set(current_representation.keys())
-        if len(missing_keys) > 0:
-            raise ValueError(
-                f"{i}-th item does not have some required keys - {missing_keys}."
-                f"Consider to delete {datastore_path}"
-            )
-
-    # embedded images
-    pickled_images = [representation["identity"] for representation in representations]
-
-    # Get the list of images on storage
-    storage_images = image_utils.list_images(path=db_path)
-
-    if len(storage_images) == 0 and refresh_database is True:
-        raise ValueError(f"No item found in {db_path}")
-    if len(representations) == 0 and refresh_database is False:
-        raise ValueError(f"Nothing is found in {datastore_path}")
-
-    must_save_pickle = False
-    new_images, old_images, replaced_images = set(), set(), set()
-
-    if not refresh_database:
-        logger.info(
-            f"Could be some changes in {db_path} not tracked."
-            "Set refresh_database to true to assure that any changes will be tracked."
-        )
-
-    # Enforce data consistency amongst on disk images and pickle file
-    if refresh_database:
-        new_images = set(storage_images) - set(pickled_images)  # images added to storage
-        old_images = set(pickled_images) - set(storage_images)  # images removed from storage
-
-        # detect replaced images
-        for current_representation in representations:
-            identity = current_representation["identity"]
-            if identity in old_images:
-                continue
-            alpha_hash = current_representation["hash"]
-            beta_hash = image_utils.find_image_hash(identity)
-            if alpha_hash != beta_hash:
-                logger.debug(f"Even though {identity} represented before, it's replaced later.")
-                replaced_images.add(identity)
-
-    if not silent and (len(new_images) > 0 or len(old_images) > 0 or len(replaced_images) > 0):
-        logger.info(
-            f"Found {len(new_images)} newly added image(s)"
-            f", {len(old_images)} removed image(s)"
-            f", {len(replaced_images)} replaced image(s)."
-        )
-
-    # append replaced images into both old and new images. these will be dropped and re-added.
-    new_images.update(replaced_images)
-    old_images.update(replaced_images)
-
-    # remove old images first
-    if len(old_images) > 0:
-        representations = [rep for rep in representations if rep["identity"] not in old_images]
-        must_save_pickle = True
-
-    # find representations for new images
-    if len(new_images) > 0:
-        representations += __find_bulk_embeddings(
-            employees=new_images,
-            model_name=model_name,
-            detector_backend=detector_backend,
-            enforce_detection=enforce_detection,
-            align=align,
-            expand_percentage=expand_percentage,
-            normalization=normalization,
-            silent=silent,
-        )  # add new images
-        must_save_pickle = True
-
-    if must_save_pickle:
-        with open(datastore_path, "wb") as f:
-            pickle.dump(representations, f)
-        if not silent:
-            logger.info(f"There are now {len(representations)} representations in {file_name}")
+    store = synchronize(
+        db_path=db_path,
+        model_name=model_name,
+        enforce_detection=enforce_detection,
+        detector_backend=detector_backend,
+        align=align,
+        expand_percentage=expand_percentage,
+        normalization=normalization,
+        silent=silent,
+        refresh_database=refresh_database,
+        batch_size=batch_size,
+        workers=workers,
+    )
 
     # Should we have no representations bailout
-    if len(representations) == 0:
+    if len(store) == 0:
         if not silent:
             toc = time.time()
             logger.info(f"find function duration {toc - tic} seconds")
@@ -256,9 +191,14 @@ def find(
         anti_spoofing=anti_spoofing,
     )
 
-    if batched:
+    # approximate search does not pay off for small datastores
+    use_index = search_method == "ivf" and len(store) >= int(
+        os.getenv("DEEPFACE_ANN_MIN_SIZE", "10000")
+    )
+
+    if batched and not use_index:
         return find_batched(
-            representations,
+            store.find_representations(),
             source_objs,
             model_name,
             distance_metric,
@@ -267,71 +207,71 @@ def find(
             threshold,
             normalization,
             anti_spoofing,
+            top_k,
+            batch_size,
         )
 
-    df = pd.DataFrame(representations)
+    # memory-mapped embeddings are searched as they are, metadata is looked up for matches
+    embedding_matrix, row_metadata = store.find_embedding_matrix()
+    # items without a face have no rows, so there may be nothing to search even in a big store
+    has_rows = len(embedding_matrix) > 0
+    ivf_index = store.find_ivf_index() if use_index and has_rows else None
 
     if silent is False:
-        logger.info(f"Searching {img_path} in {df.shape[0]} length datastore")
+        logger.info(f"Searching {img_path} in {len(store)} length datastore")
+
+    metadata_cols = datastore.METADATA_KEYS
 
     resp_obj = []
 
     for source_obj in source_objs:
         if anti_spoofing is True and source_obj.get("is_real", True) is False:
             raise ValueError("Spoof detected in the given image.")
-        source_img = source_obj["face"]
+
+    # all faces in the source image are represented together
+    target_representations = representation.find_embeddings(
+        faces=[source_obj["face"] for source_obj in source_objs],
+        model_name=model_name,
+        normalization=normalization,
+        batch_size=batch_size,
+    )
+
+    for source_obj, target_representation in zip(source_objs, target_representations):
         source_region = source_obj["facial_area"]
-        target_embedding_obj = representation.represent(
-            img_path=source_img,
-            model_name=model_name,
-            enforce_detection=enforce_detection,
-            detector_backend="skip",
-            align=align,
-            normalization=normalization,
-        )
+        target_threshold = threshold or verification.find_threshold(model_name, distance_metric)
 
-        target_representation = target_embedding_obj[0]["embedding"]
+        if not has_rows:
+            indices, distances = np.array([], dtype=int), np.array([])
+        elif ivf_index is None:
+            indices, distances = embedding_matrix.search(
+                target=target_representation,
+                distance_metric=distance_metric,
+                threshold=target_threshold,
+                top_k=top_k,
+            )
+        else:
+            indices, distances = ivf_index.search(
+                target=target_representation,
+                distance_metric=distance_metric,
+                threshold=target_threshold,
+                top_k=top_k,
+                probes=ann_probes,
+            )
 
-        result_df = df.copy()  # df will be filtered in each img
+        # dataframe is built just for the matched items
+        result_df = pd.DataFrame(
+            [row_metadata[index] for index in indices],
+            columns=metadata_cols,
+        )
         result_df["source_x"] = source_region["x"]
         result_df["source_y"] = source_region["y"]
         result_df["source_w"] = source_region["w"]
         result_df["source_h"] = source_region["h"]
-
-        distances = []
-        for _, instance in df.iterrows():
-            source_representation = instance["embedding"]
-            if source_representation is None:
-                distances.append(float("inf"))  # no representation for this image
-                continue
-
-            target_dims = len(list(target_representation))
-            source_dims = len(list(source_representation))
-            if target_dims != source_dims:
-                raise ValueError(
-                    "Source and target embeddings must have same dimensions but "
-                    + f"{target_dims}:{source_dims}. Model structure may change"
-                    + " after pickle created. Delete the {file_name} and re-run."
-                )
-
-            distance = verification.find_distance(
-                source_representation, target_representation, distance_metric
-            )
-
-            distances.append(distance)
-
-            # ---------------------------
-        target_threshold = threshold or verification.find_threshold(model_name, distance_metric)
-
         result_df["threshold"] = target_threshold
         result_df["distance"] = distances
 
-        result_df = result_df.drop(columns=["embedding"])
-        # pylint: disable=unsubscriptable-object
-        result_df = result_df[result_df["distance"] <= target_threshold]
-        result_df = result_df.sort_values(by=["distance"], ascending=True).reset_index(drop=True)
-
-        resp_obj.append(result_df)
+        # batched requests with an index get the same dicts with find_batched
+        resp_obj.append(result_df.to_dict("records") if batched else result_df)
 
     # -----------------------------------
 
@@ -342,6 +282,161 @@ def find(
     return resp_obj
 
 
+def synchronize(
+    db_path: str,
+    model_name: str = "VGG-Face",
+    enforce_detection: bool = True,
+    detector_backend: str = "opencv",
+    align: bool = True,
+    expand_percentage: int = 0,
+    normalization: str = "base",
+    silent: bool = False,
+    refresh_database: bool = True,
+    batch_size: int = 32,
+    workers: Optional[int] = None,
+) -> datastore.EmbeddingStore:
+    """
+    Synchronize the datastore of a facial database with the images in it. Embeddings of
+        new or replaced images are found, and the ones of removed images are dropped.
+    Args:
+        db_path (string): Path to the folder containing image files.
+
+        model_name (str): Model for face recognition (default is VGG-Face).
+
+        enforce_detection (boolean): If no face is detected in an image, raise an exception
+            (default is True).
+
+        detector_backend (string): face detector backend (default is opencv).
+
+        align (boolean): Perform alignment based on the eye positions (default is True).
+
+        expand_percentage (int): expand detected facial area with a percentage (default is 0).
+
+        normalization (string): Normalize the input image before feeding it to the model
+            (default is base).
+
+        silent (boolean): Suppress or allow some log messages (default is False).
+
+        refresh_database (boolean): Synchronize the images in db_path with the datastore.
+            If False, the datastore is used as it is (default is True).
+
+        batch_size (int): Maximum number of faces fed to the model in a single call
+            (default is 32).
+
+        workers (int): Number of threads decoding new images (default is None for up to
+            4 threads).
+    Returns:
+        store (datastore.EmbeddingStore): synchronized datastore of db_path
+    """
+    if not os.path.isdir(db_path):
+        raise ValueError(f"Passed path {db_path} does not exist!")
+
+    file_parts = [
+        "ds",
+        "model",
+        model_name,
+        "detector",
+        detector_backend,
+        "aligned" if align else "unaligned",
+        "normalization",
+        normalization,
+        "expand",
+        str(expand_percentage),
+    ]
+
+    file_name = "_".join(file_parts)
+    file_name = file_name.replace("-", "").lower()
+
+    datastore_path = os.path.join(db_path, file_name)
+    store = datastore.load(datastore_path)
+
+    # one-time migration of the legacy pickle datastore
+    pickle_path = f"{datastore_path}.pkl"
+    if os.path.exists(pickle_path) and len(store.items) == 0:
+        store.migrate(pickle_path)
+
+    if len(store) == 0 and refresh_database is False:
+        raise ValueError(f"Nothing is found in {datastore_path}")
+
+    new_images, old_images, replaced_images = set(), set(), set()
+
+    if not refresh_database:
+        logger.info(
+            f"Could be some changes in {db_path} not tracked."
+            "Set refresh_database to true to assure that any changes will be tracked."
+        )
+
+    # Enforce data consistency amongst on disk images and datastore
+    if refresh_database:
+        # only changed directories or files are re-visited since the previous call
+        manifest = synchronization.load(db_path)
+        manifest.sync()
+
+        if len(manifest.files) == 0:
+            raise ValueError(f"No item found in {db_path}")
+
+        # compare hashes if either images on storage or datastore changed since last time
+        if synchronized_versions.get(datastore_path) != (manifest.version, store.version):
+            storage_hashes = manifest.hashes
+            stored_hashes = store.hashes()
+
+            new_images = set(storage_hashes.keys()) - set(stored_hashes.keys())
+            old_images = set(stored_hashes.keys()) - set(storage_hashes.keys())
+
+            # detect replaced images
+            for identity, alpha_hash in stored_hashes.items():
+                if identity in old_images:
+                    continue
+                beta_hash = storage_hashes[identity]
+                if alpha_hash != beta_hash:
+                    logger.debug(
+                        f"Even though {identity} represented before, it's replaced later."
+                    )
+                    replaced_images.add(identity)
+
+    if not silent and (len(new_images) > 0 or len(old_images) > 0 or len(replaced_images) > 0):
+        logger.info(
+            f"Found {len(new_images)} newly added image(s)"
+            f", {len(old_images)} removed image(s)"
+            f", {len(replaced_images)} replaced image(s)."
+        )
+
+    # append replaced images into both old and new images. these will be dropped and re-added.
+    new_images.update(replaced_images)
+    old_images.update(replaced_images)
+
+    # remove old images first, they are just marked as removed in the datastore
+    if len(old_images) > 0:
+        store.remove(old_images)
+
+    # find representations for new images, they are appended to the end of the datastore
+    if len(new_images) > 0:
+        # completed images are appended periodically, an interrupted run resumes from there
+        __find_bulk_embeddings(
+            employees=new_images,
+            model_name=model_name,
+            detector_backend=detector_backend,
+            enforce_detection=enforce_detection,
+            align=align,
+            expand_percentage=expand_percentage,
+            normalization=normalization,
+            silent=silent,
+            batch_size=batch_size,
+            workers=workers,
+            checkpoint=store.append,
+        )  # add new images
+
+    if len(old_images) > 0 or len(new_images) > 0:
+        store.compact()
+        if not silent:
+            logger.info(f"There are now {len(store)} representations in {file_name}")
+
+    if refresh_database:
+        synchronized_versions[datastore_path] = (manifest.version, store.version)
+
+    return store
+
+
 def __find_bulk_embeddings(
     employees: Set[str],
     model_name: str = "VGG-Face",
@@ -351,9 +446,18 @@ def __find_bulk_embeddings(
     expand_percentage: int = 0,
     normalization: str = "base",
     silent: bool = False,
+    batch_size: int = 32,
+    workers: Optional[int] = None,
+    checkpoint: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    checkpoint_size: int = 100,
 ) -> List[Dict["str", Any]]:
     """
-    Find embeddings of a list of images
+    Find embeddings of a list of images in a pipeline. Images are decoded and hashed in a
+        thread pool, faces are detected in a detection worker, and detected faces are
+        represented in batches in the calling thread while next images are being prepared.
+        Detection has a single worker because detector models are shared singletons and
+        some of them are not thread-safe (e.g. opencv cascade classifier), they still use
+        multiple cores in their native inference.
 
     Args:
         employees (list): list of exact image paths
@@ -375,73 +479,169 @@ def __find_bulk_embeddings(
         normalization (bool): normalization technique
 
         silent (bool): enable or disable informative logging
+
+        batch_size (int): maximum number of faces fed to the model in a single call
+
+        workers (int): number of threads decoding and hashing images
+            (default is None for up to 4 threads)
+
+        checkpoint (callable): called with the representations of completed images
+            periodically, so that an interrupted run can resume from the last checkpoint
+            (default is None)
+
+        checkpoint_size (int): minimum number of images between two checkpoints
     Returns:
         representations (list): pivot list of dict with
             image name, hash, embedding and detected face area's coordinates
     """
-    representations = []
-    for employee in tqdm(
-        employees,
-        desc="Finding representations",
-        disable=silent,
-    ):
-        file_hash = image_utils.find_image_hash(employee)
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    workers = max(1, workers)
 
+    # each stage keeps a bounded number of images in flight to bound memory
+    queue_size = 2 * workers + batch_size
+
+    # build shared models once before worker threads use them
+    if detector_backend != "skip":
+        modeling.build_model(task="face_detector", model_name=detector_backend)
+    modeling.build_model(task="facial_recognition", model_name=model_name)
+
+    def decode(employee: str) -> Tuple[str, str, Optional[np.ndarray]]:
+        file_hash = image_utils.find_image_hash(employee)
+        try:
+            img, _ = image_utils.load_image(employee)
+        except ValueError as err:
+            logger.error(f"Exception while loading {employee}: {str(err)}")
+            img = None
+        return employee, file_hash, img
+
+    def detect(decoding: Future) -> Tuple[str, str, List[Dict[str, Any]]]:
+        employee, file_hash, img = decoding.result()
+        if img is None:
+            return employee, file_hash, []
         try:
             img_objs = detection.extract_faces(
-                img_path=employee,
+                img_path=img,
                 detector_backend=detector_backend,
                 grayscale=False,
                 enforce_detection=enforce_detection,
                 align=align,
                 expand_percentage=expand_percentage,
             )
-
         except ValueError as err:
             logger.error(f"Exception while extracting faces from {employee}: {str(err)}")
             img_objs = []
+        return employee, file_hash, img_objs
 
-        if len(img_objs) == 0:
-            representations.append(
-                {
-                    "identity": employee,
-                    "hash": file_hash,
-                    "embedding": None,
-                    "target_x": 0,
-                    "target_y": 0,
-                    "target_w": 0,
-                    "target_h": 0,
-                }
-            )
-        else:
-            for img_obj in img_objs:
-                img_content = img_obj["face"]
-                img_region = img_obj["facial_area"]
-                embedding_obj = representation.represent(
-                    img_path=img_content,
-                    model_name=model_name,
-                    enforce_detection=enforce_detection,
-                    detector_backend="skip",
-                    align=align,
-                    normalization=normalization,
-                )
-
-                img_representation = embedding_obj[0]["embedding"]
+    representations = []
+    checkpointed = 0
+    completed_images = 0
+
+    # faces waiting to be represented in the next batch
+    pending: List[Tuple[Dict[str, Any], np.ndarray]] = []
+
+    remaining_employees = iter(sorted(employees))
+    decoding_queue: Deque[Future] = deque()
+    detecting_queue: Deque[Future] = deque()
+
+    with ThreadPoolExecutor(workers) as decode_pool, ThreadPoolExecutor(
+        1
+    ) as detect_pool, tqdm(
+        total=len(employees), desc="Finding representations", disable=silent
+    ) as pbar:
+
+        def fill_queues():
+            while len(decoding_queue) < queue_size:
+                employee = next(remaining_employees, None)
+                if employee is None:
+                    break
+                decoding_queue.append(decode_pool.submit(decode, employee))
+            while len(decoding_queue) > 0 and len(detecting_queue) < queue_size:
+                detecting_queue.append(detect_pool.submit(detect, decoding_queue.popleft()))
+
+        fill_queues()
+        while len(detecting_queue) > 0:
+            employee, file_hash, img_objs = detecting_queue.popleft().result()
+            fill_queues()
+
+            if len(img_objs) == 0:
                 representations.append(
                     {
                         "identity": employee,
                         "hash": file_hash,
-                        "embedding": img_representation,
-                        "target_x": img_region["x"],
-                        "target_y": img_region["y"],
-                        "target_w": img_region["w"],
-                        "target_h": img_region["h"],
+                        "embedding": None,
+                        "target_x": 0,
+                        "target_y": 0,
+                        "target_w": 0,
+                        "target_h": 0,
                     }
                 )
+            else:
+                for img_obj in img_objs:
+                    img_region = img_obj["facial_area"]
+                    representations.append(
+                        {
+                            "identity": employee,
+                            "hash": file_hash,
+                            "embedding": None,
+                            "target_x": img_region["x"],
+                            "target_y": img_region["y"],
+                            "target_w": img_region["w"],
+                            "target_h": img_region["h"],
+                        }
+                    )
+                    pending.append((representations[-1], img_obj["face"]))
+
+            # faces of different images are represented together
+            if len(pending) >= batch_size:
+                __represent_pending_faces(pending, model_name, normalization, batch_size)
+
+            completed_images += 1
+            pbar.update(1)
+            pbar.set_postfix(faces=len(representations) - len(pending))
+
+            # all faces of the images up to now are represented if nothing is pending
+            if checkpoint is not None and len(pending) == 0:
+                if completed_images >= checkpoint_size:
+                    checkpoint(representations[checkpointed:])
+                    checkpointed = len(representations)
+                    completed_images = 0
+
+    __represent_pending_faces(pending, model_name, normalization, batch_size)
+    if checkpoint is not None and checkpointed < len(representations):
+        checkpoint(representations[checkpointed:])
 
     return representations
 
 
+def __represent_pending_faces(
+    pending: List[Tuple[Dict[str, Any], np.ndarray]],
+    model_name: str,
+    normalization: str,
+    batch_size: int,
+) -> None:
+    """
+    Find embeddings of the faces waiting for a batch, and set them into their representations
+    Args:
+        pending (list): representation and extracted face pairs. It is emptied.
+        model_name (str): model for face recognition
+        normalization (str): normalization technique
+        batch_size (int): maximum number of faces fed to the model in a single call
+    """
+    if len(pending) == 0:
+        return
+
+    embeddings = representation.find_embeddings(
+        faces=[face for _, face in pending],
+        model_name=model_name,
+        normalization=normalization,
+        batch_size=batch_size,
+    )
+    for (current_representation, _), embedding in zip(pending, embeddings):
+        current_representation["embedding"] = embedding
+    pending.clear()
+
+
 def find_batched(
     representations: List[Dict[str, Any]],
     source_objs: List[Dict[str, Any]],
@@ -452,6 +652,8 @@ def find_batched(
     threshold: Optional[float] = None,
     normalization: str = "base",
     anti_spoofing: bool = False,
+    top_k: Optional[int] = None,
+    batch_size: int = 32,
 ) -> List[List[Dict[str, Any]]]:
     """
     Perform batched face recognition by comparing source face embeddings with a set of
@@ -499,11 +701,19 @@ def find_batched(
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        top_k (int): Return only the closest k identities for each source face
+            (default is None for all identities closer than the threshold).
+
+        batch_size (int): Maximum number of source faces fed to the model in a single call
+            (default is 32).
+
     Returns:
         List[List[Dict[str, Any]]]:
             A list where each element corresponds to a source face and
             contains a list of dictionaries with matching faces.
     """
+    # enforce_detection and align are kept for backward compatibility, faces are already extracted
+    # pylint: disable=unused-argument
     embeddings_list = []
     valid_mask = []
     metadata = set()
@@ -536,19 +746,16 @@ def find_batched(
         if anti_spoofing and not source_obj.get("is_real", True):
             raise ValueError("Spoof detected in the given image.")
 
-        source_img = source_obj["face"]
-        source_region = source_obj["facial_area"]
+    # all faces in the source image are represented together
+    target_representations = representation.find_embeddings(
+        faces=[source_obj["face"] for source_obj in source_objs],
+        model_name=model_name,
+        normalization=normalization,
+        batch_size=batch_size,
+    )
 
-        target_embedding_obj = representation.represent(
-            img_path=source_img,
-            model_name=model_name,
-            enforce_detection=enforce_detection,
-            detector_backend="skip",
-            align=align,
-            normalization=normalization,
-        )
-        # it is safe to access 0 index because we already fed detected face to represent function
-        target_representation = target_embedding_obj[0]["embedding"]
+    for source_obj, target_representation in zip(source_objs, target_representations):
+        source_region = source_obj["facial_area"]
 
         target_embeddings.append(target_representation)
         source_regions.append(source_region)
@@ -590,7 +797,7 @@ def find_batched(
         mask = target_distances <= target_threshold
         filtered_data = {key: value[mask] for key, value in result_data.items()}
 
-        sorted_indices = np.argsort(filtered_data["distance"])
+        sorted_indices = np.argsort(filtered_data["distance"])[:top_k]
         sorted_data = {key: value[sorted_indices] for key, value in filtered_data.items()}
 
         num_results = len(sorted_data["distance"])
@@ -6,7 +6,7 @@ import numpy as np
 
 # project dependencies
 from deepface.commons import image_utils
-from deepface.modules import modeling, detection, preprocessing
+from deepface.modules import modeling, detection, preprocessing, caching
 from deepface.models.FacialRecognition import FacialRecognition
 
 
@@ -20,6 +20,7 @@ def represent(
     normalization: str = "base",
     anti_spoofing: bool = False,
     max_faces: Optional[int] = None,
+    batch_size: int = 32,
 ) -> List[Dict[str, Any]]:
     """
     Represent facial images as multi-dimensional vector embeddings.
@@ -49,6 +50,9 @@ def represent(
 
         max_faces (int): Set a limit on the number of faces to be processed (default is None).
 
+        batch_size (int): Maximum number of faces fed to the model in a single call
+            (default is 32).
+
     Returns:
         results (List[Dict[str, Any]]): A list of dictionaries, each containing the
             following fields:
@@ -63,26 +67,42 @@ def represent(
         - face_confidence (float): Confidence score of face detection. If `detector_backend` is set
             to 'skip', the confidence will be 0 and is nonsensical.
     """
-    resp_objs = []
-
-    model: FacialRecognition = modeling.build_model(
-        task="facial_recognition", model_name=model_name
+    # same image with same parameters is served from the cache if caching is enabled
+    cache_key = caching.find_key(
+        "represent",
+        img_path,
+        model_name=model_name,
+        enforce_detection=enforce_detection,
+        detector_backend=detector_backend,
+        align=align,
+        expand_percentage=expand_percentage,
+        normalization=normalization,
+        anti_spoofing=anti_spoofing,
+        max_faces=max_faces,
     )
+    resp_objs = caching.get(cache_key)
+    if resp_objs is not None:
+        return resp_objs
+
+    resp_objs = []
 
     # ---------------------------------
     # we have run pre-process in verification. so, this can be skipped if it is coming from verify.
-    target_size = model.input_shape
     if detector_backend != "skip":
+        # faces are kept in uint8 bgr to preprocess them in a single pass
         img_objs = detection.extract_faces(
             img_path=img_path,
             detector_backend=detector_backend,
             grayscale=False,
+            color_face="bgr",
+            normalize_face=False,
             enforce_detection=enforce_detection,
             align=align,
             expand_percentage=expand_percentage,
             anti_spoofing=anti_spoofing,
             max_faces=max_faces,
         )
+        color_face = "bgr"
     else:  # skip
         # Try load. If load error, will raise exception internal
         img, _ = image_utils.load_image(img_path)
@@ -98,6 +118,8 @@ def represent(
                 "confidence": 0,
             }
         ]
+        # given image is fed in reversed channel order as it always was
+        color_face = "rgb"
     # ---------------------------------
 
     if max_faces is not None and max_faces < len(img_objs):
@@ -113,32 +135,74 @@ def represent(
     for img_obj in img_objs:
         if anti_spoofing is True and img_obj.get("is_real", True) is False:
             raise ValueError("Spoof detected in the given image.")
-        img = img_obj["face"]
-
-        # rgb to bgr
-        img = img[:, :, ::-1]
 
-        region = img_obj["facial_area"]
-        confidence = img_obj["confidence"]
-
-        # resize to expected shape of ml model
-        img = preprocessing.resize_image(
-            img=img,
-            # thanks to DeepId (!)
-            target_size=(target_size[1], target_size[0]),
-        )
-
-        # custom normalization
-        img = preprocessing.normalize_input(img=img, normalization=normalization)
-
-        embedding = model.forward(img)
+    embeddings = find_embeddings(
+        faces=[img_obj["face"] for img_obj in img_objs],
+        model_name=model_name,
+        normalization=normalization,
+        batch_size=batch_size,
+        color_face=color_face,
+    )
 
+    for img_obj, embedding in zip(img_objs, embeddings):
         resp_objs.append(
             {
                 "embedding": embedding,
-                "facial_area": region,
-                "face_confidence": confidence,
+                "facial_area": img_obj["facial_area"],
+                "face_confidence": img_obj["confidence"],
             }
         )
 
+    caching.put(cache_key, resp_objs)
+
     return resp_objs
+
+
+def find_embeddings(
+    faces: List[np.ndarray],
+    model_name: str = "VGG-Face",
+    normalization: str = "base",
+    batch_size: int = 32,
+    color_face: str = "rgb",
+) -> List[List[float]]:
+    """
+    Find embeddings of extracted faces with batched model calls
+
+    Args:
+        faces (List[np.ndarray]): faces in RGB as extract_faces returns, or in uint8
+
+        model_name (str): Model for face recognition. Options: VGG-Face, Facenet, Facenet512,
+            OpenFace, DeepFace, DeepID, Dlib, ArcFace, SFace and GhostFaceNet
+
+        normalization (string): Normalize the input image before feeding it to the model.
+            Default is base. Options: base, raw, Facenet, Facenet2018, VGGFace, VGGFace2, ArcFace
+
+        batch_size (int): maximum number of faces fed to the model in a single call
+            (default is 32).
+
+        color_face (str): rgb or bgr color order of the faces (default is rgb).
+
+    Returns:
+        embeddings (List[List[float]]): multi-dimensional vector of each face
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be a positive integer but it is {batch_size}")
+
+    model: FacialRecognition = modeling.build_model(
+        task="facial_recognition", model_name=model_name
+    )
+    target_size = model.input_shape
+
+    embeddings = []
+    for start in range(0, len(faces), batch_size):
+        # resized, padded and normalized into a reused buffer in bgr
+        imgs = preprocessing.prepare_faces(
+            faces=faces[start : start + batch_size],
+            # thanks to DeepId (!)
+            target_size=(target_size[1], target_size[0]),
+            normalization=normalization,
+            color_face=color_face,
+        )
+        embeddings += model.forward_batch(imgs).tolist()
+
+    return embeddings
@@ -0,0 +1,324 @@
+# built-in dependencies
+from typing import List, Optional, Tuple, Union
+
+# 3rd party dependencies
+import numpy as np
+
+
+class EmbeddingMatrix:
+    """
+    Contiguous float32 (N, D) matrix of database embeddings with precomputed norms.
+        Distances of a target embedding to all database embeddings are calculated with
+        a single matrix-vector product instead of one distance calculation per item.
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        valid: Optional[np.ndarray] = None,
+        norms: Optional[np.ndarray] = None,
+    ):
+        """
+        Args:
+            embeddings (np.ndarray): (N, D) float32 embeddings. Memory-mapped arrays are
+                used as they are without copying.
+            valid (np.ndarray): (N,) mask of the items to be searched. Others never match
+                (default is None for all items).
+            norms (np.ndarray): (N,) precomputed l2 norms of the embeddings
+                (default is None to calculate them).
+        """
+        self.embeddings = embeddings
+        self.valid = np.ones(embeddings.shape[0], dtype=bool) if valid is None else valid
+
+        if norms is None:
+            norms = np.linalg.norm(embeddings, axis=1)
+        # zero vectors are just available for invalid items, avoid division by zero for them
+        self.norms = np.where(norms == 0, 1, norms)
+
+    @classmethod
+    def from_list(
+        cls, embeddings: List[Optional[Union[List[float], np.ndarray]]]
+    ) -> "EmbeddingMatrix":
+        """
+        Build an embedding matrix from a list of embeddings
+        Args:
+            embeddings (list): embeddings of the database items. Items without a face
+                (None) are kept to preserve indices, but they never match.
+        Returns:
+            embedding_matrix (EmbeddingMatrix)
+        """
+        valid = np.array([embedding is not None for embedding in embeddings], dtype=bool)
+
+        dims = next((len(embedding) for embedding in embeddings if embedding is not None), 0)
+        matrix = np.zeros((len(embeddings), dims), dtype=np.float32)
+        if valid.any():
+            matrix[valid] = np.asarray(
+                [embedding for embedding in embeddings if embedding is not None],
+                dtype=np.float32,
+            )
+
+        return cls(embeddings=matrix, valid=valid)
+
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+
+    @property
+    def dims(self) -> int:
+        return self.embeddings.shape[1]
+
+    def find_distances(
+        self,
+        target: Union[List[float], np.ndarray],
+        distance_metric: str,
+        rows: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Find distances of a target embedding to all embeddings in the matrix
+        Args:
+            target (list or np.ndarray): target embedding with D dimensions
+            distance_metric (str): cosine, euclidean or euclidean_l2
+            rows (np.ndarray): calculate distances just for these rows
+                (default is None for all rows)
+        Returns:
+            distances (np.ndarray): (N,) distances or distances of the given rows.
+                Items without a face have inf distance.
+        """
+        target = np.asarray(target, dtype=np.float32)
+
+        # matrix has no embeddings at all if none of its items has a face
+        if self.dims == 0 or len(self) == 0:
+            return np.full(len(self) if rows is None else len(rows), np.inf)
+
+        if target.shape[0] != self.dims:
+            raise ValueError(
+                "Source and target embeddings must have same dimensions but "
+                + f"{target.shape[0]}:{self.dims}. Model structure may change"
+                + " after datastore created. Delete it and re-run."
+            )
+
+        if rows is None:
+            embeddings, norms, valid = self.embeddings, self.norms, self.valid
+        else:
+            embeddings, norms, valid = self.embeddings[rows], self.norms[rows], self.valid[rows]
+
+        target_norm = np.linalg.norm(target)
+        dot_products = embeddings @ target  # (N,)
+
+        if distance_metric == "cosine":
+            distances = 1 - dot_products / (norms * target_norm)
+        elif distance_metric == "euclidean":
+            squared = norms**2 - 2 * dot_products + target_norm**2
+            distances = np.sqrt(np.maximum(squared, 0))
+        elif distance_metric == "euclidean_l2":
+            cosine_similarities = dot_products / (norms * target_norm)
+            distances = np.sqrt(np.maximum(2 - 2 * cosine_similarities, 0))
+        else:
+            raise ValueError("Invalid distance_metric passed - ", distance_metric)
+
+        # same precision with verification.find_distance
+        distances = np.round(distances.astype(np.float64), 6)
+        distances[~valid] = np.inf
+        return distances
+
+    def search(
+        self,
+        target: Union[List[float], np.ndarray],
+        distance_metric: str,
+        threshold: float,
+        top_k: Optional[int] = None,
+        rows: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the database items closer than a threshold to a target embedding
+        Args:
+            target (list or np.ndarray): target embedding with D dimensions
+            distance_metric (str): cosine, euclidean or euclidean_l2
+            threshold (float): maximum distance to be counted as a match
+            top_k (int): return only the closest k matches (default is None for all matches)
+            rows (np.ndarray): search just in these rows (default is None for all rows)
+        Returns:
+            indices (np.ndarray): indices of the matched items, sorted by distance ascending
+            distances (np.ndarray): distances of the matched items
+        """
+        distances = self.find_distances(target, distance_metric, rows=rows)
+        indices = np.flatnonzero(distances <= threshold)
+
+        if top_k is not None and top_k < len(indices):
+            # partial selection is linear while sorting all matches is not
+            partition = np.argpartition(distances[indices], top_k)[:top_k]
+            indices = indices[partition]
+
+        indices = indices[np.argsort(distances[indices], kind="stable")]
+        distances = distances[indices]
+
+        if rows is not None:
+            indices = rows[indices]
+        return indices, distances
+
+
+class IVFIndex:
+    """
+    Inverted file index for approximate nearest neighbour search over an embedding matrix.
+        Normalized embeddings are clustered with k-means, and each row is kept in the list
+        of its closest centroid. A query calculates exact distances just for the rows in
+        the lists of its closest centroids, so it visits a fraction of the database.
+        Probing more lists increases recall and latency.
+    """
+
+    def __init__(
+        self,
+        embedding_matrix: EmbeddingMatrix,
+        centroids: np.ndarray,
+        assignments: np.ndarray,
+        trained_rows: int,
+    ):
+        """
+        Args:
+            embedding_matrix (EmbeddingMatrix): indexed embeddings
+            centroids (np.ndarray): (K, D) unit length centroids
+            assignments (np.ndarray): (N,) list of each row, -1 for rows without a face
+            trained_rows (int): number of rows when the centroids were trained
+        """
+        self.embedding_matrix = embedding_matrix
+        self.centroids = centroids.astype(np.float32)
+        self.assignments = assignments.astype(np.int32)
+        self.trained_rows = trained_rows
+        self.__build_lists()
+
+    @classmethod
+    def build(
+        cls,
+        embedding_matrix: EmbeddingMatrix,
+        n_lists: Optional[int] = None,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """
+        Train centroids and assign all rows of an embedding matrix
+        Args:
+            embedding_matrix (EmbeddingMatrix): embeddings to be indexed
+            n_lists (int): number of centroids (default is None for square root of the rows)
+            iterations (int): k-means iterations (default is 10)
+            seed (int): seed of the random generator to sample initial centroids
+        Returns:
+            index (IVFIndex)
+        """
+        rng = np.random.default_rng(seed=seed)
+        valid_rows = np.flatnonzero(embedding_matrix.valid)
+        if len(valid_rows) == 0:
+            raise ValueError("At least one embedding is required to build an index")
+
+        if n_lists is None:
+            n_lists = int(np.sqrt(len(valid_rows)))
+        n_lists = max(1, min(n_lists, len(valid_rows)))
+
+        # train on a sample, it is enough for centroids and bounds the training cost
+        sample_size = min(len(valid_rows), 64 * n_lists)
+        sample_rows = np.sort(rng.choice(valid_rows, size=sample_size, replace=False))
+        sample = cls.__normalize(embedding_matrix, sample_rows)
+
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)]
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(labels, kind="stable")
+            clusters, starts = np.unique(labels[order], return_index=True)
+            sums = np.add.reduceat(sample[order], starts, axis=0)
+
+            # empty clusters keep their previous centroids
+            centroids[clusters] = sums / np.maximum(
+                np.linalg.norm(sums, axis=1, keepdims=True), 1e-12
+            )
+
+        index = cls(
+            embedding_matrix=embedding_matrix,
+            centroids=centroids,
+            assignments=np.zeros(0, dtype=np.int32),
+            trained_rows=len(valid_rows),
+        )
+        index.update(embedding_matrix)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.assignments)
+
+    def update(self, embedding_matrix: EmbeddingMatrix) -> bool:
+        """
+        Assign the rows appended to the embedding matrix after the last update
+        Args:
+            embedding_matrix (EmbeddingMatrix): embeddings with the same leading rows
+        Returns:
+            updated (bool): some rows are assigned
+        """
+        self.embedding_matrix = embedding_matrix
+        new_rows = np.arange(len(self.assignments), len(embedding_matrix))
+        if len(new_rows) == 0:
+            return False
+
+        assignments = np.full(len(new_rows), -1, dtype=np.int32)
+        valid = embedding_matrix.valid[new_rows]
+
+        # bound memory of the similarity matrix for large appends
+        chunk_size = 65536
+        valid_rows = new_rows[valid]
+        labels = np.empty(len(valid_rows), dtype=np.int32)
+        for start in range(0, len(valid_rows), chunk_size):
+            chunk = self.__normalize(embedding_matrix, valid_rows[start : start + chunk_size])
+            labels[start : start + chunk_size] = np.argmax(chunk @ self.centroids.T, axis=1)
+        assignments[valid] = labels
+
+        self.assignments = np.concatenate([self.assignments, assignments])
+        self.__build_lists()
+        return True
+
+    def search(
+        self,
+        target: Union[List[float], np.ndarray],
+        distance_metric: str,
+        threshold: float,
+        top_k: Optional[int] = None,
+        probes: int = 8,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the database items closer than a threshold to a target embedding approximately
+        Args:
+            target (list or np.ndarray): target embedding with D dimensions
+            distance_metric (str): cosine, euclidean or euclidean_l2
+            threshold (float): maximum distance to be counted as a match
+            top_k (int): return only the closest k matches (default is None for all matches)
+            probes (int): number of closest lists to be searched. Higher values increase
+                recall and latency (default is 8).
+        Returns:
+            indices (np.ndarray): indices of the matched items, sorted by distance ascending
+            distances (np.ndarray): distances of the matched items
+        """
+        target = np.asarray(target, dtype=np.float32)
+        probes = max(1, min(probes, self.centroids.shape[0]))
+
+        similarities = self.centroids @ (target / max(np.linalg.norm(target), 1e-12))
+        closest_lists = np.argpartition(-similarities, probes - 1)[:probes]
+        rows = np.concatenate(
+            [self.order[self.offsets[i] : self.offsets[i + 1]] for i in closest_lists]
+        )
+        # keep memory-mapped reads in file order
+        rows.sort()
+
+        return self.embedding_matrix.search(
+            target=target,
+            distance_metric=distance_metric,
+            threshold=threshold,
+            top_k=top_k,
+            rows=rows,
+        )
+
+    def __build_lists(self) -> None:
+        # rows of list i are order[offsets[i]:offsets[i + 1]]
+        n_lists = self.centroids.shape[0]
+        assigned_rows = np.flatnonzero(self.assignments >= 0)
+        self.order = assigned_rows[np.argsort(self.assignments[assigned_rows], kind="stable")]
+        counts = np.bincount(self.assignments[assigned_rows], minlength=n_lists)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    @staticmethod
+    def __normalize(embedding_matrix: EmbeddingMatrix, rows: np.ndarray) -> np.ndarray:
+        embeddings = np.asarray(embedding_matrix.embeddings[rows], dtype=np.float32)
+        return embeddings / embedding_matrix.norms[rows][:, None]
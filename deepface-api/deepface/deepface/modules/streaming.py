@@ -1,7 +1,8 @@
 # built-in dependencies
 import os
 import time
-from typing import List, Tuple, Optional
+import threading
+from typing import Any, Dict, List, Tuple, Optional
 import traceback
 
 # 3rd party dependencies
@@ -11,6 +12,9 @@ import cv2
 
 # project dependencies
 from deepface import DeepFace
+from deepface.modules import demography, detection, recognition, representation, verification
+from deepface.modules.tracking import FaceTracker, Track
+from deepface.modules.search import EmbeddingMatrix
 from deepface.commons.logger import Logger
 
 logger = Logger()
@@ -22,7 +26,7 @@ os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
 IDENTIFIED_IMG_SIZE = 112
 TEXT_COLOR = (255, 255, 255)
 
-# pylint: disable=unused-variable
+# pylint: disable=unused-variable, too-many-instance-attributes, too-few-public-methods
 def analysis(
     db_path: str,
     model_name="VGG-Face",
@@ -33,6 +37,8 @@ def analysis(
     time_threshold=5,
     frame_threshold=5,
     anti_spoofing: bool = False,
+    pipelined: bool = True,
+    detection_interval: int = 10,
 ):
     """
     Run real time face recognition and facial attribute analysis
@@ -62,20 +68,44 @@ def analysis(
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        pipelined (boolean): Capture frames, detect faces and render the video in separate
+            threads. Only the latest frame is kept, so the video stays smooth while faces are
+            detected as fast as the cpu allows. Set to False to process every frame one by one
+            (default is True).
+
+        detection_interval (int): Faces are followed with optical flow between detections in
+            pipelined mode. Detector runs every detection_interval frames, or as soon as a face
+            is lost. Faces are analyzed once when they appear (default is 10).
+
     Returns:
         None
     """
     # initialize models
     build_demography_models(enable_face_analysis=enable_face_analysis)
     build_facial_recognition_model(model_name=model_name)
-    # call a dummy find function for db_path once to create embeddings before starting webcam
-    _ = search_identity(
-        detected_face=np.zeros([224, 224, 3]),
+    # load the facial database into memory once before starting webcam, then keep it fresh
+    gallery = IdentityGallery(
         db_path=db_path,
+        model_name=model_name,
         detector_backend=detector_backend,
         distance_metric=distance_metric,
-        model_name=model_name,
     )
+    gallery.refresh()
+    gallery.start()
+
+    if pipelined:
+        __analyze_in_pipeline(
+            gallery=gallery,
+            detector_backend=detector_backend,
+            enable_face_analysis=enable_face_analysis,
+            source=source,
+            time_threshold=time_threshold,
+            frame_threshold=frame_threshold,
+            anti_spoofing=anti_spoofing,
+            detection_interval=detection_interval,
+        )
+        gallery.stop()
+        return
 
     freezed_img = None
     freeze = False
@@ -131,10 +161,7 @@ def analysis(
                     img=img,
                     faces_coordinates=faces_coordinates,
                     detected_faces=detected_faces,
-                    db_path=db_path,
-                    detector_backend=detector_backend,
-                    distance_metric=distance_metric,
-                    model_name=model_name,
+                    gallery=gallery,
                 )
 
                 # freeze the img after analysis
@@ -161,6 +188,7 @@ def analysis(
     # kill open cv things
     cap.release()
     cv2.destroyAllWindows()
+    gallery.stop()
 
 
 def build_facial_recognition_model(model_name: str) -> None:
@@ -176,88 +204,609 @@ def build_facial_recognition_model(model_name: str) -> None:
     logger.info(f"{model_name} is built")
 
 
-def search_identity(
-    detected_face: np.ndarray,
-    db_path: str,
-    model_name: str,
-    detector_backend: str,
-    distance_metric: str,
-) -> Tuple[Optional[str], Optional[np.ndarray]]:
+class IdentityGallery:
     """
-    Search an identity in facial database.
-    Args:
-        detected_face (np.ndarray): extracted individual facial image
-        db_path (string): Path to the folder containing image files. All detected faces
-            in the database will be considered in the decision-making process.
-        model_name (str): Model for face recognition. Options: VGG-Face, Facenet, Facenet512,
-            OpenFace, DeepFace, DeepID, Dlib, ArcFace, SFace and GhostFaceNet (default is VGG-Face).
-        detector_backend (string): face detector backend. Options: 'opencv', 'retinaface',
-            'mtcnn', 'ssd', 'dlib', 'mediapipe', 'yolov8', 'centerface' or 'skip'
-            (default is opencv).
-        distance_metric (string): Metric for measuring similarity. Options: 'cosine',
-            'euclidean', 'euclidean_l2' (default is cosine).
-    Returns:
-        result (tuple): result consisting of following objects
-            identified image path (str)
-            identified image itself (np.ndarray)
+    Embeddings of a facial database kept in memory with 112x112 thumbnails of their faces.
+        Detected faces are aligned and embedded as find does, and searched in memory, while
+        the database is synchronized with its datastore in a background thread. Detector
+        calls of the synchronization and of the inference worker share the lock of the
+        detector, so they never interleave.
     """
-    target_path = None
-    try:
-        dfs = DeepFace.find(
-            img_path=detected_face,
-            db_path=db_path,
-            model_name=model_name,
-            detector_backend=detector_backend,
-            distance_metric=distance_metric,
-            enforce_detection=False,
-            silent=True,
-        )
-    except ValueError as err:
-        if f"No item found in {db_path}" in str(err):
+
+    def __init__(
+        self,
+        db_path: str,
+        model_name: str = "VGG-Face",
+        detector_backend: str = "opencv",
+        distance_metric: str = "cosine",
+        refresh_interval: float = 30,
+    ):
+        """
+        Args:
+            db_path (string): Path to the folder containing image files.
+            model_name (str): Model for face recognition (default is VGG-Face).
+            detector_backend (string): face detector backend for the database images
+                (default is opencv).
+            distance_metric (string): Metric for measuring similarity. Options: 'cosine',
+                'euclidean', 'euclidean_l2' (default is cosine).
+            refresh_interval (float): seconds between two synchronizations of the database
+                in background (default is 30).
+        """
+        self.db_path = db_path
+        self.model_name = model_name
+        self.detector_backend = detector_backend
+        self.distance_metric = distance_metric
+        self.refresh_interval = refresh_interval
+        self.threshold = verification.find_threshold(model_name, distance_metric)
+
+        # embedding matrix, metadata of its rows and thumbnails of the faces (keyed by identity,
+        # hash and facial area) are replaced at once not to be mixed while being searched
+        self.snapshot: Tuple[
+            Optional[EmbeddingMatrix],
+            List[Dict[str, Any]],
+            Dict[Tuple[str, str, int, int, int, int], np.ndarray],
+        ] = (None, [], {})
+        self.version = None
+
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> None:
+        """
+        Synchronize the facial database and reload the gallery if the datastore is changed
+        """
+        try:
+            store = recognition.synchronize(
+                db_path=self.db_path,
+                model_name=self.model_name,
+                detector_backend=self.detector_backend,
+                enforce_detection=False,
+                silent=True,
+            )
+        except ValueError as err:
+            if f"No item found in {self.db_path}" not in str(err):
+                raise err
             logger.warn(
-                f"No item is found in {db_path}."
+                f"No item is found in {self.db_path}."
                 "So, no facial recognition analysis will be performed."
             )
-            dfs = []
+            self.snapshot = (None, [], {})
+            return
+
+        if store.version == self.version:
+            return
+
+        embedding_matrix, row_metadata = store.find_embedding_matrix()
+        rows = np.flatnonzero(embedding_matrix.valid)
+
+        # rows are copied from the memory-mapped store not to touch the disk while searching
+        _, _, cached_thumbnails = self.snapshot
+        thumbnails = {}
+        for row in rows:
+            key = self.__find_thumbnail_key(row_metadata[row])
+            thumbnail = cached_thumbnails.get(key)
+            if thumbnail is None:
+                thumbnail = self.__load_thumbnail(row_metadata[row])
+            thumbnails[key] = thumbnail
+
+        self.snapshot = (
+            EmbeddingMatrix(
+                embeddings=np.array(embedding_matrix.embeddings[rows]),
+                norms=embedding_matrix.norms[rows],
+            ),
+            [row_metadata[row] for row in rows],
+            thumbnails,
+        )
+        self.version = store.version
+        logger.info(f"{len(rows)} faces are loaded from {self.db_path}")
+
+    def start(self) -> None:
+        """
+        Start to refresh the gallery periodically in a background thread
+        """
+        self.thread = threading.Thread(target=self.__refresh_periodically, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop refreshing the gallery in background
+        """
+        self.stopped.set()
+
+    def search_identities(
+        self, detected_faces: List[np.ndarray]
+    ) -> List[Tuple[Optional[str], Optional[np.ndarray]]]:
+        """
+        Search the identities of detected faces in memory
+        Args:
+            detected_faces (list): extracted facial images in BGR
+        Returns:
+            results (list): tuple of identified image name and its thumbnail for each face,
+                or (None, None) if it is not identified
+        """
+        embedding_matrix, row_metadata, thumbnails = self.snapshot
+        if embedding_matrix is None or len(detected_faces) == 0:
+            return [(None, None)] * len(detected_faces)
+
+        target_embeddings = self.find_embeddings(detected_faces)
+
+        results = []
+        for target_embedding in target_embeddings:
+            indices, _ = embedding_matrix.search(
+                target_embedding, self.distance_metric, threshold=self.threshold, top_k=1
+            )
+            if len(indices) == 0:
+                results.append((None, None))
+                continue
+
+            metadata = row_metadata[indices[0]]
+            target_path = metadata["identity"]
+            logger.info(f"Hello, {target_path}")
+            results.append(
+                (
+                    os.path.basename(target_path),
+                    thumbnails[self.__find_thumbnail_key(metadata)],
+                )
+            )
+        return results
+
+    def find_embeddings(self, detected_faces: List[np.ndarray]) -> List[List[float]]:
+        """
+        Find embeddings of detected faces as find function does for a face. Embeddings of
+            the database are found for aligned faces, so each face is detected again in its
+            crop with the detector of the database and aligned before it is embedded.
+        Args:
+            detected_faces (list): extracted facial images in BGR
+        Returns:
+            embeddings (list): embedding of each face
+        """
+        faces = []
+        for detected_face in detected_faces:
+            face_objs = detection.extract_faces(
+                img_path=detected_face,
+                detector_backend=self.detector_backend,
+                enforce_detection=False,
+                align=True,
+                color_face="bgr",
+                normalize_face=False,
+            )
+            # whole crop is returned if its face is not detected again
+            faces.append(face_objs[0]["face"])
+
+        # faces of a frame are embedded together
+        return representation.find_embeddings(
+            faces=faces, model_name=self.model_name, color_face="bgr"
+        )
+
+    def __refresh_periodically(self) -> None:
+        while not self.stopped.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as err:  # pylint: disable=broad-except
+                logger.error(f"Facial database cannot be refreshed: {err}")
+
+    @staticmethod
+    def __find_thumbnail_key(metadata: Dict[str, Any]) -> Tuple[str, str, int, int, int, int]:
+        return (
+            metadata["identity"],
+            metadata["hash"],
+            metadata["target_x"],
+            metadata["target_y"],
+            metadata["target_w"],
+            metadata["target_h"],
+        )
+
+    @staticmethod
+    def __load_thumbnail(metadata: Dict[str, Any]) -> np.ndarray:
+        img = cv2.imread(metadata["identity"])
+        if img is None:
+            return np.zeros((IDENTIFIED_IMG_SIZE, IDENTIFIED_IMG_SIZE, 3), dtype=np.uint8)
+
+        x, y = max(int(metadata["target_x"]), 0), max(int(metadata["target_y"]), 0)
+        w, h = int(metadata["target_w"]), int(metadata["target_h"])
+        face = img[y : y + h, x : x + w]
+
+        # show image as is if its facial area is not available
+        if face.size == 0:
+            face = img
+        return cv2.resize(face, (IDENTIFIED_IMG_SIZE, IDENTIFIED_IMG_SIZE))
+
+
+class FrameGrabber:
+    """
+    Reads the frames of a video source in a background thread and keeps only the latest one,
+        so slow consumers drop frames instead of queueing them up in the capture driver.
+    """
+
+    def __init__(self, source: Any, stats: Optional["StreamStats"] = None):
+        """
+        Args:
+            source (Any): camera index, video file or stream url
+            stats (StreamStats): stats to count captured frames (default is None)
+        """
+        self.cap = cv2.VideoCapture(source)
+        self.stats = stats
+
+        # video files are read at their own frame rate, cameras as fast as they deliver
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        is_file = self.cap.get(cv2.CAP_PROP_FRAME_COUNT) > 0
+        self.frame_interval = 1 / fps if is_file and fps > 0 else 0
+
+        self.condition = threading.Condition()
+        self.frame: Optional[np.ndarray] = None
+        self.frame_index = 0
+        self.captured_at = 0.0
+        self.stopped = False
+        self.thread = threading.Thread(target=self.__capture, daemon=True)
+
+    def start(self) -> None:
+        """
+        Start to capture frames in background
+        """
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop capturing frames and release the video source
+        """
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        self.thread.join(timeout=1)
+
+    def read(
+        self, last_index: int = 0, timeout: Optional[float] = None
+    ) -> Tuple[Optional[np.ndarray], int, float]:
+        """
+        Wait for a frame newer than the last read one
+        Args:
+            last_index (int): index of the last read frame (default is 0)
+            timeout (float): maximum seconds to wait (default is None)
+        Returns:
+            frame (np.ndarray): latest frame, None if there is no newer frame
+            frame_index (int): index of the frame
+            captured_at (float): perf_counter time when the frame was captured
+        """
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.frame_index > last_index or self.stopped, timeout=timeout
+            )
+            if self.frame_index <= last_index:
+                return None, last_index, 0.0
+            return self.frame, self.frame_index, self.captured_at
+
+    def __capture(self) -> None:
+        next_capture = time.perf_counter()
+        while not self.stopped:
+            has_frame, frame = self.cap.read()
+            if not has_frame:
+                break
+
+            with self.condition:
+                self.frame = frame
+                self.frame_index += 1
+                self.captured_at = time.perf_counter()
+                self.condition.notify_all()
+            if self.stats is not None:
+                self.stats.tick("capture")
+
+            if self.frame_interval > 0:
+                next_capture += self.frame_interval
+                time.sleep(max(next_capture - time.perf_counter(), 0))
+
+        self.cap.release()
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+
+class StreamStats:
+    """
+    Exponential moving averages of the frame rates of capture, detection, inference and
+        render stages, and of the end-to-end latency of a stream
+    """
+
+    def __init__(self, smoothing: float = 0.1):
+        """
+        Args:
+            smoothing (float): weight of the latest measurement (default is 0.1)
+        """
+        self.smoothing = smoothing
+        self.intervals: Dict[str, float] = {}
+        self.last_ticks: Dict[str, float] = {}
+        self.latency = 0.0
+        self.lock = threading.Lock()
+
+    def tick(self, stage: str) -> None:
+        """
+        Count a processed frame of a stage
+        Args:
+            stage (str): capture, detection, inference or render
+        """
+        with self.lock:
+            now = time.perf_counter()
+            last_tick = self.last_ticks.get(stage)
+            self.last_ticks[stage] = now
+            if last_tick is not None:
+                self.intervals[stage] = self.__smooth(self.intervals.get(stage), now - last_tick)
+
+    def add_latency(self, latency: float) -> None:
+        """
+        Add the latency between capturing a frame and rendering its results
+        Args:
+            latency (float): seconds
+        """
+        with self.lock:
+            self.latency = self.__smooth(self.latency or None, latency)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns:
+            summary (dict): capture_fps, detection_fps, inference_fps, render_fps
+                and latency_ms
+        """
+        with self.lock:
+            summary = {
+                f"{stage}_fps": 1 / self.intervals[stage] if self.intervals.get(stage) else 0.0
+                for stage in ["capture", "detection", "inference", "render"]
+            }
+            summary["latency_ms"] = 1000 * self.latency
+            return summary
+
+    def __smooth(self, average: Optional[float], value: float) -> float:
+        if average is None:
+            return value
+        return (1 - self.smoothing) * average + self.smoothing * value
+
+
+class StreamState:
+    """
+    Latest inference results shared between the inference worker and the render loop
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.faces_coordinates: List[Tuple[int, int, int, int, bool, float]] = []
+        self.num_frames_with_faces = 0
+        # index and capture time of the frame that results belong to
+        self.frame_index = 0
+        self.captured_at = 0.0
+        self.freezed_img: Optional[np.ndarray] = None
+        self.freezed_at = 0.0
+        self.stopped = False
+
+
+def __analyze_in_pipeline(
+    gallery: IdentityGallery,
+    detector_backend: str,
+    enable_face_analysis: bool,
+    source: Any,
+    time_threshold: int,
+    frame_threshold: int,
+    anti_spoofing: bool,
+    detection_interval: int,
+) -> None:
+    """
+    Run real time analysis with a capture thread, an inference worker and a render loop.
+        Render loop shows the latest frame with the latest results, so the video never
+        waits for the detector.
+    """
+    stats = StreamStats()
+    state = StreamState()
+    grabber = FrameGrabber(source=source, stats=stats)
+    grabber.start()
+
+    worker = threading.Thread(
+        target=__infer,
+        kwargs={
+            "grabber": grabber,
+            "state": state,
+            "stats": stats,
+            "gallery": gallery,
+            "detector_backend": detector_backend,
+            "enable_face_analysis": enable_face_analysis,
+            "frame_threshold": frame_threshold,
+            "anti_spoofing": anti_spoofing,
+            "tracker": FaceTracker(detection_interval=detection_interval),
+        },
+        daemon=True,
+    )
+    worker.start()
+
+    frame_index = 0
+    rendered_result = 0
+    logged_at = time.perf_counter()
+    while True:
+        frame, frame_index, _ = grabber.read(frame_index, timeout=1)
+        if frame is None:
+            if grabber.stopped:
+                break
+            continue
+
+        with state.lock:
+            if state.freezed_img is not None and time.time() - state.freezed_at > time_threshold:
+                state.freezed_img = None
+                logger.info("freeze released")
+            freezed_img, freezed_at = state.freezed_img, state.freezed_at
+            faces_coordinates = state.faces_coordinates
+            num_frames_with_faces = state.num_frames_with_faces
+            result_index, result_captured_at = state.frame_index, state.captured_at
+
+        if freezed_img is not None:
+            img = countdown_to_release(
+                img=freezed_img.copy(), tic=freezed_at, time_threshold=time_threshold
+            )
         else:
-            raise err
-    if len(dfs) == 0:
-        # you may consider to return unknown person's image here
-        return None, None
+            img = highlight_facial_areas(img=frame.copy(), faces_coordinates=faces_coordinates)
+            img = countdown_to_freeze(
+                img=img,
+                faces_coordinates=faces_coordinates,
+                frame_threshold=frame_threshold,
+                num_frames_with_faces=num_frames_with_faces,
+            )
 
-    # detected face is coming from parent, safe to access 1st index
-    df = dfs[0]
+        # latency from capturing a frame to showing its results for the first time
+        if result_index > rendered_result:
+            rendered_result = result_index
+            stats.add_latency(time.perf_counter() - result_captured_at)
 
-    if df.shape[0] == 0:
-        return None, None
+        cv2.imshow("img", overlay_stats(img=img, stats=stats.summary()))
+        stats.tick("render")
 
-    candidate = df.iloc[0]
-    target_path = candidate["identity"]
-    logger.info(f"Hello, {target_path}")
+        if time.perf_counter() - logged_at > 10:
+            logged_at = time.perf_counter()
+            logger.debug(f"stream stats: {stats.summary()}")
 
-    # load found identity image - extracted if possible
-    target_objs = DeepFace.extract_faces(
-        img_path=target_path,
-        detector_backend=detector_backend,
-        enforce_detection=False,
-        align=True,
+        if cv2.waitKey(1) & 0xFF == ord("q"):  # press q to quit
+            break
+
+    state.stopped = True
+    grabber.stop()
+    worker.join(timeout=5)
+    cv2.destroyAllWindows()
+    logger.info(f"stream stats: {stats.summary()}")
+
+
+def __infer(
+    grabber: FrameGrabber,
+    state: StreamState,
+    stats: StreamStats,
+    gallery: IdentityGallery,
+    detector_backend: str,
+    enable_face_analysis: bool,
+    frame_threshold: int,
+    anti_spoofing: bool,
+    tracker: FaceTracker,
+) -> None:
+    """
+    Follow faces in the latest frame at the rate detector and tracker allow, and analyze
+        them once they are seen in frame_threshold frames in a row. Faces are analyzed just
+        once along their track, their results are shown again in the next freezes.
+    """
+    frame_index = 0
+    num_frames_with_faces = 0
+    while not state.stopped:
+        # nothing to detect while the analyzed frame is shown
+        if state.freezed_img is not None:
+            time.sleep(0.01)
+            continue
+
+        frame, frame_index, captured_at = grabber.read(frame_index, timeout=1)
+        if frame is None:
+            if grabber.stopped:
+                return
+            continue
+
+        if tracker.needs_detection():
+            detections = grab_facial_areas(
+                img=frame, detector_backend=detector_backend, anti_spoofing=anti_spoofing
+            )
+            stats.tick("detection")
+            tracks = tracker.update(img=frame, detections=detections)
+        else:
+            tracks = tracker.update(img=frame)
+
+        faces_coordinates = [track.coordinates for track in tracks]
+        num_frames_with_faces = num_frames_with_faces + 1 if len(faces_coordinates) else 0
+
+        freezed_img = None
+        if num_frames_with_faces > 0 and num_frames_with_faces % frame_threshold == 0:
+            # only the faces appeared after the previous freeze are analyzed
+            analyze_tracks(
+                img=frame,
+                tracks=[track for track in tracks if not track.analyzed],
+                gallery=gallery,
+                enable_face_analysis=enable_face_analysis,
+            )
+            img = highlight_facial_areas(
+                img=frame.copy(), faces_coordinates=faces_coordinates, anti_spoofing=anti_spoofing
+            )
+            freezed_img = overlay_tracks(img=img, tracks=tracks)
+            logger.info("freezed")
+
+        with state.lock:
+            state.faces_coordinates = faces_coordinates
+            state.num_frames_with_faces = num_frames_with_faces
+            state.frame_index = frame_index
+            state.captured_at = captured_at
+            if freezed_img is not None:
+                state.freezed_img = freezed_img
+                state.freezed_at = time.time()
+        stats.tick("inference")
+
+
+def analyze_tracks(
+    img: np.ndarray,
+    tracks: List[Track],
+    gallery: IdentityGallery,
+    enable_face_analysis: bool,
+) -> None:
+    """
+    Find the identity and demography of tracked faces, and keep them in their tracks
+    Args:
+        img (np.ndarray): image itself
+        tracks (list): tracks to be analyzed
+        gallery (IdentityGallery): facial database loaded into memory
+        enable_face_analysis (bool): Flag to enable face analysis.
+    """
+    detected_faces = extract_facial_areas(
+        img=img, faces_coordinates=[track.coordinates for track in tracks]
     )
 
-    # extract facial area of the identified image if and only if it has one face
-    # otherwise, show image as is
-    if len(target_objs) == 1:
-        # extract 1st item directly
-        target_obj = target_objs[0]
-        target_img = target_obj["face"]
-        target_img *= 255
-        target_img = target_img[:, :, ::-1]
-    else:
-        target_img = cv2.imread(target_path)
+    identities = gallery.search_identities(detected_faces=detected_faces)
+    for track, identity in zip(tracks, identities):
+        track.identity = identity
+        track.analyzed = True
+
+    if enable_face_analysis is False:
+        return
 
-    # resize anyway
-    target_img = cv2.resize(target_img, (IDENTIFIED_IMG_SIZE, IDENTIFIED_IMG_SIZE))
+    # faces of all new tracks are analyzed together, one model call per action
+    analyzed = [
+        (track, detected_face)
+        for track, detected_face in zip(tracks, detected_faces)
+        if detected_face.size > 0
+    ]
+    demographies = demography.analyze_faces(
+        faces=[detected_face for _, detected_face in analyzed],
+        actions=("age", "gender", "emotion"),
+        silent=True,
+    )
+    for (track, _), demography_obj in zip(analyzed, demographies):
+        track.demography = demography_obj
+
+
+def overlay_tracks(img: np.ndarray, tracks: List[Track]) -> np.ndarray:
+    """
+    Overlay the analysis results kept in tracks onto image itself
+    Args:
+        img (np.ndarray): image itself
+        tracks (list): analyzed tracks
+    Returns:
+        img (np.ndarray): image with demography and identity of the tracked faces
+    """
+    for track in tracks:
+        x, y, w, h, _, _ = track.coordinates
+        if track.demography is not None:
+            img = overlay_emotion(
+                img=img, emotion_probas=track.demography["emotion"], x=x, y=y, w=w, h=h
+            )
+            img = overlay_age_gender(
+                img=img,
+                apparent_age=track.demography["age"],
+                gender=track.demography["dominant_gender"][0:1],  # M or W
+                x=x,
+                y=y,
+                w=w,
+                h=h,
+            )
 
-    return target_path.split("/")[-1], target_img
+        target_label, target_img = track.identity
+        if target_label is not None:
+            img = overlay_identified_face(
+                img=img, target_img=target_img, label=target_label, x=x, y=y, w=w, h=h
+            )
+    return img
 
 
 def build_demography_models(enable_face_analysis: bool) -> None:
@@ -366,6 +915,32 @@ def countdown_to_release(
     return img
 
 
+def overlay_stats(img: np.ndarray, stats: Dict[str, float]) -> np.ndarray:
+    """
+    Show the frame rates and latency of the stream in the image bottom left area
+    Args:
+        img (np.ndarray): image itself
+        stats (dict): summary of StreamStats
+    Returns:
+        img (np.ndarray): image with stream stats
+    """
+    text = (
+        f"capture {stats['capture_fps']:.0f} fps, detection {stats['detection_fps']:.1f} fps, "
+        f"inference {stats['inference_fps']:.1f} fps, render {stats['render_fps']:.0f} fps, "
+        f"latency {stats['latency_ms']:.0f} ms"
+    )
+    cv2.putText(
+        img,
+        text,
+        (10, img.shape[0] - 10),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.4,
+        TEXT_COLOR,
+        1,
+    )
+    return img
+
+
 def grab_facial_areas(
     img: np.ndarray, detector_backend: str, threshold: int = 130, anti_spoofing: bool = False
 ) -> List[Tuple[int, int, int, int, bool, float]]:
@@ -428,10 +1003,7 @@ def perform_facial_recognition(
     img: np.ndarray,
     detected_faces: List[np.ndarray],
     faces_coordinates: List[Tuple[int, int, int, int, bool, float]],
-    db_path: str,
-    detector_backend: str,
-    distance_metric: str,
-    model_name: str,
+    gallery: IdentityGallery,
 ) -> np.ndarray:
     """
     Perform facial recognition
@@ -440,27 +1012,16 @@ def perform_facial_recognition(
         detected_faces (list): list of extracted detected face images as numpy
         faces_coordinates (list): list of facial area coordinates as tuple with
             x, y, w and h values also is_real and antispoof_score keys
-        db_path (string): Path to the folder containing image files. All detected faces
-            in the database will be considered in the decision-making process.
-        detector_backend (string): face detector backend. Options: 'opencv', 'retinaface',
-            'mtcnn', 'ssd', 'dlib', 'mediapipe', 'yolov8', 'centerface' or 'skip'
-            (default is opencv).
-        distance_metric (string): Metric for measuring similarity. Options: 'cosine',
-            'euclidean', 'euclidean_l2' (default is cosine).
-        model_name (str): Model for face recognition. Options: VGG-Face, Facenet, Facenet512,
-            OpenFace, DeepFace, DeepID, Dlib, ArcFace, SFace and GhostFaceNet (default is VGG-Face).
+        gallery (IdentityGallery): facial database loaded into memory
     Returns:
         img (np.ndarray): image with identified face informations
     """
-    for idx, (x, y, w, h, is_real, antispoof_score) in enumerate(faces_coordinates):
-        detected_face = detected_faces[idx]
-        target_label, target_img = search_identity(
-            detected_face=detected_face,
-            db_path=db_path,
-            detector_backend=detector_backend,
-            distance_metric=distance_metric,
-            model_name=model_name,
-        )
+    # all faces in the frame are embedded together and searched in memory
+    results = gallery.search_identities(detected_faces=detected_faces)
+
+    for (x, y, w, h, is_real, antispoof_score), (target_label, target_img) in zip(
+        faces_coordinates, results
+    ):
         if target_label is None:
             continue
 
@@ -496,27 +1057,26 @@ def perform_demography_analysis(
     """
     if enable_face_analysis is False:
         return img
-    for idx, (x, y, w, h, is_real, antispoof_score) in enumerate(faces_coordinates):
-        detected_face = detected_faces[idx]
-        demographies = DeepFace.analyze(
-            img_path=detected_face,
-            actions=("age", "gender", "emotion"),
-            detector_backend="skip",
-            enforce_detection=False,
-            silent=True,
-        )
 
-        if len(demographies) == 0:
-            continue
-
-        # safe to access 1st index because detector backend is skip
-        demography = demographies[0]
-
-        img = overlay_emotion(img=img, emotion_probas=demography["emotion"], x=x, y=y, w=w, h=h)
+    # all faces in the frame are analyzed together, one model call per action
+    analyzed = [
+        (coordinates, detected_face)
+        for coordinates, detected_face in zip(faces_coordinates, detected_faces)
+        if detected_face.size > 0
+    ]
+    demographies = demography.analyze_faces(
+        faces=[detected_face for _, detected_face in analyzed],
+        actions=("age", "gender", "emotion"),
+        silent=True,
+    )
+    for ((x, y, w, h, _, _), _), demography_obj in zip(analyzed, demographies):
+        img = overlay_emotion(
+            img=img, emotion_probas=demography_obj["emotion"], x=x, y=y, w=w, h=h
+        )
         img = overlay_age_gender(
             img=img,
-            apparent_age=demography["age"],
-            gender=demography["dominant_gender"][0:1],  # M or W
+            apparent_age=demography_obj["age"],
+            gender=demography_obj["dominant_gender"][0:1],  # M or W
             x=x,
             y=y,
             w=w,
@@ -0,0 +1,338 @@
+# built-in dependencies
+import os
+import sys
+import struct
+import ctypes
+import ctypes.util
+import threading
+from typing import Dict, Optional, Set, Tuple
+
+# project dependencies
+from deepface.commons import image_utils
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# pylint: disable=too-many-instance-attributes
+
+# inotify constants from linux/inotify.h
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+# manifests are kept in memory for each facial database
+cached_manifests: Dict[str, "DirectoryManifest"] = {}
+manifests_lock = threading.Lock()
+
+
+def load(db_path: str) -> "DirectoryManifest":
+    """
+    Load the manifest of a facial database in a singleton way. Its directories are watched
+        with inotify if DEEPFACE_WATCH_DATABASE environment variable is set to 1 on linux.
+    Args:
+        db_path (str): path to the folder containing image files
+    Returns:
+        manifest (DirectoryManifest)
+    """
+    with manifests_lock:
+        manifest = cached_manifests.get(db_path)
+        if manifest is None:
+            watch = os.getenv("DEEPFACE_WATCH_DATABASE", "0") == "1"
+            manifest = DirectoryManifest(db_path=db_path, watch=watch)
+            cached_manifests[db_path] = manifest
+    return manifest
+
+
+class DirectoryManifest:
+    """
+    Cached listing of the images in a facial database with their stats (mtime, size, inode).
+        The whole directory tree is scanned just once. Then, only the directories whose
+        mtime is changed are re-scanned, because adding, removing or renaming a file changes
+        the mtime of its directory. If the directories are watched with inotify, only the
+        files and directories reported by its events are re-checked, which also covers the
+        images overwritten in place.
+    """
+
+    def __init__(self, db_path: str, watch: bool = False):
+        """
+        Args:
+            db_path (str): path to the folder containing image files
+            watch (bool): watch the directories with inotify if it is available
+                (default is False)
+        """
+        self.db_path = db_path
+        # exact image path to its stats signature and hash
+        self.files: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+        # directory path to its mtime
+        self.directories: Dict[str, int] = {}
+        # incremented whenever an image is added, removed or replaced
+        self.version = 0
+        self.scanned = False
+        self.lock = threading.Lock()
+
+        self.watcher: Optional[InotifyWatcher] = None
+        if watch:
+            if InotifyWatcher.is_available():
+                self.watcher = InotifyWatcher()
+            else:
+                logger.warn("inotify is not available, database changes are found with mtimes")
+
+    @property
+    def hashes(self) -> Dict[str, str]:
+        """
+        Returns:
+            hashes (dict): hash of each image in the facial database
+        """
+        with self.lock:
+            return {file_path: file_hash for file_path, (_, file_hash) in self.files.items()}
+
+    def sync(self) -> None:
+        """
+        Synchronize the manifest with the facial database
+        """
+        with self.lock:
+            if not self.scanned or (self.watcher is not None and self.watcher.overflowed):
+                self.__scan()
+            elif self.watcher is not None:
+                dirty_directories, dirty_files = self.watcher.consume()
+                for directory in dirty_directories:
+                    self.__rescan_directory(directory)
+                for file_path in dirty_files:
+                    self.__check_file(file_path)
+            else:
+                for directory, mtime in list(self.directories.items()):
+                    try:
+                        changed = os.stat(directory).st_mtime_ns != mtime
+                    except FileNotFoundError:
+                        changed = True
+                    if changed:
+                        self.__rescan_directory(directory)
+
+    def __scan(self) -> None:
+        if self.watcher is not None:
+            self.watcher.reset()
+        previous = self.files
+        self.files = {}
+        self.directories = {}
+        self.__rescan_directory(self.db_path, previous=previous)
+        if set(previous.keys()) != set(self.files.keys()) or any(
+            previous[file_path] != entry for file_path, entry in self.files.items()
+        ):
+            self.version += 1
+        self.scanned = True
+
+    def __rescan_directory(
+        self,
+        directory: str,
+        previous: Optional[Dict[str, Tuple[Tuple[int, int, int], str]]] = None,
+    ) -> None:
+        previous = self.files if previous is None else previous
+
+        # directory may be removed in the meantime
+        if not os.path.isdir(directory):
+            self.__forget_directory(directory)
+            return
+
+        # watch before listing not to miss the changes in between
+        if self.watcher is not None:
+            self.watcher.watch(directory)
+        self.directories[directory] = os.stat(directory).st_mtime_ns
+
+        listed_files = set()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=True):
+                    if entry.path not in self.directories:
+                        self.__rescan_directory(entry.path, previous=previous)
+                elif (
+                    os.path.splitext(entry.name)[-1].lower() in image_utils.IMAGE_EXTENSIONS
+                    and entry.is_file(follow_symlinks=True)
+                ):
+                    listed_files.add(entry.path)
+                    self.__check_file(entry.path, previous=previous)
+
+        # a full scan starts from scratch, nothing to be removed
+        if previous is not self.files:
+            return
+
+        # files and sub directories removed from this directory
+        parent = os.path.join(directory, "")
+        for file_path in list(self.files.keys()):
+            if os.path.join(os.path.dirname(file_path), "") == parent:
+                if file_path not in listed_files:
+                    self.__forget_file(file_path)
+        for sub_directory in list(self.directories.keys()):
+            if os.path.join(os.path.dirname(sub_directory), "") == parent:
+                if not os.path.isdir(sub_directory):
+                    self.__forget_directory(sub_directory)
+
+    def __check_file(
+        self,
+        file_path: str,
+        previous: Optional[Dict[str, Tuple[Tuple[int, int, int], str]]] = None,
+    ) -> None:
+        previous = self.files if previous is None else previous
+
+        try:
+            file_stats = os.stat(file_path)
+        except FileNotFoundError:
+            self.__forget_file(file_path)
+            return
+
+        signature = (file_stats.st_mtime_ns, file_stats.st_size, file_stats.st_ino)
+        known = previous.get(file_path)
+        if known is not None and known[0] == signature:
+            self.files[file_path] = known
+            return
+
+        # content of new or changed files is checked once
+        if not image_utils.is_image(file_path):
+            self.__forget_file(file_path)
+            return
+
+        self.files[file_path] = (signature, image_utils.find_image_hash(file_path, file_stats))
+        if previous is self.files:
+            self.version += 1
+
+    def __forget_file(self, file_path: str) -> None:
+        if self.files.pop(file_path, None) is not None:
+            self.version += 1
+
+    def __forget_directory(self, directory: str) -> None:
+        prefix = os.path.join(directory, "")
+        for sub_directory in list(self.directories.keys()):
+            if sub_directory == directory or sub_directory.startswith(prefix):
+                del self.directories[sub_directory]
+        for file_path in [path for path in self.files if path.startswith(prefix)]:
+            self.__forget_file(file_path)
+
+
+class InotifyWatcher:
+    """
+    Watches directories with linux inotify api through libc, and collects the changed
+        files and directories between two synchronizations in a background thread.
+    """
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.watched_directories: Dict[int, str] = {}
+        self.watch_descriptors: Dict[str, int] = {}
+        self.dirty_directories: Set[str] = set()
+        self.dirty_files: Set[str] = set()
+        self.overflowed = False
+        self.lock = threading.Lock()
+
+        self.thread = threading.Thread(target=self.__read_events, daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def is_available() -> bool:
+        """
+        Returns:
+            is_available (bool): inotify api is available in this system
+        """
+        if not sys.platform.startswith("linux"):
+            return False
+        library = ctypes.util.find_library("c")
+        return library is not None and hasattr(ctypes.CDLL(library), "inotify_init1")
+
+    def watch(self, directory: str) -> None:
+        """
+        Start to watch a directory if it is not watched yet
+        Args:
+            directory (str): exact directory path
+        """
+        with self.lock:
+            if directory in self.watch_descriptors:
+                return
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                logger.warn(f"{directory} cannot be watched, errno {ctypes.get_errno()}")
+                self.overflowed = True
+                return
+            self.watched_directories[wd] = directory
+            self.watch_descriptors[directory] = wd
+
+    def reset(self) -> None:
+        """
+        Forget the collected changes before a full scan
+        """
+        with self.lock:
+            self.dirty_directories = set()
+            self.dirty_files = set()
+            self.overflowed = False
+
+    def consume(self) -> Tuple[Set[str], Set[str]]:
+        """
+        Returns:
+            dirty_directories (set): directories to be re-scanned
+            dirty_files (set): files to be re-checked
+        """
+        with self.lock:
+            dirty_directories, dirty_files = self.dirty_directories, self.dirty_files
+            self.dirty_directories = set()
+            self.dirty_files = set()
+        return dirty_directories, dirty_files
+
+    def __read_events(self) -> None:
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except OSError as err:
+                logger.error(f"inotify events cannot be read: {err}")
+                with self.lock:
+                    self.overflowed = True
+                return
+
+            offset = 0
+            with self.lock:
+                while offset + EVENT_HEADER.size <= len(buffer):
+                    wd, mask, _, name_length = EVENT_HEADER.unpack_from(buffer, offset)
+                    offset += EVENT_HEADER.size
+                    name = buffer[offset : offset + name_length].rstrip(b"\0")
+                    offset += name_length
+                    self.__handle_event(wd, mask, os.fsdecode(name))
+
+    def __handle_event(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            self.overflowed = True
+            return
+
+        directory = self.watched_directories.get(wd)
+        if directory is None:
+            return
+
+        if mask & IN_IGNORED:
+            del self.watched_directories[wd]
+            self.watch_descriptors.pop(directory, None)
+            self.dirty_directories.add(directory)
+        elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            self.dirty_directories.add(directory)
+        elif mask & IN_ISDIR:
+            self.dirty_directories.add(directory)
+            self.dirty_directories.add(os.path.join(directory, name))
+        elif os.path.splitext(name)[-1].lower() in image_utils.IMAGE_EXTENSIONS:
+            self.dirty_files.add(os.path.join(directory, name))
@@ -0,0 +1,265 @@
+# built-in dependencies
+from typing import Any, Dict, List, Optional, Tuple
+
+# 3rd party dependencies
+import numpy as np
+import cv2
+
+# project dependencies
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# pylint: disable=too-many-instance-attributes, too-few-public-methods
+
+
+class Track:
+    """
+    A face followed across frames, with the analysis results found for it once
+    """
+
+    def __init__(
+        self,
+        track_id: int,
+        box: Tuple[int, int, int, int],
+        is_real: bool = True,
+        antispoof_score: float = 0,
+    ):
+        """
+        Args:
+            track_id (int): unique identifier of the track
+            box (tuple): x, y, w and h of the facial area
+            is_real (bool): anti spoofing result of the last detection (default is True)
+            antispoof_score (float): anti spoofing score of the last detection (default is 0)
+        """
+        self.track_id = track_id
+        self.box = np.array(box, dtype=np.float32)
+        self.is_real = is_real
+        self.antispoof_score = antispoof_score
+        # feature points followed with optical flow, None until they are found
+        self.points: Optional[np.ndarray] = None
+        # number of detections in a row not matching this track
+        self.misses = 0
+
+        # analysis results are kept along the track not to be found again
+        self.analyzed = False
+        self.identity: Tuple[Optional[str], Optional[np.ndarray]] = (None, None)
+        self.demography: Optional[Dict[str, Any]] = None
+
+    @property
+    def coordinates(self) -> Tuple[int, int, int, int, bool, float]:
+        """
+        Returns:
+            coordinates (tuple): x, y, w, h, is_real and antispoof_score of the face
+        """
+        x, y, w, h = (int(round(value)) for value in self.box)
+        return x, y, w, h, self.is_real, self.antispoof_score
+
+
+class FaceTracker:
+    """
+    Follows faces between detections. Detections are associated to the tracks with their
+        intersection over union, and the tracks are moved with the optical flow of their
+        feature points in other frames. So, the detector runs only every detection_interval
+        frames or when a track is lost.
+    """
+
+    def __init__(
+        self,
+        detection_interval: int = 10,
+        iou_threshold: float = 0.3,
+        max_misses: int = 1,
+        min_points: int = 4,
+    ):
+        """
+        Args:
+            detection_interval (int): maximum number of frames between two detections
+                (default is 10)
+            iou_threshold (float): minimum intersection over union to associate a detection
+                with a track (default is 0.3)
+            max_misses (int): number of detections a track may miss before it is dropped
+                (default is 1)
+            min_points (int): minimum number of followed feature points, a track is lost
+                with less (default is 4)
+        """
+        if not isinstance(detection_interval, int) or detection_interval < 1:
+            raise ValueError("detection_interval must be a positive integer")
+
+        self.detection_interval = detection_interval
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.min_points = min_points
+
+        self.tracks: List[Track] = []
+        self.next_track_id = 1
+        self.frames_since_detection = 0
+        self.lost = False
+        self.previous_gray: Optional[np.ndarray] = None
+
+    def needs_detection(self) -> bool:
+        """
+        Returns:
+            needs_detection (bool): detector must run for the next frame
+        """
+        return (
+            self.previous_gray is None
+            or self.lost
+            or self.frames_since_detection + 1 >= self.detection_interval
+        )
+
+    def update(
+        self,
+        img: np.ndarray,
+        detections: Optional[List[Tuple[int, int, int, int, bool, float]]] = None,
+    ) -> List[Track]:
+        """
+        Update the tracks with a new frame
+        Args:
+            img (np.ndarray): frame in BGR
+            detections (list): x, y, w, h, is_real and antispoof_score of the detected faces
+                in this frame, or None to follow the tracks with optical flow
+        Returns:
+            tracks (list): current tracks
+        """
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+        if detections is not None or self.previous_gray is None:
+            self.__associate(detections or [])
+            self.frames_since_detection = 0
+            self.lost = False
+        else:
+            self.__follow(gray)
+            self.frames_since_detection += 1
+
+        height, width = gray.shape
+        for track in self.tracks:
+            track.box[:2] = np.clip(track.box[:2], 0, [width - 1, height - 1])
+            track.box[2:] = np.minimum(track.box[2:], [width, height] - track.box[:2])
+            if track.points is None:
+                track.points = self.__find_points(gray, track.box)
+
+        self.previous_gray = gray
+        return self.tracks
+
+    def __associate(self, detections: List[Tuple[int, int, int, int, bool, float]]) -> None:
+        boxes = np.array([detection[:4] for detection in detections], dtype=np.float32)
+        ious = find_ious(np.array([track.box for track in self.tracks]).reshape(-1, 4), boxes)
+
+        # greedy matching from the most overlapping pairs
+        matched_tracks, matched_detections = set(), set()
+        for flat_index in np.argsort(-ious, axis=None):
+            track_index, detection_index = (
+                int(index) for index in np.unravel_index(flat_index, ious.shape)
+            )
+            if ious[track_index, detection_index] < self.iou_threshold:
+                break
+            if track_index in matched_tracks or detection_index in matched_detections:
+                continue
+            matched_tracks.add(track_index)
+            matched_detections.add(detection_index)
+
+            track = self.tracks[track_index]
+            track.box = boxes[detection_index].copy()
+            track.is_real, track.antispoof_score = detections[detection_index][4:6]
+            track.points = None
+            track.misses = 0
+
+        tracks = []
+        for track_index, track in enumerate(self.tracks):
+            if track_index not in matched_tracks:
+                track.misses += 1
+            if track.misses <= self.max_misses:
+                tracks.append(track)
+
+        for detection_index, detection in enumerate(detections):
+            if detection_index in matched_detections:
+                continue
+            tracks.append(
+                Track(
+                    track_id=self.next_track_id,
+                    box=detection[:4],
+                    is_real=detection[4],
+                    antispoof_score=detection[5],
+                )
+            )
+            self.next_track_id += 1
+
+        self.tracks = tracks
+
+    def __follow(self, gray: np.ndarray) -> None:
+        tracks = []
+        for track in self.tracks:
+            if track.points is None or len(track.points) == 0:
+                # faces without texture cannot be followed, they stay until next detection
+                tracks.append(track)
+                continue
+
+            points, status, _ = cv2.calcOpticalFlowPyrLK(
+                self.previous_gray, gray, track.points, None, winSize=(15, 15), maxLevel=2
+            )
+            # points are followed back to the previous frame, only consistent ones are kept
+            back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(
+                gray, self.previous_gray, points, None, winSize=(15, 15), maxLevel=2
+            )
+            errors = np.linalg.norm((back_points - track.points).reshape(-1, 2), axis=1)
+            found = (status.reshape(-1) == 1) & (back_status.reshape(-1) == 1) & (errors < 1)
+            if found.sum() < self.min_points:
+                logger.debug(f"track {track.track_id} is lost")
+                self.lost = True
+                continue
+
+            old_points = track.points.reshape(-1, 2)[found]
+            new_points = points.reshape(-1, 2)[found]
+
+            # translation and scale of the face from the median motion of its points
+            old_center = np.median(old_points, axis=0)
+            new_center = np.median(new_points, axis=0)
+            old_spread = np.linalg.norm(old_points - old_center, axis=1)
+            new_spread = np.linalg.norm(new_points - new_center, axis=1)
+            moving = old_spread > 1
+            scale = float(np.median(new_spread[moving] / old_spread[moving])) if moving.any() else 1
+
+            box_center = track.box[:2] + track.box[2:] / 2
+            box_center += new_center - old_center
+            track.box[2:] *= scale
+            track.box[:2] = box_center - track.box[2:] / 2
+            track.points = new_points.reshape(-1, 1, 2)
+            tracks.append(track)
+
+        self.tracks = tracks
+
+    @staticmethod
+    def __find_points(gray: np.ndarray, box: np.ndarray) -> Optional[np.ndarray]:
+        # inner area of the face not to follow the background
+        x, y, w, h = box
+        mask = np.zeros_like(gray)
+        mask[
+            int(y + 0.15 * h) : int(y + 0.85 * h),
+            int(x + 0.15 * w) : int(x + 0.85 * w),
+        ] = 255
+        return cv2.goodFeaturesToTrack(
+            gray, maxCorners=30, qualityLevel=0.01, minDistance=3, mask=mask
+        )
+
+
+def find_ious(boxes: np.ndarray, other_boxes: np.ndarray) -> np.ndarray:
+    """
+    Find intersection over union of each pair of boxes
+    Args:
+        boxes (np.ndarray): (N, 4) boxes as x, y, w and h
+        other_boxes (np.ndarray): (M, 4) boxes as x, y, w and h
+    Returns:
+        ious (np.ndarray): (N, M) intersection over union values
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    other_boxes = np.asarray(other_boxes, dtype=np.float32).reshape(-1, 4)
+
+    top_left = np.maximum(boxes[:, None, :2], other_boxes[None, :, :2])
+    bottom_right = np.minimum(
+        boxes[:, None, :2] + boxes[:, None, 2:], other_boxes[None, :, :2] + other_boxes[None, :, 2:]
+    )
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    areas = np.prod(boxes[:, 2:], axis=1)
+    other_areas = np.prod(other_boxes[:, 2:], axis=1)
+    union = areas[:, None] + other_areas[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0)
@@ -6,7 +6,7 @@ from typing import Any, Dict, Optional, Union, List, Tuple
 import numpy as np
 
 # project dependencies
-from deepface.modules import representation, detection, modeling
+from deepface.modules import representation, detection, modeling, gallery, caching
 from deepface.models.FacialRecognition import FacialRecognition
 from deepface.commons.logger import Logger
 
@@ -15,7 +15,7 @@ logger = Logger()
 
 def verify(
     img1_path: Union[str, np.ndarray, List[float]],
-    img2_path: Union[str, np.ndarray, List[float]],
+    img2_path: Union[str, np.ndarray, List[float], None],
     model_name: str = "VGG-Face",
     detector_backend: str = "opencv",
     distance_metric: str = "cosine",
@@ -26,6 +26,7 @@ def verify(
     silent: bool = False,
     threshold: Optional[float] = None,
     anti_spoofing: bool = False,
+    gallery_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Verify if an image pair represents the same person or different persons.
@@ -41,7 +42,8 @@ def verify(
 
         img2_path (str or np.ndarray or  or List[float]): Path to the second image.
             Accepts exact image path as a string, numpy array (BGR), base64 encoded images
-            or pre-calculated embeddings.
+            or pre-calculated embeddings. It can be None if gallery_id is set and the identity
+            is already enrolled.
 
         model_name (str): Model for face recognition. Options: VGG-Face, Facenet, Facenet512,
             OpenFace, DeepFace, DeepID, Dlib, ArcFace, SFace and GhostFaceNet (default is VGG-Face).
@@ -73,6 +75,10 @@ def verify(
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        gallery_id (str): Identifier of the second image's identity in the embedding gallery.
+            If set, embeddings of the second image are calculated once per its content
+            and served from the gallery afterwards (default is None).
+
     Returns:
         result (dict): A dictionary containing verification results.
 
@@ -178,8 +184,57 @@ def verify(
                 raise ValueError(f"Exception while processing img{index}_path") from err
         return img_embeddings, img_facial_areas
 
+    def find_enrolled_embeddings_and_facial_areas(
+        img_path: Union[str, np.ndarray, None], index: int
+    ) -> Tuple[List[List[float]], List[dict]]:
+        """
+        Retrieves facial embeddings and corresponding facial areas of an identity
+        from the embedding gallery. The identity is (re-)enrolled if an image is given
+        and its content is changed since the last enrollment.
+        """
+        if img_path is None:
+            enrollment = gallery.find_enrollment(
+                gallery_id=gallery_id,
+                model_name=model_name,
+                detector_backend=detector_backend,
+                align=align,
+                expand_percentage=expand_percentage,
+                normalization=normalization,
+            )
+            if enrollment is None:
+                raise ValueError(
+                    f"{gallery_id} is not enrolled into the gallery for {model_name} yet."
+                    f" Pass img{index}_path to enroll it."
+                )
+        elif isinstance(img_path, list):
+            raise ValueError(
+                f"Pre-calculated embeddings cannot be enrolled. Pass img{index}_path as an image."
+            )
+        else:
+            try:
+                enrollment = gallery.enroll(
+                    gallery_id=gallery_id,
+                    img_path=img_path,
+                    model_name=model_name,
+                    detector_backend=detector_backend,
+                    enforce_detection=enforce_detection,
+                    align=align,
+                    expand_percentage=expand_percentage,
+                    normalization=normalization,
+                    anti_spoofing=anti_spoofing,
+                )
+            except ValueError as err:
+                raise ValueError(f"Exception while processing img{index}_path") from err
+        return enrollment["embeddings"], enrollment["facial_areas"]
+
+    # enrollment is resolved first, so an unknown identity fails before any model work on img1
+    if gallery_id is None:
+        img2_embeddings, img2_facial_areas = extract_embeddings_and_facial_areas(img2_path, 2)
+    else:
+        img2_embeddings, img2_facial_areas = find_enrolled_embeddings_and_facial_areas(
+            img2_path, 2
+        )
     img1_embeddings, img1_facial_areas = extract_embeddings_and_facial_areas(img1_path, 1)
-    img2_embeddings, img2_facial_areas = extract_embeddings_and_facial_areas(img2_path, 2)
 
     min_distance, min_idx, min_idy = float("inf"), None, None
     for idx, img1_embedding in enumerate(img1_embeddings):
@@ -228,36 +283,51 @@ def __extract_faces_and_embeddings(
         embeddings (List[float])
         facial areas (List[dict])
     """
-    embeddings = []
+    # a reference image verified repeatedly is served from the cache if caching is enabled
+    cache_key = caching.find_key(
+        "verify",
+        img_path,
+        model_name=model_name,
+        detector_backend=detector_backend,
+        enforce_detection=enforce_detection,
+        align=align,
+        expand_percentage=expand_percentage,
+        normalization=normalization,
+        anti_spoofing=anti_spoofing,
+    )
+    cached = caching.get(cache_key)
+    if cached is not None:
+        return cached
+
     facial_areas = []
 
     img_objs = detection.extract_faces(
         img_path=img_path,
         detector_backend=detector_backend,
         grayscale=False,
+        color_face="bgr",
+        normalize_face=False,
         enforce_detection=enforce_detection,
         align=align,
         expand_percentage=expand_percentage,
         anti_spoofing=anti_spoofing,
     )
 
-    # find embeddings for each face
     for img_obj in img_objs:
         if anti_spoofing is True and img_obj.get("is_real", True) is False:
             raise ValueError("Spoof detected in given image.")
-        img_embedding_obj = representation.represent(
-            img_path=img_obj["face"],
-            model_name=model_name,
-            enforce_detection=enforce_detection,
-            detector_backend="skip",
-            align=align,
-            normalization=normalization,
-        )
-        # already extracted face given, safe to access its 1st item
-        img_embedding = img_embedding_obj[0]["embedding"]
-        embeddings.append(img_embedding)
         facial_areas.append(img_obj["facial_area"])
 
+    # find embeddings of all faces together, extracted faces are not cached on their own
+    embeddings = representation.find_embeddings(
+        faces=[img_obj["face"] for img_obj in img_objs],
+        model_name=model_name,
+        normalization=normalization,
+        color_face="bgr",
+    )
+
+    caching.put(cache_key, (embeddings, facial_areas))
+
     return embeddings, facial_areas
 
 
@@ -5,4 +5,4 @@ cd ../deepface/api/src
 # python api.py
 
 # run the service with gunicorn - for prod purposes
-gunicorn --workers=1 --timeout=3600 --bind=0.0.0.0:5005 "app:create_app()"
\ No newline at end of file
+gunicorn --workers=1 --threads=${DEEPFACE_API_THREADS:-8} --timeout=3600 --bind=0.0.0.0:5005 "app:create_app()"
\ No newline at end of file
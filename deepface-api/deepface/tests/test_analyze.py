@@ -1,10 +1,17 @@
 # 3rd party dependencies
 import cv2
+import pytest
+import numpy as np
 
 # project dependencies
 from deepface import DeepFace
+from deepface.models.Demography import Demography
+from deepface.models.demography import AgeGenderRace
 from deepface.commons.logger import Logger
 
+# deepface is imported first, so tf.keras is bound to tf_keras as it is in production
+import tensorflow as tf  # pylint: disable=wrong-import-order
+
 logger = Logger()
 
 
@@ -135,3 +142,111 @@ def test_analyze_for_different_detectors():
                     assert result["gender"]["Man"] > result["gender"]["Woman"]
                 else:
                     assert result["gender"]["Man"] < result["gender"]["Woman"]
+
+
+def create_fine_tuned_model(backbone_weights, classes, seed):
+    # same structure with demography models: a head on top of a shared backbone
+    backbone = tf.keras.models.Sequential(
+        [
+            tf.keras.layers.Input(shape=(8, 8, 3)),
+            tf.keras.layers.Conv2D(4, (3, 3), activation="relu"),
+            tf.keras.layers.MaxPooling2D((2, 2)),
+            tf.keras.layers.Flatten(),
+        ]
+    )
+    backbone.set_weights(backbone_weights)
+    # heads have the same name in all demography models
+    output = tf.keras.layers.Dense(
+        classes,
+        activation="softmax",
+        kernel_initializer=tf.keras.initializers.GlorotUniform(seed=seed),
+        name="predictions",
+    )(backbone.layers[-1].output)
+    return tf.keras.models.Model(inputs=backbone.inputs, outputs=output)
+
+
+def test_shared_model_has_same_predictions(tmp_path):
+    rng = np.random.default_rng(seed=0)
+    weights = [rng.normal(size=(3, 3, 3, 4)).astype("float32"), np.zeros(4, dtype="float32")]
+    other_weights = [weights[0] + 1, weights[1]]
+    img = rng.random(size=(1, 8, 8, 3)).astype("float32")
+    age_model = create_fine_tuned_model(weights, classes=101, seed=1)
+
+    for gender_weights in [weights, other_weights]:
+        models = {
+            "Gender": create_fine_tuned_model(gender_weights, classes=2, seed=2),
+            "Race": create_fine_tuned_model(weights, classes=6, seed=3),
+        }
+        weight_files = {}
+        for model_name, model in models.items():
+            weight_files[model_name] = str(tmp_path / f"{model_name}.h5")
+            model.save_weights(weight_files[model_name])
+
+        shared_model = AgeGenderRace.build_shared_model(
+            model=age_model, weight_files=weight_files
+        )
+        outputs = shared_model(img)
+
+        # heads are read from the weight files and they are built on the age backbone
+        expected = [
+            age_model(img).numpy(),
+            create_fine_tuned_model(weights, classes=2, seed=2)(img).numpy(),
+            models["Race"](img).numpy(),
+        ]
+        assert len(outputs) == 3
+        for output, expected_output in zip(outputs, expected):
+            assert np.array_equal(output.numpy(), expected_output)
+
+        # backbone is kept once: input, conv, pooling and flatten layers and three heads
+        assert len(shared_model.layers) == 4 + 3
+
+    # gender predictions differ from its own model once its backbone is fine-tuned
+    assert not np.array_equal(outputs[1].numpy(), models["Gender"](img).numpy())
+
+    logger.info("✅ test shared model has same predictions done")
+
+
+def test_batched_analyze():
+    batched_objs = DeepFace.analyze("dataset/couple.jpg", silent=True)
+    assert len(batched_objs) > 1
+
+    one_by_one_objs = DeepFace.analyze("dataset/couple.jpg", silent=True, batch_size=1)
+    assert len(one_by_one_objs) == len(batched_objs)
+
+    for batched_obj, one_by_one_obj in zip(batched_objs, one_by_one_objs):
+        assert batched_obj["region"] == one_by_one_obj["region"]
+        assert batched_obj["dominant_gender"] == one_by_one_obj["dominant_gender"]
+        for action in ["emotion", "gender", "race"]:
+            for label, score in batched_obj[action].items():
+                assert abs(score - one_by_one_obj[action][label]) < 1e-2
+
+    with pytest.raises(ValueError, match="batch_size must be a positive integer"):
+        DeepFace.analyze("dataset/couple.jpg", batch_size=0)
+
+    logger.info("✅ test batched analyze done")
+
+
+def test_predict_batch_of_clients_overwriting_predict():
+    class CustomClient(Demography):
+        def __init__(self):
+            self.model = None
+            self.model_name = "Custom"
+
+        def predict(self, img):
+            assert img.shape == (1, 4, 4, 3)
+            return np.array([img.sum(), img.max()])
+
+    imgs = np.random.default_rng(seed=0).random((3, 4, 4, 3))
+    predictions = CustomClient().predict_batch(imgs)
+    assert predictions.shape == (3, 2)
+    assert np.allclose(predictions[:, 0], imgs.reshape(3, -1).sum(axis=1))
+
+    class IncompleteClient(Demography):
+        def __init__(self):
+            self.model = None
+            self.model_name = "Incomplete"
+
+    with pytest.raises(ValueError, match="You must overwrite predict_batch method"):
+        IncompleteClient().predict_batch(imgs)
+
+    logger.info("✅ test predict batch of custom clients done")
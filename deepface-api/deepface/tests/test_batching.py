@@ -0,0 +1,142 @@
+# built-in dependencies
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 3rd party dependencies
+import pytest
+import numpy as np
+
+# project dependencies
+from deepface import DeepFace
+from deepface.modules import modeling
+from deepface.modules.batching import MicroBatcher
+from deepface.models.FacialRecognition import FacialRecognition
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def create_batch_function(batch_sizes: list):
+    def func(imgs):
+        batch_sizes.append(len(imgs))
+        time.sleep(0.02)
+        return imgs * 2
+
+    return func
+
+
+def test_concurrent_calls_are_run_in_batches():
+    batch_sizes = []
+    batcher = MicroBatcher(
+        func=create_batch_function(batch_sizes), name="double", max_batch_size=8, max_wait=0.01
+    )
+
+    inputs = [np.full((2, 3), i, dtype=np.float32) for i in range(32)]
+    with ThreadPoolExecutor(32) as pool:
+        outputs = list(pool.map(batcher, inputs))
+
+    # each caller gets its own outputs
+    for imgs, output in zip(inputs, outputs):
+        assert np.array_equal(output, imgs * 2)
+
+    assert sum(batch_sizes) == 64
+    assert max(batch_sizes) <= 8
+    assert len(batch_sizes) < 32
+
+    stats = batcher.get_stats()
+    assert stats["requests"] == 32
+    assert stats["batches"] == len(batch_sizes)
+    assert stats["mean_batch_size"] == pytest.approx(64 / len(batch_sizes))
+    assert 0 < stats["mean_fill"] <= 1
+
+    # calls having more inputs than max batch size are run alone
+    assert batcher(np.ones((20, 3))).shape == (20, 3)
+    assert batch_sizes[-1] == 20
+
+    logger.info("✅ test concurrent calls are run in batches done")
+
+
+def test_batched_dict_outputs_and_errors():
+    def func(imgs):
+        if (imgs < 0).any():
+            raise ValueError("negative input")
+        return {"sum": imgs.sum(axis=1), "max": imgs.max(axis=1)}
+
+    batcher = MicroBatcher(func=func, name="stats", max_batch_size=16, max_wait=0.02)
+
+    inputs = [np.arange(6, dtype=np.float32).reshape(2, 3) + i for i in range(8)]
+    with ThreadPoolExecutor(8) as pool:
+        outputs = list(pool.map(batcher, inputs))
+    for imgs, output in zip(inputs, outputs):
+        assert np.array_equal(output["sum"], imgs.sum(axis=1))
+        assert np.array_equal(output["max"], imgs.max(axis=1))
+
+    # an error is raised in each call of the failed batch
+    with ThreadPoolExecutor(2) as pool:
+        futures = [pool.submit(batcher, np.ones((1, 3))), pool.submit(batcher, -np.ones((1, 3)))]
+    for future in futures:
+        if future.exception() is not None:
+            assert str(future.exception()) == "negative input"
+    assert futures[1].exception() is not None
+
+    with pytest.raises(ValueError, match="max_batch_size must be a positive integer"):
+        MicroBatcher(func=func, name="stats", max_batch_size=0)
+
+    logger.info("✅ test batched dict outputs and errors done")
+
+
+class MeanClient(FacialRecognition):
+    """
+    Weight-free facial recognition model counting its forward passes
+    """
+
+    def __init__(self):
+        self.model = None
+        self.model_name = "Mean"
+        self.input_shape = (4, 4)
+        self.output_shape = 3
+        self.batch_sizes = []
+
+    def forward_batch(self, imgs: np.ndarray) -> np.ndarray:
+        self.batch_sizes.append(len(imgs))
+        time.sleep(0.02)
+        return imgs.mean(axis=(1, 2))
+
+
+def test_concurrent_represent_calls_share_forward_passes(monkeypatch):
+    monkeypatch.setitem(modeling.models["facial_recognition"], "Mean", MeanClient)
+    modeling.enable_batching(max_batch_size=16, max_wait=0.05)
+
+    try:
+        rng = np.random.default_rng(seed=0)
+        imgs = [rng.integers(0, 255, size=(32, 32, 3), dtype=np.uint8) for _ in range(12)]
+
+        with ThreadPoolExecutor(12) as pool:
+            results = list(
+                pool.map(
+                    lambda img: DeepFace.represent(
+                        img_path=img, model_name="Mean", detector_backend="skip"
+                    ),
+                    imgs,
+                )
+            )
+
+        model = modeling.build_model(task="facial_recognition", model_name="Mean")
+        assert len(model.batch_sizes) < 12 and sum(model.batch_sizes) == 12
+        stats = modeling.get_stats()["facial_recognition/Mean"]["batching"]
+        assert stats["requests"] == 12 and stats["batches"] == len(model.batch_sizes)
+
+        # results are the same with the ones found one by one
+        modeling.disable_batching()
+        for img, result in zip(imgs, results):
+            expected = DeepFace.represent(img_path=img, model_name="Mean", detector_backend="skip")
+            assert result[0]["embedding"] == pytest.approx(expected[0]["embedding"])
+
+        stats = modeling.get_stats()["facial_recognition/Mean"]
+        assert "batching" not in stats
+    finally:
+        modeling.disable_batching()
+        modeling.cached_models.pop(("facial_recognition", "Mean"), None)
+        modeling.model_stats.pop(("facial_recognition", "Mean"), None)
+
+    logger.info("✅ test concurrent represent calls share forward passes done")
@@ -0,0 +1,139 @@
+# 3rd party dependencies
+import pytest
+import numpy as np
+
+# project dependencies
+from deepface import DeepFace
+from deepface.modules import modeling, caching
+from deepface.models.FacialRecognition import FacialRecognition
+from deepface.models.Demography import Demography
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+class CountingClient(FacialRecognition):
+    """
+    Weight-free facial recognition model counting the faces it embeds
+    """
+
+    def __init__(self):
+        self.model = None
+        self.model_name = "Counting"
+        self.input_shape = (4, 4)
+        self.output_shape = 3
+        self.faces = 0
+
+    def forward_batch(self, imgs: np.ndarray) -> np.ndarray:
+        self.faces += len(imgs)
+        return imgs.mean(axis=(1, 2))
+
+
+class CountingEmotionClient(Demography):
+    """
+    Weight-free emotion model counting the faces it analyzes
+    """
+
+    def __init__(self):
+        self.model = None
+        self.model_name = "Emotion"
+        self.faces = 0
+
+    def predict_batch(self, imgs: np.ndarray) -> np.ndarray:
+        self.faces += len(imgs)
+        return np.ones((len(imgs), 7), dtype=np.float32)
+
+
+@pytest.fixture(name="counting_models")
+def fixture_counting_models(monkeypatch):
+    monkeypatch.setitem(modeling.models["facial_recognition"], "Counting", CountingClient)
+    monkeypatch.setitem(modeling.models["facial_attribute"], "Emotion", CountingEmotionClient)
+    caching.enable_cache(memory_budget=1, path="")
+    yield (
+        modeling.build_model(task="facial_recognition", model_name="Counting"),
+        modeling.build_model(task="facial_attribute", model_name="Emotion"),
+    )
+    caching.disable_cache()
+    for key in [("facial_recognition", "Counting"), ("facial_attribute", "Emotion")]:
+        modeling.cached_models.pop(key, None)
+        modeling.model_stats.pop(key, None)
+
+
+def test_results_are_served_from_cache(counting_models):
+    recognition_model, emotion_model = counting_models
+    rng = np.random.default_rng(seed=0)
+    img1, img2 = rng.integers(0, 255, size=(2, 32, 32, 3), dtype=np.uint8)
+
+    # represent
+    result = DeepFace.represent(img_path=img1, model_name="Counting", detector_backend="skip")
+    # returned results are copies, so changing them does not change the cache
+    result[0]["facial_area"]["x"] = 100
+    cached_result = DeepFace.represent(
+        img_path=img1.copy(), model_name="Counting", detector_backend="skip"
+    )
+    assert recognition_model.faces == 1
+    assert cached_result[0]["facial_area"]["x"] == 0
+    assert cached_result[0]["embedding"] == result[0]["embedding"]
+
+    # other parameters are other results
+    DeepFace.represent(
+        img_path=img1, model_name="Counting", detector_backend="skip", normalization="raw"
+    )
+    assert recognition_model.faces == 2
+
+    # same reference image is embedded once in verify
+    for img in [img1, img2, img1[::-1]]:
+        DeepFace.verify(
+            img1_path=img, img2_path=img2, model_name="Counting", detector_backend="skip"
+        )
+    assert recognition_model.faces == 2 + 3
+
+    # analyze
+    for _ in range(3):
+        results = DeepFace.analyze(img_path=img1, actions=["emotion"], detector_backend="skip")
+        assert results[0]["dominant_emotion"] == "angry"
+    assert emotion_model.faces == 1
+
+    stats = caching.get_stats()
+    assert stats["enabled"] is True
+    assert stats["misses"] == 2 + 3 + 1
+    assert stats["hits"] == 1 + 3 + 2
+    assert 0 < stats["memory"] <= stats["memory_budget"]
+
+    logger.info("✅ test results are served from cache done")
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    caching.enable_cache(memory_budget=0.01, path=str(tmp_path))
+    try:
+        img = np.zeros((8, 8, 3), dtype=np.uint8)
+        keys = [caching.find_key("represent", img, model_name=str(index)) for index in range(3)]
+        assert len(set(keys)) == 3
+        assert caching.find_key("represent", "https://example.com/img.jpg") is None
+
+        result = [float(value) for value in range(500)]
+        for key in keys:
+            caching.put(key, result)
+            # recently used one is kept
+            assert caching.get(keys[0]) == result
+
+        stats = caching.get_stats()
+        assert stats["entries"] == 2 and stats["evictions"] == 1
+        assert len(list(tmp_path.glob("*.pkl"))) == 3
+
+        # evicted and restarted results are read back from disk
+        caching.disable_cache()
+        caching.enable_cache(memory_budget=0.01, path=str(tmp_path))
+        assert caching.get(keys[1]) == result
+        assert caching.get_stats()["disk_hits"] >= 1
+
+        caching.clear_cache()
+        assert caching.get(keys[1]) is None
+        assert len(list(tmp_path.glob("*.pkl"))) == 0
+    finally:
+        caching.disable_cache()
+
+    # disabled cache finds no keys
+    assert caching.find_key("represent", img) is None
+
+    logger.info("✅ test least recently used results are evicted done")
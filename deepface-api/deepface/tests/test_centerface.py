@@ -0,0 +1,130 @@
+# 3rd party dependencies
+import cv2
+import numpy as np
+
+# project dependencies
+from deepface import DeepFace
+from deepface.models.face_detection import CenterFace
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def legacy_decode(heatmap, scale, offset, landmark, size, threshold):
+    # decoding of the reference implementation looping over each heatmap hit
+    heatmap = np.squeeze(heatmap)
+    c0, c1 = np.where(heatmap > threshold)
+    boxes, lms = [], []
+    for i in range(len(c0)):  # pylint: disable=consider-using-enumerate
+        s0, s1 = np.exp(scale[0, 0, c0[i], c1[i]]) * 4, np.exp(scale[0, 1, c0[i], c1[i]]) * 4
+        o0, o1 = offset[0, 0, c0[i], c1[i]], offset[0, 1, c0[i], c1[i]]
+        x1 = min(max(0, (c1[i] + o1 + 0.5) * 4 - s1 / 2), size[1])
+        y1 = min(max(0, (c0[i] + o0 + 0.5) * 4 - s0 / 2), size[0])
+        boxes.append(
+            [x1, y1, min(x1 + s1, size[1]), min(y1 + s0, size[0]), heatmap[c0[i], c1[i]]]
+        )
+        lm = []
+        for j in range(5):
+            lm.append(landmark[0, j * 2 + 1, c0[i], c1[i]] * s1 + x1)
+            lm.append(landmark[0, j * 2, c0[i], c1[i]] * s0 + y1)
+        lms.append(lm)
+    return np.asarray(boxes, dtype=np.float32), np.asarray(lms, dtype=np.float32)
+
+
+def legacy_nms(boxes, scores, nms_thresh):
+    areas = (boxes[:, 2] - boxes[:, 0] + 1) * (boxes[:, 3] - boxes[:, 1] + 1)
+    order = np.argsort(scores)[::-1]
+    suppressed = np.zeros(len(boxes), dtype=bool)
+    keep = []
+    for _i, i in enumerate(order):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        for j in order[_i + 1 :]:
+            w = max(0, min(boxes[i, 2], boxes[j, 2]) - max(boxes[i, 0], boxes[j, 0]) + 1)
+            h = max(0, min(boxes[i, 3], boxes[j, 3]) - max(boxes[i, 1], boxes[j, 1]) + 1)
+            if w * h / (areas[i] + areas[j] - w * h) >= nms_thresh:
+                suppressed[j] = True
+    return keep
+
+
+def test_vectorized_decode_is_same_with_legacy_decode():
+    rng = np.random.default_rng(seed=0)
+    height, width = 120, 160
+    heatmap = rng.uniform(0, 0.5, size=(1, 1, height, width)).astype(np.float32)
+    # clusters of hits around faces, overlapping boxes of a face are suppressed
+    for row, column in rng.integers(5, [height - 5, width - 5], size=(20, 2)):
+        heatmap[0, 0, row - 2 : row + 3, column - 2 : column + 3] = rng.uniform(0.6, 1, (5, 5))
+    scale = rng.uniform(2, 4, size=(1, 2, height, width)).astype(np.float32)
+    offset = rng.uniform(0, 1, size=(1, 2, height, width)).astype(np.float32)
+    landmark = rng.uniform(0, 1, size=(1, 10, height, width)).astype(np.float32)
+
+    model = CenterFace.CenterFace(weight_path="centerface.onnx")
+    boxes, lms = model.decode(heatmap, scale, offset, landmark, (480, 640), threshold=0.55)
+
+    expected_boxes, expected_lms = legacy_decode(
+        heatmap, scale, offset, landmark, (480, 640), threshold=0.55
+    )
+    keep = legacy_nms(expected_boxes[:, :4], expected_boxes[:, 4], 0.3)
+    assert 0 < len(keep) < len(expected_boxes)
+    assert np.allclose(boxes, expected_boxes[keep], atol=1e-3)
+    assert np.allclose(lms, expected_lms[keep], atol=1e-3)
+
+    # no hits
+    boxes, lms = model.decode(heatmap, scale, offset, landmark, (480, 640), threshold=1.5)
+    assert boxes.shape == (0, 5) and lms.shape == (0, 10)
+
+    logger.info("✅ test vectorized decode is same with legacy decode done")
+
+
+def test_centerface_network_is_loaded_once_for_each_input_size(monkeypatch):
+    loads = []
+
+    class FakeNet:
+        def __init__(self):
+            self.blob = None
+
+        def setInput(self, blob):  # pylint: disable=invalid-name
+            self.blob = blob
+
+        def forward(self, _):
+            height, width = self.blob.shape[2] // 4, self.blob.shape[3] // 4
+            return [
+                np.zeros((1, 1, height, width), dtype=np.float32),
+                np.zeros((1, 2, height, width), dtype=np.float32),
+                np.zeros((1, 2, height, width), dtype=np.float32),
+                np.zeros((1, 10, height, width), dtype=np.float32),
+            ]
+
+    monkeypatch.setattr(cv2.dnn, "readNetFromONNX", lambda _: loads.append(1) or FakeNet())
+    monkeypatch.setattr(CenterFace, "MAX_INPUT_SIZES", 2)
+
+    model = CenterFace.CenterFace(weight_path="centerface.onnx")
+    for height, width in [(480, 640), (470, 630), (480, 640), (720, 1280), (200, 200)]:
+        dets, lms = model.forward(np.zeros((height, width, 3), dtype=np.uint8), height, width)
+        assert dets.shape == (0, 5) and lms.shape == (0, 10)
+
+    # 470x630 is padded to 480x640, least recently used size is evicted
+    assert len(loads) == 3
+    assert list(model.nets.keys()) == [(736, 1280), (224, 224)]
+
+    logger.info("✅ test centerface network is loaded once for each input size done")
+
+
+def test_centerface_detections_do_not_change_in_next_calls():
+    img = cv2.imread("dataset/img11.jpg")
+    first_objs = DeepFace.extract_faces(img_path=img, detector_backend="centerface")
+
+    # an image in another size is detected between
+    DeepFace.extract_faces(
+        img_path=cv2.resize(img, None, fx=0.5, fy=0.5),
+        detector_backend="centerface",
+        enforce_detection=False,
+    )
+
+    next_objs = DeepFace.extract_faces(img_path=img, detector_backend="centerface")
+    assert [obj["facial_area"] for obj in first_objs] == [
+        obj["facial_area"] for obj in next_objs
+    ]
+
+    logger.info("✅ test centerface detections do not change in next calls done")
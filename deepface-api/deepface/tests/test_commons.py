@@ -1,10 +1,18 @@
 # built-in dependencies
 import os
+import json
+import shutil
+import importlib.util
 from unittest import mock
+
+# 3rd party dependencies
 import pytest
+import numpy as np
 
 # project dependencies
-from deepface.commons import folder_utils, weight_utils, package_utils
+# deepface is imported first, so keras models are built with tf_keras as they are in production
+from deepface import DeepFace  # pylint: disable=unused-import
+from deepface.commons import folder_utils, graph_utils, onnx_utils, weight_utils, package_utils
 from deepface.commons.logger import Logger
 
 # pylint: disable=unused-argument
@@ -16,15 +24,21 @@ tf_version = package_utils.get_tf_major_version()
 # conditional imports
 if tf_version == 1:
     from keras.models import Sequential
+    from keras.initializers import GlorotUniform
     from keras.layers import (
+        Conv2D,
         Dropout,
         Dense,
+        Flatten,
     )
 else:
     from tensorflow.keras.models import Sequential
+    from tensorflow.keras.initializers import GlorotUniform
     from tensorflow.keras.layers import (
+        Conv2D,
         Dropout,
         Dense,
+        Flatten,
     )
 
 
@@ -52,6 +66,210 @@ def test_loading_broken_weights():
     logger.info("✅ test loading broken weight file is done")
 
 
+def test_compiled_models_are_loaded_from_artifacts(tmp_path, monkeypatch):
+    monkeypatch.setenv("DEEPFACE_HOME", str(tmp_path))
+    weight_file = str(tmp_path / "dense.weights.h5")
+    builds = []
+
+    def create_model():
+        model = Sequential()
+        model.add(Dense(units=8, activation="relu", input_shape=(16,)))
+        model.add(Dense(units=4, activation="softmax"))
+        return model
+
+    def loader():
+        builds.append(weight_file)
+        return weight_utils.load_model_weights(model=create_model(), weight_file=weight_file)
+
+    create_model().save_weights(weight_file)
+    inputs = np.random.default_rng(seed=0).random((3, 16), dtype=np.float32)
+
+    model = weight_utils.load_compiled_model(model_name="Dense", loader=loader)
+    compiled_model = weight_utils.load_compiled_model(model_name="Dense", loader=loader)
+    assert len(builds) == 1
+    # artifact is keyed by the module building the model too
+    with open(tmp_path / ".deepface/weights/compiled/Dense.json", encoding="utf-8") as f:
+        index = json.load(f)
+    assert [os.path.basename(source["file"]) for source in index["sources"]] == [
+        "dense.weights.h5",
+        "test_commons.py",
+    ]
+    assert isinstance(compiled_model, weight_utils.CompiledModel)
+    assert compiled_model.count_params() == model.count_params()
+    assert np.allclose(compiled_model(inputs).numpy(), model(inputs).numpy(), atol=1e-6)
+
+    # artifact is compiled again for other weights
+    create_model().save_weights(weight_file)
+    model = weight_utils.load_compiled_model(model_name="Dense", loader=loader)
+    compiled_model = weight_utils.load_compiled_model(model_name="Dense", loader=loader)
+    assert len(builds) == 2
+    assert np.allclose(compiled_model(inputs).numpy(), model(inputs).numpy(), atol=1e-6)
+    # artifact of the former weights is removed
+    assert len(list((tmp_path / ".deepface/weights/compiled").glob("Dense-*"))) == 1
+
+    monkeypatch.setenv("DEEPFACE_COMPILED_MODELS", "0")
+    assert not isinstance(
+        weight_utils.load_compiled_model(model_name="Dense", loader=loader),
+        weight_utils.CompiledModel,
+    )
+    assert len(builds) == 3
+
+    logger.info("✅ test compiled models are loaded from artifacts done")
+
+
+def test_graph_function_runs_batches_in_buckets():
+    assert graph_utils.find_buckets(45) == [32, 8, 4, 1]
+    assert graph_utils.find_buckets(0) == []
+
+    model = Sequential()
+    model.add(Dense(units=8, activation="relu", input_shape=(16,)))
+    model.add(Dense(units=4, activation="softmax"))
+    graph_function = graph_utils.GraphFunction(model=model, name="Dense")
+
+    graph_function.warm_up()
+    assert list(graph_function.functions.keys()) == [1]
+
+    inputs = np.random.default_rng(seed=0).random((7, 16), dtype=np.float32)
+    outputs = graph_function(inputs)
+    assert isinstance(outputs, np.ndarray)
+    assert np.allclose(outputs, model(inputs, training=False).numpy(), atol=1e-6)
+    assert sorted(graph_function.functions.keys()) == [1, 2, 4]
+    assert graph_function.eager is False
+
+    # inputs not matching the model raise its own error
+    with pytest.raises(ValueError):
+        graph_function(np.zeros((2, 8), dtype=np.float32))
+
+    logger.info("✅ test graph function runs batches in buckets done")
+
+
+def test_graph_function_falls_back_to_eager_calls():
+    model = Sequential()
+    model.add(Dense(units=4, input_shape=(16,)))
+    graph_function = graph_utils.GraphFunction(model=model, name="Dense")
+    # tensors of a graph cannot be converted to numpy
+    graph_function.func = lambda inputs: model(inputs, training=False).numpy()
+
+    inputs = np.random.default_rng(seed=0).random((3, 16), dtype=np.float32)
+    outputs = graph_function(inputs)
+    assert graph_function.eager is True
+    assert not graph_function.functions
+    assert np.allclose(outputs, model(inputs, training=False).numpy(), atol=1e-6)
+
+    logger.info("✅ test graph function falls back to eager calls done")
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("tf2onnx") is None or importlib.util.find_spec("onnxruntime") is None,
+    reason="tf2onnx and onnxruntime are required to export models to onnx",
+)
+def test_onnx_models_are_exported_and_quantized(tmp_path, monkeypatch):
+    monkeypatch.setenv("DEEPFACE_HOME", str(tmp_path))
+    calibration_dir = tmp_path / "calibration"
+    calibration_dir.mkdir()
+    for img_name in ["img1.jpg", "img2.jpg", "img3.jpg", "img4.jpg"]:
+        shutil.copy(f"dataset/{img_name}", calibration_dir / img_name)
+    monkeypatch.setenv("DEEPFACE_ONNX_CALIBRATION_DIR", str(calibration_dir))
+    weight_file = str(tmp_path / "conv.weights.h5")
+    builds = []
+
+    def create_model():
+        model = Sequential()
+        model.add(
+            Conv2D(
+                8,
+                (3, 3),
+                strides=2,
+                activation="relu",
+                input_shape=(16, 16, 3),
+                kernel_initializer=GlorotUniform(seed=0),
+            )
+        )
+        model.add(Flatten())
+        model.add(Dense(units=4, kernel_initializer=GlorotUniform(seed=1)))
+        return model
+
+    def loader():
+        builds.append(weight_file)
+        return weight_utils.load_model_weights(model=create_model(), weight_file=weight_file)
+
+    create_model().save_weights(weight_file)
+    model = loader()
+    # faces are in the distribution static quantization is calibrated on
+    inputs = onnx_utils.find_calibration_inputs(
+        calibration_dir=str(calibration_dir), target_size=(16, 16)
+    )
+    expected = model(inputs, training=False).numpy()
+
+    for quantization, atol in [("fp32", 1e-5), ("dynamic", 0.05), ("static", 0.05)]:
+        monkeypatch.setenv("DEEPFACE_ONNX_MODELS", f"DeepID:{quantization}")
+        onnx_model = weight_utils.load_compiled_model(model_name="DeepID", loader=loader)
+        assert isinstance(onnx_model, onnx_utils.OnnxModel)
+        assert graph_utils.is_supported(onnx_model)
+        assert np.allclose(onnx_model(inputs), expected, atol=atol)
+        graph_function = graph_utils.GraphFunction(model=onnx_model, name="DeepID")
+        assert np.allclose(graph_function(inputs), expected, atol=atol)
+
+    # exported models are loaded from their artifacts
+    assert len(builds) == 4
+    monkeypatch.setenv("DEEPFACE_ONNX_MODELS", "DeepID")
+    onnx_model = weight_utils.load_compiled_model(model_name="DeepID", loader=loader)
+    assert len(builds) == 4
+    assert len(list((tmp_path / ".deepface/weights/compiled").glob("DeepID-onnx-*.onnx"))) == 3
+
+    # opencv runs the same fp32 model
+    opencv_model = onnx_utils.OnnxModel(
+        path=onnx_model.path,
+        name="DeepID",
+        input_shape=onnx_model.input_shape,
+        dtype=onnx_model.dtype,
+        runtime="opencv",
+    )
+    assert np.allclose(opencv_model(inputs), expected, atol=1e-5)
+
+    # models requested in onnx are not run in tensorflow silently
+    def export_onnx_model(**kwargs):
+        raise RuntimeError("unsupported layer")
+
+    monkeypatch.setattr(onnx_utils, "export_onnx_model", export_onnx_model)
+    monkeypatch.setenv("DEEPFACE_ONNX_MODELS", "ArcFace:dynamic")
+    with pytest.raises(ValueError, match="ArcFace cannot be exported to onnx"):
+        weight_utils.load_compiled_model(model_name="ArcFace", loader=loader)
+
+    logger.info("✅ test onnx models are exported and quantized done")
+
+
+def test_onnx_models_are_validated(monkeypatch):
+    monkeypatch.setenv("DEEPFACE_ONNX_MODELS", "Facenet512:static, ArcFace:dynamic,DeepID")
+    monkeypatch.setenv("DEEPFACE_ONNX_CALIBRATION_DIR", "dataset")
+    monkeypatch.setenv("DEEPFACE_ONNX_RUNTIME", "onnxruntime")
+    assert onnx_utils.find_onnx_models() == {
+        "Facenet512": "static",
+        "ArcFace": "dynamic",
+        "DeepID": "fp32",
+    }
+
+    monkeypatch.setenv("DEEPFACE_ONNX_MODELS", "SFace")
+    with pytest.raises(ValueError, match="SFace cannot be run in onnx"):
+        onnx_utils.find_onnx_models()
+
+    monkeypatch.setenv("DEEPFACE_ONNX_MODELS", "DeepID:int4")
+    with pytest.raises(ValueError, match="unimplemented quantization - int4"):
+        onnx_utils.find_onnx_models()
+
+    monkeypatch.setenv("DEEPFACE_ONNX_MODELS", "DeepID:dynamic")
+    monkeypatch.setenv("DEEPFACE_ONNX_RUNTIME", "opencv")
+    with pytest.raises(ValueError, match="can be run with onnxruntime only"):
+        onnx_utils.find_onnx_models()
+
+    monkeypatch.setenv("DEEPFACE_ONNX_MODELS", "DeepID:static")
+    monkeypatch.delenv("DEEPFACE_ONNX_CALIBRATION_DIR")
+    with pytest.raises(ValueError, match="DEEPFACE_ONNX_CALIBRATION_DIR"):
+        onnx_utils.find_onnx_models()
+
+    logger.info("✅ test onnx models are validated done")
+
+
 @mock.patch("deepface.commons.folder_utils.get_deepface_home")  # Update with your actual module
 @mock.patch("gdown.download")  # Mocking gdown's download function
 @mock.patch("os.path.isfile")  # Mocking os.path.isfile
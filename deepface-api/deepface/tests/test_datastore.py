@@ -0,0 +1,234 @@
+# built-in dependencies
+import os
+import pickle
+
+# 3rd party dependencies
+import pytest
+import numpy as np
+
+# project dependencies
+from deepface.modules import datastore, verification
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def create_representations(identities, rng, dims=8):
+    return [
+        {
+            "identity": identity,
+            "hash": f"hash-{identity}",
+            "embedding": None if identity.startswith("noface") else rng.normal(size=dims).tolist(),
+            "target_x": 1,
+            "target_y": 2,
+            "target_w": 3,
+            "target_h": 4,
+        }
+        for identity in identities
+    ]
+
+
+def test_append_remove_and_reload(tmp_path):
+    rng = np.random.default_rng(seed=0)
+    datastore_path = str(tmp_path / "ds_model_facenet")
+
+    store = datastore.EmbeddingStore(datastore_path)
+    assert len(store) == 0
+
+    representations = create_representations(["a.jpg", "b.jpg", "noface.jpg"], rng)
+    store.append(representations)
+    assert len(store) == 3
+    assert store.hashes()["b.jpg"] == "hash-b.jpg"
+
+    # rows are written in float32 and memory-mapped
+    assert os.path.getsize(store.matrix_path) == 2 * 8 * 4
+    embedding_matrix, row_metadata = store.find_embedding_matrix()
+    assert isinstance(embedding_matrix.embeddings, np.memmap)
+    assert [metadata["identity"] for metadata in row_metadata] == ["a.jpg", "b.jpg"]
+
+    # matrix and metadata of its rows are built once until the store changes
+    assert store.find_embedding_matrix()[1] is row_metadata
+    assert store.rows == 2
+
+    store.remove({"a.jpg"})
+    store.append(create_representations(["c.jpg"], rng))
+    assert store.identities() == {"b.jpg", "c.jpg", "noface.jpg"}
+
+    # removed rows never match
+    target = representations[0]["embedding"]
+    embedding_matrix, row_metadata = store.find_embedding_matrix()
+    indices, _ = embedding_matrix.search(target, "cosine", threshold=10)
+    assert {row_metadata[index]["identity"] for index in indices} == {"b.jpg", "c.jpg"}
+    assert row_metadata[0] is None
+    assert store.rows == 3
+
+    # another instance restores the same state from files
+    restored = datastore.EmbeddingStore(datastore_path)
+    assert restored.identities() == store.identities()
+    assert restored.hashes() == store.hashes()
+    assert np.array_equal(
+        restored.find_embedding_matrix()[0].embeddings, store.find_embedding_matrix()[0].embeddings
+    )
+
+    logger.info("✅ test append, remove and reload done")
+
+
+def test_store_without_any_face(tmp_path):
+    rng = np.random.default_rng(seed=0)
+    store = datastore.EmbeddingStore(str(tmp_path / "ds_model_facenet"))
+    store.append(create_representations(["noface1.jpg", "noface2.jpg"], rng))
+    assert len(store) == 2
+
+    # items without a face have no rows, and searching nothing finds nothing
+    embedding_matrix, row_metadata = store.find_embedding_matrix()
+    assert len(embedding_matrix) == store.rows == 0
+    assert row_metadata == []
+    indices, _ = embedding_matrix.search(rng.normal(size=8), "cosine", threshold=10)
+    assert len(indices) == 0
+
+    logger.info("✅ test store without any face done")
+
+
+def test_refresh_reads_appended_items(tmp_path):
+    rng = np.random.default_rng(seed=1)
+    datastore_path = str(tmp_path / "ds_model_facenet")
+
+    reader = datastore.EmbeddingStore(datastore_path)
+    writer = datastore.EmbeddingStore(datastore_path)
+    writer.append(create_representations(["a.jpg"], rng))
+
+    reader.refresh()
+    assert reader.identities() == {"a.jpg"}
+
+    writer.append(create_representations(["b.jpg"], rng))
+    reader.refresh()
+    assert reader.identities() == {"a.jpg", "b.jpg"}
+    assert reader.find_embedding_matrix()[0].embeddings.shape == (2, 8)
+
+    logger.info("✅ test refresh reads appended items done")
+
+
+def test_distances_are_same_with_find_distance(tmp_path):
+    rng = np.random.default_rng(seed=2)
+    store = datastore.EmbeddingStore(str(tmp_path / "ds_model_facenet"))
+    representations = create_representations([f"{i}.jpg" for i in range(20)], rng)
+    store.append(representations)
+
+    target = rng.normal(size=8).tolist()
+    embedding_matrix, _ = store.find_embedding_matrix()
+    distances = embedding_matrix.find_distances(target, "euclidean")
+    expected = [
+        verification.find_distance(item["embedding"], target, "euclidean")
+        for item in representations
+    ]
+    assert np.allclose(distances, expected, atol=1e-4)
+
+    logger.info("✅ test distances of memory-mapped store done")
+
+
+def test_compaction(tmp_path):
+    rng = np.random.default_rng(seed=3)
+    datastore_path = str(tmp_path / "ds_model_facenet")
+    store = datastore.EmbeddingStore(datastore_path)
+    store.append(create_representations(["a.jpg", "b.jpg", "c.jpg", "noface.jpg"], rng))
+
+    # compaction is not required while most of the rows are alive
+    store.remove({"a.jpg"})
+    store.compact()
+    assert store.tombstones == 1
+
+    old_matrix_path = store.matrix_path
+    store.remove({"b.jpg", "c.jpg"})
+    store.compact()
+    assert store.tombstones == 0
+    assert store.matrix_path != old_matrix_path
+    assert not os.path.exists(old_matrix_path)
+    assert store.identities() == {"noface.jpg"}
+
+    store.append(create_representations(["d.jpg"], rng))
+    restored = datastore.EmbeddingStore(datastore_path)
+    assert restored.identities() == {"noface.jpg", "d.jpg"}
+    assert len(restored.items) == 2
+
+    logger.info("✅ test compaction done")
+
+
+def test_migration_from_pickle(tmp_path):
+    rng = np.random.default_rng(seed=4)
+    datastore_path = str(tmp_path / "ds_model_facenet")
+    representations = create_representations(["a.jpg", "noface.jpg"], rng)
+    with open(f"{datastore_path}.pkl", "wb") as f:
+        pickle.dump(representations, f)
+
+    store = datastore.EmbeddingStore(datastore_path)
+    store.migrate(f"{datastore_path}.pkl")
+
+    assert not os.path.exists(f"{datastore_path}.pkl")
+    assert store.identities() == {"a.jpg", "noface.jpg"}
+    migrated = {item["identity"]: item for item in store.find_representations()}
+    assert migrated["noface.jpg"]["embedding"] is None
+    assert np.allclose(migrated["a.jpg"]["embedding"], representations[0]["embedding"])
+
+    logger.info("✅ test migration from pickle done")
+
+
+def test_migration_of_invalid_pickle(tmp_path):
+    datastore_path = str(tmp_path / "ds_model_facenet")
+    with open(f"{datastore_path}.pkl", "wb") as f:
+        pickle.dump([{"identity": "a.jpg"}], f)
+
+    store = datastore.EmbeddingStore(datastore_path)
+    with pytest.raises(ValueError, match="does not have some required keys"):
+        store.migrate(f"{datastore_path}.pkl")
+
+    # legacy datastore is kept
+    assert os.path.exists(f"{datastore_path}.pkl")
+
+    logger.info("✅ test migration of invalid pickle done")
+
+
+def test_dimension_mismatch(tmp_path):
+    rng = np.random.default_rng(seed=5)
+    store = datastore.EmbeddingStore(str(tmp_path / "ds_model_facenet"))
+    store.append(create_representations(["a.jpg"], rng, dims=8))
+
+    with pytest.raises(ValueError, match="Embeddings must have 8 dimensions"):
+        store.append(create_representations(["b.jpg"], rng, dims=16))
+
+    logger.info("✅ test dimension mismatch done")
+
+
+def test_ivf_index_is_persisted_and_updated(tmp_path):
+    rng = np.random.default_rng(seed=6)
+    datastore_path = str(tmp_path / "ds_model_facenet")
+    store = datastore.EmbeddingStore(datastore_path)
+    store.append(create_representations([f"{i}.jpg" for i in range(100)], rng))
+
+    index = store.find_ivf_index()
+    assert len(index) == 100
+    assert os.path.exists(f"{datastore_path}.ivf.npz")
+
+    # another instance loads it instead of training
+    restored = datastore.EmbeddingStore(datastore_path)
+    restored_index = restored.find_ivf_index()
+    assert np.array_equal(restored_index.centroids, index.centroids)
+    assert np.array_equal(restored_index.assignments, index.assignments)
+
+    # appended rows are assigned to the existing lists
+    restored.append(create_representations([f"new{i}.jpg" for i in range(10)], rng))
+    restored_index = restored.find_ivf_index()
+    assert len(restored_index) == 110
+    assert restored_index.trained_rows == 100
+    assert np.array_equal(restored_index.centroids, index.centroids)
+
+    # removed rows never match
+    restored.remove({"new0.jpg"})
+    target = restored.find_representations()[0]["embedding"]
+    embedding_matrix, row_metadata = restored.find_embedding_matrix()
+    indices, _ = restored.find_ivf_index().search(
+        target, "cosine", threshold=10, probes=len(index.centroids)
+    )
+    assert "new0.jpg" not in {row_metadata[i]["identity"] for i in indices}
+    assert len(indices) == len(embedding_matrix) - 1
+
+    logger.info("✅ test ivf index persistence done")
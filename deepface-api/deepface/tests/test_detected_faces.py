@@ -0,0 +1,198 @@
+# built-in dependencies
+from heapq import nlargest
+
+# 3rd party dependencies
+import cv2
+import numpy as np
+
+# project dependencies
+from deepface.modules import detection, modeling
+from deepface.models.Detector import (
+    Detector,
+    DetectedFaces,
+    FacialAreaRegion,
+    non_max_suppression,
+)
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def create_regions(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed=seed)
+    regions = []
+    for _ in range(count):
+        x, y = rng.integers(0, 500, size=2).tolist()
+        w, h = rng.integers(20, 120, size=2).tolist()
+        regions.append(
+            FacialAreaRegion(
+                x=x,
+                y=y,
+                w=w,
+                h=h,
+                left_eye=(x + int(0.7 * w), y + int(0.3 * h) + int(rng.integers(-5, 5))),
+                right_eye=(x + int(0.3 * w), y + int(0.3 * h)),
+                confidence=float(rng.uniform(0.5, 1)),
+            )
+        )
+    return regions
+
+
+class ArrayDetector(Detector):
+    """
+    Detector finding faces as arrays
+    """
+
+    regions = create_regions(30)
+
+    def detect_faces(self, img):
+        return self.detect_faces_array(img).to_regions()
+
+    def detect_faces_array(self, img):
+        # faces are placed into the image without borders
+        dx, dy = (img.shape[1] - 640) // 2, (img.shape[0] - 640) // 2
+        return DetectedFaces.from_regions(self.regions).shift(dx, dy)
+
+
+class RegionDetector(Detector):
+    """
+    Detector finding faces one by one
+    """
+
+    def detect_faces(self, img):
+        return ArrayDetector().detect_faces(img)
+
+
+def test_detected_faces_conversion():
+    regions = create_regions(5)
+    regions.append(FacialAreaRegion(x=10, y=20, w=30, h=40))
+    regions.append(
+        FacialAreaRegion(
+            x=1, y=2, w=3, h=4, nose=(5, 6), mouth_left=(7, 8), mouth_right=(9, 10), confidence=0
+        )
+    )
+
+    faces = DetectedFaces.from_regions(regions)
+    assert len(faces) == 7
+    assert faces.boxes.shape == (7, 4) and faces.landmarks.shape == (7, 5, 2)
+    assert faces.to_regions() == regions
+    assert DetectedFaces.from_regions([]).to_regions() == []
+
+    # shifting facial areas moves their landmarks too
+    shifted = faces.shift(100, 50).to_regions()[0]
+    assert (shifted.x, shifted.y) == (regions[0].x + 100, regions[0].y + 50)
+    assert shifted.left_eye == (regions[0].left_eye[0] + 100, regions[0].left_eye[1] + 50)
+
+    # faces without eyes are not rotated
+    angles = faces.find_angles()
+    assert angles[-1] == angles[-2] == 0
+    for region, angle in zip(regions[:5], angles[:5]):
+        assert angle == detection.align_img_wrt_eyes(
+            np.zeros((1, 1, 3)), left_eye=region.left_eye, right_eye=region.right_eye
+        )[1]
+
+    logger.info("✅ test detected faces conversion done")
+
+
+def test_detected_faces_post_processing():
+    regions = create_regions(100)
+    faces = DetectedFaces.from_regions(regions)
+
+    # largest faces in the same order with the ones found one by one
+    expected = nlargest(10, regions, key=lambda region: region.w * region.h)
+    assert faces.largest(10).to_regions() == expected
+    assert faces.largest(1000) is faces
+
+    confident = faces.filter(0.8)
+    assert len(confident) == sum(region.confidence >= 0.8 for region in regions)
+    assert (confident.scores >= 0.8).all()
+
+    logger.info("✅ test detected faces post processing done")
+
+
+def test_detected_faces_expansion(monkeypatch):
+    monkeypatch.setitem(modeling.models["face_detector"], "array", ArrayDetector)
+    img = np.zeros((640, 640, 3), dtype=np.uint8)
+
+    # padded alignment expands faces in the bordered image, so expansion is never clipped
+    for expand_percentage in [0, 10, 35]:
+        detected_faces = detection.detect_faces(
+            detector_backend="array",
+            img=img,
+            align=True,
+            align_mode="padded",
+            expand_percentage=expand_percentage,
+        )
+        assert len(detected_faces) == len(ArrayDetector.regions)
+        for region, detected_face in zip(ArrayDetector.regions, detected_faces):
+            expanded_w = region.w + int(region.w * expand_percentage / 100)
+            expanded_h = region.h + int(region.h * expand_percentage / 100)
+            facial_area = detected_face.facial_area
+            assert facial_area.x == region.x - int((expanded_w - region.w) / 2)
+            assert facial_area.y == region.y - int((expanded_h - region.h) / 2)
+            assert (facial_area.w, facial_area.h) == (expanded_w, expanded_h)
+
+    modeling.cached_models.pop(("face_detector", "array"), None)
+    modeling.model_stats.pop(("face_detector", "array"), None)
+
+    logger.info("✅ test detected faces expansion done")
+
+
+def test_non_max_suppression():
+    boxes = np.array(
+        [
+            [0, 0, 10, 10],
+            [1, 1, 10, 10],  # overlaps the first one with 0.68 iou
+            [5, 0, 10, 10],  # overlaps the first one with 0.33 iou
+            [50, 50, 10, 10],
+        ],
+        dtype=np.float64,
+    )
+    scores = np.array([0.9, 0.95, 0.8, 0.1])
+
+    assert non_max_suppression(boxes, scores, 0.5).tolist() == [1, 2, 3]
+    assert non_max_suppression(boxes, scores, 0.3).tolist() == [1, 3]
+    assert non_max_suppression(boxes[:0], scores[:0], 0.3).tolist() == []
+
+    faces = DetectedFaces(boxes=boxes, scores=scores, landmarks=np.full((4, 5, 2), np.nan))
+    assert faces.suppress(0.3).scores.tolist() == [0.95, 0.1]
+
+    logger.info("✅ test non max suppression done")
+
+
+def test_array_detectors_are_same_with_region_detectors(monkeypatch):
+    monkeypatch.setitem(modeling.models["face_detector"], "array", ArrayDetector)
+    monkeypatch.setitem(modeling.models["face_detector"], "region", RegionDetector)
+    img = cv2.resize(cv2.imread("dataset/img1.jpg"), (640, 640))
+
+    for align, align_mode in [(False, "roi"), (True, "roi"), (True, "padded")]:
+        for max_faces in [None, 5]:
+            array_faces = detection.detect_faces(
+                detector_backend="array",
+                img=img,
+                align=align,
+                align_mode=align_mode,
+                expand_percentage=10,
+                max_faces=max_faces,
+                min_confidence=0.6,
+            )
+            region_faces = detection.detect_faces(
+                detector_backend="region",
+                img=img,
+                align=align,
+                align_mode=align_mode,
+                expand_percentage=10,
+                max_faces=max_faces,
+                min_confidence=0.6,
+            )
+            assert 0 < len(array_faces) == len(region_faces)
+            assert all(face.confidence >= 0.6 for face in array_faces)
+            for array_face, region_face in zip(array_faces, region_faces):
+                assert array_face.facial_area == region_face.facial_area
+                assert np.array_equal(array_face.img, region_face.img)
+
+    for model_name in ["array", "region"]:
+        modeling.cached_models.pop(("face_detector", model_name), None)
+        modeling.model_stats.pop(("face_detector", model_name), None)
+
+    logger.info("✅ test array detectors are same with region detectors done")
@@ -1,5 +1,7 @@
 # built-in dependencies
+import time
 import base64
+from concurrent.futures import ThreadPoolExecutor
 
 # 3rd party dependencies
 import cv2
@@ -8,6 +10,8 @@ import pytest
 
 # project dependencies
 from deepface import DeepFace
+from deepface.modules import detection, modeling, verification
+from deepface.models.Detector import Detector, FacialAreaRegion
 from deepface.commons import image_utils
 from deepface.commons.logger import Logger
 
@@ -141,3 +145,130 @@ def test_facial_coordinates_are_in_borders():
         assert y + h < height
 
     logger.info("✅ facial area coordinates are all in image borders")
+
+
+class PlacedFacesDetector(Detector):
+    """
+    Detector returning the same facial areas of an image whether it has borders or not
+    """
+
+    def detect_faces(self, img):
+        # faces are placed with respect to the image without borders
+        height, width = cv2.imread("dataset/img11.jpg").shape[:2]
+        facial_areas = [
+            FacialAreaRegion(x=100, y=80, w=150, h=160, left_eye=(220, 120), right_eye=(140, 140)),
+            # rotated faces close to the borders
+            FacialAreaRegion(x=0, y=0, w=90, h=100, left_eye=(70, 20), right_eye=(20, 45)),
+            FacialAreaRegion(
+                x=width - 60,
+                y=height - 70,
+                w=60,
+                h=70,
+                left_eye=(width - 10, height - 50),
+                right_eye=(width - 50, height - 40),
+            ),
+            # face without eyes is not rotated
+            FacialAreaRegion(x=30, y=30, w=40, h=40),
+        ]
+        dx = (img.shape[1] - width) // 2
+        dy = (img.shape[0] - height) // 2
+
+        def shift(point):
+            return None if point is None else (point[0] + dx, point[1] + dy)
+
+        return [
+            FacialAreaRegion(
+                x=facial_area.x + dx,
+                y=facial_area.y + dy,
+                w=facial_area.w,
+                h=facial_area.h,
+                left_eye=shift(facial_area.left_eye),
+                right_eye=shift(facial_area.right_eye),
+            )
+            for facial_area in facial_areas
+        ]
+
+
+def test_roi_alignment_is_same_with_padded_alignment(monkeypatch):
+    monkeypatch.setitem(modeling.models["face_detector"], "placed", PlacedFacesDetector)
+    img = cv2.imread("dataset/img11.jpg")
+
+    for expand_percentage in [0, 30]:
+        padded_faces = detection.detect_faces(
+            detector_backend="placed",
+            img=img,
+            expand_percentage=expand_percentage,
+            align_mode="padded",
+        )
+        roi_faces = detection.detect_faces(
+            detector_backend="placed",
+            img=img,
+            expand_percentage=expand_percentage,
+            align_mode="roi",
+        )
+
+        assert len(padded_faces) == len(roi_faces) == 4
+        for padded_face, roi_face in zip(padded_faces, roi_faces):
+            assert padded_face.facial_area == roi_face.facial_area
+            assert padded_face.img.shape == roi_face.img.shape
+            # crops differ only in interpolation round-off
+            differences = np.abs(padded_face.img.astype(np.int32) - roi_face.img)
+            assert differences.mean() < 0.1
+
+    with pytest.raises(ValueError, match="align_mode must be roi or padded"):
+        detection.detect_faces(detector_backend="placed", img=img, align_mode="rotated")
+
+    modeling.cached_models.pop(("face_detector", "placed"), None)
+    modeling.model_stats.pop(("face_detector", "placed"), None)
+    logger.info("✅ roi alignment is same with padded alignment test is done")
+
+
+class StatefulDetector(Detector):
+    """
+    Detector keeping its input between two calls as opencv networks do, so interleaved
+        calls return the faces of each other
+    """
+
+    def __init__(self):
+        self.img = None
+
+    def detect_faces(self, img):
+        self.img = img
+        time.sleep(0.01)
+        # face size is the pixel value of the image set in the former step
+        size = int(self.img[0, 0, 0])
+        return [FacialAreaRegion(x=0, y=0, w=size, h=size, confidence=0.9)]
+
+
+def test_concurrent_requests_do_not_share_detections(monkeypatch):
+    monkeypatch.setitem(modeling.models["face_detector"], "stateful", StatefulDetector)
+    sizes = list(range(20, 52))
+
+    def detect(size):
+        img = np.full((64, 64, 3), size, dtype=np.uint8)
+        faces = detection.detect_faces(detector_backend="stateful", img=img, align=False)
+        return faces[0].facial_area.w
+
+    with ThreadPoolExecutor(8) as pool:
+        assert list(pool.map(detect, sizes)) == sizes
+
+    modeling.cached_models.pop(("face_detector", "stateful"), None)
+    modeling.model_stats.pop(("face_detector", "stateful"), None)
+    logger.info("✅ concurrent requests do not share detections test is done")
+
+
+def test_roi_alignment_embeddings(monkeypatch):
+    img_path = "dataset/img11.jpg"
+
+    monkeypatch.setenv("DEEPFACE_ALIGN_MODE", "padded")
+    padded_objs = DeepFace.represent(img_path=img_path, model_name="Facenet")
+    monkeypatch.setenv("DEEPFACE_ALIGN_MODE", "roi")
+    roi_objs = DeepFace.represent(img_path=img_path, model_name="Facenet")
+
+    # detector runs on the image without borders, so facial areas may shift slightly
+    assert len(padded_objs) == len(roi_objs)
+    for padded_obj, roi_obj in zip(padded_objs, roi_objs):
+        distance = verification.find_cosine_distance(padded_obj["embedding"], roi_obj["embedding"])
+        assert distance < 0.1
+
+    logger.info("✅ roi alignment embeddings test is done")
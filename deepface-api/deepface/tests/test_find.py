@@ -7,7 +7,7 @@ import pandas as pd
 
 # project dependencies
 from deepface import DeepFace
-from deepface.modules import verification
+from deepface.modules import verification, recognition
 from deepface.commons import image_utils
 from deepface.commons.logger import Logger
 
@@ -108,16 +108,25 @@ def test_find_without_refresh_database():
 
     img_path = os.path.join("dataset", "img1.jpg")
 
-    # 1. Calculate hash of the .pkl file;
+    # 1. Calculate hash of the datastore files;
     # 2. Move random image to the temporary created directory;
-    # 3. As a result, there will be a difference between the .pkl file and the disk files;
-    # 4. If refresh_database=False, then .pkl file should not be updated.
+    # 3. As a result, there will be a difference between the datastore and the disk files;
+    # 4. If refresh_database=False, then datastore should not be updated.
     #    Recalculate hash and compare it with the hash from pt. 1;
     # 5. After successful check, the image will be moved back to the original destination;
 
-    pkl_path = "dataset/ds_model_vggface_detector_opencv_aligned_normalization_base_expand_0.pkl"
-    with open(pkl_path, "rb") as f:
-        hash_before = hashlib.sha256(f.read())
+    datastore_prefix = "dataset/ds_model_vggface_detector_opencv_aligned_normalization_base_expand_0"
+
+    def find_datastore_hash():
+        datastore_hash = hashlib.sha256()
+        for file_name in sorted(os.listdir("dataset")):
+            file_path = os.path.join("dataset", file_name)
+            if file_path.startswith(datastore_prefix):
+                with open(file_path, "rb") as f:
+                    datastore_hash.update(f.read())
+        return datastore_hash
+
+    hash_before = find_datastore_hash()
 
     image_name = "img28.jpg"
     tmp_dir = "dataset/temp_image"
@@ -126,15 +135,14 @@ def test_find_without_refresh_database():
 
     dfs = DeepFace.find(img_path=img_path, db_path="dataset", silent=True, refresh_database=False)
 
-    with open(pkl_path, "rb") as f:
-        hash_after = hashlib.sha256(f.read())
+    hash_after = find_datastore_hash()
 
     shutil.move(os.path.join(tmp_dir, image_name), os.path.join("dataset", image_name))
     os.rmdir(tmp_dir)
 
     assert hash_before.hexdigest() == hash_after.hexdigest()
 
-    logger.info("✅ .pkl hashes before and after the recognition process are the same")
+    logger.info("✅ datastore hashes before and after the recognition process are the same")
 
     assert len(dfs) > 0
     for df in dfs:
@@ -151,3 +159,48 @@ def test_find_without_refresh_database():
         logger.debug(df.head())
         assert df.shape[0] > 0
     logger.info("✅ test find without refresh database done")
+
+
+def test_find_with_top_k():
+    img_path = os.path.join("dataset", "img1.jpg")
+    all_dfs = DeepFace.find(img_path=img_path, db_path="dataset", silent=True)
+    dfs = DeepFace.find(img_path=img_path, db_path="dataset", silent=True, top_k=2)
+    assert len(dfs) == len(all_dfs)
+    for df, all_df in zip(dfs, all_dfs):
+        assert df.shape[0] == min(2, all_df.shape[0])
+        assert df["identity"].tolist() == all_df["identity"].head(2).tolist()
+        assert df["distance"].is_monotonic_increasing
+    logger.info("✅ test find with top k done")
+
+
+def test_find_bulk_embeddings_in_parallel_with_checkpoints():
+    find_bulk_embeddings = getattr(recognition, "__find_bulk_embeddings")
+    employees = {os.path.join("dataset", f"img{i}.jpg") for i in range(1, 11)}
+
+    checkpoints = []
+    parallel = find_bulk_embeddings(
+        employees=employees,
+        silent=True,
+        batch_size=4,
+        workers=4,
+        checkpoint=checkpoints.append,
+        checkpoint_size=3,
+    )
+    serial = find_bulk_embeddings(employees=employees, silent=True, workers=1)
+
+    # all images are saved once in checkpoints of completed images
+    assert [item for checkpoint in checkpoints for item in checkpoint] == parallel
+    assert len(checkpoints) > 1
+    for checkpoint in checkpoints:
+        assert all(item["embedding"] is not None for item in checkpoint)
+
+    assert {item["identity"] for item in parallel} == employees
+    for parallel_item, serial_item in zip(parallel, serial):
+        assert parallel_item["identity"] == serial_item["identity"]
+        assert parallel_item["target_x"] == serial_item["target_x"]
+        distance = verification.find_distance(
+            parallel_item["embedding"], serial_item["embedding"], "cosine"
+        )
+        assert distance < 1e-4
+
+    logger.info("✅ test find bulk embeddings in parallel done")
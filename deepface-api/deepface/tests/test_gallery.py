@@ -0,0 +1,101 @@
+# 3rd party dependencies
+import pytest
+import cv2
+
+# project dependencies
+from deepface import DeepFace
+from deepface.modules import gallery, verification
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def test_verify_with_gallery_id():
+    gallery.remove("unit-test-user")
+
+    first = DeepFace.verify("dataset/img1.jpg", "dataset/img2.jpg", gallery_id="unit-test-user")
+    assert first["verified"] is True
+
+    # enrolled image is not required anymore
+    second = DeepFace.verify("dataset/img1.jpg", None, gallery_id="unit-test-user")
+    assert second["verified"] is True
+    assert second["distance"] == first["distance"]
+    assert second["facial_areas"]["img2"] == first["facial_areas"]["img2"]
+
+    # same result with the classical verification
+    classical = DeepFace.verify("dataset/img1.jpg", "dataset/img2.jpg")
+    assert classical["distance"] == first["distance"]
+
+    logger.info("✅ test verify with gallery id done")
+
+
+def test_re_enrollment_with_changed_content():
+    gallery.remove("unit-test-user")
+
+    enrollment = DeepFace.enroll(gallery_id="unit-test-user", img_path="dataset/img2.jpg")
+    assert enrollment["gallery_id"] == "unit-test-user"
+    assert len(enrollment["embeddings"]) == len(enrollment["facial_areas"]) > 0
+
+    # same content must not be re-calculated
+    assert DeepFace.enroll(gallery_id="unit-test-user", img_path="dataset/img2.jpg") == enrollment
+
+    # callers get a copy of the enrollment, so they cannot change the gallery
+    enrollment["facial_areas"][0]["x"] = -1
+    assert gallery.find_enrollment("unit-test-user")["facial_areas"][0]["x"] != -1
+
+    # changed content must be re-calculated
+    res = DeepFace.verify("dataset/img1.jpg", "dataset/img3.jpg", gallery_id="unit-test-user")
+    assert res["verified"] is False
+    assert gallery.find_enrollment("unit-test-user")["hash"] != enrollment["hash"]
+
+    logger.info("✅ test re-enrollment with changed content done")
+
+
+def test_verify_for_non_enrolled_gallery_id(monkeypatch):
+    gallery.remove("unit-test-user")
+
+    # enrollment is looked up before the first image is processed
+    def extract_faces(**kwargs):
+        raise AssertionError("img1 must not be processed for a non enrolled identity")
+
+    monkeypatch.setattr(verification.detection, "extract_faces", extract_faces)
+
+    with pytest.raises(ValueError, match="is not enrolled into the gallery"):
+        DeepFace.verify("dataset/img1.jpg", None, gallery_id="unit-test-user")
+
+    logger.info("✅ test verify for non enrolled gallery id done")
+
+
+def test_gallery_is_persisted():
+    gallery.remove("unit-test-user")
+    enrollment = DeepFace.enroll(gallery_id="unit-test-user", img_path="dataset/img2.jpg")
+
+    gallery.flush_cache()
+
+    restored = gallery.find_enrollment("unit-test-user")
+    assert restored is not enrollment
+    assert restored["hash"] == enrollment["hash"]
+    assert restored["embeddings"] == enrollment["embeddings"]
+
+    assert gallery.remove("unit-test-user") == 1
+    assert gallery.find_enrollment("unit-test-user") is None
+
+    logger.info("✅ test gallery persistence done")
+
+
+def test_content_hash():
+    img_path = "dataset/img1.jpg"
+    img = cv2.imread(img_path)
+
+    assert gallery.find_content_hash(img_path) == gallery.find_content_hash(img_path)
+    assert gallery.find_content_hash(img) == gallery.find_content_hash(img.copy())
+    assert gallery.find_content_hash(img) != gallery.find_content_hash(img[:, ::-1])
+    assert gallery.find_content_hash(img_path) != gallery.find_content_hash("dataset/img2.jpg")
+    assert gallery.find_content_hash("data:image/jpeg;base64,AAAA") != gallery.find_content_hash(
+        "data:image/jpeg;base64,AAAB"
+    )
+
+    with pytest.raises(ValueError, match="img must be numpy array or str"):
+        gallery.find_content_hash(123)
+
+    logger.info("✅ test content hash done")
@@ -0,0 +1,239 @@
+# built-in dependencies
+import base64
+
+# 3rd party dependencies
+import cv2
+import pytest
+import numpy as np
+from flask import Flask
+
+# project dependencies
+from deepface.commons import image_utils
+from deepface.api.src.modules.core import routes, service
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def test_image_format_and_size_from_headers():
+    for img_path in ["dataset/img1.jpg", "dataset/img3.jpg", "dataset/couple.jpg"]:
+        with open(img_path, "rb") as img_file:
+            data = img_file.read()
+        img = cv2.imread(img_path, cv2.IMREAD_IGNORE_ORIENTATION | cv2.IMREAD_COLOR)
+        assert image_utils.find_image_format(data) == "jpeg"
+        assert image_utils.find_image_size(data) == img.shape[:2]
+
+    png_data = cv2.imencode(".png", np.zeros((30, 40, 3), dtype=np.uint8))[1].tobytes()
+    assert image_utils.find_image_format(png_data) == "png"
+    assert image_utils.find_image_size(png_data) == (30, 40)
+
+    with open("dataset/img47.jpg", "rb") as img_file:
+        webp_data = img_file.read()
+    assert image_utils.find_image_format(webp_data) == "webp"
+    assert image_utils.find_image_size(webp_data) is None
+    assert image_utils.find_image_format(b"") == "unknown"
+
+    logger.info("✅ test image format and size from headers done")
+
+
+def test_reduced_decoding():
+    with open("dataset/couple.jpg", "rb") as img_file:
+        data = img_file.read()
+    height, width = image_utils.find_image_size(data)
+
+    assert image_utils.find_reduction(data) == 1
+    assert image_utils.find_reduction(data, max_size=max(height, width)) == 1
+    assert image_utils.find_reduction(data, max_size=max(height, width) // 4) == 4
+    assert image_utils.find_reduction(data, max_size=1) == 8
+
+    img = image_utils.load_image_from_bytes(data)
+    assert img.shape[:2] == (height, width)
+
+    reduced_img = image_utils.load_image_from_bytes(data, reduction=4)
+    assert reduced_img.shape[:2] == (-(-height // 4), -(-width // 4))
+
+    with pytest.raises(ValueError, match="reduction must be 1, 2, 4 or 8"):
+        image_utils.load_image_from_bytes(data, reduction=3)
+
+    with pytest.raises(ValueError, match="Failed to decode image"):
+        image_utils.load_image_from_bytes(data[:64])
+
+    logger.info("✅ test reduced decoding done")
+
+
+def test_base64_is_decoded_once():
+    with open("dataset/img1.jpg", "rb") as img_file:
+        data = img_file.read()
+    uri = "data:image/jpeg;base64," + base64.b64encode(data).decode("utf8")
+
+    assert image_utils.decode_base64(uri) == data
+    assert np.array_equal(image_utils.load_image_from_base64(uri), cv2.imread("dataset/img1.jpg"))
+
+    logger.info("✅ test base64 is decoded once done")
+
+
+@pytest.fixture(name="client")
+def fixture_client(monkeypatch):
+    # facial area of the whole image to check coordinates are scaled back
+    def represent(img_path, **kwargs):
+        height, width = img_path.shape[:2]
+        facial_area = {"x": 1, "y": 2, "w": width, "h": height, "left_eye": (3, 4)}
+        return {"results": [{"embedding": [], "facial_area": facial_area, "kwargs": kwargs}]}
+
+    monkeypatch.setattr(routes.service, "represent", represent)
+    app = Flask(__name__)
+    app.register_blueprint(routes.blueprint)
+    yield app.test_client()
+
+
+def test_represent_for_image_body(client):
+    with open("dataset/couple.jpg", "rb") as img_file:
+        data = img_file.read()
+    height, width = image_utils.find_image_size(data)
+
+    response = client.post(
+        "/represent?model_name=Facenet", data=data, content_type="image/jpeg"
+    )
+    assert response.status_code == 200
+    result = response.json["results"][0]
+    assert result["kwargs"]["model_name"] == "Facenet"
+    assert result["facial_area"] == {
+        "x": 1,
+        "y": 2,
+        "w": width,
+        "h": height,
+        "left_eye": [3, 4],
+    }
+
+    # large images are decoded at lower resolution, and facial areas are scaled back
+    response = client.post(
+        f"/represent?max_image_size={width // 2}", data=data, content_type="image/jpeg"
+    )
+    assert response.status_code == 200
+    assert response.json["results"][0]["facial_area"] == {
+        "x": 2,
+        "y": 4,
+        "w": 2 * (-(-width // 2)),
+        "h": 2 * (-(-height // 2)),
+        "left_eye": [6, 8],
+    }
+
+    # base64 encoded images in json are reduced as well
+    uri = "data:image/jpeg;base64," + base64.b64encode(data).decode("utf8")
+    response = client.post("/represent", json={"img": uri, "max_image_size": width // 4})
+    assert response.status_code == 200
+    assert response.json["results"][0]["facial_area"]["left_eye"] == [12, 16]
+
+    response = client.post("/represent", data=b"", content_type="image/jpeg")
+    assert response.status_code == 400
+
+    with open("dataset/img47.jpg", "rb") as img_file:
+        response = client.post("/represent", data=img_file.read(), content_type="image/jpeg")
+    assert response.status_code == 400
+    assert "Input image can be jpg or png, but it is webp" in response.json["exception"]
+
+    logger.info("✅ test represent for image body done")
+
+
+def test_query_string_arguments_are_parsed(monkeypatch):
+    calls = []
+
+    def represent(**kwargs):
+        calls.append(kwargs)
+        return []
+
+    # service itself passes the arguments to DeepFace
+    monkeypatch.setattr(service.DeepFace, "represent", represent)
+    app = Flask(__name__)
+    app.register_blueprint(routes.blueprint)
+    client = app.test_client()
+
+    with open("dataset/img1.jpg", "rb") as img_file:
+        data = img_file.read()
+
+    response = client.post(
+        "/represent?anti_spoofing=true&enforce_detection=false&align=False&max_faces=1",
+        data=data,
+        content_type="image/jpeg",
+    )
+    assert response.status_code == 200
+    assert calls[0]["anti_spoofing"] is True
+    assert calls[0]["enforce_detection"] is False
+    assert calls[0]["align"] is False
+    assert calls[0]["max_faces"] == 1
+
+    response = client.post(
+        "/represent?anti_spoofing=maybe", data=data, content_type="image/jpeg"
+    )
+    assert response.status_code == 400
+    assert "anti_spoofing must be true or false" in response.json["exception"]
+
+    response = client.post("/represent?max_faces=one", data=data, content_type="image/jpeg")
+    assert response.status_code == 400
+    assert len(calls) == 1
+
+    logger.info("✅ test query string arguments are parsed done")
+
+
+def test_shared_facial_areas_are_not_scaled_in_place(monkeypatch):
+    # facial areas served from the gallery are shared by all requests
+    enrolled_area = {"x": 1, "y": 2, "w": 3, "h": 4, "left_eye": (5, 6)}
+
+    def verify(**_):
+        return {"facial_areas": {"img1": dict(enrolled_area), "img2": enrolled_area}}
+
+    monkeypatch.setattr(routes.service, "verify", verify)
+    app = Flask(__name__)
+    app.register_blueprint(routes.blueprint)
+    client = app.test_client()
+
+    with open("dataset/couple.jpg", "rb") as img_file:
+        data = img_file.read()
+    width = image_utils.find_image_size(data)[1]
+    uri = "data:image/jpeg;base64," + base64.b64encode(data).decode("utf8")
+
+    for _ in range(2):
+        response = client.post(
+            "/verify", json={"img1": uri, "img2": uri, "max_image_size": width // 4}
+        )
+        assert response.status_code == 200
+        assert response.json["facial_areas"]["img2"] == {
+            "x": 4,
+            "y": 8,
+            "w": 12,
+            "h": 16,
+            "left_eye": [20, 24],
+        }
+    assert enrolled_area == {"x": 1, "y": 2, "w": 3, "h": 4, "left_eye": (5, 6)}
+
+    logger.info("✅ test shared facial areas are not scaled in place done")
+
+
+def test_enrolled_image_is_not_decoded(monkeypatch):
+    calls = []
+
+    def verify(**kwargs):
+        calls.append(kwargs)
+        return {"facial_areas": {"img1": {}, "img2": {}}}
+
+    monkeypatch.setattr(routes.service, "verify", verify)
+    app = Flask(__name__)
+    app.register_blueprint(routes.blueprint)
+    client = app.test_client()
+
+    with open("dataset/img1.jpg", "rb") as img_file:
+        uri = "data:image/jpeg;base64," + base64.b64encode(img_file.read()).decode("utf8")
+
+    # enrolled image is passed as it is sent, so the gallery compares its hash first
+    response = client.post(
+        "/verify", json={"img1": uri, "img2": uri, "gallery_id": "user", "max_image_size": 100}
+    )
+    assert response.status_code == 200
+    assert isinstance(calls[0]["img1_path"], np.ndarray)
+    assert calls[0]["img2_path"] == uri
+
+    response = client.post("/verify", json={"img1": uri, "gallery_id": "user"})
+    assert response.status_code == 200
+    assert calls[1]["img2_path"] is None
+
+    logger.info("✅ test enrolled image is not decoded done")
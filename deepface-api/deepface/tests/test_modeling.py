@@ -0,0 +1,176 @@
+# built-in dependencies
+import os
+import sys
+import json
+import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# 3rd party dependencies
+import pytest
+import numpy as np
+
+# project dependencies
+from deepface.modules import modeling
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+class FakeKerasModel:
+    def __init__(self, megabytes: int):
+        self.weights = [np.zeros((megabytes, 256, 1024), dtype=np.float32)]
+
+    def count_params(self):
+        return self.weights[0].size
+
+
+def create_client(megabytes: int, constructions: list):
+    class FakeClient:
+        def __init__(self):
+            constructions.append(time.time())
+            time.sleep(0.2)
+            self.model = FakeKerasModel(megabytes)
+            self.model_name = "Fake"
+
+    return FakeClient
+
+
+@pytest.fixture(name="fake_models")
+def fixture_fake_models(monkeypatch):
+    constructions = {"small": [], "medium": [], "large": []}
+    monkeypatch.setitem(
+        modeling.models,
+        "facial_recognition",
+        {
+            **modeling.models["facial_recognition"],
+            "small": create_client(1, constructions["small"]),
+            "medium": create_client(2, constructions["medium"]),
+            "large": create_client(4, constructions["large"]),
+        },
+    )
+    yield constructions
+    for model_name in constructions:
+        key = ("facial_recognition", model_name)
+        modeling.cached_models.pop(key, None)
+        modeling.model_stats.pop(key, None)
+        modeling.pinned_models.discard(key)
+
+
+def test_concurrent_requests_build_model_once(fake_models):
+    with ThreadPoolExecutor(8) as pool:
+        clients = list(
+            pool.map(
+                lambda _: modeling.build_model(task="facial_recognition", model_name="small"),
+                range(8),
+            )
+        )
+
+    assert len(fake_models["small"]) == 1
+    assert all(client is clients[0] for client in clients)
+
+    stats = modeling.get_stats()["facial_recognition/small"]
+    assert stats["loads"] == 1 and stats["hits"] == 7
+    assert stats["memory"] == 1024 * 1024
+    assert stats["load_time"] >= 0.2
+
+    logger.info("✅ test concurrent requests build model once done")
+
+
+def test_least_recently_used_models_are_evicted(fake_models, monkeypatch):
+    monkeypatch.setenv("DEEPFACE_MODEL_MEMORY_BUDGET", "6")
+
+    modeling.build_model(task="facial_recognition", model_name="small")
+    modeling.build_model(task="facial_recognition", model_name="medium")
+    # small one is used recently, so medium one is evicted for the large one
+    modeling.build_model(task="facial_recognition", model_name="small")
+    modeling.build_model(task="facial_recognition", model_name="large")
+
+    stats = modeling.get_stats()
+    assert stats["facial_recognition/small"]["resident"] is True
+    assert stats["facial_recognition/large"]["resident"] is True
+    assert stats["facial_recognition/medium"]["resident"] is False
+    assert stats["facial_recognition/medium"]["evictions"] == 1
+
+    # evicted model is built again on its next request
+    modeling.build_model(task="facial_recognition", model_name="medium")
+    assert len(fake_models["medium"]) == 2
+
+    logger.info("✅ test least recently used models are evicted done")
+
+
+def test_warm_up(fake_models, monkeypatch):
+    monkeypatch.setenv("DEEPFACE_MODEL_MEMORY_BUDGET", "4")
+    monkeypatch.setenv("DEEPFACE_WARMUP_MODELS", "face_detector/opencv")
+
+    stats = modeling.warm_up()
+    assert stats["face_detector/opencv"]["resident"] is True
+    assert stats["face_detector/opencv"]["pinned"] is True
+
+    # warmed up models are never evicted
+    modeling.build_model(task="facial_recognition", model_name="large")
+    assert modeling.get_stats()["face_detector/opencv"]["resident"] is True
+    assert len(fake_models["large"]) == 1
+
+    with pytest.raises(ValueError, match="must be in task/model_name format"):
+        modeling.warm_up(["opencv"])
+
+    # dummy inputs of models with non square inputs are in (height, width) order
+    class DeepIdLikeClient:
+        def __init__(self):
+            self.input_shape = (47, 55)
+            self.inputs = []
+
+        def forward_batch(self, imgs: np.ndarray) -> np.ndarray:
+            self.inputs.append(imgs.shape)
+            return np.zeros((len(imgs), 160))
+
+    monkeypatch.setitem(modeling.models["facial_recognition"], "deepid-like", DeepIdLikeClient)
+    modeling.warm_up(["facial_recognition/deepid-like"])
+    model = modeling.build_model(task="facial_recognition", model_name="deepid-like")
+    assert model.inputs == [(1, 55, 47, 3)]
+    modeling.cached_models.pop(("facial_recognition", "deepid-like"), None)
+    modeling.model_stats.pop(("facial_recognition", "deepid-like"), None)
+    modeling.pinned_models.discard(("facial_recognition", "deepid-like"))
+
+    logger.info("✅ test warm up done")
+
+
+def test_models_are_imported_on_first_build():
+    # fresh interpreter, because tensorflow is already imported by other tests
+    script = (
+        "import sys, json; import deepface.api.src.app; "
+        "from deepface.modules import modeling; "
+        "imported = lambda: sorted(name for name in sys.modules if name.startswith("
+        "('tensorflow', 'torch', 'deepface.models.'))); "
+        "before = imported(); "
+        "modeling.build_model(task='face_detector', model_name='opencv'); "
+        "print(json.dumps([before, imported()]))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": root},
+        check=True,
+    )
+    before, after = json.loads(result.stdout.splitlines()[-1])
+
+    # api is served without importing any model module or framework
+    assert before == ["deepface.models.Detector", "deepface.models.FacialRecognition"]
+    # just the built model is imported
+    assert set(after) - set(before) == {
+        "deepface.models.face_detection",
+        "deepface.models.face_detection.OpenCv",
+    }
+
+    assert modeling.find_model_class(task="face_detector", model_name="opencv").__name__ == (
+        "OpenCvClient"
+    )
+    with pytest.raises(ValueError, match="Invalid model_name passed"):
+        modeling.find_model_class(task="facial_recognition", model_name="x")
+    with pytest.raises(ValueError, match="unimplemented task"):
+        modeling.build_model(task="x", model_name="small")
+
+    logger.info("✅ test models are imported on first build done")
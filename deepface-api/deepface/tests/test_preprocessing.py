@@ -0,0 +1,72 @@
+# 3rd party dependencies
+import pytest
+import numpy as np
+
+# project dependencies
+from deepface.modules import preprocessing
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+NORMALIZATIONS = ["base", "raw", "Facenet", "Facenet2018", "VGGFace", "VGGFace2", "ArcFace"]
+
+
+def prepare_faces_one_by_one(faces, target_size, normalization):
+    imgs = []
+    for face in faces:
+        img = preprocessing.resize_image(img=face[:, :, ::-1], target_size=target_size)
+        imgs.append(preprocessing.normalize_input(img=img, normalization=normalization))
+    return np.concatenate(imgs, axis=0)
+
+
+def test_prepare_faces_is_same_with_resize_and_normalize():
+    rng = np.random.default_rng(seed=0)
+    # bgr faces in various sizes as detectors find
+    faces = [
+        rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        for height, width in [(120, 90), (300, 310), (55, 47), (224, 224)]
+    ]
+    # rgb faces in [0, 1] as extract_faces returns
+    rgb_faces = [face[:, :, ::-1] / 255 for face in faces]
+
+    for target_size in [(224, 224), (160, 160), (55, 47)]:
+        for normalization in NORMALIZATIONS:
+            expected = prepare_faces_one_by_one(rgb_faces, target_size, normalization)
+            tolerance = 1e-4 * max(1, np.abs(expected).max())
+
+            imgs = preprocessing.prepare_faces(
+                faces=rgb_faces, target_size=target_size, normalization=normalization
+            )
+            assert imgs.shape == expected.shape and imgs.dtype == np.float32
+            assert np.abs(imgs - expected).max() < tolerance
+
+            imgs = preprocessing.prepare_faces(
+                faces=faces,
+                target_size=target_size,
+                normalization=normalization,
+                color_face="bgr",
+            )
+            assert np.abs(imgs - expected).max() < tolerance
+
+    logger.info("✅ test prepare faces is same with resize and normalize done")
+
+
+def test_prepare_faces_reuses_buffers():
+    faces = [np.full((100, 80, 3), 255, dtype=np.uint8)] * 4
+
+    imgs = preprocessing.prepare_faces(faces=faces, target_size=(112, 112), color_face="bgr")
+    smaller_imgs = preprocessing.prepare_faces(
+        faces=faces[:2], target_size=(112, 112), color_face="bgr"
+    )
+    assert np.shares_memory(imgs, smaller_imgs)
+    assert len(smaller_imgs) == 2
+    # padded pixels are black and face pixels are white
+    assert smaller_imgs[:, :, 0].max() == 0 and smaller_imgs[:, :, 56].min() == pytest.approx(1)
+
+    with pytest.raises(ValueError, match="unimplemented normalization type"):
+        preprocessing.prepare_faces(faces=faces, target_size=(112, 112), normalization="x")
+
+    with pytest.raises(ValueError, match="color_face can be rgb or bgr"):
+        preprocessing.prepare_faces(faces=faces, target_size=(112, 112), color_face="gray")
+
+    logger.info("✅ test prepare faces reuses buffers done")
@@ -1,8 +1,13 @@
 # built-in dependencies
 import cv2
 
+# 3rd party dependencies
+import pytest
+import numpy as np
+
 # project dependencies
 from deepface import DeepFace
+from deepface.models.FacialRecognition import FacialRecognition
 from deepface.commons.logger import Logger
 
 logger = Logger()
@@ -60,3 +65,48 @@ def test_max_faces():
     max_faces = 1
     results = DeepFace.represent(img_path="dataset/couple.jpg", max_faces=max_faces)
     assert len(results) == max_faces
+
+
+def test_batched_represent_is_same_with_one_by_one():
+    # couple.jpg has more than one face, so they are fed to the model in a single batch
+    batched = DeepFace.represent(img_path="dataset/couple.jpg", model_name="Facenet")
+    one_by_one = DeepFace.represent(
+        img_path="dataset/couple.jpg", model_name="Facenet", batch_size=1
+    )
+    assert len(batched) == len(one_by_one) > 1
+    for batched_obj, single_obj in zip(batched, one_by_one):
+        assert batched_obj["facial_area"] == single_obj["facial_area"]
+        assert np.allclose(batched_obj["embedding"], single_obj["embedding"], atol=1e-4)
+
+    with pytest.raises(ValueError, match="batch_size must be a positive integer"):
+        DeepFace.represent(img_path="dataset/couple.jpg", batch_size=0)
+
+    logger.info("✅ test batched represent done")
+
+
+def test_forward_batch_of_clients_overwriting_forward():
+    class CustomClient(FacialRecognition):
+        def __init__(self):
+            self.model = None
+            self.model_name = "Custom"
+            self.input_shape = (4, 4)
+            self.output_shape = 2
+
+        def forward(self, img):
+            assert img.shape == (1, 4, 4, 3)
+            return [float(img.sum()), float(img.max())]
+
+    imgs = np.random.default_rng(seed=0).random((3, 4, 4, 3))
+    embeddings = CustomClient().forward_batch(imgs)
+    assert embeddings.shape == (3, 2)
+    assert np.allclose(embeddings[:, 0], imgs.reshape(3, -1).sum(axis=1))
+
+    class IncompleteClient(FacialRecognition):
+        def __init__(self):
+            self.model = None
+            self.model_name = "Incomplete"
+
+    with pytest.raises(ValueError, match="You must overwrite forward_batch method"):
+        IncompleteClient().forward_batch(imgs)
+
+    logger.info("✅ test forward batch of custom clients done")
@@ -0,0 +1,151 @@
+# 3rd party dependencies
+import pytest
+import numpy as np
+
+# project dependencies
+from deepface.modules import verification
+from deepface.modules.search import EmbeddingMatrix, IVFIndex
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+metrics = ["cosine", "euclidean", "euclidean_l2"]
+
+
+def test_distances_are_same_with_find_distance():
+    rng = np.random.default_rng(seed=0)
+    embeddings = rng.normal(size=(50, 128)).tolist()
+    target = rng.normal(size=128).tolist()
+
+    embedding_matrix = EmbeddingMatrix.from_list(embeddings)
+    assert embedding_matrix.embeddings.dtype == np.float32
+    assert embedding_matrix.embeddings.flags["C_CONTIGUOUS"]
+
+    for metric in metrics:
+        distances = embedding_matrix.find_distances(target, metric)
+        expected = [verification.find_distance(embedding, target, metric) for embedding in embeddings]
+        assert np.allclose(distances, expected, atol=1e-4)
+
+    logger.info("✅ test distances of embedding matrix done")
+
+
+def test_items_without_embedding_never_match():
+    embeddings = [[1.0, 0.0], None, [0.0, 1.0]]
+    embedding_matrix = EmbeddingMatrix.from_list(embeddings)
+
+    distances = embedding_matrix.find_distances([1.0, 0.0], "cosine")
+    assert distances[0] == 0
+    assert np.isinf(distances[1])
+
+    indices, _ = embedding_matrix.search([1.0, 0.0], "cosine", threshold=10)
+    assert indices.tolist() == [0, 2]
+
+    logger.info("✅ test items without embedding done")
+
+
+def test_matrix_without_any_embedding():
+    for embedding_matrix in [
+        EmbeddingMatrix.from_list([None, None]),
+        EmbeddingMatrix(embeddings=np.zeros((0, 0), dtype=np.float32)),
+    ]:
+        for metric in metrics:
+            distances = embedding_matrix.find_distances([1.0, 0.0], metric)
+            assert len(distances) == len(embedding_matrix)
+            assert np.isinf(distances).all()
+
+            indices, distances = embedding_matrix.search([1.0, 0.0], metric, threshold=10)
+            assert indices.tolist() == distances.tolist() == []
+
+    logger.info("✅ test matrix without any embedding done")
+
+
+def test_search_with_top_k():
+    rng = np.random.default_rng(seed=1)
+    embeddings = rng.normal(size=(1000, 64)).tolist()
+    target = rng.normal(size=64).tolist()
+
+    embedding_matrix = EmbeddingMatrix.from_list(embeddings)
+    all_indices, all_distances = embedding_matrix.search(target, "euclidean", threshold=np.inf)
+    assert len(all_indices) == 1000
+    assert np.all(np.diff(all_distances) >= 0)
+
+    top_indices, top_distances = embedding_matrix.search(
+        target, "euclidean", threshold=np.inf, top_k=5
+    )
+    assert top_indices.tolist() == all_indices[:5].tolist()
+    assert top_distances.tolist() == all_distances[:5].tolist()
+
+    logger.info("✅ test search with top k done")
+
+
+def test_dimension_mismatch():
+    embedding_matrix = EmbeddingMatrix.from_list([[1.0, 0.0, 0.0]])
+    with pytest.raises(ValueError, match="Source and target embeddings must have same dimensions"):
+        embedding_matrix.find_distances([1.0, 0.0], "cosine")
+
+    logger.info("✅ test dimension mismatch done")
+
+
+def create_clustered_embeddings(rng, identities=200, samples=5, dims=64):
+    centers = rng.normal(size=(identities, dims))
+    embeddings = np.repeat(centers, samples, axis=0) + 0.1 * rng.normal(
+        size=(identities * samples, dims)
+    )
+    return centers, embeddings.astype(np.float32)
+
+
+def test_ivf_index_with_all_probes_is_exact():
+    rng = np.random.default_rng(seed=2)
+    centers, embeddings = create_clustered_embeddings(rng)
+    embedding_matrix = EmbeddingMatrix(embeddings=embeddings)
+    index = IVFIndex.build(embedding_matrix, n_lists=16)
+
+    for target in centers[:10]:
+        for metric in metrics:
+            exact_indices, exact_distances = embedding_matrix.search(
+                target, metric, threshold=np.inf, top_k=5
+            )
+            indices, distances = index.search(
+                target, metric, threshold=np.inf, top_k=5, probes=16
+            )
+            assert indices.tolist() == exact_indices.tolist()
+            assert distances.tolist() == exact_distances.tolist()
+
+    logger.info("✅ test ivf index with all probes done")
+
+
+def test_ivf_index_recall():
+    rng = np.random.default_rng(seed=3)
+    centers, embeddings = create_clustered_embeddings(rng)
+    embedding_matrix = EmbeddingMatrix(embeddings=embeddings)
+    index = IVFIndex.build(embedding_matrix)
+
+    hits = 0
+    for i, target in enumerate(centers):
+        indices, _ = index.search(target, "cosine", threshold=np.inf, top_k=5, probes=4)
+        hits += len(set(indices.tolist()) & set(range(5 * i, 5 * i + 5)))
+    assert hits / embeddings.shape[0] > 0.95
+
+    logger.info("✅ test ivf index recall done")
+
+
+def test_ivf_index_update():
+    rng = np.random.default_rng(seed=4)
+    centers, embeddings = create_clustered_embeddings(rng)
+    index = IVFIndex.build(EmbeddingMatrix(embeddings=embeddings[:500]), n_lists=8)
+    assert len(index) == 500
+
+    # appended rows are assigned without training again
+    centroids = index.centroids.copy()
+    valid = np.ones(1000, dtype=bool)
+    valid[600] = False
+    assert index.update(EmbeddingMatrix(embeddings=embeddings, valid=valid)) is True
+    assert index.update(EmbeddingMatrix(embeddings=embeddings, valid=valid)) is False
+    assert len(index) == 1000
+    assert np.array_equal(index.centroids, centroids)
+    assert index.assignments[600] == -1
+
+    indices, _ = index.search(centers[150], "cosine", threshold=np.inf, top_k=5, probes=8)
+    assert sorted(indices.tolist()) == list(range(750, 755))
+
+    logger.info("✅ test ivf index update done")
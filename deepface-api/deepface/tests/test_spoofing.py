@@ -0,0 +1,28 @@
+# 3rd party dependencies
+import cv2
+import pytest
+
+# project dependencies
+from deepface import DeepFace
+from deepface.modules import modeling
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def test_batched_anti_spoofing_is_same_with_single_faces():
+    img = cv2.imread("dataset/selfie-many-people.jpg")
+    face_objs = DeepFace.extract_faces(img_path=img, anti_spoofing=True)
+    assert len(face_objs) > 1
+
+    antispoof_model = modeling.build_model(task="spoofing", model_name="Fasnet")
+    for face_obj in face_objs:
+        facial_area = tuple(face_obj["facial_area"][key] for key in ["x", "y", "w", "h"])
+        is_real, antispoof_score = antispoof_model.analyze(img=img, facial_area=facial_area)
+        assert face_obj["is_real"] is is_real
+        assert isinstance(face_obj["antispoof_score"], float)
+        assert face_obj["antispoof_score"] == pytest.approx(antispoof_score, abs=1e-5)
+
+    assert antispoof_model.analyze_batch(img=img, facial_areas=[]) == []
+
+    logger.info("✅ test batched anti spoofing is same with single faces done")
@@ -0,0 +1,294 @@
+# built-in dependencies
+import time
+import shutil
+import threading
+
+# 3rd party dependencies
+import cv2
+import pytest
+import numpy as np
+
+# project dependencies
+from deepface import DeepFace
+from deepface.modules import modeling, streaming
+from deepface.modules.tracking import Track
+from deepface.models.Demography import Demography
+from deepface.models.Detector import Detector, FacialAreaRegion
+from deepface.models.FacialRecognition import FacialRecognition
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+class PixelClient(FacialRecognition):
+    """
+    Weight-free facial recognition model using down-sampled pixels as embeddings
+    """
+
+    def __init__(self):
+        self.model = None
+        self.model_name = "Pixel"
+        self.input_shape = (8, 8)
+        self.output_shape = 192
+
+    def forward_batch(self, imgs: np.ndarray) -> np.ndarray:
+        return imgs.reshape(imgs.shape[0], -1)
+
+
+@pytest.fixture(name="pixel_model")
+def fixture_pixel_model(monkeypatch):
+    monkeypatch.setitem(modeling.models["facial_recognition"], "Pixel", PixelClient)
+    yield "Pixel"
+    modeling.cached_models.pop(("facial_recognition", "Pixel"), None)
+    modeling.model_stats.pop(("facial_recognition", "Pixel"), None)
+
+
+def test_identity_gallery(tmp_path, pixel_model):
+    db_path = tmp_path / "db"
+    db_path.mkdir()
+    for img_name in ["img1.jpg", "img3.jpg"]:
+        shutil.copy(f"dataset/{img_name}", db_path / img_name)
+
+    gallery = streaming.IdentityGallery(db_path=str(db_path), model_name=pixel_model)
+    gallery.refresh()
+    embedding_matrix, row_metadata, thumbnails = gallery.snapshot
+    assert len(row_metadata) == len(embedding_matrix.embeddings) == 2
+    assert all(
+        thumbnail.shape == (streaming.IDENTIFIED_IMG_SIZE, streaming.IDENTIFIED_IMG_SIZE, 3)
+        for thumbnail in thumbnails.values()
+    )
+
+    # detected faces are searched in memory instead of calling find for each of them
+    detected_faces = [
+        (face_obj["face"][:, :, ::-1] * 255).astype(np.uint8)
+        for img_name in ["img3.jpg", "img1.jpg"]
+        for face_obj in DeepFace.extract_faces(f"dataset/{img_name}")
+    ]
+    results = gallery.search_identities(detected_faces)
+    assert [label for label, _ in results] == ["img3.jpg", "img1.jpg"]
+    assert gallery.search_identities([]) == []
+
+    # unchanged database is not reloaded
+    snapshot = gallery.snapshot
+    gallery.refresh()
+    assert gallery.snapshot is snapshot
+
+    # new images are loaded and thumbnails of the old ones are reused
+    shutil.copy("dataset/img2.jpg", db_path / "img2.jpg")
+    gallery.refresh()
+    _, row_metadata, new_thumbnails = gallery.snapshot
+    assert len(row_metadata) == 3
+    for key, thumbnail in thumbnails.items():
+        assert new_thumbnails[key] is thumbnail
+
+    logger.info("✅ test identity gallery done")
+
+
+def test_identity_gallery_embeddings_are_same_with_find(tmp_path, pixel_model):
+    shutil.copy("dataset/img1.jpg", tmp_path / "img1.jpg")
+    gallery = streaming.IdentityGallery(db_path=str(tmp_path), model_name=pixel_model)
+
+    # unaligned crops of the stream detector, as streaming.extract_facial_areas finds them
+    img = cv2.imread("dataset/img3.jpg")
+    faces_coordinates = streaming.grab_facial_areas(img=img, detector_backend="opencv")
+    detected_faces = streaming.extract_facial_areas(img=img, faces_coordinates=faces_coordinates)
+    assert len(detected_faces) > 0
+
+    reference = DeepFace.represent(
+        img_path=str(tmp_path / "img1.jpg"), model_name=pixel_model, enforce_detection=False
+    )[0]["embedding"]
+    embeddings = gallery.find_embeddings(detected_faces)
+    for detected_face, embedding in zip(detected_faces, embeddings):
+        dfs = DeepFace.find(
+            img_path=detected_face,
+            db_path=str(tmp_path),
+            model_name=pixel_model,
+            distance_metric="euclidean",
+            threshold=np.inf,
+            enforce_detection=False,
+            silent=True,
+        )
+        # distance found by find is the distance of the aligned face
+        distance = np.linalg.norm(np.array(embedding) - np.array(reference))
+        assert dfs[0]["distance"][0] == pytest.approx(distance, abs=1e-3)
+
+    logger.info("✅ test identity gallery embeddings are same with find done")
+
+
+def test_identity_gallery_for_empty_database(tmp_path, pixel_model):
+    gallery = streaming.IdentityGallery(db_path=str(tmp_path), model_name=pixel_model)
+    gallery.refresh()
+
+    assert gallery.search_identities([np.zeros((224, 224, 3), dtype=np.uint8)]) == [(None, None)]
+
+    logger.info("✅ test identity gallery for empty database done")
+
+
+class StatefulDetector(Detector):
+    """
+    Detector keeping its input between two steps as opencv cascades and networks do
+    """
+
+    def __init__(self):
+        self.img = None
+
+    def detect_faces(self, img):
+        self.img = img
+        time.sleep(0.005)
+        # face size is the pixel value of the image set in the former step
+        size = int(self.img[0, 0, 0])
+        return [FacialAreaRegion(x=0, y=0, w=size, h=size, confidence=0.9)]
+
+
+def test_gallery_refresh_and_inference_share_detector(tmp_path, pixel_model, monkeypatch):
+    monkeypatch.setitem(modeling.models["face_detector"], "stateful", StatefulDetector)
+    for i in range(20):
+        cv2.imwrite(str(tmp_path / f"img{i}.png"), np.full((64, 64, 3), 30, dtype=np.uint8))
+
+    gallery = streaming.IdentityGallery(
+        db_path=str(tmp_path), model_name=pixel_model, detector_backend="stateful"
+    )
+    # gallery is synchronized in background while frames are detected
+    refresher = threading.Thread(target=gallery.refresh)
+    refresher.start()
+    sizes = []
+    while refresher.is_alive() or len(sizes) < 20:
+        size = 140 + len(sizes) % 100
+        frame = np.full((256, 256, 3), size, dtype=np.uint8)
+        faces = streaming.grab_facial_areas(img=frame, detector_backend="stateful")
+        assert [w for _, _, w, _, _, _ in faces] == [size]
+        sizes.append(size)
+    refresher.join()
+
+    # database faces are not mixed with the frames either
+    _, row_metadata, _ = gallery.snapshot
+    assert len(row_metadata) == 20
+    assert all(metadata["target_w"] == 30 for metadata in row_metadata)
+
+    modeling.cached_models.pop(("face_detector", "stateful"), None)
+    modeling.model_stats.pop(("face_detector", "stateful"), None)
+    logger.info("✅ test gallery refresh and inference share detector done")
+
+
+class CountingDemographyClient(Demography):
+    """
+    Weight-free facial attribute model recording the batch size of each call
+    """
+
+    calls = []
+
+    def __init__(self):
+        self.model = None
+        self.model_name = "Counting"
+
+    def predict_batch(self, imgs: np.ndarray):
+        self.calls.append(len(imgs))
+        # shared age, gender and race model returns predictions of each model
+        return {
+            "Age": np.full(len(imgs), 30.0),
+            "Gender": np.tile([0.2, 0.8], (len(imgs), 1)),
+            "Race": np.full((len(imgs), 6), 1 / 6),
+        }
+
+
+class CountingEmotionClient(CountingDemographyClient):
+    """
+    Weight-free emotion model recording the batch size of each call
+    """
+
+    def predict_batch(self, imgs: np.ndarray):
+        self.calls.append(len(imgs))
+        return np.tile(np.arange(7, dtype=np.float64), (len(imgs), 1))
+
+
+def test_tracks_are_analyzed_together(tmp_path, pixel_model, monkeypatch):
+    for model_name, client in [
+        ("Age-Gender-Race", CountingDemographyClient),
+        ("Emotion", CountingEmotionClient),
+    ]:
+        monkeypatch.setitem(modeling.models["facial_attribute"], model_name, client)
+        modeling.build_model(task="facial_attribute", model_name=model_name)
+    CountingDemographyClient.calls.clear()
+
+    gallery = streaming.IdentityGallery(db_path=str(tmp_path), model_name=pixel_model)
+    tracks = [Track(track_id=i, box=(40 * i, 10, 30, 30)) for i in range(3)]
+    streaming.analyze_tracks(
+        img=cv2.imread("dataset/img1.jpg"),
+        tracks=tracks,
+        gallery=gallery,
+        enable_face_analysis=True,
+    )
+
+    # one call per model for all tracks instead of one call per track
+    assert CountingDemographyClient.calls == [3, 3]
+    for track in tracks:
+        assert track.analyzed is True
+        assert track.demography["age"] == 30
+        assert track.demography["dominant_gender"] == "Man"
+        assert track.demography["dominant_emotion"] == "neutral"
+
+    for model_name in ["Age-Gender-Race", "Emotion"]:
+        modeling.cached_models.pop(("facial_attribute", model_name), None)
+        modeling.model_stats.pop(("facial_attribute", model_name), None)
+    logger.info("✅ test tracks are analyzed together done")
+
+
+def create_video(video_path: str, frames: int, fps: int) -> None:
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), i, dtype=np.uint8))
+    writer.release()
+
+
+def test_frame_grabber_keeps_only_latest_frame(tmp_path):
+    video_path = str(tmp_path / "video.avi")
+    create_video(video_path, frames=40, fps=100)
+
+    stats = streaming.StreamStats()
+    grabber = streaming.FrameGrabber(source=video_path, stats=stats)
+    # video files are read at their own frame rate
+    assert grabber.frame_interval == pytest.approx(0.01)
+    grabber.start()
+
+    # a slow consumer skips frames instead of queueing them
+    read_indices = []
+    frame_index = 0
+    while True:
+        frame, frame_index, captured_at = grabber.read(frame_index, timeout=1)
+        if frame is None:
+            break
+        assert frame.shape == (48, 64, 3) and captured_at > 0
+        read_indices.append(frame_index)
+        time.sleep(0.05)
+
+    assert grabber.stopped is True
+    assert read_indices[-1] == 40
+    assert len(read_indices) < 20
+    assert read_indices == sorted(set(read_indices))
+    assert 50 < stats.summary()["capture_fps"] < 150
+
+    logger.info("✅ test frame grabber keeps only latest frame done")
+
+
+def test_stream_stats():
+    stats = streaming.StreamStats(smoothing=0.5)
+    assert stats.summary() == {
+        "capture_fps": 0.0,
+        "detection_fps": 0.0,
+        "inference_fps": 0.0,
+        "render_fps": 0.0,
+        "latency_ms": 0.0,
+    }
+
+    for _ in range(5):
+        stats.tick("inference")
+        time.sleep(0.02)
+    stats.add_latency(0.1)
+    stats.add_latency(0.2)
+
+    summary = stats.summary()
+    assert 20 < summary["inference_fps"] < 55
+    assert summary["latency_ms"] == pytest.approx(150)
+    assert summary["render_fps"] == 0.0
+
+    logger.info("✅ test stream stats done")
@@ -0,0 +1,106 @@
+# built-in dependencies
+import os
+import time
+from unittest import mock
+
+# 3rd party dependencies
+import pytest
+import numpy as np
+import cv2
+
+# project dependencies
+from deepface.commons import image_utils
+from deepface.modules import synchronization
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def write_image(file_path: str, value: int = 0):
+    img = np.full((8, 8, 3), value, dtype=np.uint8)
+    cv2.imwrite(file_path, img)
+
+
+def test_changes_are_found_incrementally(tmp_path):
+    db_path = str(tmp_path)
+    os.mkdir(os.path.join(db_path, "alice"))
+    write_image(os.path.join(db_path, "alice", "1.jpg"))
+    write_image(os.path.join(db_path, "bob.png"))
+    with open(os.path.join(db_path, "notes.txt"), "w", encoding="utf-8") as f:
+        f.write("not an image")
+
+    manifest = synchronization.DirectoryManifest(db_path)
+    manifest.sync()
+    assert set(manifest.hashes.keys()) == set(image_utils.list_images(db_path))
+    assert manifest.hashes[os.path.join(db_path, "bob.png")] == image_utils.find_image_hash(
+        os.path.join(db_path, "bob.png")
+    )
+
+    # nothing is opened if directories are not changed
+    version = manifest.version
+    with mock.patch.object(image_utils, "is_image", wraps=image_utils.is_image) as is_image:
+        manifest.sync()
+        assert is_image.call_count == 0
+    assert manifest.version == version
+
+    # add into a sub directory
+    write_image(os.path.join(db_path, "alice", "2.jpg"))
+    # replace with a new file
+    write_image(os.path.join(db_path, "bob.tmp.png"), value=255)
+    os.replace(os.path.join(db_path, "bob.tmp.png"), os.path.join(db_path, "bob.png"))
+    # add a new sub directory
+    os.mkdir(os.path.join(db_path, "carol"))
+    write_image(os.path.join(db_path, "carol", "1.jpg"))
+
+    previous_hashes = manifest.hashes
+    with mock.patch.object(image_utils, "is_image", wraps=image_utils.is_image) as is_image:
+        manifest.sync()
+        # only new or changed files are opened
+        assert is_image.call_count == 3
+
+    assert manifest.version > version
+    assert set(manifest.hashes.keys()) == set(image_utils.list_images(db_path))
+    assert manifest.hashes[os.path.join(db_path, "bob.png")] != previous_hashes[
+        os.path.join(db_path, "bob.png")
+    ]
+
+    # remove a file and a sub directory
+    os.remove(os.path.join(db_path, "alice", "1.jpg"))
+    os.remove(os.path.join(db_path, "carol", "1.jpg"))
+    os.rmdir(os.path.join(db_path, "carol"))
+    manifest.sync()
+    assert set(manifest.hashes.keys()) == set(image_utils.list_images(db_path))
+    assert os.path.join(db_path, "carol") not in manifest.directories
+
+    logger.info("✅ test changes are found incrementally done")
+
+
+@pytest.mark.skipif(
+    not synchronization.InotifyWatcher.is_available(), reason="inotify is not available"
+)
+def test_changes_are_found_with_inotify(tmp_path):
+    db_path = str(tmp_path)
+    write_image(os.path.join(db_path, "alice.jpg"))
+
+    manifest = synchronization.DirectoryManifest(db_path, watch=True)
+    assert manifest.watcher is not None
+    manifest.sync()
+    previous_hash = manifest.hashes[os.path.join(db_path, "alice.jpg")]
+
+    # overwriting in place does not change the directory mtime
+    time.sleep(0.01)
+    write_image(os.path.join(db_path, "alice.jpg"), value=255)
+    os.mkdir(os.path.join(db_path, "bob"))
+    write_image(os.path.join(db_path, "bob", "1.jpg"))
+
+    # events are read in background
+    for _ in range(100):
+        if len(manifest.watcher.dirty_files) > 0 and len(manifest.watcher.dirty_directories) > 0:
+            break
+        time.sleep(0.01)
+
+    manifest.sync()
+    assert manifest.hashes[os.path.join(db_path, "alice.jpg")] != previous_hash
+    assert set(manifest.hashes.keys()) == set(image_utils.list_images(db_path))
+
+    logger.info("✅ test changes are found with inotify done")
@@ -0,0 +1,90 @@
+# 3rd party dependencies
+import pytest
+import numpy as np
+
+# project dependencies
+from deepface.modules.tracking import FaceTracker, find_ious
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def create_frame(x: int, y: int) -> np.ndarray:
+    # textured square on a flat background, so optical flow can follow it
+    rng = np.random.default_rng(42)
+    patch = rng.integers(0, 256, size=(60, 60, 3), dtype=np.uint8)
+    img = np.full((200, 240, 3), 127, dtype=np.uint8)
+    img[y : y + 60, x : x + 60] = patch
+    return img
+
+
+def test_find_ious():
+    ious = find_ious(
+        np.array([[0, 0, 10, 10], [100, 100, 10, 10]]),
+        np.array([[0, 0, 10, 10], [5, 0, 10, 10], [50, 50, 10, 10]]),
+    )
+    assert ious.shape == (2, 3)
+    assert ious[0].tolist() == pytest.approx([1, 1 / 3, 0])
+    assert ious[1].tolist() == pytest.approx([0, 0, 0])
+    assert find_ious(np.zeros((0, 4)), np.zeros((2, 4))).shape == (0, 2)
+
+    logger.info("✅ test find ious done")
+
+
+def test_detections_are_associated_to_tracks():
+    tracker = FaceTracker()
+    img = create_frame(50, 50)
+
+    tracks = tracker.update(img, detections=[(50, 50, 60, 60, True, 0.9)])
+    assert len(tracks) == 1 and tracks[0].track_id == 1
+    tracks[0].analyzed = True
+
+    # slightly moved face keeps its track and its analysis, new face gets a new track
+    tracks = tracker.update(
+        img, detections=[(150, 20, 50, 50, False, 0.8), (54, 52, 60, 60, True, 0.95)]
+    )
+    assert sorted((track.track_id, track.analyzed) for track in tracks) == [(1, True), (2, False)]
+    assert tracks[0].coordinates == (54, 52, 60, 60, True, 0.95)
+    assert tracks[1].coordinates == (150, 20, 50, 50, False, 0.8)
+
+    # tracks missing more than max_misses detections are dropped
+    tracks = tracker.update(img, detections=[(150, 20, 50, 50, False, 0.8)])
+    assert [track.track_id for track in tracks] == [1, 2]
+    tracks = tracker.update(img, detections=[(150, 20, 50, 50, False, 0.8)])
+    assert [track.track_id for track in tracks] == [2]
+
+    with pytest.raises(ValueError, match="detection_interval must be a positive integer"):
+        FaceTracker(detection_interval=0)
+
+    logger.info("✅ test detections are associated to tracks done")
+
+
+def test_tracks_follow_faces_between_detections():
+    tracker = FaceTracker(detection_interval=3)
+    assert tracker.needs_detection() is True
+    tracker.update(create_frame(50, 50), detections=[(50, 50, 60, 60, True, 0)])
+
+    detections = 0
+    for i in range(1, 7):
+        if tracker.needs_detection():
+            detections += 1
+            tracks = tracker.update(
+                create_frame(50 + 3 * i, 50 + 2 * i),
+                detections=[(50 + 3 * i, 50 + 2 * i, 60, 60, True, 0)],
+            )
+        else:
+            tracks = tracker.update(create_frame(50 + 3 * i, 50 + 2 * i))
+
+        assert len(tracks) == 1 and tracks[0].track_id == 1
+        x, y, w, h, _, _ = tracks[0].coordinates
+        assert abs(x - (50 + 3 * i)) <= 1 and abs(y - (50 + 2 * i)) <= 1
+        assert abs(w - 60) <= 2 and abs(h - 60) <= 2
+
+    # detector runs every detection_interval frames only
+    assert detections == 2
+
+    # a face disappearing without a detection is lost, then detector runs
+    tracker.update(np.full((200, 240, 3), 127, dtype=np.uint8))
+    assert len(tracker.tracks) == 0 and tracker.needs_detection() is True
+
+    logger.info("✅ test tracks follow faces between detections done")
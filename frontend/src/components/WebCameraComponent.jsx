@@ -55,6 +55,9 @@ const videoWidth = 1024;
 const videoHeight = 576;
 const faceLandmarkerWait = 100;
 
+// pictures of the users enrolled into the gallery of the service in this session
+const enrolledPictures = new Map();
+
 const refVideoConstraints = {
     width: videoWidth,
     height: videoHeight,
@@ -391,28 +394,40 @@ const WebCameraComponent = ({ enableDetectFace, isVisable, setActiveComponent, s
     // /* --- Verify User Function --- */
     const verify = async (imageSrc) => {
         try {
-            const requestBody = JSON.stringify(
-              {
-                model_name: deepFaceFacialRecognitionModel,
-                detector_backend: deepFaceDetector,
-                distance_metric: deepFaceDistanceMetric,
-                align: true,
-                img1: imageSrc,
-                img2: user.user_picture,
-                enforce_detection: false,
-                anti_spoofing: deepFaceAntiSpoofing,
-              }
-            );
-            
-            const response = await fetch(`${deepFaceServiceEndpoint}/verify`, {
+            const postVerify = (withPicture) => fetch(`${deepFaceServiceEndpoint}/verify`, {
               method: 'POST',
               headers: {
                 'Content-Type': 'application/json',
               },
-              body: requestBody,
+              body: JSON.stringify(
+                {
+                  model_name: deepFaceFacialRecognitionModel,
+                  detector_backend: deepFaceDetector,
+                  distance_metric: deepFaceDistanceMetric,
+                  align: true,
+                  img1: imageSrc,
+                  // user_picture is sent just to enroll it, then the gallery serves its embeddings
+                  ...(withPicture ? { img2: user.user_picture } : {}),
+                  gallery_id: user.uid,
+                  enforce_detection: false,
+                  anti_spoofing: deepFaceAntiSpoofing,
+                }
+              ),
             });
-    
-            const data = await response.json();
+
+            const isEnrolled = enrolledPictures.get(user.uid) === user.user_picture;
+            let response = await postVerify(!isEnrolled);
+            let data = await response.json();
+
+            // gallery of the service may be removed or flushed, enroll the picture again
+            if (isEnrolled && response.status !== 200 && String(data.error).includes('is not enrolled')) {
+              response = await postVerify(true);
+              data = await response.json();
+            }
+
+            if (response.status === 200) {
+              enrolledPictures.set(user.uid, user.user_picture);
+            }
 
             // Store the verification data for display
             setVerificationData(data);